@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+
+"""
+Orçamento de peso das páginas do app (grafo de imports)
+Lê os imports de app/, components/, hooks/ e lib/, monta o grafo de arquivos e,
+para cada página (app/**/page.tsx com os layouts, loading e error acima dela),
+soma o peso transitivo do código-fonte:
+  - fonte: todo o código que a página alcança por imports estáticos
+  - cliente: o que fica abaixo de uma fronteira 'use client' (vai para o
+    navegador), mais a estimativa dos pacotes npm usados no cliente
+Imports dinâmicos (import() / next/dynamic) viram chunks separados e não
+entram na conta. Aponta os imports de cliente pesados nas páginas de
+app/(app)/* e compara cada rota com o orçamento de scripts/bundle_budgets.json.
+A leitura é incremental (cache por mtime/tamanho em .bundle-graph-cache.json)
+e os arquivos alterados são analisados em paralelo com --jobs.
+Execute com: python3 scripts/bundle_budget.py [--jobs 4] [--json] [--update-budgets]
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ts_source import SourceFile
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = '.bundle-graph-cache.json'
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bundle_budgets.json')
+SOURCE_DIRS = ('app', 'components', 'hooks', 'lib', 'types', 'middleware')
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs')
+RESOLVE_SUFFIXES = ('', '.ts', '.tsx', '.js', '.jsx', '.mjs', '/index.ts', '/index.tsx', '/index.js')
+SEGMENT_FILES = ('layout', 'template', 'loading', 'error')
+CLIENT_SECTION = 'app/(app)/'
+# Abaixo disso o paralelismo custa mais do que economiza
+PARALLEL_THRESHOLD = 16
+
+_FROM = re.compile(r'\bfrom\s*$')
+_SIDE_EFFECT = re.compile(r'(?:^|[^.\w$])import\s*$')
+_DYNAMIC = re.compile(r'(?:^|[^.\w$])import\s*\(\s*$')
+_REQUIRE = re.compile(r'\brequire\s*\(\s*$')
+_STATEMENT = re.compile(r'\b(import|export)\b')
+_TYPE_ONLY = re.compile(r'^\s+type\s+[{*\w]')
+
+
+def parse_source(path):
+    """Tamanho, diretiva 'use client' e imports [especificador, tipo] de um arquivo"""
+    source = SourceFile.read(path)
+    masked = source.masked
+    literals = source.literals
+    first = len(masked) - len(masked.lstrip())
+    client = bool(literals) and literals[0].start == first and literals[0].text == 'use client'
+    imports = []
+    for literal in literals:
+        if literal.quote == '`':
+            continue
+        before = masked[max(0, literal.start - 400):literal.start]
+        if _FROM.search(before):
+            statements = list(_STATEMENT.finditer(before))
+            if statements and _TYPE_ONLY.match(before[statements[-1].end():]):
+                continue
+            kind = 'static'
+        elif _DYNAMIC.search(before):
+            kind = 'dynamic'
+        elif _SIDE_EFFECT.search(before) or _REQUIRE.search(before):
+            kind = 'static'
+        else:
+            continue
+        imports.append([literal.text, kind])
+    return {'size': len(source.text.encode('utf-8')), 'client': client, 'imports': imports}
+
+
+def _parse_job(job):
+    root, relative = job
+    try:
+        return relative, parse_source(os.path.join(root, relative))
+    except (OSError, UnicodeDecodeError):
+        return relative, None
+
+
+def source_files(root):
+    files = []
+    for directory in SOURCE_DIRS:
+        for path in glob.glob(os.path.join(root, directory, '**', '*'), recursive=True):
+            if path.endswith(SOURCE_EXTENSIONS) and not path.endswith('.d.ts') and os.path.isfile(path):
+                files.append(os.path.relpath(path, root).replace(os.sep, '/'))
+    return sorted(files)
+
+
+class ImportGraph:
+    """Arquivos do projeto, seus imports resolvidos e a leitura incremental"""
+
+    def __init__(self, root='.', cache_file=None):
+        self.root = root
+        self.cache_file = cache_file
+        self.files = {}
+        self.parsed = 0
+        self.reused = 0
+
+    def _load_cache(self):
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get('files', {}) if data.get('version') == CACHE_VERSION else {}
+
+    def _save_cache(self):
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        fd, temporary = tempfile.mkstemp(prefix='.bundle-graph-', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': self.files}, f, separators=(',', ':'))
+        os.replace(temporary, self.cache_file)
+
+    def build(self, jobs=1):
+        """Reanalisa só os arquivos com mtime ou tamanho diferentes do cache"""
+        cached = self._load_cache()
+        changed = []
+        for relative in source_files(self.root):
+            stat = os.stat(os.path.join(self.root, relative))
+            entry = cached.get(relative)
+            if entry and entry['mtime'] == stat.st_mtime_ns and entry['bytes'] == stat.st_size:
+                self.files[relative] = entry
+                self.reused += 1
+            else:
+                changed.append((relative, stat))
+        jobs_list = [(self.root, relative) for relative, _ in changed]
+        if jobs > 1 and len(jobs_list) >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_parse_job, jobs_list, chunksize=8))
+        else:
+            results = [_parse_job(job) for job in jobs_list]
+        stats = dict(changed)
+        for relative, parsed in results:
+            if parsed is None:
+                continue
+            stat = stats[relative]
+            parsed.update(mtime=stat.st_mtime_ns, bytes=stat.st_size)
+            self.files[relative] = parsed
+            self.parsed += 1
+        if self.cache_file and (self.parsed or len(cached) != len(self.files)):
+            self._save_cache()
+        return self
+
+    def resolve(self, importer, specifier):
+        """Caminho relativo do arquivo importado, ou ('pacote', nome) para imports externos"""
+        if specifier.startswith('@/'):
+            base = specifier[2:]
+        elif specifier.startswith('.'):
+            base = os.path.normpath(os.path.join(os.path.dirname(importer), specifier)).replace(os.sep, '/')
+        else:
+            parts = specifier.split('/')
+            return ('package', '/'.join(parts[:2]) if specifier.startswith('@') else parts[0])
+        for suffix in RESOLVE_SUFFIXES:
+            candidate = base + suffix
+            if candidate in self.files:
+                return candidate
+        path = os.path.join(self.root, base)
+        if os.path.isfile(path):
+            # CSS e outros assets locais: entram pelo tamanho em disco
+            self.files.setdefault(base, {'size': os.path.getsize(path), 'client': False, 'imports': [],
+                                         'asset': True})
+            return base
+        return None
+
+    def edges(self, relative):
+        for specifier, kind in self.files[relative]['imports']:
+            yield specifier, kind, self.resolve(relative, specifier)
+
+
+def pages(root):
+    found = []
+    for path in glob.glob(os.path.join(root, 'app', '**', 'page.*'), recursive=True):
+        if path.endswith(SOURCE_EXTENSIONS):
+            found.append(os.path.relpath(path, root).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def route_of(page):
+    """app/(app)/licitacoes/[id]/page.tsx -> /licitacoes/[id] (grupos entre parênteses somem)"""
+    segments = page.split('/')[1:-1]
+    return '/' + '/'.join(segment for segment in segments if not (segment.startswith('(') and segment.endswith(')')))
+
+
+def segment_entries(graph, page):
+    """A página e os arquivos de segmento (layout, loading, error...) de cada diretório acima dela"""
+    entries = []
+    directory = os.path.dirname(page)
+    chain = []
+    while True:
+        chain.append(directory)
+        if directory in ('app', ''):
+            break
+        directory = os.path.dirname(directory)
+    for directory in reversed(chain):
+        for name in SEGMENT_FILES:
+            for extension in SOURCE_EXTENSIONS:
+                candidate = f'{directory}/{name}{extension}'
+                if candidate in graph.files:
+                    entries.append(candidate)
+    entries.append(page)
+    return entries
+
+
+class Weigher:
+    """Peso transitivo (fonte e cliente) a partir de um conjunto de arquivos de entrada"""
+
+    def __init__(self, graph, config):
+        self.graph = graph
+        self.framework = set(config.get('framework', ()))
+        self.package_kb = config.get('packages_kb', {})
+        self._single = {}
+
+    def closure(self, entries, client=False):
+        graph = self.graph
+        reached = {}
+        packages = {}
+        dynamic = set()
+        stack = [(entry, client) for entry in entries]
+        while stack:
+            relative, in_client = stack.pop()
+            node = graph.files.get(relative)
+            if node is None:
+                continue
+            in_client = in_client or node['client']
+            previous = reached.get(relative)
+            if previous is not None and (previous or not in_client):
+                continue
+            reached[relative] = in_client
+            for specifier, kind, target in graph.edges(relative):
+                if target is None:
+                    continue
+                if isinstance(target, tuple):
+                    name = target[1]
+                    if name not in self.framework and kind == 'static':
+                        packages[name] = packages.get(name, False) or in_client
+                elif kind == 'dynamic':
+                    dynamic.add(target)
+                else:
+                    stack.append((target, in_client))
+        return reached, packages, dynamic
+
+    def weigh(self, entries, client=False):
+        reached, packages, dynamic = self.closure(entries, client)
+        files = self.graph.files
+        source = sum(files[relative]['size'] for relative in reached)
+        local_client = sum(files[relative]['size'] for relative, in_client in reached.items() if in_client)
+        client_packages = {name: self.package_kb.get(name, 0) for name, in_client in packages.items() if in_client}
+        return {
+            'files': len(reached),
+            'source_kb': round(source / 1024, 1),
+            'client_source_kb': round(local_client / 1024, 1),
+            'client_packages_kb': round(sum(client_packages.values()), 1),
+            'client_kb': round(local_client / 1024 + sum(client_packages.values()), 1),
+            'client_packages': sorted(client_packages, key=lambda name: -client_packages[name]),
+            'dynamic_chunks': sorted(dynamic),
+        }
+
+    def single(self, relative):
+        """Peso de cliente de um import isolado (memorizado)"""
+        if relative not in self._single:
+            self._single[relative] = self.weigh([relative], client=True)['client_kb']
+        return self._single[relative]
+
+    def heavy_imports(self, entries, threshold_kb):
+        """Imports diretos das entradas que levam código de cliente pesado"""
+        graph = self.graph
+        heavy = {}
+        for entry in entries:
+            entry_client = graph.files[entry]['client']
+            for specifier, kind, target in graph.edges(entry):
+                if kind != 'static' or target is None:
+                    continue
+                if isinstance(target, tuple):
+                    weight = self.package_kb.get(target[1], 0)
+                    client_side = entry_client
+                    name = target[1]
+                else:
+                    client_side = entry_client or graph.files[target]['client']
+                    weight = self.single(target) if client_side else 0
+                    name = target
+                if client_side and weight >= threshold_kb:
+                    heavy[name] = max(heavy.get(name, 0), weight)
+        return [{'import': name, 'client_kb': weight}
+                for name, weight in sorted(heavy.items(), key=lambda item: -item[1])]
+
+
+def load_config(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def budget_for(route, config):
+    """Orçamento da rota: entrada exata, depois o padrão glob mais específico, depois o default"""
+    routes = config.get('routes', {})
+    if route in routes:
+        return routes[route]
+    matches = [pattern for pattern in routes if fnmatch.fnmatchcase(route, pattern)]
+    if matches:
+        return routes[max(matches, key=len)]
+    return config.get('default', {})
+
+
+def analyze(root='.', config=None, jobs=1, cache_file=DEFAULT_CACHE_FILE):
+    """Pesa todas as páginas e devolve o relatório com violações de orçamento"""
+    config = load_config(DEFAULT_CONFIG) if config is None else config
+    started = time.perf_counter()
+    graph = ImportGraph(root, os.path.join(root, cache_file) if cache_file else None).build(jobs)
+    weigher = Weigher(graph, config)
+    threshold = config.get('heavy_import_kb', 60)
+    results = []
+    violations = []
+    for page in pages(root):
+        entries = segment_entries(graph, page)
+        route = route_of(page)
+        weight = weigher.weigh(entries)
+        weight.update(page=page, route=route)
+        weight['heavy_imports'] = weigher.heavy_imports(entries, threshold) if page.startswith(CLIENT_SECTION) else []
+        budget = budget_for(route, config)
+        weight['budget'] = budget
+        for metric in ('client_kb', 'source_kb'):
+            limit = budget.get(metric)
+            if limit is not None and weight[metric] > limit:
+                violations.append({'route': route, 'page': page, 'metric': metric,
+                                   'current': weight[metric], 'budget': limit})
+        results.append(weight)
+    return {
+        'version': 1,
+        'summary': {
+            'files': len(graph.files),
+            'parsed': graph.parsed,
+            'reused': graph.reused,
+            'pages': len(results),
+            'seconds': round(time.perf_counter() - started, 3),
+        },
+        'pages': results,
+        'violations': violations,
+    }
+
+
+def updated_budgets(report, config, headroom=0.1):
+    """Orçamentos por rota a partir do peso atual mais a folga"""
+    routes = {}
+    for page in report['pages']:
+        routes[page['route']] = {metric: round(page[metric] * (1 + headroom) + 1)
+                                 for metric in ('client_kb', 'source_kb')}
+    return {**config, 'routes': routes}
+
+
+def format_report(report):
+    lines = []
+    for page in sorted(report['pages'], key=lambda page: -page['client_kb']):
+        budget = page['budget']
+        limit = f"/{budget['client_kb']}" if 'client_kb' in budget else ''
+        lines.append(f"  {page['route']:<40} cliente {page['client_kb']:>7.1f}{limit:<6} KB  "
+                     f"fonte {page['source_kb']:>7.1f} KB  {page['files']:>4} arquivos")
+        for heavy in page['heavy_imports'][:5]:
+            lines.append(f"      ⚠️  import pesado no cliente: {heavy['import']} ({heavy['client_kb']:.1f} KB)")
+    summary = report['summary']
+    lines.append(f"\n📊 {summary['pages']} páginas, {summary['files']} arquivos ({summary['parsed']} analisados, "
+                 f"{summary['reused']} do cache) em {summary['seconds']:.2f}s")
+    for violation in report['violations']:
+        lines.append(f"❌ {violation['route']}: {violation['metric']} {violation['current']} KB "
+                     f"> orçamento {violation['budget']} KB")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Peso transitivo das páginas e orçamento por rota')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help='arquivo JSON de orçamentos')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='processos para analisar os arquivos alterados')
+    parser.add_argument('--no-cache', action='store_true', help='ignora e não grava o cache incremental')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    parser.add_argument('--update-budgets', action='store_true',
+                        help='grava os pesos atuais (+10%%) como orçamento de cada rota')
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    report = analyze(args.root, config, args.jobs, None if args.no_cache else DEFAULT_CACHE_FILE)
+
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(format_report(report))
+        if args.json_out:
+            with open(args.json_out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.update_budgets:
+        with open(args.config, 'w', encoding='utf-8') as f:
+            json.dump(updated_budgets(report, config), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'Orçamentos atualizados em {args.config}', file=sys.stderr)
+        return 0
+    return 1 if report['violations'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+
+"""
+Simulador de políticas de cache para lib/cache.ts (MemoryCache)
+Reproduz um trace de acessos (get com leitura-através, como withCache/cached,
+e invalidações por tag) contra várias políticas ao mesmo tempo:
+  - ttl-tag: o desenho atual, sem limite de tamanho, expiração preguiçosa no get,
+    varredura cleanup() a cada 60s e invalidateByTag apagando chave a chave
+  - lru, lfu, slru (LRU segmentado) e tinylfu (W-TinyLFU), limitados em bytes
+Cada política limitada roda com invalidação ansiosa (índice tag -> chaves, como
+hoje) e versionada (contador por tag, conferido no get, custo O(1)).
+Relata taxa de acerto, memória (pico e média), despejos e o custo das
+invalidações e das varreduras. O trace vem de um arquivo NDJSON ou é gerado a
+partir dos padrões de chave de cacheUtils (dbKey, apiKey, userKey e tags).
+Execute com: python3 scripts/cache_sim.py [--trace acessos.ndjson] [--capacity-mb 2,8,32] [--json]
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from collections import OrderedDict
+
+# Estimativas do custo de uma entrada no V8: item do Map, objeto {value, expiry, tags}
+# e a posição da chave em cada Set do tagMap
+ENTRY_OVERHEAD = 120
+TAG_OVERHEAD = 48
+CLEANUP_INTERVAL_MS = 60 * 1000
+DEFAULT_TTL_MS = 5 * 60 * 1000
+POLICIES = ('ttl-tag', 'lru', 'lfu', 'slru', 'tinylfu')
+INVALIDATION_MODES = ('eager', 'versioned')
+ENTITIES = {
+    # tabela: (prefixo de tag em cacheUtils.tags, fixture usada para estimar o tamanho)
+    'oportunidades': ('oportunidade', 'data/oportunidades.json'),
+    'licitacoes': ('licitacao', 'data/licitacoes.json'),
+    'clientes': ('cliente', None),
+    'documentos': ('documento', None),
+}
+DEFAULT_RECORD_BYTES = 600
+
+
+class Entry:
+    __slots__ = ('key', 'size', 'expiry', 'tags', 'versions')
+
+    def __init__(self, key, size, expiry, tags, versions):
+        self.key = key
+        self.size = size
+        self.expiry = expiry
+        self.tags = tags
+        self.versions = versions
+
+
+class CachePolicy:
+    """TTL + tags como MemoryCache; subclasses definem ordem de despejo e admissão"""
+
+    sweeps = False
+
+    def __init__(self, capacity=None, invalidation='eager'):
+        self.capacity = capacity
+        self.invalidation = invalidation
+        self.entries = {}
+        self.tag_index = {}
+        self.versions = {}
+        self.bytes = 0
+        self.peak_bytes = self.peak_entries = 0
+        self.byte_samples = self.samples = 0
+        self.hits = self.misses = self.expired = self.stale = 0
+        self.evictions = self.rejected = 0
+        self.invalidations = self.invalidated = self.invalidation_work = 0
+        self.invalidation_seconds = self.invalidation_max = 0.0
+        self.sweep_count = self.sweep_work = 0
+        self.sweep_max = 0.0
+        self.op_seconds = 0.0
+
+    @property
+    def name(self):
+        return self.label if self.capacity is None else f'{self.label}/{self.invalidation}'
+
+    def get(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False
+        if now > entry.expiry:
+            self.remove(key)
+            self.expired += 1
+            self.misses += 1
+            return False
+        if entry.versions is not None:
+            versions = self.versions
+            for tag, version in zip(entry.tags, entry.versions):
+                if versions.get(tag, 0) != version:
+                    self.remove(key)
+                    self.stale += 1
+                    self.misses += 1
+                    return False
+        self.hits += 1
+        self.touch(entry)
+        return True
+
+    def set(self, key, size, tags, ttl, now):
+        if key in self.entries:
+            self.remove(key)
+        versions = None
+        if self.invalidation == 'versioned':
+            versions = tuple(self.versions.get(tag, 0) for tag in tags)
+        footprint = size + ENTRY_OVERHEAD + len(key) + TAG_OVERHEAD * len(tags)
+        entry = Entry(key, footprint, now + ttl, tags, versions)
+        if self.capacity is not None and footprint > self.capacity:
+            self.rejected += 1
+            return
+        if not self.admit(entry):
+            self.rejected += 1
+            return
+        self.entries[key] = entry
+        self.bytes += footprint
+        if versions is None:
+            for tag in tags:
+                keys = self.tag_index.get(tag)
+                if keys is None:
+                    keys = self.tag_index[tag] = set()
+                keys.add(key)
+        self.inserted(entry)
+        if self.bytes > self.peak_bytes:
+            self.peak_bytes = self.bytes
+        if len(self.entries) > self.peak_entries:
+            self.peak_entries = len(self.entries)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return 0
+        self.bytes -= entry.size
+        work = 1
+        if entry.versions is None:
+            for tag in entry.tags:
+                keys = self.tag_index.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    work += 1
+                    if not keys:
+                        del self.tag_index[tag]
+        self.removed(entry)
+        return work
+
+    def evict(self, key):
+        self.evictions += 1
+        self.remove(key)
+
+    def invalidate(self, tag):
+        started = time.perf_counter()
+        self.invalidations += 1
+        if self.invalidation == 'versioned':
+            self.versions[tag] = self.versions.get(tag, 0) + 1
+            self.invalidation_work += 1
+        else:
+            for key in self.tag_index.pop(tag, ()):
+                self.invalidated += 1
+                self.invalidation_work += self.remove(key)
+        elapsed = time.perf_counter() - started
+        self.invalidation_seconds += elapsed
+        self.invalidation_max = max(self.invalidation_max, elapsed)
+
+    def cleanup(self, now):
+        """cleanup(): percorre todas as entradas e apaga as vencidas"""
+        started = time.perf_counter()
+        self.sweep_count += 1
+        self.sweep_work += len(self.entries)
+        for key in [key for key, entry in self.entries.items() if now > entry.expiry]:
+            self.remove(key)
+        self.sweep_max = max(self.sweep_max, time.perf_counter() - started)
+
+    def sample(self):
+        self.byte_samples += self.bytes
+        self.samples += 1
+
+    def admit(self, entry):
+        while self.bytes + entry.size > self.capacity:
+            self.evict(self.victim())
+        return True
+
+    def touch(self, entry):
+        pass
+
+    def inserted(self, entry):
+        pass
+
+    def removed(self, entry):
+        pass
+
+    def victim(self):
+        raise NotImplementedError
+
+    def summary(self):
+        gets = self.hits + self.misses
+        return {
+            'policy': self.name,
+            'capacity_mb': round(self.capacity / 1e6, 1) if self.capacity is not None else None,
+            'gets': gets,
+            'hit_ratio': round(self.hits / gets, 4) if gets else 0.0,
+            'expired': self.expired,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+            'peak_mb': round(self.peak_bytes / 1e6, 2),
+            'mean_mb': round(self.byte_samples / self.samples / 1e6, 2) if self.samples else 0.0,
+            'peak_entries': self.peak_entries,
+            'invalidations': self.invalidations,
+            'invalidated_keys': self.invalidated,
+            'invalidation_work': self.invalidation_work,
+            'invalidation_us': round(self.invalidation_seconds / self.invalidations * 1e6, 2)
+            if self.invalidations else 0.0,
+            'invalidation_max_ms': round(self.invalidation_max * 1000, 3),
+            'sweeps': self.sweep_count,
+            'sweep_work': self.sweep_work,
+            'sweep_max_ms': round(self.sweep_max * 1000, 3),
+            'op_us': round(self.op_seconds / (gets + self.invalidations) * 1e6, 2)
+            if gets + self.invalidations else 0.0,
+        }
+
+
+class TtlTagCache(CachePolicy):
+    """Desenho atual: sem limite; só a varredura periódica libera as entradas vencidas"""
+
+    label = 'ttl-tag'
+    sweeps = True
+
+    def admit(self, entry):
+        return True
+
+
+class LruCache(CachePolicy):
+    label = 'lru'
+
+    def __init__(self, capacity=None, invalidation='eager'):
+        super().__init__(capacity, invalidation)
+        self.order = OrderedDict()
+
+    def touch(self, entry):
+        self.order.move_to_end(entry.key)
+
+    def inserted(self, entry):
+        self.order[entry.key] = None
+
+    def removed(self, entry):
+        del self.order[entry.key]
+
+    def victim(self):
+        return next(iter(self.order))
+
+
+class LfuCache(CachePolicy):
+    """Menos frequente primeiro (empate: o mais antigo), com heap de remoção preguiçosa"""
+
+    label = 'lfu'
+
+    def __init__(self, capacity=None, invalidation='eager'):
+        super().__init__(capacity, invalidation)
+        self.frequency = {}
+        self.heap = []
+        self.sequence = 0
+
+    def _push(self, key):
+        self.sequence += 1
+        heapq.heappush(self.heap, (self.frequency[key], self.sequence, key))
+        if len(self.heap) > 4 * len(self.frequency) + 64:
+            self.heap = [(frequency, 0, key) for key, frequency in self.frequency.items()]
+            heapq.heapify(self.heap)
+
+    def touch(self, entry):
+        self.frequency[entry.key] += 1
+        self._push(entry.key)
+
+    def inserted(self, entry):
+        self.frequency[entry.key] = 1
+        self._push(entry.key)
+
+    def removed(self, entry):
+        del self.frequency[entry.key]
+
+    def victim(self):
+        heap, frequency = self.heap, self.frequency
+        while True:
+            count, _, key = heap[0]
+            if frequency.get(key) == count:
+                return key
+            heapq.heappop(heap)
+
+
+class SegmentedLruCache(CachePolicy):
+    """SLRU: entradas novas em período de prova; um segundo acesso promove ao segmento protegido"""
+
+    label = 'slru'
+    protected_share = 0.8
+
+    def __init__(self, capacity=None, invalidation='eager'):
+        super().__init__(capacity, invalidation)
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.protected_bytes = 0
+
+    def touch(self, entry):
+        key = entry.key
+        if key in self.protected:
+            self.protected.move_to_end(key)
+            return
+        del self.probation[key]
+        self.protected[key] = entry
+        self.protected_bytes += entry.size
+        limit = self.capacity * self.protected_share
+        while self.protected_bytes > limit and len(self.protected) > 1:
+            demoted_key, demoted = self.protected.popitem(last=False)
+            self.protected_bytes -= demoted.size
+            self.probation[demoted_key] = demoted
+
+    def inserted(self, entry):
+        self.probation[entry.key] = entry
+
+    def removed(self, entry):
+        if self.protected.pop(entry.key, None) is not None:
+            self.protected_bytes -= entry.size
+        else:
+            self.probation.pop(entry.key, None)
+
+    def victim(self):
+        return next(iter(self.probation or self.protected))
+
+
+class FrequencySketch:
+    """Count-min sketch de 4 linhas com contadores saturados em 15 e envelhecimento por metade"""
+
+    def __init__(self, width):
+        size = 64
+        while size < width:
+            size *= 2
+        self.mask = size - 1
+        self.rows = [[0] * size for _ in range(4)]
+        self.additions = 0
+        self.reset_at = 10 * size
+
+    def _indexes(self, key):
+        value = zlib.crc32(key.encode())
+        for row in range(4):
+            value = (value * 0x9E3779B1 + row) & 0xFFFFFFFF
+            yield row, (value >> 8) & self.mask
+
+    def increment(self, key):
+        for row, index in self._indexes(key):
+            counters = self.rows[row]
+            if counters[index] < 15:
+                counters[index] += 1
+        self.additions += 1
+        if self.additions >= self.reset_at:
+            self.rows = [[count >> 1 for count in counters] for counters in self.rows]
+            self.additions //= 2
+
+    def estimate(self, key):
+        return min(self.rows[row][index] for row, index in self._indexes(key))
+
+
+class TinyLfuCache(SegmentedLruCache):
+    """W-TinyLFU: janela LRU de 1% na frente de um SLRU; o sketch decide quem entra no SLRU"""
+
+    label = 'tinylfu'
+    window_share = 0.01
+
+    def __init__(self, capacity=None, invalidation='eager'):
+        super().__init__(capacity, invalidation)
+        self.window = OrderedDict()
+        self.window_bytes = self.main_bytes = 0
+        self.sketch = FrequencySketch(max(1024, int(capacity / 2048)) if capacity else 1024)
+
+    def get(self, key, now):
+        self.sketch.increment(key)
+        return super().get(key, now)
+
+    def admit(self, entry):
+        # Só a janela recebe entradas novas; o espaço total é garantido em inserted()
+        return True
+
+    def touch(self, entry):
+        if entry.key in self.window:
+            self.window.move_to_end(entry.key)
+        else:
+            super().touch(entry)
+
+    def inserted(self, entry):
+        self.window[entry.key] = entry
+        self.window_bytes += entry.size
+        window_limit = self.capacity * self.window_share
+        main_limit = self.capacity - window_limit
+        while self.window_bytes > window_limit and self.window:
+            key, candidate = self.window.popitem(last=False)
+            self.window_bytes -= candidate.size
+            while self.main_bytes + candidate.size > main_limit and (self.probation or self.protected):
+                victim = next(iter(self.probation or self.protected))
+                if self.sketch.estimate(key) <= self.sketch.estimate(victim):
+                    break
+                self.evict(victim)
+            if self.main_bytes + candidate.size > main_limit:
+                # Perdeu para a vítima: o candidato sai do cache
+                self.window[key] = candidate
+                self.window_bytes += candidate.size
+                self.window.move_to_end(key, last=False)
+                self.evict(key)
+                continue
+            self.probation[key] = candidate
+            self.main_bytes += candidate.size
+        while self.bytes > self.capacity and self.window:
+            self.evict(next(iter(self.window)))
+
+    def removed(self, entry):
+        key = entry.key
+        if self.window.pop(key, None) is not None:
+            self.window_bytes -= entry.size
+            return
+        if key in self.probation or key in self.protected:
+            self.main_bytes -= entry.size
+            super().removed(entry)
+
+
+FACTORIES = {
+    'ttl-tag': TtlTagCache,
+    'lru': LruCache,
+    'lfu': LfuCache,
+    'slru': SegmentedLruCache,
+    'tinylfu': TinyLfuCache,
+}
+
+
+def record_bytes(root):
+    """Tamanho médio de um registro JSON de cada entidade, pelas fixtures em data/"""
+    sizes = {}
+    for table, (_, fixture) in ENTITIES.items():
+        sizes[table] = DEFAULT_RECORD_BYTES
+        path = os.path.join(root, fixture) if fixture else None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                records = json.load(f)
+            if records:
+                sizes[table] = sum(len(json.dumps(record, ensure_ascii=False)) for record in records) // len(records)
+    return sizes
+
+
+def _skewed(rng, count, skew):
+    """Índice em [0, count) concentrado nos primeiros (popularidade tipo Zipf)"""
+    return min(count - 1, int(count * rng.random() ** skew))
+
+
+def generate_trace(seed=42, requests=500000, rate=200.0, rows=20000, users=200, write_share=0.01,
+                   collection_share=0.2, search_share=0.15, skew=3.0, sizes=None):
+    """Eventos sintéticos com os padrões de chave e tag de cacheUtils, em memória constante"""
+    rng = random.Random(seed)
+    sizes = sizes or {table: DEFAULT_RECORD_BYTES for table in ENTITIES}
+    tables = list(ENTITIES)
+    now = 0.0
+    for _ in range(requests):
+        now += rng.expovariate(rate) * 1000.0
+        table = rng.choice(tables)
+        prefix = ENTITIES[table][0]
+        if rng.random() < write_share:
+            row = _skewed(rng, rows, skew)
+            # Uma escrita invalida a tag do registro; parte delas também a da coleção,
+            # que em cacheUtils.tags está em todas as entradas da entidade
+            yield {'t': now, 'op': 'invalidate', 'tag': f'{prefix}:{row}'}
+            if rng.random() < collection_share:
+                yield {'t': now, 'op': 'invalidate', 'tag': table}
+            continue
+        draw = rng.random()
+        if draw < 0.45:
+            row = _skewed(rng, rows, skew)
+            yield {'t': now, 'op': 'get', 'key': f'db:{table}:{row}', 'size': sizes[table],
+                   'ttl': DEFAULT_TTL_MS, 'tags': [f'{prefix}:{row}', table]}
+        elif draw < 0.8:
+            page = _skewed(rng, 50, skew) + 1
+            params = f'limit:20,page:{page}'
+            if rng.random() < search_share:
+                # Buscas livres geram chaves que quase nunca se repetem
+                params = f'busca:{rng.getrandbits(32):08x},{params}'
+            yield {'t': now, 'op': 'get', 'key': f'api:/api/{table}-{params}', 'size': 20 * sizes[table],
+                   'ttl': 60 * 1000, 'tags': [table]}
+        else:
+            user = _skewed(rng, users, skew)
+            yield {'t': now, 'op': 'get', 'key': f'user:{user}:{table}', 'size': 10 * sizes[table],
+                   'ttl': DEFAULT_TTL_MS, 'tags': [f'user:{user}', 'users', table]}
+
+
+def read_trace(path):
+    """Trace NDJSON: {"t", "op": "get", "key", "size", "ttl", "tags"} ou {"t", "op": "invalidate", "tag"}"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def replay(events, policies, sample_every=1000, trace_out=None):
+    """Aplica cada evento a todas as políticas; get com falha grava o valor (leitura-através)"""
+    next_cleanup = None
+    count = 0
+    for event in events:
+        if trace_out is not None:
+            trace_out.write(json.dumps(event, separators=(',', ':')) + '\n')
+        now = event['t']
+        if next_cleanup is None:
+            next_cleanup = now + CLEANUP_INTERVAL_MS
+        while now >= next_cleanup:
+            for policy in policies:
+                if policy.sweeps:
+                    policy.cleanup(next_cleanup)
+            next_cleanup += CLEANUP_INTERVAL_MS
+        if event['op'] == 'invalidate':
+            tag = event['tag']
+            for policy in policies:
+                started = time.perf_counter()
+                policy.invalidate(tag)
+                policy.op_seconds += time.perf_counter() - started
+        else:
+            key = event['key']
+            size = event.get('size', DEFAULT_RECORD_BYTES)
+            ttl = event.get('ttl', DEFAULT_TTL_MS)
+            tags = event.get('tags', [])
+            for policy in policies:
+                started = time.perf_counter()
+                if not policy.get(key, now):
+                    policy.set(key, size, tags, ttl, now)
+                policy.op_seconds += time.perf_counter() - started
+        count += 1
+        if count % sample_every == 0:
+            for policy in policies:
+                policy.sample()
+    return count
+
+
+def build_policies(names, capacities, modes):
+    policies = []
+    for name in names:
+        if name == 'ttl-tag':
+            policies.append(TtlTagCache())
+            continue
+        for capacity in capacities:
+            for mode in modes:
+                policies.append(FACTORIES[name](capacity, mode))
+    return policies
+
+
+def format_report(report):
+    lines = [f"📊 {report['events']} eventos ({report['source']}) em {report['seconds']:.1f}s"]
+    lines.append(f"  {'política':<22}{'limite':>8}{'acerto':>8}{'pico MB':>9}{'média MB':>9}{'despejos':>10}"
+                 f"{'invalid.':>9}{'trabalho':>10}{'µs/inv':>8}{'varredura':>10}{'µs/op':>7}")
+    for row in report['policies']:
+        capacity = f"{row['capacity_mb']:.0f}MB" if row['capacity_mb'] is not None else '∞'
+        sweep = f"{row['sweep_max_ms']:.1f}ms" if row['sweeps'] else '-'
+        lines.append(f"  {row['policy']:<22}{capacity:>8}{row['hit_ratio'] * 100:>7.1f}%{row['peak_mb']:>9.1f}"
+                     f"{row['mean_mb']:>9.1f}{row['evictions']:>10}{row['invalidations']:>9}"
+                     f"{row['invalidation_work']:>10}{row['invalidation_us']:>8.1f}{sweep:>10}{row['op_us']:>7.1f}")
+    lines.append('  trabalho: operações de mapa nas invalidações (chaves e posições de tag removidas); '
+                 'varredura: pior cleanup()')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compara políticas de cache para lib/cache.ts')
+    parser.add_argument('--trace', help='trace NDJSON (ou .ndjson.gz) a reproduzir; padrão: gerado')
+    parser.add_argument('--write-trace', help='grava o trace gerado em NDJSON')
+    parser.add_argument('--policies', default=','.join(POLICIES),
+                        help=f'lista separada por vírgula entre: {", ".join(POLICIES)}')
+    parser.add_argument('--capacity-mb', default='2,8,32', help='limites em MB das políticas limitadas')
+    parser.add_argument('--invalidation', choices=INVALIDATION_MODES + ('both',), default='both',
+                        help='invalidação por tag das políticas limitadas')
+    parser.add_argument('--requests', type=int, default=200000, help='requisições do trace gerado')
+    parser.add_argument('--rate', type=float, default=200.0, help='requisições por segundo (tempo virtual)')
+    parser.add_argument('--rows', type=int, default=20000, help='registros por entidade')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--write-share', type=float, default=0.01, help='fração de requisições que escrevem')
+    parser.add_argument('--collection-share', type=float, default=0.2,
+                        help='fração das escritas que invalidam a tag da coleção inteira')
+    parser.add_argument('--skew', type=float, default=3.0, help='concentração da popularidade (1 = uniforme)')
+    parser.add_argument('--root', default='.', help='raiz do repositório (para data/)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.policies.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FACTORIES]
+    if unknown:
+        parser.error(f'políticas desconhecidas: {", ".join(unknown)}')
+    capacities = [int(float(value) * 1e6) for value in args.capacity_mb.split(',') if value.strip()]
+    modes = INVALIDATION_MODES if args.invalidation == 'both' else (args.invalidation,)
+    policies = build_policies(names, capacities, modes)
+
+    if args.trace:
+        events = read_trace(args.trace)
+        source = args.trace
+    else:
+        events = generate_trace(args.seed, args.requests, args.rate, args.rows, args.users, args.write_share,
+                                args.collection_share, skew=args.skew, sizes=record_bytes(args.root))
+        source = f'gerado, semente {args.seed}'
+    trace_out = open(args.write_trace, 'w', encoding='utf-8') if args.write_trace and not args.trace else None
+    started = time.perf_counter()
+    try:
+        count = replay(events, policies, trace_out=trace_out)
+    finally:
+        if trace_out is not None:
+            trace_out.close()
+
+    report = {
+        'source': source,
+        'events': count,
+        'seconds': round(time.perf_counter() - started, 2),
+        'policies': [policy.summary() for policy in policies],
+    }
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    print(format_report(report))
+    if trace_out is not None:
+        print(f'📄 Trace salvo em: {args.write_trace}')
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Relatório salvo em: {args.json_out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
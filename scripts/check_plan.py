@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+
+"""
+Plano de verificações declaradas em scripts/checks.toml
+load_manifest() lê e valida o manifesto uma única vez; CheckPlan compila as
+verificações das suítes escolhidas em um plano de sondagens sem repetição:
+cada caminho é consultado uma vez e cada arquivo é varrido uma vez com todos
+os padrões que qualquer verificação procura nele, em qualquer raiz de projeto.
+Execute com: python3 scripts/check_plan.py [--root DIR] [--suite system] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+from check_runner import probe
+from content_cache import default_cache
+from results_cache import track
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'checks.toml')
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ITEM_TYPES = {'exists': 'path', 'patterns': 'pattern', 'dependencies': 'name'}
+CHECK_KEYS = {'name', 'header', 'summary', 'threshold', 'min_passed', 'items'}
+ITEM_KEYS = {'file', 'optional', 'required', 'file_missing', 'ignore_case', 'found', 'missing',
+             'severity', 'summary', *ITEM_TYPES}
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def _entries(values, field, where):
+    entries = []
+    for value in values:
+        if isinstance(value, str):
+            value = {field: value}
+        if not isinstance(value, dict) or not isinstance(value.get(field), str):
+            raise ManifestError(f'{where}: entrada inválida {value!r} (esperado texto ou {{{field} = ...}})')
+        entries.append({field: value[field], 'label': value.get('label', value[field])})
+    return entries
+
+
+def _item(raw, messages, where):
+    unknown = set(raw) - ITEM_KEYS
+    if unknown:
+        raise ManifestError(f'{where}: chaves desconhecidas {sorted(unknown)}')
+    kinds = [kind for kind in ITEM_TYPES if kind in raw]
+    if len(kinds) != 1:
+        raise ManifestError(f'{where}: o item precisa de exatamente um entre {sorted(ITEM_TYPES)}')
+    kind = kinds[0]
+    if (kind == 'exists') == ('file' in raw):
+        raise ManifestError(f'{where}: "file" é obrigatório em patterns/dependencies e proibido em exists')
+    if raw.get('severity', 'error') not in ('error', 'warning'):
+        raise ManifestError(f'{where}: severity deve ser "error" ou "warning"')
+    return {
+        'type': kind,
+        'file': raw.get('file'),
+        'entries': _entries(raw[kind], ITEM_TYPES[kind], where),
+        'optional': bool(raw.get('optional', False)),
+        'required': bool(raw.get('required', False)),
+        'file_missing': raw.get('file_missing'),
+        'ignore_case': bool(raw.get('ignore_case', False)),
+        'found': raw.get('found', messages.get(f'{kind}_found', '{label}')),
+        'missing': raw.get('missing', messages.get(f'{kind}_missing', '{label}')),
+        'severity': raw.get('severity', 'error'),
+        'summary': raw.get('summary'),
+    }
+
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    """Lê o manifesto e devolve {suíte: [verificações]} com os itens normalizados"""
+    with open(path, 'rb') as f:
+        try:
+            data = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ManifestError(f'{path}: {e}') from e
+
+    suites = {}
+    for suite, body in data.get('suites', {}).items():
+        messages = body.get('messages', {})
+        checks = []
+        for index, raw in enumerate(body.get('checks', [])):
+            where = f'{path}: suites.{suite}.checks[{index}]'
+            unknown = set(raw) - CHECK_KEYS
+            if unknown:
+                raise ManifestError(f'{where}: chaves desconhecidas {sorted(unknown)}')
+            if 'name' not in raw:
+                raise ManifestError(f'{where}: "name" é obrigatório')
+            if any(check['name'] == raw['name'] for check in checks):
+                raise ManifestError(f'{where}: verificação "{raw["name"]}" repetida')
+            checks.append({
+                'suite': suite,
+                'name': raw['name'],
+                'header': raw.get('header', raw['name']),
+                'summary': raw.get('summary'),
+                'threshold': float(raw.get('threshold', 1.0)),
+                'min_passed': raw.get('min_passed'),
+                'items': [_item(item, messages, f'{where}.items[{position}]')
+                          for position, item in enumerate(raw.get('items', []))],
+            })
+        suites[suite] = checks
+    return suites
+
+
+def check_paths(manifest, suite, name):
+    """Caminhos declarados em exists na verificação indicada"""
+    for check in manifest[suite]:
+        if check['name'] == name:
+            return [entry['path'] for item in check['items'] if item['type'] == 'exists'
+                    for entry in item['entries']]
+    raise KeyError(f'{suite}: {name}')
+
+
+def api_routes(manifest=None):
+    """Arquivos das rotas principais da API (suíte system), usados também pelo teste de carga"""
+    return check_paths(manifest or load_manifest(), 'system', 'Rotas da API')
+
+
+class CheckPlan:
+    """Verificações de uma ou mais suítes com as sondagens compartilhadas entre elas"""
+
+    def __init__(self, manifest, suites=None, root=DEFAULT_ROOT):
+        self.root = os.path.abspath(root)
+        suites = list(manifest) if suites is None else suites
+        self.checks = {}
+        self.patterns = {}
+        self._results = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+        for suite in suites:
+            if suite not in manifest:
+                raise ManifestError(f'suíte desconhecida: {suite}')
+            for check in manifest[suite]:
+                self.checks[(suite, check['name'])] = check
+                for item in check['items']:
+                    if item['type'] == 'patterns':
+                        wanted = self.patterns.setdefault(self.path(item['file']), set())
+                        wanted.update((entry['pattern'], item['ignore_case']) for entry in item['entries'])
+
+    def path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def _memo(self, kind, path, compute):
+        key = (kind, path)
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+            loader = self._loading.setdefault(key, threading.Lock())
+        # Verificações concorrentes que pedem a mesma sondagem esperam uma só execução
+        with loader:
+            with self._lock:
+                if key in self._results:
+                    return self._results[key]
+            value = compute(path)
+            with self._lock:
+                self._results[key] = value
+            return value
+
+    def invalidate(self, paths):
+        """Descarta as sondagens memorizadas dos caminhos alterados (modo --watch)"""
+        paths = set(paths)
+        with self._lock:
+            for key in [key for key in self._results if key[1] in paths]:
+                del self._results[key]
+
+    def existence_changed(self, path):
+        """Se o caminho surgiu ou sumiu desde a última sondagem memorizada"""
+        with self._lock:
+            known = self._results.get(('exists', path))
+        return known is None or known != os.path.exists(path)
+
+    def path_exists(self, path):
+        return self._memo('exists', path, os.path.exists)
+
+    def search_file(self, path):
+        """Procura de uma vez todos os padrões que o plano quer no arquivo"""
+        return self._memo('search', path, self._search)
+
+    def read_package(self, path):
+        return self._memo('package', path, self._read_package)
+
+    def _search(self, path):
+        wanted = sorted(self.patterns.get(path, ()))
+        found = {}
+        for ignore_case in (False, True):
+            patterns = [pattern for pattern, case in wanted if case == ignore_case]
+            try:
+                hits = default_cache.search(path, patterns, ignore_case=ignore_case) if patterns else []
+            except (OSError, UnicodeDecodeError):
+                hits = [False] * len(patterns)
+            found.update(((pattern, ignore_case), hit) for pattern, hit in zip(patterns, hits))
+        return found
+
+    @staticmethod
+    def _read_package(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return set(data.get('dependencies', {})) | set(data.get('devDependencies', {}))
+
+    def probe_counts(self):
+        """Sondagens que as verificações fariam isoladamente e as que o plano faz"""
+        declared = 0
+        exists, scans, packages = set(), set(), set()
+        for check in self.checks.values():
+            for item in check['items']:
+                if item['type'] == 'exists':
+                    declared += len(item['entries'])
+                    exists.update(self.path(entry['path']) for entry in item['entries'])
+                else:
+                    declared += 2
+                    exists.add(self.path(item['file']))
+                    (scans if item['type'] == 'patterns' else packages).add(self.path(item['file']))
+        return {'checks': len(self.checks), 'declared': declared,
+                'planned': len(exists) + len(scans) + len(packages), 'files_scanned': len(scans)}
+
+    def prefetch(self, check):
+        """Executa as sondagens da verificação pelo executor ativo (em paralelo com --jobs)"""
+        paths = [self.path(entry['path']) for item in check['items'] if item['type'] == 'exists'
+                 for entry in item['entries']]
+        files = [self.path(item['file']) for item in check['items'] if item['file']]
+        present = dict(zip(paths + files, probe(self.path_exists, paths + files)))
+        scans = {self.path(item['file']) for item in check['items'] if item['type'] == 'patterns'}
+        packages = {self.path(item['file']) for item in check['items'] if item['type'] == 'dependencies'}
+        probe(self.search_file, sorted(path for path in scans if present[path]))
+        probe(self.read_package, sorted(path for path in packages if present[path]))
+
+    def run(self, suite, name):
+        """Avalia a verificação e devolve passed, contagens e os eventos a exibir"""
+        check = self.checks[(suite, name)]
+        self.prefetch(check)
+        events = []
+        passed = total = 0
+        for item in check['items']:
+            if item['type'] == 'exists':
+                results = [(entry, self._exists(entry['path'])) for entry in item['entries']]
+            else:
+                path = self.path(item['file'])
+                if not self._exists(item['file']):
+                    if item['optional']:
+                        continue
+                    if item['required']:
+                        if item['file_missing']:
+                            events.append({'kind': 'file_missing', 'ok': False, 'severity': 'error',
+                                           'message': item['file_missing'].format(path=item['file'])})
+                        return {'name': name, 'passed': False, 'count': passed, 'total': total, 'events': events}
+                    results = [(entry, False) for entry in item['entries']]
+                elif item['type'] == 'patterns':
+                    track(path, content=True)
+                    found = self.search_file(path)
+                    results = [(entry, found[(entry['pattern'], item['ignore_case'])]) for entry in item['entries']]
+                else:
+                    track(path, content=True)
+                    declared = self.read_package(path)
+                    results = [(entry, entry['name'] in declared) for entry in item['entries']]
+
+            for entry, ok in results:
+                template = item['found'] if ok else item['missing']
+                events.append({'kind': item['type'], 'ok': ok, 'label': entry['label'],
+                               'severity': 'ok' if ok else item['severity'], 'message': template.format(**entry)})
+            item_passed = sum(1 for _, ok in results if ok)
+            if item['summary']:
+                events.append({'kind': 'summary', 'ok': True, 'severity': 'info',
+                               'message': item['summary'].format(passed=item_passed, total=len(results))})
+            passed += item_passed
+            total += len(results)
+
+        if check['summary']:
+            events.append({'kind': 'summary', 'ok': True, 'severity': 'info',
+                           'message': check['summary'].format(passed=passed, total=total)})
+        if check['min_passed'] is not None:
+            ok = passed >= check['min_passed']
+        else:
+            ok = passed >= total * check['threshold']
+        return {'name': name, 'passed': ok, 'count': passed, 'total': total, 'events': events}
+
+    def _exists(self, relative):
+        path = self.path(relative)
+        track(path)
+        return self.path_exists(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Executa as verificações declaradas em checks.toml')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='raiz do projeto (padrão: pai de scripts/)')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help='manifesto TOML das verificações')
+    parser.add_argument('--suite', action='append', help='suíte a executar (repetível; padrão: todas)')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o resultado JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    try:
+        plan = CheckPlan(load_manifest(args.manifest), args.suite, args.root)
+    except (OSError, ManifestError) as e:
+        print(f'❌ {e}', file=sys.stderr)
+        return 2
+
+    results = []
+    for suite, name in plan.checks:
+        result = plan.run(suite, name)
+        result['suite'] = suite
+        results.append(result)
+    report = {'root': plan.root, 'probes': plan.probe_counts(), 'results': results}
+
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0 if all(result['passed'] for result in results) else 1
+
+    counts = report['probes']
+    print(f"📊 {counts['checks']} verificações em {plan.root}")
+    print(f"   {counts['declared']} sondagens declaradas -> {counts['planned']} no plano "
+          f"({counts['files_scanned']} arquivos varridos)")
+    for result in results:
+        symbol = '✅' if result['passed'] else '❌'
+        print(f"{symbol} [{result['suite']}] {result['name']}: {result['count']}/{result['total']}")
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Resultado salvo em: {args.json_out}')
+    return 0 if all(result['passed'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+"""
+Executor de verificações dos scripts de validação do sistema CRM
+Agenda as verificações e as sondagens de arquivos de cada uma em pools de threads,
+mantendo a saída na mesma ordem da execução sequencial. Cada verificação e cada
+sondagem vira um span de instrumentation.
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from instrumentation import span, timed
+
+_local = threading.local()
+_active_runner = None
+
+
+def emit(message):
+    """Escreve uma linha no buffer da verificação atual ou direto no stdout"""
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is not None:
+        buffer.write(message + '\n')
+    else:
+        print(message)
+
+
+@contextmanager
+def capture():
+    """Captura tudo que for emitido pela thread atual"""
+    previous = getattr(_local, 'buffer', None)
+    buffer = io.StringIO()
+    _local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _local.buffer = previous
+
+
+def probe(fn, items):
+    """Aplica fn a cada item usando o executor ativo, preservando a ordem"""
+    fn = timed(fn)
+    if _active_runner is None:
+        return [fn(item) for item in items]
+    return _active_runner.probe(fn, items)
+
+
+class CheckRunner:
+    """Executa verificações em paralelo e imprime os resultados em ordem"""
+
+    def __init__(self, jobs=1):
+        self.jobs = max(1, int(jobs))
+        self._check_pool = None
+        self._probe_pool = None
+
+    def __enter__(self):
+        global _active_runner
+        if self.jobs > 1:
+            self._check_pool = ThreadPoolExecutor(
+                max_workers=self.jobs, thread_name_prefix='check')
+            # Pool separado para as sondagens: uma verificação esperando suas
+            # sondagens nunca ocupa a vaga de que elas precisam para rodar
+            self._probe_pool = ThreadPoolExecutor(
+                max_workers=self.jobs * 4, thread_name_prefix='probe')
+        _active_runner = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active_runner
+        _active_runner = None
+        for pool in (self._check_pool, self._probe_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._check_pool = self._probe_pool = None
+        return False
+
+    def probe(self, fn, items):
+        items = list(items)
+        if self._probe_pool is None or len(items) < 2:
+            return [fn(item) for item in items]
+        return list(self._probe_pool.map(fn, items))
+
+    def run(self, checks, out=None):
+        """
+        Executa cada verificação (nome, função) e devolve a lista de resultados
+        (nome, passed, seconds) na ordem recebida. Em paralelo, a saída de cada
+        verificação é impressa assim que ela e todas as anteriores terminam.
+        """
+        out = out or sys.stdout
+        if self._check_pool is None:
+            futures = None
+        else:
+            futures = [self._check_pool.submit(_run_captured, name, fn)
+                       for name, fn in checks]
+
+        results = []
+        for index, (name, fn) in enumerate(checks):
+            if futures is None:
+                passed, seconds = _run_timed(name, fn)
+            else:
+                passed, seconds, output = futures[index].result()
+                out.write(output)
+                out.flush()
+            results.append({'name': name, 'passed': passed, 'seconds': seconds})
+        return results
+
+
+def _run_timed(name, fn):
+    started = time.perf_counter()
+    with span(name, 'check'):
+        passed = fn()
+    return passed, time.perf_counter() - started
+
+
+def _run_captured(name, fn):
+    with capture() as buffer:
+        passed, seconds = _run_timed(name, fn)
+    return passed, seconds, buffer.getvalue()
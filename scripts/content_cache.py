@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+Cache de conteúdo de arquivos compartilhado pelas verificações do sistema CRM
+Cada arquivo é lido uma única vez por execução (enquanto mtime e tamanho não
+mudarem) e todos os padrões procurados nele são encontrados em uma só varredura.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@lru_cache(maxsize=128)
+def _compile(patterns, ignore_case):
+    # Padrões mais longos primeiro; o lookahead permite casamentos sobrepostos
+    ordered = sorted(set(patterns), key=len, reverse=True)
+    alternation = '|'.join(re.escape(pattern) for pattern in ordered)
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile(f'(?=({alternation}))', flags)
+
+
+def find_patterns(text, patterns, ignore_case=False):
+    """Devolve, na ordem recebida, se cada padrão literal aparece no texto"""
+    patterns = tuple(patterns)
+    if not patterns:
+        return []
+    fold = str.casefold if ignore_case else (lambda value: value)
+    wanted = {fold(pattern) for pattern in patterns if pattern}
+    found = set()
+    for match in _compile(patterns, ignore_case).finditer(text):
+        found.add(fold(match.group(1)))
+        if found >= wanted:
+            break
+    # Em uma mesma posição só a alternativa mais longa casa; um padrão que é
+    # prefixo dela também está presente no texto
+    result = []
+    for pattern in patterns:
+        key = fold(pattern)
+        result.append(not pattern or key in found or any(key in hit for hit in found))
+    return result
+
+
+class ContentCache:
+    """Cache LRU de conteúdo de arquivos, indexado por caminho, mtime e tamanho"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.reads = 0
+
+    def read(self, file_path, encoding='utf-8'):
+        """Lê o arquivo (ou devolve a cópia em cache); propaga erros de leitura"""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            loader = self._loading.get(path)
+            if loader is None:
+                loader = self._loading[path] = [threading.Lock(), 0]
+            loader[1] += 1
+        try:
+            # Sondagens concorrentes do mesmo arquivo esperam uma única leitura
+            with loader[0]:
+                return self._read(path, encoding)
+        finally:
+            # A trava sai do dicionário junto com a última leitura que a usava
+            with self._lock:
+                loader[1] -= 1
+                if not loader[1]:
+                    del self._loading[path]
+
+    def _read(self, path, encoding):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size, encoding)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+        with open(path, 'r', encoding=encoding) as f:
+            content = f.read()
+        with self._lock:
+            self.reads += 1
+            self._store(path, key, content, stat.st_size)
+        return content
+
+    def search(self, file_path, patterns, ignore_case=False):
+        """Procura todos os padrões no arquivo com uma única varredura"""
+        return find_patterns(self.read(file_path), patterns, ignore_case)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _store(self, path, key, content, size):
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        if size > self.max_bytes:
+            return
+        self._entries[path] = (key, content, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted[2]
+
+
+# Instância compartilhada pelos scripts de validação
+default_cache = ContentCache()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+Observação de mudanças em arquivos para o modo --watch das validações
+Usa watchdog (inotify, FSEvents, ReadDirectoryChangesW) quando instalado e,
+sem ele, compara instantâneos de mtime/tamanho da árvore a cada intervalo.
+Rajadas de eventos (salvar vários arquivos, git checkout) viram um único lote,
+entregue depois de `debounce` segundos sem novos eventos.
+"""
+
+import os
+import queue
+import re
+import time
+from functools import lru_cache
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # sem watchdog: varredura periódica
+    FileSystemEventHandler = object
+    Observer = None
+
+IGNORED_DIRS = frozenset({'.git', 'node_modules', '.next', '__pycache__'})
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.3
+
+
+@lru_cache(maxsize=None)
+def _pattern_regex(pattern):
+    regex = ''
+    parts = pattern.split('/')
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == '**':
+            # Como glob(recursive=True): ** casa zero ou mais diretórios
+            regex += '.*' if last else '(?:[^/]+/)*'
+            continue
+        regex += ''.join('[^/]*' if char == '*' else '[^/]' if char == '?' else re.escape(char)
+                         for char in part)
+        if not last:
+            regex += '/'
+    return re.compile(regex + r'\Z')
+
+
+def matches(path, pattern):
+    """Se o caminho relativo (separado por /) casa o padrão glob, com ** como em glob.glob"""
+    return _pattern_regex(pattern).match(path) is not None
+
+
+def _ignored(path, root, ignored_dirs):
+    relative = os.path.relpath(path, root)
+    return any(part in ignored_dirs for part in relative.split(os.sep))
+
+
+class PollingWatcher:
+    """Detecta criação, remoção e alteração comparando instantâneos da árvore"""
+
+    name = 'varredura'
+
+    def __init__(self, root, ignored_dirs=IGNORED_DIRS):
+        self.root = os.path.abspath(root)
+        self.ignored_dirs = ignored_dirs
+        self._snapshot = {}
+
+    def start(self):
+        self._snapshot = self._scan()
+        return self
+
+    def stop(self):
+        pass
+
+    def _scan(self):
+        snapshot = {}
+        pending = [self.root]
+        while pending:
+            try:
+                entries = list(os.scandir(pending.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.ignored_dirs:
+                            # Diretórios valem só pela existência; o mtime muda a cada filho
+                            snapshot[entry.path] = 'dir'
+                            pending.append(entry.path)
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return snapshot
+
+    def poll(self, timeout):
+        """Espera timeout segundos e devolve os caminhos que mudaram desde a última chamada"""
+        time.sleep(timeout)
+        current = self._scan()
+        previous = self._snapshot
+        self._snapshot = current
+        changed = {path for path, state in current.items() if previous.get(path) != state}
+        changed.update(path for path in previous if path not in current)
+        return changed
+
+
+class _QueueHandler(FileSystemEventHandler):
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        self.events.put(event.src_path)
+        dest = getattr(event, 'dest_path', '')
+        if dest:
+            self.events.put(dest)
+
+
+class WatchdogWatcher:
+    """Recebe os eventos do sistema operacional pelo watchdog"""
+
+    name = 'watchdog'
+
+    def __init__(self, root, ignored_dirs=IGNORED_DIRS):
+        self.root = os.path.abspath(root)
+        self.ignored_dirs = ignored_dirs
+        self._events = queue.Queue()
+        self._observer = None
+
+    def start(self):
+        self._observer = Observer()
+        self._observer.schedule(_QueueHandler(self._events), self.root, recursive=True)
+        self._observer.start()
+        return self
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def poll(self, timeout):
+        """Devolve os caminhos com eventos, esperando no máximo timeout segundos pelo primeiro"""
+        changed = set()
+        try:
+            changed.add(self._events.get(timeout=timeout))
+            while True:
+                changed.add(self._events.get_nowait())
+        except queue.Empty:
+            pass
+        paths = {os.path.abspath(os.fsdecode(path)) for path in changed}
+        return {path for path in paths if not _ignored(path, self.root, self.ignored_dirs)}
+
+
+def create_watcher(root, backend='auto'):
+    """watchdog se disponível (ou pedido), senão varredura periódica"""
+    if backend == 'watchdog' and Observer is None:
+        raise RuntimeError('watchdog não está instalado (pip install watchdog)')
+    if backend in ('auto', 'watchdog') and Observer is not None:
+        return WatchdogWatcher(root).start()
+    return PollingWatcher(root).start()
+
+
+def batches(watcher, debounce=DEFAULT_DEBOUNCE, interval=DEFAULT_INTERVAL):
+    """Gera conjuntos de caminhos alterados, cada um após debounce segundos de silêncio"""
+    pending = set()
+    last_event = 0.0
+    while True:
+        timeout = min(interval, debounce) if pending else interval
+        changed = watcher.poll(timeout)
+        if changed:
+            pending |= changed
+            last_event = time.monotonic()
+        elif pending and time.monotonic() - last_event >= debounce:
+            yield pending
+            pending = set()
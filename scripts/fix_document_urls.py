@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""
+Correção em lote das URLs de documentos PDF salvos como imagem no Cloudinary
+Mesmo trabalho de scripts/fix-document-urls.js (/image/upload/ -> /raw/upload/),
+mas sem carregar a tabela inteira nem atualizar linha a linha: percorre os
+candidatos por paginação de chave (id > último), reescreve cada lote com um
+único UPDATE ... CASE (ou junção com tabela temporária) e faz commit em blocos
+limitados, para não segurar locks por minutos.
+Execute com: python3 scripts/fix_document_urls.py [--dry-run] [--batch 1000] [--local 100000]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from urllib.parse import quote
+
+from local_db import LocalDatabase, load_catalog, prepare
+
+WRONG_SEGMENT = '/image/upload/'
+RIGHT_SEGMENT = '/raw/upload/'
+# URLs já corrigidas ficam de fora mesmo que o segmento antigo reapareça no nome do arquivo
+CANDIDATES = ("url_documento LIKE '%/image/upload/%' AND url_documento NOT LIKE '%/raw/upload/%' "
+              "AND (formato = 'pdf' OR nome LIKE '%.pdf')")
+STRATEGIES = ('case', 'temp-table', 'row')
+
+
+def mysql_url_from_env():
+    """Mesma configuração do script Node (DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT)"""
+    user = quote(os.environ.get('DB_USER', 'root'), safe='')
+    password = quote(os.environ.get('DB_PASSWORD', ''), safe='')
+    credentials = f'{user}:{password}' if password else user
+    return (f"mysql://{credentials}@{os.environ.get('DB_HOST', 'localhost')}:"
+            f"{os.environ.get('DB_PORT', '3306')}/{os.environ.get('DB_NAME', 'crm_licitacoes')}")
+
+
+def fixed_url(url):
+    # Só a primeira ocorrência, como o replace() de string do script Node: o segmento
+    # pode reaparecer no public_id do arquivo
+    return url.replace(WRONG_SEGMENT, RIGHT_SEGMENT, 1)
+
+
+def candidate_batches(database, batch_size, after=''):
+    """Lotes de (id, url) a corrigir, em ordem de id, sem OFFSET nem leitura da tabela inteira"""
+    while True:
+        rows = database.execute(
+            f'SELECT id, url_documento FROM documentos WHERE id > ? AND {CANDIDATES} ORDER BY id LIMIT ?',
+            (after, batch_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][0]
+
+
+def update_case(database, changes):
+    """Um UPDATE por lote: SET url = CASE id WHEN ... END WHERE id IN (...)"""
+    cases = ' '.join('WHEN ? THEN ?' for _ in changes)
+    marks = ', '.join('?' for _ in changes)
+    params = [value for change in changes for value in change] + [identifier for identifier, _ in changes]
+    # A condição no LIKE torna o lote idempotente se outra escrita corrigiu a linha antes
+    cursor = database.execute(
+        f'UPDATE documentos SET url_documento = CASE id {cases} ELSE url_documento END '
+        f"WHERE id IN ({marks}) AND url_documento LIKE '%/image/upload/%'", params)
+    return cursor.rowcount
+
+
+def update_temp_table(database, changes):
+    """Carrega (id, url) em uma tabela temporária e atualiza por junção"""
+    database.execute('CREATE TEMPORARY TABLE IF NOT EXISTS url_fix (id CHAR(36) PRIMARY KEY, url TEXT)',
+                     translate=False)
+    database.execute('DELETE FROM url_fix', translate=False)
+    database.executemany('INSERT INTO url_fix (id, url) VALUES (?, ?)', changes)
+    if database.engine == 'sqlite':
+        sql = ('UPDATE documentos SET url_documento = url_fix.url FROM url_fix '
+               "WHERE url_fix.id = documentos.id AND documentos.url_documento LIKE '%/image/upload/%'")
+    else:
+        sql = ('UPDATE documentos d JOIN url_fix f ON f.id = d.id SET d.url_documento = f.url '
+               "WHERE d.url_documento LIKE '%/image/upload/%'")
+    return database.execute(sql).rowcount
+
+
+def update_rows(database, changes):
+    """Linha a linha, como o script Node; serve de referência para o benchmark"""
+    updated = 0
+    for identifier, url in changes:
+        updated += database.execute('UPDATE documentos SET url_documento = ? WHERE id = ?',
+                                    (url, identifier)).rowcount
+    return updated
+
+
+UPDATERS = {'case': update_case, 'temp-table': update_temp_table, 'row': update_rows}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)] if ordered else 0.0
+
+
+def repair(database, batch_size=1000, commit_every=None, strategy='case', dry_run=False,
+           pause_ms=0.0, limit=None, log=print, verbose=False):
+    """Corrige as URLs e devolve as métricas da execução"""
+    commit_every = commit_every or batch_size
+    updater = UPDATERS[strategy]
+    scanned = updated = pending = batches = commits = 0
+    batch_ms = []
+    samples = []
+    started = batch_started = time.perf_counter()
+    for rows in candidate_batches(database, batch_size):
+        if limit is not None:
+            rows = rows[:max(0, limit - scanned)]
+            if not rows:
+                break
+        changes = [(identifier, fixed_url(url)) for identifier, url in rows]
+        scanned += len(rows)
+        batches += 1
+        if len(samples) < 5:
+            samples.extend(rows[:5 - len(samples)])
+        if verbose:
+            for (identifier, old), (_, new) in zip(rows, changes):
+                log(f'  {identifier}: {old} -> {new}')
+        if not dry_run:
+            updated += updater(database, changes)
+            pending += len(changes)
+            if pending >= commit_every:
+                database.commit()
+                commits += 1
+                pending = 0
+        # Inclui a leitura do lote, não só o UPDATE
+        batch_ms.append((time.perf_counter() - batch_started) * 1000)
+        if pause_ms:
+            time.sleep(pause_ms / 1000.0)
+        batch_started = time.perf_counter()
+        if limit is not None and scanned >= limit:
+            break
+    if not dry_run and pending:
+        database.commit()
+        commits += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'strategy': strategy,
+        'dry_run': dry_run,
+        'scanned': scanned,
+        'updated': updated,
+        'batches': batches,
+        'commits': commits,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(scanned / elapsed, 1) if elapsed else 0.0,
+        'batch_ms': {'p50': round(percentile(batch_ms, 0.5), 2), 'p95': round(percentile(batch_ms, 0.95), 2),
+                     'max': round(max(batch_ms, default=0.0), 2)},
+        'samples': [{'id': identifier, 'de': url, 'para': fixed_url(url)} for identifier, url in samples],
+    }
+
+
+def remaining(database):
+    return database.scalar(f'SELECT COUNT(*) FROM documentos WHERE {CANDIDATES}')
+
+
+def break_urls(database, percent):
+    """No banco local, volta parte das URLs de PDF para /image/upload/ (o defeito a corrigir)"""
+    cursor = database.execute(
+        "UPDATE documentos SET url_documento = REPLACE(url_documento, '/raw/upload/', '/image/upload/') "
+        "WHERE formato = 'pdf' AND (rowid * 7919) % 100 < ?", (percent,))
+    database.commit()
+    return cursor.rowcount
+
+
+def format_result(result):
+    mode = 'simulação (--dry-run)' if result['dry_run'] else f"estratégia {result['strategy']}"
+    lines = [f"📊 {result['scanned']} documentos candidatos, {result['updated']} atualizados — {mode}",
+             f"   {result['batches']} lotes, {result['commits']} commits em {result['seconds']:.2f}s "
+             f"({result['rows_per_second']:.0f} linhas/s)",
+             f"   tempo por lote: p50 {result['batch_ms']['p50']:.1f} ms, p95 {result['batch_ms']['p95']:.1f} ms, "
+             f"máx {result['batch_ms']['max']:.1f} ms"]
+    for sample in result['samples']:
+        lines.append(f"   {sample['id']}: {sample['de']} -> {sample['para']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Corrige em lote as URLs /image/upload/ de documentos PDF')
+    parser.add_argument('--batch', type=int, default=1000, help='linhas por lote de UPDATE')
+    parser.add_argument('--commit-every', type=int, help='linhas por commit (padrão: um commit por lote)')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='case',
+                        help='case (UPDATE ... CASE), temp-table (junção) ou row (linha a linha)')
+    parser.add_argument('--dry-run', action='store_true', help='só lista e conta, sem alterar o banco')
+    parser.add_argument('--pause-ms', type=float, default=0.0, help='pausa entre lotes para aliviar o banco')
+    parser.add_argument('--limit', type=int, help='corrige no máximo esta quantidade de linhas')
+    parser.add_argument('-v', '--verbose', action='store_true', help='mostra cada URL alterada')
+    parser.add_argument('--mysql-url', help='padrão: montada a partir de DB_HOST, DB_USER, DB_PASSWORD...')
+    parser.add_argument('--local', type=int, metavar='DOCUMENTOS',
+                        help='roda contra um SQLite local com esta quantidade de documentos')
+    parser.add_argument('--broken-percent', type=int, default=30,
+                        help='no modo --local, percentual de PDFs com a URL errada')
+    parser.add_argument('--db', default=':memory:', help='arquivo SQLite do modo --local')
+    args = parser.parse_args(argv)
+
+    if args.local:
+        database = LocalDatabase.sqlite(args.db)
+        prepare(database, load_catalog(), max(1000, args.local // 10), args.local)
+        broken = break_urls(database, args.broken_percent)
+        print(f'🗄️  {database.version}: {args.local} documentos, {broken} com URL errada')
+    else:
+        database = LocalDatabase.mysql(args.mysql_url or mysql_url_from_env(), create=False)
+
+    try:
+        result = repair(database, args.batch, args.commit_every, args.strategy, args.dry_run,
+                        args.pause_ms, args.limit, verbose=args.verbose)
+        print(format_result(result))
+        left = remaining(database)
+        if args.dry_run or args.limit:
+            print(f'   {left} documentos ainda com URL errada')
+        elif left:
+            print(f'⚠️  {left} documentos continuam com URL errada', file=sys.stderr)
+            return 1
+        else:
+            print('✅ Nenhum documento PDF com URL errada')
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
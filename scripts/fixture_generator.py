@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+
+"""
+Gerador de dados sintéticos no formato de data/licitacoes.json e data/oportunidades.json
+Infere o schema dos registros a partir das fixtures (tipos, formatos de data e
+moeda, enumerações, pares nome/id, listas aninhadas e campos opcionais) e grava
+milhões de registros em NDJSON ou em INSERTs de várias linhas, com memória
+constante. A semente torna a saída reproduzível, qualquer que seja o número de
+processos que dividem o trabalho em shards.
+Execute com: python3 scripts/fixture_generator.py data/licitacoes.json -n 1000000 [-o saida.ndjson] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+# Registros gerados com a mesma semente de RNG; independe de como os shards são divididos
+CHUNK_SIZE = 10000
+DEFAULT_REF_RATIO = 0.02
+MISSING = object()
+
+_ISO_DATETIME = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z?$')
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_BR_DATE = re.compile(r'^\d{2}/\d{2}/\d{4}$')
+_TIME = re.compile(r'^\d{2}:\d{2}(:\d{2})?$')
+_CURRENCY = re.compile(r'^R\$\s?[\d.]+(,\d{2})?$')
+_EMAIL = re.compile(r'^[^@\s]+@([^@\s]+)$')
+_URL = re.compile(r'^(https?://|/)\S+$')
+_IDENTIFIER = re.compile(r'^[a-z0-9_]+$')
+_PREFIXED_ID = re.compile(r'^([A-Za-z_-]*?)(\d+)$')
+
+
+@dataclass
+class Spec:
+    """Como gerar um valor: tipo, formato e parâmetros observados nas fixtures"""
+    kind: str
+    presence: float = 1.0
+    null_rate: float = 0.0
+    empty_rate: float = 0.0
+    format: str = None
+    choices: list = field(default_factory=list)
+    words: list = field(default_factory=list)
+    low: float = 0
+    high: float = 0
+    prefix: str = ''
+    label_of: str = None
+    item: 'Spec' = None
+    fields: dict = field(default_factory=dict)
+
+
+def _is_id_key(key):
+    return key == 'id' or key.endswith('Id') or key.endswith('_id')
+
+
+def _dominant(regex, values, share=0.8):
+    """Valores que casam com o formato, se forem a grande maioria (as fixtures têm sujeira)"""
+    matched = [value for value in values if regex.match(value)]
+    return matched if matched and len(matched) >= share * len(values) else None
+
+
+def _infer_string(key, values):
+    spec = Spec('string')
+    filled = [value for value in values if value != '']
+    spec.empty_rate = 1 - len(filled) / len(values)
+    values = filled or values
+    distinct = sorted(set(values))
+    if _is_id_key(key):
+        prefixes = Counter(match.group(1) for match in map(_PREFIXED_ID.match, values) if match)
+        spec.format = 'id' if prefixes else 'uuid'
+        spec.prefix = prefixes.most_common(1)[0][0] if prefixes else ''
+    elif _dominant(_ISO_DATETIME, values):
+        spec.format = 'datetime'
+        moments = [_parse_datetime(value) for value in _dominant(_ISO_DATETIME, values)]
+        spec.low, spec.high = min(moments).timestamp(), max(moments).timestamp()
+        spec.prefix = '.%f' if any('.' in value for value in values) else ''
+    elif _dominant(_ISO_DATE, values) or _dominant(_BR_DATE, values):
+        iso = bool(_dominant(_ISO_DATE, values))
+        spec.format = 'date' if iso else 'br_date'
+        moments = [datetime.strptime(value, '%Y-%m-%d' if iso else '%d/%m/%Y')
+                   for value in _dominant(_ISO_DATE if iso else _BR_DATE, values)]
+        spec.low, spec.high = min(moments).timestamp(), max(moments).timestamp()
+    elif _dominant(_TIME, values):
+        spec.format = 'time'
+    elif _dominant(_CURRENCY, values):
+        spec.format = 'currency'
+        spec.choices = [_parse_currency(value) for value in _dominant(_CURRENCY, values)]
+    elif _dominant(_EMAIL, values):
+        spec.format = 'email'
+        spec.choices = sorted({_EMAIL.match(value).group(1) for value in _dominant(_EMAIL, values)})
+    elif _dominant(_URL, values):
+        spec.format = 'template'
+        spec.choices = distinct
+    elif all(re.search(r'\d', value) and len(value) < 40 and not re.search(r'[A-Za-zÀ-ú]{4,}', value)
+             for value in values):
+        spec.format = 'template'  # códigos como PE-001/2023 e telefones: troca só os dígitos
+        spec.choices = distinct
+    elif all(_IDENTIFIER.match(value) for value in values) or len(distinct) < len(values):
+        spec.format = 'enum'
+        spec.choices = distinct
+    else:
+        spec.format = 'text'
+        spec.words = sorted({word for value in values for word in value.split()})
+        lengths = [len(value.split()) for value in values]
+        spec.low, spec.high = min(lengths), max(lengths)
+    return spec
+
+
+def infer(values, key='', total=None):
+    """Spec de um campo a partir dos valores observados (MISSING quando a chave falta)"""
+    total = len(values) if total is None else total
+    present = [value for value in values if value is not MISSING]
+    observed = [value for value in present if value is not None]
+    presence = len(present) / total if total else 1.0
+    null_rate = 1 - len(observed) / len(present) if present else 0.0
+    if not observed:
+        return Spec('null', presence)
+    sample = observed[0]
+    if isinstance(sample, bool):
+        spec = Spec('bool', low=sum(1 for value in observed if value) / len(observed))
+    elif isinstance(sample, (int, float)) and all(isinstance(value, (int, float)) for value in observed):
+        integral = all(isinstance(value, int) or float(value).is_integer() for value in observed)
+        spec = Spec('int' if integral else 'float', choices=sorted(observed))
+    elif isinstance(sample, str) and all(isinstance(value, str) for value in observed):
+        spec = _infer_string(key, observed)
+    elif isinstance(sample, list):
+        items = [item for value in observed for item in value]
+        lengths = [len(value) for value in observed]
+        spec = Spec('list', low=min(lengths), high=max(lengths),
+                    item=infer(items, key[:-1] if key.endswith('s') else key) if items else Spec('null'))
+    elif isinstance(sample, dict):
+        spec = Spec('object', fields=infer_fields(observed))
+    else:
+        spec = Spec('string', format='enum', choices=sorted({json.dumps(value) for value in observed}))
+    spec.presence = presence
+    spec.null_rate = null_rate
+    return spec
+
+
+def infer_fields(records):
+    """Campos de uma lista de objetos, na ordem em que aparecem, com os pares nome/id ligados"""
+    keys = []
+    for record in records:
+        for key in record:
+            if key not in keys:
+                keys.append(key)
+    fields = {key: infer([record.get(key, MISSING) for record in records], key, len(records))
+              for key in keys}
+    for key, spec in fields.items():
+        # orgao + orgaoId: o nome acompanha o id sorteado, como uma chave estrangeira
+        partner = fields.get(f'{key}Id') or fields.get(f'{key}_id')
+        if partner is not None and partner.format == 'id' and spec.format in ('enum', 'text'):
+            spec.format = 'enum'
+            spec.label_of = f'{key}Id' if f'{key}Id' in fields else f'{key}_id'
+            if not spec.choices:
+                spec.choices = sorted({record[key] for record in records if isinstance(record.get(key), str)})
+    return fields
+
+
+def infer_schema(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    if isinstance(records, dict):
+        records = next((value for value in records.values() if isinstance(value, list)), [records])
+    return Spec('object', fields=infer_fields(records))
+
+
+def _parse_datetime(value):
+    return datetime.strptime(value.rstrip('Z')[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+
+
+def _parse_currency(value):
+    return float(value.replace('R$', '').strip().replace('.', '').replace(',', '.'))
+
+
+def _format_currency(amount):
+    text = f'{amount:,.2f}'.replace(',', '_').replace('.', ',').replace('_', '.')
+    return f'R$ {text}'
+
+
+class RecordGenerator:
+    """Gera registros a partir do schema; cada bloco de CHUNK_SIZE tem seu próprio RNG"""
+
+    def __init__(self, schema, total, seed=42, ref_ratio=DEFAULT_REF_RATIO):
+        self.schema = schema
+        self.total = total
+        self.seed = seed
+        self.ref_ratio = ref_ratio
+        # O schema vira funções uma única vez; gerar não consulta mais os Specs
+        self._build = self._compile_object(schema, top=True)
+
+    def cardinality(self, spec):
+        return max(len(spec.choices) or 1, int(self.total * self.ref_ratio) or 1)
+
+    def records(self, start, stop):
+        """Registros de índice start (inclusive) a stop (exclusive)"""
+        index = start
+        while index < stop:
+            chunk = index // CHUNK_SIZE
+            rng = random.Random(f'{self.seed}:{chunk}')
+            first = chunk * CHUNK_SIZE
+            for position in range(first, index):  # avança o RNG até o início pedido
+                self._build(rng, position)
+            end = min(stop, first + CHUNK_SIZE)
+            for position in range(index, end):
+                yield self._build(rng, position)
+            index = end
+
+    def _compile_object(self, spec, top=False):
+        steps = []
+        for key, field_spec in spec.fields.items():
+            if key == 'id' and top:
+                make = _record_id
+            elif field_spec.format == 'id' and not top:
+                # ids aninhados derivam do registro pai; as demais referências apontam para ele
+                make = _nested_id(field_spec.prefix) if key == 'id' else _record_id
+            else:
+                make = self._compile(field_spec)
+            steps.append((key, field_spec.presence, field_spec.null_rate, make))
+        labels = [(key, field_spec.label_of, len(spec.fields[field_spec.label_of].prefix), field_spec.choices)
+                  for key, field_spec in spec.fields.items() if field_spec.label_of and top]
+        ordered = [(earlier, later) for earlier, later in _DATE_ORDER
+                   if earlier in spec.fields and later in spec.fields
+                   and spec.fields[earlier].format == spec.fields[later].format in ('datetime', 'date')]
+
+        def build(rng, index):
+            draw = rng.random
+            record = {}
+            for key, presence, null_rate, make in steps:
+                if presence < 1 and draw() >= presence:
+                    continue
+                if null_rate and draw() < null_rate:
+                    record[key] = None
+                    continue
+                record[key] = make(rng, index)
+            for key, id_key, prefix_length, choices in labels:
+                # orgao acompanha orgaoId: o mesmo id tem sempre o mesmo nome
+                if record.get(key) and record.get(id_key):
+                    ref = int(record[id_key][prefix_length:]) - 1
+                    label = choices[ref % len(choices)]
+                    record[key] = label if ref < len(choices) else f'{label} {ref // len(choices) + 1}'
+            for earlier, later in ordered:
+                if record.get(earlier) and record.get(later) and record[later] < record[earlier]:
+                    record[earlier], record[later] = record[later], record[earlier]
+            return record
+
+        return build
+
+    def _compile(self, spec):
+        kind = spec.kind
+        if kind == 'null':
+            return lambda rng, index: None
+        if kind == 'bool':
+            return lambda rng, index: rng.random() < spec.low
+        if kind in ('int', 'float'):
+            observed = spec.choices
+            if kind == 'int':
+                return lambda rng, index: int(round(_jitter(rng, observed)))
+            return lambda rng, index: round(_jitter(rng, observed), 2)
+        if kind == 'list':
+            low, high = int(spec.low), int(spec.high)
+            item = self._compile(spec.item)
+            return lambda rng, index: [item(rng, index) for _ in range(low + int(rng.random() * (high - low + 1)))]
+        if kind == 'object':
+            return self._compile_object(spec)
+        make = self._compile_string(spec)
+        if spec.empty_rate:
+            empty_rate = spec.empty_rate
+            return lambda rng, index: '' if rng.random() < empty_rate else make(rng, index)
+        return make
+
+    def _compile_string(self, spec):
+        form = spec.format
+        if form in ('datetime', 'date', 'br_date'):
+            low, high = spec.low, spec.high
+            if high - low < 86400:
+                low, high = low - 180 * 86400, high + 180 * 86400
+            span = high - low
+            millis = bool(spec.prefix)
+
+            def moment(rng, index):
+                value = low + rng.random() * span
+                parts = time.gmtime(value)
+                if form == 'date':
+                    return '%04d-%02d-%02d' % parts[:3]
+                if form == 'br_date':
+                    return '%02d/%02d/%04d' % (parts[2], parts[1], parts[0])
+                text = '%04d-%02d-%02dT%02d:%02d:%02d' % parts[:6]
+                return f'{text}.{int(value * 1000) % 1000:03d}Z' if millis else text + 'Z'
+
+            return moment
+        if form == 'time':
+            return lambda rng, index: f'{8 + int(rng.random() * 11):02d}:{rng.choice((0, 15, 30, 45)):02d}'
+        if form == 'currency':
+            observed = spec.choices
+            return lambda rng, index: _format_currency(round(_jitter(rng, observed), -2))
+        if form == 'email':
+            domains = spec.choices
+            users = self.total * 10 + 1
+            return lambda rng, index: f'contato{int(rng.random() * users)}@{rng.choice(domains)}'
+        if form == 'id':
+            prefix, cardinality = spec.prefix, self.cardinality(spec)
+            return lambda rng, index: f'{prefix}{int(rng.random() * cardinality) + 1}'
+        if form == 'uuid':
+            return lambda rng, index: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if form == 'template':
+            templates = [_template(value) for value in spec.choices]
+            return lambda rng, index: _fill(rng, rng.choice(templates))
+        if form == 'enum':
+            choices = spec.choices
+            return lambda rng, index: rng.choice(choices)
+        words = spec.words
+        low, high = int(spec.low) or 1, max(int(spec.high), int(spec.low) or 1)
+        return lambda rng, index: ' '.join(rng.choices(words, k=low + int(rng.random() * (high - low + 1))))
+
+
+_DATE_ORDER = (
+    ('dataPublicacao', 'dataAbertura'),
+    ('dataAbertura', 'dataJulgamento'),
+    ('dataCriacao', 'dataAtualizacao'),
+    ('created_at', 'updated_at'),
+)
+
+
+def _record_id(rng, index):
+    return str(index + 1)
+
+
+def _nested_id(prefix):
+    return lambda rng, index: f'{prefix}{index + 1}-{rng.getrandbits(24):06x}'
+
+
+def _template(value):
+    """Partes fixas e trechos de dígitos de um valor de exemplo ('PE-', 3, '/', 4)"""
+    return [int(part) if part.isdigit() else part
+            for part in re.split(r'(\d+)', re.sub(r'\d+', lambda match: str(len(match.group())), value))
+            if part]
+
+
+def _fill(rng, template):
+    return ''.join(part if isinstance(part, str) else '%0*d' % (part, int(rng.random() * 10 ** part))
+                   for part in template)
+
+
+def _jitter(rng, observed):
+    """Valor observado sorteado com variação de ±30%: mantém a distribuição (e os extremos) da fixture"""
+    return rng.choice(observed) * rng.uniform(0.7, 1.3)
+
+
+def _snake(name):
+    return re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name).lower()
+
+
+def _sql_literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, ensure_ascii=False)
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "''") + "'"
+
+
+class NdjsonWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        self.stream.write('\n')
+
+    def close(self):
+        pass
+
+
+class SqlWriter:
+    """INSERT de várias linhas; listas e objetos viram JSON em texto"""
+
+    def __init__(self, stream, table, columns, batch_size=500):
+        self.stream = stream
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self._batch = []
+        self._header = f'INSERT INTO {table} ({", ".join(_snake(column) for column in columns)}) VALUES\n'
+
+    def write(self, record):
+        self._batch.append('(' + ', '.join(_sql_literal(record.get(column)) for column in self.columns) + ')')
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._batch:
+            self.stream.write(self._header)
+            self.stream.write(',\n'.join(self._batch))
+            self.stream.write(';\n')
+            self._batch = []
+
+    def close(self):
+        self.flush()
+
+
+def make_writer(stream, output_format, schema, table, batch_size):
+    if output_format == 'sql':
+        return SqlWriter(stream, table, list(schema.fields), batch_size)
+    return NdjsonWriter(stream)
+
+
+def write_shard(job):
+    """Gera os registros [start, stop) em um arquivo; roda em um processo separado"""
+    schema, total, seed, ref_ratio, start, stop, path, output_format, table, batch_size = job
+    generator = RecordGenerator(schema, total, seed, ref_ratio)
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as stream:
+        writer = make_writer(stream, output_format, schema, table, batch_size)
+        for record in generator.records(start, stop):
+            writer.write(record)
+        writer.close()
+    return path, stop - start
+
+
+def shard_ranges(total, shards):
+    """Divide [0, total) em shards contíguos alinhados a CHUNK_SIZE quando possível"""
+    shards = max(1, min(shards, total or 1))
+    chunks = -(-total // CHUNK_SIZE)
+    if chunks >= shards:
+        per_shard = -(-chunks // shards) * CHUNK_SIZE
+    else:
+        per_shard = -(-total // shards)
+    return [(start, min(total, start + per_shard)) for start in range(0, total, per_shard)]
+
+
+def shard_path(output, number, count):
+    if count == 1:
+        return output
+    root, extension = os.path.splitext(output)
+    return f'{root}-{number:05d}{extension}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera registros sintéticos no formato das fixtures de data/')
+    parser.add_argument('fixture', help='arquivo JSON de exemplo (ex.: data/licitacoes.json)')
+    parser.add_argument('-n', '--count', type=int, default=100000, help='registros a gerar')
+    parser.add_argument('-o', '--output', default='-', help='arquivo de saída (padrão: stdout)')
+    parser.add_argument('--format', choices=('ndjson', 'sql'), default='ndjson')
+    parser.add_argument('--table', help='tabela dos INSERTs (padrão: nome da fixture)')
+    parser.add_argument('--batch', type=int, default=500, help='linhas por INSERT')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ref-ratio', type=float, default=DEFAULT_REF_RATIO,
+                        help='ids distintos de referência (clienteId, orgaoId...) por registro')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='processos em paralelo; cada um grava um shard <saida>-NNNNN')
+    parser.add_argument('--schema', action='store_true', help='mostra o schema inferido e sai')
+    args = parser.parse_args(argv)
+
+    schema = infer_schema(args.fixture)
+    if args.schema:
+        def describe(spec, indent='  '):
+            for key, field_spec in spec.fields.items():
+                detail = field_spec.format or field_spec.kind
+                optional = f' presente em {field_spec.presence:.0%}' if field_spec.presence < 1 else ''
+                print(f'{indent}{key}: {field_spec.kind}/{detail}{optional}')
+                target = field_spec.item if field_spec.kind == 'list' else field_spec
+                if target is not None and target.kind == 'object':
+                    describe(target, indent + '  ')
+        describe(schema)
+        return 0
+
+    table = args.table or os.path.splitext(os.path.basename(args.fixture))[0]
+    started = time.perf_counter()
+    if args.workers > 1:
+        if args.output == '-':
+            parser.error('--workers exige --output (cada processo grava seu próprio arquivo)')
+        ranges = shard_ranges(args.count, args.workers)
+        jobs = [(schema, args.count, args.seed, args.ref_ratio, start, stop,
+                 shard_path(args.output, number, len(ranges)), args.format, table, args.batch)
+                for number, (start, stop) in enumerate(ranges)]
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            outputs = list(pool.map(write_shard, jobs))
+    elif args.output == '-':
+        writer = make_writer(sys.stdout, args.format, schema, table, args.batch)
+        for record in RecordGenerator(schema, args.count, args.seed, args.ref_ratio).records(0, args.count):
+            writer.write(record)
+        writer.close()
+        outputs = [('-', args.count)]
+    else:
+        outputs = [write_shard((schema, args.count, args.seed, args.ref_ratio, 0, args.count,
+                                args.output, args.format, table, args.batch))]
+
+    elapsed = time.perf_counter() - started
+    if args.output != '-':
+        for path, count in outputs:
+            print(f'📄 {path}: {count} registros', file=sys.stderr)
+        print(f'📊 {args.count} registros em {elapsed:.1f}s '
+              f'({args.count / elapsed if elapsed else 0:,.0f}/s)'.replace(',', '.'), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
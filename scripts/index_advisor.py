@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+"""
+Análise de cobertura de índices do sistema CRM
+Monta o catálogo de schema/, sql-mysql/ e sql_fixes.sql, extrai as colunas de
+WHERE, JOIN e ORDER BY das consultas embutidas nas rotas da API e reporta os
+predicados sem índice de apoio e os índices redundantes (prefixo de outro).
+Execute com: python3 scripts/index_advisor.py [--json arquivo|-]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+from sql_catalog import Catalog, table_aliases
+from ts_source import SourceFile
+
+_STATEMENT_START = re.compile(r'^\s*\(?\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE|WITH)\b', re.I)
+_CLAUSE_END = r'(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bUNION\b|\bFOR\s+UPDATE\b|$)'
+_PREDICATE = re.compile(
+    r'(?<![\w.$])(?:(\w+)\.)?(\w+)\s*(=|<>|!=|>=|<=|>|<|\bNOT\s+LIKE\b|\bLIKE\b|\bNOT\s+IN\b|\bIN\b'
+    r'|\bBETWEEN\b|\bIS\s+NOT\b|\bIS\b)\s*((?:\w+\.)?\w+|\?|\'[^\']*\'|\()?', re.I)
+_ON_CLAUSE = re.compile(r'\bJOIN\s+(\S+)(?:\s+(?:AS\s+)?(\w+))?\s+ON\s+(.*?)(?=\b(?:LEFT|RIGHT|INNER|CROSS|JOIN|WHERE)\b|'
+                        r'\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)', re.I | re.S)
+_SQL_WORDS = {'and', 'or', 'not', 'null', 'true', 'false', 'case', 'when', 'then', 'else', 'end',
+              'count', 'sum', 'avg', 'min', 'max', 'coalesce', 'now', 'curdate', 'date_add', 'interval'}
+
+
+def _normalize(text):
+    # Expressões ${...} de templates viram parâmetros
+    return re.sub(r'\$\{[^}]*\}', ' ? ', text)
+
+
+def _predicate_regions(sql):
+    """Trechos de filtro (WHERE ou fragmento de condição) e de junção (ON)"""
+    statement = _STATEMENT_START.match(sql)
+    filters, joins = [], []
+    if statement:
+        kind = statement.group(1).upper()
+        if kind in ('INSERT', 'REPLACE') and not re.search(r'\bSELECT\b', sql, re.I):
+            return filters, joins
+        for match in re.finditer(rf'\bWHERE\b(.*?){_CLAUSE_END}', sql, re.I | re.S):
+            filters.append(match.group(1))
+        for match in _ON_CLAUSE.finditer(sql):
+            joins.append((match.group(1), match.group(2), match.group(3)))
+    elif not re.match(r'\s*SET\b', sql, re.I) and re.search(r'(=|<|>|\bLIKE\b|\bIN\b)\s*(\?|\()', sql, re.I):
+        # Fragmento montado no código, ex.: conditions.push('l.status = ?')
+        filters.append(sql)
+    return filters, joins
+
+
+def _order_columns(sql):
+    match = re.search(r'\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\bOFFSET\b|\bFOR\s+UPDATE\b|$)', sql, re.I | re.S)
+    columns = []
+    if match:
+        for item in match.group(1).split(','):
+            column = re.match(r'\s*(?:(\w+)\.)?(\w+)\s*(ASC|DESC)?\s*$', item, re.I)
+            if column:
+                columns.append((column.group(1), column.group(2)))
+    return columns
+
+
+class QueryScope:
+    """Consultas e fragmentos de uma mesma função, com os aliases que usam"""
+
+    def __init__(self, file, name):
+        self.file = file
+        self.name = name
+        self.aliases = {}
+        self.fragments = []
+
+    def add(self, sql, line):
+        self.aliases.update(table_aliases(sql))
+        self.fragments.append((sql, line))
+
+
+def extract_scopes(root='.', pattern='app/api/**/route.ts'):
+    """Agrupa os literais SQL das rotas por função"""
+    scopes = []
+    for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+        source = SourceFile.read(path)
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        functions = source.functions()
+        by_function = {}
+        separators = {}
+        for match in re.finditer(r'\b(\w+)\s*\.\s*join\s*\(\s*([\'"`])(.*?)\2', source.text):
+            separators.setdefault(match.group(1), match.group(3))
+        for literal in source.literals:
+            text = _normalize(literal.text)
+            pushed = re.search(r'\b(\w+)\s*\.\s*push\s*\(\s*$', source.masked[max(0, literal.start - 80):literal.start])
+            if pushed and not re.search(r'\b(AND|OR)\b', separators.get(pushed.group(1), ''), re.I):
+                # Lista unida por vírgula: atribuições de UPDATE ... SET, não filtros
+                continue
+            if not re.search(r'\b(SELECT|UPDATE|DELETE|WHERE|JOIN|ORDER\s+BY)\b|(\w+)\s*(=|<|>|\bLIKE\b|\bIN\b)\s*(\?|\()',
+                             text, re.I):
+                continue
+            containing = [f for f in functions if f.start <= literal.start <= f.end]
+            function = min(containing, key=lambda f: f.end - f.start) if containing else None
+            key = function.name if function else '<módulo>'
+            scope = by_function.get(key)
+            if scope is None:
+                scope = by_function[key] = QueryScope(relative, key)
+                scopes.append(scope)
+            scope.add(text, source.line_of(literal.start))
+    return scopes
+
+
+class Resolver:
+    """Resolve (alias, coluna) para (tabela, coluna), atravessando views"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._view_columns = {}
+
+    def _view(self, name):
+        if name not in self._view_columns:
+            self._view_columns[name] = self.catalog.view_columns(name)
+        return self._view_columns[name]
+
+    def resolve(self, qualifier, column, aliases):
+        column = column.lower()
+        if qualifier:
+            candidates = [aliases.get(qualifier.lower(), qualifier.lower())]
+        else:
+            candidates = list(dict.fromkeys(aliases.values()))
+        for name in candidates:
+            table = self.catalog.tables.get(name)
+            if table is not None and column in table.columns:
+                return name, column
+            if name in self.catalog.views:
+                source = self._view(name).get(column)
+                if source:
+                    return source
+        return None
+
+
+def _has_leading_index(table, column, equality_columns=()):
+    for index in table.indexes:
+        if index.columns and index.columns[0] == column:
+            return True
+        # Ordenação/intervalo atendidos por índice composto após igualdade
+        if len(index.columns) > 1 and index.columns[0] in equality_columns and index.columns[1] == column:
+            return True
+    return False
+
+
+def find_missing_indexes(catalog, scopes):
+    """Predicados sem índice cuja coluna líder seja a coluna consultada"""
+    resolver = Resolver(catalog)
+    missing = {}
+
+    def note(kind, resolved, scope, line, operator, equality=()):
+        if resolved is None:
+            return
+        table_name, column = resolved
+        table = catalog.tables.get(table_name)
+        if table is None or column not in table.columns:
+            return
+        if _has_leading_index(table, column, equality):
+            return
+        key = (table_name, column)
+        entry = missing.setdefault(key, {
+            'table': table_name, 'column': column, 'kinds': set(), 'operators': set(),
+            'occurrences': [],
+        })
+        entry['kinds'].add(kind)
+        if operator:
+            entry['operators'].add(operator.upper())
+        occurrence = f'{scope.file}:{line} ({scope.name})'
+        if occurrence not in entry['occurrences']:
+            entry['occurrences'].append(occurrence)
+
+    for scope in scopes:
+        for sql, line in scope.fragments:
+            filters, joins = _predicate_regions(sql)
+            equality = defaultdict(set)
+            for region in filters:
+                for match in _PREDICATE.finditer(region):
+                    qualifier, column, operator, value = match.groups()
+                    if column.lower() in _SQL_WORDS or column.isdigit():
+                        continue
+                    resolved = resolver.resolve(qualifier, column, scope.aliases)
+                    if resolved and operator == '=':
+                        equality[resolved[0]].add(resolved[1])
+                    note('filter', resolved, scope, line, ' '.join(operator.split()))
+            for table_ref, alias, condition in joins:
+                joined = {table_ref.strip('`').split('.')[-1].lower()}
+                if alias:
+                    joined.add(alias.lower())
+                for match in re.finditer(r'(?:(\w+)\.)?(\w+)\s*=\s*(?:(\w+)\.)?(\w+)', condition):
+                    left_q, left_c, right_q, right_c = match.groups()
+                    # A coluna do lado da tabela juntada é a que precisa de índice
+                    for qualifier, column in ((left_q, left_c), (right_q, right_c)):
+                        if qualifier and qualifier.lower() in joined:
+                            note('join', resolver.resolve(qualifier, column, scope.aliases), scope, line, '=')
+            for qualifier, column in _order_columns(sql):
+                resolved = resolver.resolve(qualifier, column, scope.aliases)
+                equal = equality.get(resolved[0], ()) if resolved else ()
+                note('order', resolved, scope, line, None, equal)
+
+    results = []
+    for entry in missing.values():
+        entry['kinds'] = sorted(entry['kinds'])
+        entry['operators'] = sorted(entry['operators'])
+        non_sargable = entry['operators'] and all('LIKE' in op for op in entry['operators'])
+        entry['suggestion'] = None if non_sargable else (
+            f"CREATE INDEX idx_{entry['table']}_{entry['column']} ON {entry['table']}({entry['column']});")
+        if non_sargable:
+            entry['note'] = "apenas LIKE: índice B-tree só ajuda sem '%' inicial"
+        results.append(entry)
+    results.sort(key=lambda entry: (-len(entry['occurrences']), entry['table'], entry['column']))
+    return results
+
+
+def find_redundant_indexes(catalog):
+    """Índices cujas colunas são prefixo (ou cópia) de outro índice da mesma tabela"""
+    redundant = []
+    for table in sorted(catalog.tables.values(), key=lambda table: table.name):
+        explicit = [index for index in table.indexes if not index.implicit]
+        for index in explicit:
+            if index.primary or index.unique:
+                continue
+            for other in explicit:
+                if other is index or len(other.columns) < len(index.columns):
+                    continue
+                if other.columns[:len(index.columns)] != index.columns:
+                    continue
+                if other.columns == index.columns and not (other.unique or other.primary) \
+                        and table.indexes.index(other) > table.indexes.index(index):
+                    continue  # duplicata exata: reporta só a segunda ocorrência
+                redundant.append({
+                    'table': table.name,
+                    'index': index.name,
+                    'columns': index.columns,
+                    'covered_by': other.name,
+                    'covered_by_columns': other.columns,
+                    'source': index.source,
+                    'suggestion': f'DROP INDEX {index.name} ON {table.name};',
+                })
+                break
+    return redundant
+
+
+def analyze(root='.'):
+    catalog = Catalog.load(root)
+    scopes = extract_scopes(root)
+    return {
+        'catalog': {'tables': len(catalog.tables), 'views': len(catalog.views),
+                    'indexes': sum(len(table.indexes) for table in catalog.tables.values())},
+        'missing_indexes': find_missing_indexes(catalog, scopes),
+        'redundant_indexes': find_redundant_indexes(catalog),
+    }
+
+
+def format_report(report):
+    lines = [f"📚 Catálogo: {report['catalog']['tables']} tabelas, {report['catalog']['views']} views, "
+             f"{report['catalog']['indexes']} índices",
+             f"\n🐢 Predicados sem índice de apoio ({len(report['missing_indexes'])}):"]
+    for entry in report['missing_indexes']:
+        lines.append(f"  {entry['table']}.{entry['column']} [{', '.join(entry['kinds'])}] "
+                     f"{len(entry['occurrences'])} consulta(s)")
+        for occurrence in entry['occurrences'][:3]:
+            lines.append(f"      {occurrence}")
+        lines.append(f"      → {entry['suggestion'] or entry.get('note')}")
+    lines.append(f"\n♻️  Índices redundantes ({len(report['redundant_indexes'])}):")
+    for entry in report['redundant_indexes']:
+        lines.append(f"  {entry['table']}.{entry['index']} ({', '.join(entry['columns'])}) "
+                     f"coberto por {entry['covered_by']} ({', '.join(entry['covered_by_columns'])}) "
+                     f"[{entry['source']}]")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cobertura de índices das consultas das rotas')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--json', dest='json_out', help="grava o relatório JSON no arquivo ('-' para stdout)")
+    parser.add_argument('--table', action='append', help='limita o relatório a estas tabelas')
+    args = parser.parse_args(argv)
+
+    report = analyze(args.root)
+    if args.table:
+        wanted = {name.lower() for name in args.table}
+        report['missing_indexes'] = [e for e in report['missing_indexes'] if e['table'] in wanted]
+        report['redundant_indexes'] = [e for e in report['redundant_indexes'] if e['table'] in wanted]
+
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(format_report(report))
+        if args.json_out:
+            with open(args.json_out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
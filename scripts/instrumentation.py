@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Medição de tempo dos scripts de validação
+span() marca um trecho (verificação, sondagem de arquivo...) e, quando há um
+Recorder ativo, registra início, duração e thread; sem Recorder o custo é uma
+checagem de variável. O Recorder pode ainda perfilar cada verificação com
+cProfile e medir alocações com tracemalloc, e exporta os eventos em JSON ou no
+formato Chrome trace (chrome://tracing, ui.perfetto.dev).
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_active = None
+_local = threading.local()
+
+
+@contextmanager
+def _noop():
+    yield None
+
+
+def span(name, category='check', **args):
+    """Trecho medido; devolve um contexto que não faz nada se não houver Recorder ativo"""
+    if _active is None:
+        return _noop()
+    return _active.span(name, category, args)
+
+
+def timed(fn, category='probe', name=None):
+    """Envolve fn para que cada chamada vire um span com o argumento como detalhe"""
+    label = name or getattr(fn, '__name__', 'probe')
+
+    def wrapper(item, *args, **kwargs):
+        if _active is None:
+            return fn(item, *args, **kwargs)
+        with _active.span(label, category, {'item': str(item)}):
+            return fn(item, *args, **kwargs)
+    return wrapper
+
+
+class Recorder:
+    """Coleta os spans de uma execução; profile e memory ativam cProfile e tracemalloc"""
+
+    def __init__(self, profile=False, memory=False, profile_top=15):
+        self.profile = profile
+        self.memory = memory
+        self.profile_top = profile_top
+        self.events = []
+        self.stats = None
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._origin = None
+        self._started_memory = False
+
+    def __enter__(self):
+        global _active
+        self._origin = time.perf_counter_ns()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_memory = True
+        _active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        _active = None
+        if self._started_memory:
+            tracemalloc.stop()
+            self._started_memory = False
+        return False
+
+    def _thread_id(self):
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._threads:
+                self._threads[ident] = (len(self._threads) + 1, threading.current_thread().name)
+            return self._threads[ident][0]
+
+    @contextmanager
+    def span(self, name, category, args):
+        profiler = None
+        # cProfile mede só a thread que o ativou; verificações aninhadas usam o perfil externo
+        if self.profile and category == 'check' and getattr(_local, 'profiler', None) is None:
+            profiler = cProfile.Profile()
+            _local.profiler = profiler
+            profiler.enable()
+        memory_before = tracemalloc.get_traced_memory()[0] if self.memory and category == 'check' else None
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter_ns()
+            if profiler is not None:
+                profiler.disable()
+                _local.profiler = None
+                args['profile'] = self._top_functions(profiler)
+            if memory_before is not None:
+                args['alloc_kb'] = round((tracemalloc.get_traced_memory()[0] - memory_before) / 1024, 1)
+            event = {'name': name, 'cat': category, 'start_ns': start - self._origin,
+                     'dur_ns': end - start, 'tid': self._thread_id(), 'args': args}
+            with self._lock:
+                self.events.append(event)
+
+    def _top_functions(self, profiler):
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler, stream=io.StringIO())
+            else:
+                self.stats.add(profiler)
+        rows = []
+        for (filename, line, function), (_, calls, _, cumulative, _) in stats.stats.items():
+            rows.append((cumulative, f'{os.path.basename(filename)}:{line}({function})', calls))
+        rows.sort(reverse=True)
+        return [{'function': label, 'calls': calls, 'cumulative_ms': round(cumulative * 1000, 3)}
+                for cumulative, label, calls in rows[:self.profile_top]]
+
+    def summary(self):
+        """Tempo por nome de span: chamadas, total e máximo, do mais caro para o mais barato"""
+        grouped = {}
+        for event in self.events:
+            key = (event['cat'], event['name'])
+            entry = grouped.setdefault(key, {'category': event['cat'], 'name': event['name'],
+                                             'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            milliseconds = event['dur_ns'] / 1e6
+            entry['calls'] += 1
+            entry['total_ms'] += milliseconds
+            entry['max_ms'] = max(entry['max_ms'], milliseconds)
+        rows = sorted(grouped.values(), key=lambda entry: -entry['total_ms'])
+        for row in rows:
+            row['total_ms'] = round(row['total_ms'], 3)
+            row['max_ms'] = round(row['max_ms'], 3)
+        return rows
+
+    def wall_ms(self):
+        if not self.events:
+            return 0.0
+        end = max(event['start_ns'] + event['dur_ns'] for event in self.events)
+        return round(end / 1e6, 3)
+
+    def to_dict(self):
+        return {
+            'version': 1,
+            'pid': os.getpid(),
+            'wall_ms': self.wall_ms(),
+            'summary': self.summary(),
+            'events': [{'name': event['name'], 'category': event['cat'],
+                        'start_ms': round(event['start_ns'] / 1e6, 3), 'duration_ms': round(event['dur_ns'] / 1e6, 3),
+                        'thread': event['tid'], 'args': event['args']} for event in self.events],
+        }
+
+    def chrome_trace(self):
+        """Eventos completos ('X') e nomes de thread ('M') no formato Trace Event"""
+        pid = os.getpid()
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in self._threads.values()]
+        for event in self.events:
+            args = {key: value for key, value in event['args'].items() if key != 'profile'}
+            trace.append({'name': event['name'], 'cat': event['cat'], 'ph': 'X', 'pid': pid, 'tid': event['tid'],
+                          'ts': event['start_ns'] / 1000.0, 'dur': event['dur_ns'] / 1000.0, 'args': args})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+    def write_profile(self, path):
+        """Perfil cProfile somado de todas as verificações (abra com pstats ou snakeviz)"""
+        if self.stats is not None:
+            self.stats.dump_stats(path)
+
+    def format_summary(self, limit=10):
+        lines = [f"  {'categoria':<10}{'nome':<44}{'chamadas':>9}{'total ms':>11}{'máx ms':>10}"]
+        for row in self.summary()[:limit]:
+            lines.append(f"  {row['category']:<10}{row['name'][:43]:<44}{row['calls']:>9}"
+                         f"{row['total_ms']:>11.2f}{row['max_ms']:>10.2f}")
+        return '\n'.join(lines)
+
+
+def add_arguments(parser):
+    """Opções de medição comuns aos scripts de validação"""
+    parser.add_argument('--timings', metavar='ARQUIVO', help='grava os tempos de cada verificação e sondagem em JSON')
+    parser.add_argument('--chrome-trace', metavar='ARQUIVO', help='grava os spans no formato Chrome trace')
+    parser.add_argument('--profile', nargs='?', const='', metavar='ARQUIVO',
+                        help='perfila cada verificação com cProfile (e grava o perfil somado em ARQUIVO)')
+    parser.add_argument('--memory', action='store_true', help='mede as alocações de cada verificação (tracemalloc; força execução serial)')
+
+
+def recorder_from_args(args):
+    return Recorder(profile=args.profile is not None, memory=args.memory)
+
+
+def export(recorder, args, log=print):
+    """Grava os arquivos pedidos nas opções de add_arguments()"""
+    if args.timings:
+        recorder.write_json(args.timings)
+        log(f'⏱️  Tempos salvos em: {args.timings}')
+    if args.chrome_trace:
+        recorder.write_chrome_trace(args.chrome_trace)
+        log(f'⏱️  Chrome trace salvo em: {args.chrome_trace}')
+    if args.profile:
+        recorder.write_profile(args.profile)
+        log(f'⏱️  Perfil cProfile salvo em: {args.profile}')
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark da verificação de JWT HS256 do middleware e protótipo de cache
+middleware.ts chama jwtVerify (jose) em toda requisição não pública e
+lib/auth/jwt.ts assina e verifica com jsonwebtoken: cada requisição refaz o
+HMAC-SHA256, decodifica header e payload em JSON e confere exp, mesmo quando o
+dashboard manda o mesmo token várias vezes por segundo.
+O benchmark reproduz esse caminho com hmac/hashlib e o compara com um cache
+limitado de tokens já verificados:
+  - chave: SHA-256 do token (o token em si não fica em memória)
+  - validade da entrada: min(exp do token, agora + --max-ttl), então um token
+    expirado nunca é aceito e revogações demoram no máximo --max-ttl segundos
+  - tokens inválidos nunca entram no cache
+  - cheio, o cache descarta primeiro as entradas que expiram mais cedo
+O tráfego é gerado em tempo virtual (usuários com popularidade Zipf, tokens de
+1h renovados ao expirar, uma fração adulterada) e cada decisão do cache é
+conferida contra a verificação completa. Os tempos são de Python; o que se
+transfere para o Node é a proporção entre verificação e acerto no cache.
+Execute com: python3 scripts/jwt_bench.py [--rate 300] [--capacities 100,1000,10000] [--json]
+"""
+
+import argparse
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+DEFAULT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key')
+ACCESS_TOKEN_TTL = 3600  # expiresIn: "1h" em generateAccessToken
+ROLES = ('admin', 'gerente', 'comercial', 'usuario')
+HEADER = {'alg': 'HS256', 'typ': 'JWT'}
+
+
+class TokenError(Exception):
+    pass
+
+
+def b64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def b64url_decode(segment):
+    try:
+        return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+    except (ValueError, TypeError) as e:
+        raise TokenError('segmento base64url inválido') from e
+
+
+def sign_hs256(payload, secret):
+    """Token compacto como o jsonwebtoken gera (JSON sem espaços)"""
+    header = b64url_encode(json.dumps(HEADER, separators=(',', ':')).encode())
+    body = b64url_encode(json.dumps(payload, separators=(',', ':')).encode())
+    signing_input = f'{header}.{body}'.encode('ascii')
+    signature = hmac.new(secret, signing_input, hashlib.sha256).digest()
+    return f'{header}.{body}.{b64url_encode(signature)}'
+
+
+def verify_hs256(token, secret, now):
+    """O que jwtVerify faz para HS256: header, assinatura, payload e exp/nbf"""
+    parts = token.split('.')
+    if len(parts) != 3:
+        raise TokenError('token mal formado')
+    try:
+        header = json.loads(b64url_decode(parts[0]))
+    except ValueError as e:
+        raise TokenError('header inválido') from e
+    if header.get('alg') != 'HS256':
+        raise TokenError('algoritmo não permitido')
+    expected = hmac.new(secret, f'{parts[0]}.{parts[1]}'.encode('ascii'), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, b64url_decode(parts[2])):
+        raise TokenError('assinatura inválida')
+    try:
+        payload = json.loads(b64url_decode(parts[1]))
+    except ValueError as e:
+        raise TokenError('payload inválido') from e
+    if 'exp' in payload and payload['exp'] <= now:
+        raise TokenError('token expirado')
+    if 'nbf' in payload and payload['nbf'] > now:
+        raise TokenError('token ainda não válido')
+    return payload
+
+
+class VerifiedTokenCache:
+    """Tokens já verificados, indexados pelo SHA-256 e expirando junto com o token"""
+
+    def __init__(self, capacity=10000, max_ttl=60.0):
+        self.capacity = capacity
+        self.max_ttl = max_ttl
+        self._entries = {}
+        self._heap = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.peak_entries = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def verify(self, token, secret, now):
+        key = hashlib.sha256(token.encode('ascii')).digest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry[0]:
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        payload = verify_hs256(token, secret, now)
+        self.store(key, min(payload.get('exp', math.inf), now + self.max_ttl), payload, now)
+        return payload
+
+    def store(self, key, expires_at, payload, now):
+        if key not in self._entries and len(self._entries) >= self.capacity:
+            self._evict(now)
+        self._entries[key] = (expires_at, payload)
+        heapq.heappush(self._heap, (expires_at, key))
+        # Entradas regravadas deixam registros velhos no heap; compacta de vez em quando
+        if len(self._heap) > 2 * self.capacity + 64:
+            self._heap = [(entry[0], key) for key, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+        self.peak_entries = max(self.peak_entries, len(self._entries))
+
+    def _evict(self, now):
+        while self._heap and len(self._entries) >= self.capacity:
+            expires_at, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != expires_at:
+                continue
+            del self._entries[key]
+            if expires_at <= now:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+
+def make_token(rng, user, issued_at, secret):
+    payload = {'userId': user['id'], 'email': user['email'], 'role': user['role'],
+               'iat': int(issued_at), 'exp': int(issued_at) + ACCESS_TOKEN_TTL}
+    return sign_hs256(payload, secret)
+
+
+def tamper(token, rng):
+    head, body, signature = token.rsplit('.', 2)
+    position = rng.randrange(len(signature) - 1)
+    replacement = 'A' if signature[position] != 'A' else 'B'
+    return f'{head}.{body}.{signature[:position]}{replacement}{signature[position + 1:]}'
+
+
+def workload(users, rate, duration, zipf, invalid_share, secret, seed):
+    """Requisições (t, token) em tempo virtual; t=0 é o início, tokens emitidos na última hora"""
+    rng = random.Random(seed)
+    population = [{'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                   'email': f'usuario{index}@empresa.com.br', 'role': rng.choice(ROLES)}
+                  for index in range(users)]
+    weights = [1.0 / (rank + 1) ** zipf for rank in range(users)]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+
+    tokens = {}
+    requests = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            break
+        index = rng.choices(range(users), cum_weights=cumulative)[0]
+        current = tokens.get(index)
+        if current is None:
+            issued = -rng.uniform(0, ACCESS_TOKEN_TTL)
+            current = tokens[index] = (make_token(rng, population[index], issued, secret), issued)
+        token, issued = current
+        if issued + ACCESS_TOKEN_TTL <= t:
+            # O cliente manda o token vencido uma vez e então renova (/api/auth/refresh)
+            tokens[index] = (make_token(rng, population[index], t, secret), t)
+        elif rng.random() < invalid_share:
+            token = tamper(token, rng)
+        requests.append((t, token))
+    return requests
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(requests, secret, verify):
+    """Aplica verify a cada requisição; devolve decisões e latências em µs"""
+    decisions = []
+    latencies = []
+    clock = time.perf_counter_ns
+    for t, token in requests:
+        started = clock()
+        try:
+            verify(token, secret, t)
+            accepted = True
+        except TokenError:
+            accepted = False
+        latencies.append((clock() - started) / 1000)
+        decisions.append(accepted)
+    return decisions, latencies
+
+
+def summarize(latencies):
+    total_us = sum(latencies)
+    mean = total_us / len(latencies) if latencies else 0.0
+    return {'mean_us': round(mean, 3), 'p50_us': round(percentile(latencies, 0.5), 3),
+            'p99_us': round(percentile(latencies, 0.99), 3),
+            'throughput_per_s': round(1e6 / mean) if mean else 0}
+
+
+def bytes_per_token(count, secret, seed, max_ttl):
+    """Memória do cache por token guardado (chave, payload e registro no heap)"""
+    rng = random.Random(seed)
+    user = {'id': str(uuid.uuid4()), 'email': 'usuario@empresa.com.br', 'role': 'comercial'}
+    tokens = [make_token(rng, dict(user, id=str(uuid.UUID(int=rng.getrandbits(128), version=4))), 0, secret)
+              for _ in range(count)]
+    cache = VerifiedTokenCache(capacity=count, max_ttl=max_ttl)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for token in tokens:
+        cache.verify(token, secret, 1)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+
+def benchmark(args):
+    secret = args.secret.encode()
+    requests = workload(args.users, args.rate, args.duration, args.zipf, args.invalid_share, secret, args.seed)
+    baseline_decisions, latencies = run(requests, secret, verify_hs256)
+    baseline = summarize(latencies)
+    baseline['accepted'] = sum(baseline_decisions)
+    rejected = len(requests) - baseline['accepted']
+
+    caches = []
+    for capacity in args.capacities:
+        cache = VerifiedTokenCache(capacity, args.max_ttl)
+        decisions, latencies = run(requests, secret, cache.verify)
+        row = summarize(latencies)
+        row.update({
+            'capacity': capacity,
+            'hit_ratio': round(cache.hits / len(requests), 4) if requests else 0.0,
+            'speedup': round(baseline['mean_us'] / row['mean_us'], 2) if row['mean_us'] else 0.0,
+            'evictions': cache.evictions,
+            'expirations': cache.expirations,
+            'peak_entries': cache.peak_entries,
+            'bytes_per_token': round(bytes_per_token(min(capacity, args.memory_sample), secret, args.seed,
+                                                     args.max_ttl)),
+            'mismatches': sum(1 for left, right in zip(baseline_decisions, decisions) if left != right),
+        })
+        row['peak_kb'] = round(row['peak_entries'] * row['bytes_per_token'] / 1024, 1)
+        caches.append(row)
+
+    load = []
+    for rate in args.rates:
+        entry = {'rate': rate, 'baseline_core_pct': round(baseline['mean_us'] * rate / 1e4, 2)}
+        for row in caches:
+            entry[f"cache_{row['capacity']}_core_pct"] = round(row['mean_us'] * rate / 1e4, 2)
+        load.append(entry)
+
+    return {
+        'settings': {'users': args.users, 'rate': args.rate, 'duration': args.duration, 'zipf': args.zipf,
+                     'invalid_share': args.invalid_share, 'max_ttl': args.max_ttl, 'seed': args.seed},
+        'requests': len(requests),
+        'distinct_tokens': len({token for _, token in requests}),
+        'rejected': rejected,
+        'baseline': baseline,
+        'caches': caches,
+        'load': load,
+    }
+
+
+def format_report(report):
+    settings = report['settings']
+    baseline = report['baseline']
+    lines = [f"📊 {report['requests']} requisições ({settings['rate']} req/s por {settings['duration']}s), "
+             f"{settings['users']} usuários, {report['distinct_tokens']} tokens distintos, "
+             f"{report['rejected']} rejeitadas",
+             f"  {'caminho':<18}{'média µs':>10}{'p50 µs':>9}{'p99 µs':>9}{'verif./s':>11}{'acertos':>9}"
+             f"{'ganho':>8}{'pico':>8}{'B/token':>9}{'divergências':>14}",
+             f"  {'verificação HMAC':<18}{baseline['mean_us']:>10.2f}{baseline['p50_us']:>9.2f}"
+             f"{baseline['p99_us']:>9.2f}{baseline['throughput_per_s']:>11}{'-':>9}{'1.00x':>8}{'-':>8}{'-':>9}{'-':>14}"]
+    for row in report['caches']:
+        lines.append(f"  {'cache ' + str(row['capacity']):<18}{row['mean_us']:>10.2f}{row['p50_us']:>9.2f}"
+                     f"{row['p99_us']:>9.2f}{row['throughput_per_s']:>11}{row['hit_ratio'] * 100:>8.1f}%"
+                     f"{row['speedup']:>7.2f}x{row['peak_entries']:>8}{row['bytes_per_token']:>9}"
+                     f"{row['mismatches']:>14}")
+    lines.append(f"  entradas valem até o exp do token ou {settings['max_ttl']:.0f}s; "
+                 f"divergências: decisões diferentes da verificação completa")
+    lines.append('')
+    lines.append('⏱️  Núcleo de CPU gasto só com verificação de token')
+    header = f"  {'req/s':>8}{'HMAC':>10}"
+    for row in report['caches']:
+        header += f"{'cache ' + str(row['capacity']):>14}"
+    lines.append(header)
+    for entry in report['load']:
+        line = f"  {entry['rate']:>8}{entry['baseline_core_pct']:>9.2f}%"
+        for row in report['caches']:
+            key = f"cache_{row['capacity']}_core_pct"
+            line += f"{entry[key]:>13.2f}%"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def parse_list(value, kind):
+    return [kind(item) for item in value.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mede a verificação HS256 do middleware e um cache de tokens')
+    parser.add_argument('--users', type=int, default=500, help='usuários com sessão ativa')
+    parser.add_argument('--rate', type=float, default=300.0, help='requisições por segundo (tempo virtual)')
+    parser.add_argument('--duration', type=float, default=120.0, help='segundos de tráfego (tempo virtual)')
+    parser.add_argument('--zipf', type=float, default=1.1, help='concentração das requisições nos usuários ativos')
+    parser.add_argument('--invalid-share', type=float, default=0.01, help='fração de tokens adulterados')
+    parser.add_argument('--capacities', default='100,1000,10000', help='tamanhos de cache comparados')
+    parser.add_argument('--max-ttl', type=float, default=60.0,
+                        help='segundos máximos de uma entrada (atraso máximo de uma revogação)')
+    parser.add_argument('--rates', default='100,1000,5000', help='taxas para estimar o uso de CPU')
+    parser.add_argument('--memory-sample', type=int, default=10000, help='tokens usados para medir bytes/token')
+    parser.add_argument('--secret', default=DEFAULT_SECRET, help='segredo HS256 (padrão: $JWT_SECRET)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+    args.capacities = parse_list(args.capacities, int)
+    args.rates = parse_list(args.rates, int)
+
+    report = benchmark(args)
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Relatório salvo em: {args.json_out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
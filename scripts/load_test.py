@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+
+"""
+Teste de carga das rotas da API do sistema CRM
+Reproduz um mix ponderado de requisições (por padrão, as rotas da verificação
+"Rotas da API" em checks.toml) com concorrência, taxa, duração e tempo limite
+por requisição configuráveis e reporta latência p50/p95/p99 e vazão por rota.
+Execute com: python3 scripts/load_test.py --target http://localhost:3000 --duration 30
+         ou: python3 scripts/load_test.py --stub   (servidor local de apoio)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from check_plan import api_routes
+
+DEFAULT_PARAMS = {'id': '00000000-0000-0000-0000-000000000001'}
+DEFAULT_TIMEOUT = 10.0
+
+
+def route_template(route_file):
+    """Converte app/api/x/[id]/route.ts em /api/x/[id]"""
+    path = route_file
+    if path.startswith('app/'):
+        path = path[len('app'):]
+    return re.sub(r'/route\.(ts|js)$', '', path)
+
+
+def expand_template(template, params):
+    """Substitui os segmentos dinâmicos [nome] pelos valores em params"""
+    def replace(match):
+        name = match.group(1)
+        if name not in params:
+            raise KeyError(f"Parâmetro '{name}' não informado para {template}")
+        return str(params[name])
+    return re.sub(r'\[([^\]/]+)\]', replace, template)
+
+
+def default_mix():
+    """Mix padrão: listagens pesam o dobro dos detalhes"""
+    mix = []
+    for route_file in api_routes():
+        template = route_template(route_file)
+        mix.append({'route': template, 'method': 'GET',
+                    'weight': 1 if '[' in template else 2})
+    return mix
+
+
+def load_mix(mix_file):
+    """Lê um mix JSON: [{"route": "/api/licitacoes", "weight": 5, "method": "GET", "query": "..."}]"""
+    with open(mix_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    for entry in entries:
+        entry.setdefault('method', 'GET')
+        entry.setdefault('weight', 1)
+    return entries
+
+
+class HttpConnection:
+    """Conexão HTTP/1.1 persistente sobre streams do asyncio"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, method, path, host, body=None, headers=None):
+        """Envia uma requisição e devolve (status, bytes do corpo, keep_alive)"""
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {host}', 'Connection: keep-alive']
+        for name, value in (headers or {}).items():
+            lines.append(f'{name}: {value}')
+        if body is not None:
+            lines.append(f'Content-Length: {len(body)}')
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        self.writer.write(payload + (body or b''))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Conexão encerrada pelo servidor')
+        version, status = status_line.decode('latin-1').split(' ', 2)[:2]
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if method == 'HEAD' or status in ('204', '304'):
+            pass
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                chunk_size = int((await self.reader.readline()).split(b';')[0], 16)
+                if chunk_size == 0:
+                    await self.reader.readline()
+                    break
+                size += len(await self.reader.readexactly(chunk_size + 2)) - 2
+        elif 'content-length' in response_headers:
+            size = len(await self.reader.readexactly(int(response_headers['content-length'])))
+        else:
+            size = len(await self.reader.read())
+            return int(status), size, False
+
+        connection = response_headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version != 'HTTP/1.0' or connection == 'keep-alive')
+        return int(status), size, keep_alive
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Pool limitado de conexões persistentes para um único host"""
+
+    def __init__(self, base_url, size, timeout=None):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f'URL não suportada: {base_url}')
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = parts.scheme == 'https'
+        self.host_header = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def acquire(self):
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return HttpConnection(reader, writer)
+
+    def release(self, connection, reusable=True):
+        if reusable:
+            self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    async def request(self, method, path, body=None, headers=None):
+        connection = await self.acquire()
+        reusable = False
+        try:
+            # Estourado o tempo limite, a conexão fica no meio da resposta e é descartada
+            status, size, reusable = await asyncio.wait_for(connection.request(
+                method, self.prefix + path, self.host_header, body, headers), self.timeout)
+            return status, size
+        finally:
+            self.release(connection, reusable)
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+def percentile(sorted_values, fraction):
+    """Percentil pelo método do posto mais próximo"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class RouteStats:
+    """Amostras de latência e contadores de uma rota"""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.bytes = 0
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        return {
+            'requests': len(values) + sum(self.errors.values()),
+            'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+            'bytes': self.bytes,
+            'statuses': {str(code): count for code, count in sorted(self.statuses.items())},
+            'errors': dict(self.errors),
+        }
+
+
+async def run_load(base_url, mix, concurrency=10, rate=None, duration=10.0,
+                   pool_size=None, params=None, seed=None, max_requests=None,
+                   timeout=DEFAULT_TIMEOUT):
+    """Executa o teste de carga e devolve o relatório por rota"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    rng = random.Random(seed)
+    targets = []
+    for entry in mix:
+        path = expand_template(entry['route'], params)
+        if entry.get('query'):
+            path += '?' + entry['query']
+        body = entry.get('body')
+        targets.append((entry['route'], entry['method'], path,
+                        json.dumps(body).encode('utf-8') if body is not None else None))
+    weights = [entry['weight'] for entry in mix]
+    stats = {entry['route']: RouteStats() for entry in mix}
+
+    pool = ConnectionPool(base_url, pool_size or concurrency, timeout)
+    started = time.monotonic()
+    deadline = started + duration
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while True:
+            if max_requests is not None and issued >= max_requests:
+                return
+            if rate:
+                # Agenda global: a n-ésima requisição sai em started + n/rate
+                send_at = started + issued / rate
+                issued += 1
+                if send_at >= deadline:
+                    return
+                delay = send_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                issued += 1
+                if time.monotonic() >= deadline:
+                    return
+            route, method, path, body = rng.choices(targets, weights)[0]
+            headers = {'Content-Type': 'application/json'} if body is not None else None
+            route_stats = stats[route]
+            begin = time.perf_counter()
+            try:
+                status, size = await pool.request(method, path, body, headers)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError,
+                    ValueError) as e:
+                route_stats.errors[type(e).__name__] += 1
+                continue
+            route_stats.latencies.append(time.perf_counter() - begin)
+            route_stats.statuses[status] += 1
+            route_stats.bytes += size
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        pool.close()
+    elapsed = time.monotonic() - started
+
+    routes = {route: route_stats.summary(elapsed) for route, route_stats in stats.items()}
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.latencies.extend(route_stats.latencies)
+        total.statuses.update(route_stats.statuses)
+        total.errors.update(route_stats.errors)
+        total.bytes += route_stats.bytes
+    return {
+        'target': base_url,
+        'elapsed_s': round(elapsed, 3),
+        'concurrency': concurrency,
+        'rate': rate,
+        'timeout': timeout,
+        'connections_opened': pool.opened,
+        'total': total.summary(elapsed),
+        'routes': routes,
+    }
+
+
+def format_report(report):
+    lines = [f"\n📊 Carga em {report['target']} — {report['elapsed_s']}s, "
+             f"concorrência {report['concurrency']}, conexões abertas {report['connections_opened']}",
+             f"{'Rota':<50} {'req':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}"]
+    rows = list(report['routes'].items()) + [('TOTAL', report['total'])]
+    for route, summary in rows:
+        lines.append(f"{route:<50} {summary['requests']:>7} {summary['throughput_rps']:>9} "
+                     f"{summary['p50_ms']:>9} {summary['p95_ms']:>9} {summary['p99_ms']:>9} "
+                     f"{sum(summary['errors'].values()):>6}")
+    return '\n'.join(lines)
+
+
+def parse_params(values):
+    params = {}
+    for value in values or []:
+        name, sep, param = value.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f'Parâmetro inválido: {value} (use nome=valor)')
+        params[name] = param
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Teste de carga das rotas da API do CRM')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', help='URL base da aplicação, ex.: http://localhost:3000')
+    target.add_argument('--stub', action='store_true', help='sobe o servidor local de apoio e testa contra ele')
+    parser.add_argument('-c', '--concurrency', type=int, default=10)
+    parser.add_argument('-r', '--rate', type=float, default=None, help='requisições por segundo (padrão: sem limite)')
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help='duração em segundos')
+    parser.add_argument('-n', '--max-requests', type=int, default=None)
+    parser.add_argument('--pool-size', type=int, default=None, help='conexões persistentes (padrão: concorrência)')
+    parser.add_argument('-t', '--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='tempo limite de cada requisição em segundos (padrão: %(default)s; 0 desativa)')
+    parser.add_argument('--mix', help='arquivo JSON com o mix ponderado de rotas')
+    parser.add_argument('--param', action='append', help='valor de segmento dinâmico, ex.: id=123')
+    parser.add_argument('--stub-latency-ms', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', dest='json_out', help='grava o relatório em JSON neste arquivo')
+    args = parser.parse_args(argv)
+
+    mix = load_mix(args.mix) if args.mix else default_mix()
+    stub = None
+    base_url = args.target
+    if args.stub:
+        from stub_server import StubServer
+        stub = StubServer(latency_ms=args.stub_latency_ms).start()
+        base_url = stub.base_url
+    try:
+        report = asyncio.run(run_load(
+            base_url, mix, concurrency=args.concurrency, rate=args.rate,
+            duration=args.duration, pool_size=args.pool_size,
+            params=parse_params(args.param), seed=args.seed,
+            max_requests=args.max_requests, timeout=args.timeout or None))
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Relatório salvo em: {args.json_out}")
+    return 0 if sum(report['total']['errors'].values()) == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+
+"""
+Banco local compatível com o MySQL do sistema CRM, para rodar o SQL do projeto
+sem a instância do Azure. Usa o mysqld local quando há um disponível (via PyMySQL)
+e, na falta dele, SQLite com uma camada de tradução do dialeto.
+O schema vem de transicao-mysql-new.sql + sql_fixes.sql (via sql_catalog) e os
+dados sintéticos são gerados de forma determinística a partir de uma semente.
+"""
+
+import os
+import random
+import re
+import socket
+import sqlite3
+import time
+import zlib
+from datetime import date, datetime, timedelta
+
+from sql_catalog import MYSQL_SCHEMA_FILES, Catalog
+
+DEFAULT_MYSQL_URL = 'mysql://root@127.0.0.1:3306/crm_bench'
+BATCH_SIZE = 5000
+
+# Linhas por tabela em função da escala (número de oportunidades)
+TABLE_ROWS = {
+    'users': lambda scale, docs: max(20, scale // 500),
+    'responsaveis': lambda scale, docs: max(10, scale // 1000),
+    'segmentos_clientes': lambda scale, docs: 12,
+    'clientes': lambda scale, docs: max(50, scale // 20),
+    'contatos': lambda scale, docs: max(100, scale // 10),
+    'orgaos': lambda scale, docs: max(20, scale // 200),
+    'licitacoes': lambda scale, docs: max(50, scale // 4),
+    'oportunidades': lambda scale, docs: scale,
+    'reunioes': lambda scale, docs: scale // 2,
+    'notas': lambda scale, docs: scale // 2,
+    'documentos': lambda scale, docs: docs,
+    'tags': lambda scale, docs: 30,
+}
+# Tabelas de junção: uma a três linhas para cada linha da primeira tabela
+JUNCTION_TABLES = ('documentos_tags',)
+
+STATUS_VALUES = {
+    'oportunidades': ('novo_lead', 'agendamento_reuniao', 'levantamento_oportunidades',
+                      'proposta_enviada', 'negociacao', 'fechado_ganho', 'fechado_perdido'),
+    'licitacoes': ('analise_interna', 'analise_edital', 'aguardando_pregao', 'em_andamento',
+                   'envio_documentos', 'assinaturas', 'vencida', 'nao_vencida', 'concluida',
+                   'arquivada', 'fechado_ganho', 'fechado_perdido'),
+    'licitacao_etapas': ('pendente', 'concluida', 'atrasada'),
+    'documentos': ('ativo', 'ativo', 'ativo', 'inativo'),
+}
+COLUMN_VALUES = {
+    'role': ('admin', 'user', 'user', 'user'),
+    'modalidade': ('Pregão Eletrônico', 'Pregão Presencial', 'Concorrência', 'Tomada de Preços',
+                   'Dispensa'),
+    'tipo': ('produto', 'servico'),
+    'tipo_faturamento': ('direto', 'distribuidor'),
+    'categoria': ('edital', 'proposta', 'contrato', 'certidao', 'outro'),
+    'formato': ('pdf', 'pdf', 'pdf', 'docx', 'xlsx', 'png'),
+    'estado': ('SP', 'RJ', 'MG', 'PR', 'RS', 'SC', 'BA', 'DF'),
+    'segmento': ('Saúde', 'Educação', 'Indústria', 'Varejo', 'Governo', 'Tecnologia'),
+    'papel': ('principal', 'suporte', 'financeiro'),
+    'tipo_participante': ('interno', 'externo'),
+}
+_WORDS = ('sistema', 'contrato', 'licença', 'serviço', 'aquisição', 'manutenção', 'software',
+          'equipamento', 'consultoria', 'suporte', 'rede', 'servidor', 'projeto', 'proposta',
+          'implantação', 'treinamento', 'hospital', 'prefeitura', 'secretaria', 'escola')
+_EPOCH = datetime(2023, 1, 1)
+_SPAN_SECONDS = 3 * 365 * 86400
+
+
+def synthetic_id(table, index):
+    """UUID determinístico da linha index de uma tabela (sem guardar as chaves)"""
+    return f'{zlib.crc32(table.encode()):08x}-0000-4000-8000-{index:012x}'
+
+
+def load_catalog(root='.'):
+    """Catálogo apenas com os scripts MySQL que descrevem o banco de produção"""
+    return Catalog.from_files([os.path.join(root, name) for name in MYSQL_SCHEMA_FILES], root)
+
+
+_INTERVAL = re.compile(
+    r'\bDATE_(ADD|SUB)\s*\(\s*((?:[^(),]|\([^()]*\))+?)\s*,\s*INTERVAL\s+(-?\d+)\s+(DAY|MONTH|YEAR|HOUR|MINUTE|SECOND)S?\s*\)',
+    re.I)
+_EXTRACT_DAYS = re.compile(
+    r'\bEXTRACT\s*\(\s*DAY\s+FROM\s+\(\s*([\w.]+)\s*-\s*([\w.]+)\s*\)\s*\)', re.I)
+_SEPARATOR = re.compile(r"\s+SEPARATOR\s+('(?:[^']|'')*')", re.I)
+_LIMIT_OFFSET = re.compile(r'\bLIMIT\s+(\d+|\?|:\w+)\s*,\s*(\d+|\?|:\w+)', re.I)
+
+
+def postgres_to_mysql(sql):
+    """Ajusta construções do Postgres que aparecem nas consultas do módulo comercial"""
+    return _EXTRACT_DAYS.sub(r'DATEDIFF(\1, \2)', sql)
+
+
+def mysql_to_sqlite(sql):
+    """Reescreve a sintaxe MySQL que o SQLite não entende; funções ficam em _register_functions"""
+    sql = postgres_to_mysql(sql)
+
+    def interval(match):
+        sign = '+' if match.group(1).upper() == 'ADD' else '-'
+        amount = int(match.group(3))
+        if amount < 0:
+            sign, amount = ('-' if sign == '+' else '+'), -amount
+        return f"DATETIME({match.group(2)}, '{sign}{amount} {match.group(4).lower()}')"
+
+    sql = _INTERVAL.sub(interval, sql)
+    sql = _SEPARATOR.sub(r', \1', sql)
+    sql = _LIMIT_OFFSET.sub(r'LIMIT \2 OFFSET \1', sql)
+    sql = re.sub(r'\bCAST\s*\((.*?)\s+AS\s+(?:UNSIGNED|SIGNED)(?:\s+INTEGER)?\s*\)', r'CAST(\1 AS INTEGER)',
+                 sql, flags=re.I | re.S)
+    sql = re.sub(r'\bAS\s+CHAR(?:\s*\(\d+\))?\s*\)', 'AS TEXT)', sql, flags=re.I)
+    sql = re.sub(r'(?<![\w.])IF\s*\(', 'IIF(', sql, flags=re.I)
+    return sql
+
+
+def _date_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value
+    text = str(value)
+    for pattern in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text[:19] if 'H' in pattern else text[:10], pattern)
+        except ValueError:
+            continue
+    return None
+
+
+def _date_format(value, pattern):
+    moment = _date_value(value)
+    if moment is None or pattern is None:
+        return None
+    pattern = (pattern.replace('%i', '%M').replace('%s', '%S').replace('%e', str(moment.day))
+               .replace('%c', str(moment.month)))
+    return moment.strftime(pattern)
+
+
+def _datediff(first, second):
+    first, second = _date_value(first), _date_value(second)
+    if first is None or second is None:
+        return None
+    return (first.date() if isinstance(first, datetime) else first).toordinal() - \
+        (second.date() if isinstance(second, datetime) else second).toordinal()
+
+
+def _register_functions(connection):
+    """Funções MySQL usadas nas views e rotas, implementadas em Python"""
+    connection.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    connection.create_function('CURDATE', 0, lambda: date.today().isoformat())
+    connection.create_function('CONCAT', -1, lambda *parts: None if any(p is None for p in parts)
+                               else ''.join(str(p) for p in parts))
+    connection.create_function('DATEDIFF', 2, _datediff, deterministic=True)
+    connection.create_function('DATE_FORMAT', 2, _date_format, deterministic=True)
+    for name, attribute in (('YEAR', 'year'), ('MONTH', 'month'), ('DAY', 'day')):
+        connection.create_function(
+            name, 1, lambda value, attribute=attribute: getattr(_date_value(value), attribute, None),
+            deterministic=True)
+    connection.create_function('UUID', 0, lambda: synthetic_id('uuid', random.getrandbits(48)))
+
+
+def _sqlite_type(column_type):
+    base = column_type.split('(')[0].split()[0].upper()
+    if base in ('INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'MEDIUMINT', 'TINYINT', 'BOOLEAN', 'BOOL', 'BIT'):
+        return 'INTEGER'
+    if base in ('DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE', 'REAL'):
+        return 'REAL'
+    if base in ('BLOB', 'LONGBLOB', 'MEDIUMBLOB', 'BINARY', 'VARBINARY'):
+        return 'BLOB'
+    return 'TEXT'
+
+
+def _mysql_definition(column):
+    """Definição original da coluna sem a cláusula REFERENCES (FKs ficam de fora na carga)
+    nem a posição do ALTER TABLE ... ADD (AFTER coluna / FIRST)"""
+    definition = re.sub(r'\bREFERENCES\b.*$', '', column.definition, flags=re.I | re.S).strip().rstrip(',')
+    return re.sub(r'\s+(?:AFTER\s+\S+|FIRST)\s*$', '', definition, flags=re.I)
+
+
+class LocalDatabase:
+    """Conexão com o banco local e as operações usadas pelos benchmarks"""
+
+    def __init__(self, engine, connection, location):
+        self.engine = engine
+        self.connection = connection
+        self.location = location
+
+    @classmethod
+    def sqlite(cls, path=':memory:'):
+        connection = sqlite3.connect(path, check_same_thread=False)
+        _register_functions(connection)
+        connection.execute('PRAGMA journal_mode=WAL' if path != ':memory:' else 'PRAGMA journal_mode=MEMORY')
+        connection.execute('PRAGMA synchronous=OFF')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        connection.execute('PRAGMA cache_size=-262144')
+        return cls('sqlite', connection, path)
+
+    @classmethod
+    def mysql(cls, url=DEFAULT_MYSQL_URL, create=True):
+        import pymysql  # opcional: só é necessário com um mysqld local
+        from urllib.parse import unquote as url_unquote, urlsplit
+        parts = urlsplit(url)
+        database = parts.path.lstrip('/') or 'crm_bench'
+        connection = pymysql.connect(host=parts.hostname or '127.0.0.1', port=parts.port or 3306,
+                                     user=url_unquote(parts.username or 'root'),
+                                     password=url_unquote(parts.password or ''), autocommit=False)
+        with connection.cursor() as cursor:
+            if create:
+                cursor.execute(f'CREATE DATABASE IF NOT EXISTS `{database}`')
+            cursor.execute(f'USE `{database}`')
+        return cls('mysql', connection, url)
+
+    @property
+    def version(self):
+        if self.engine == 'sqlite':
+            return f'sqlite {sqlite3.sqlite_version}'
+        return f'mysql {self.scalar("SELECT VERSION()")}'
+
+    def translate(self, sql):
+        """SQL no dialeto do motor; parâmetros nomeados (:nome) viram o estilo do driver"""
+        if self.engine == 'sqlite':
+            return mysql_to_sqlite(sql)
+        sql = postgres_to_mysql(sql).replace('%', '%%')
+        return re.sub(r'(?<![:\w]):(\w+)', r'%(\1)s', sql).replace('?', '%s')
+
+    def execute(self, sql, params=(), translate=True):
+        cursor = self.connection.cursor()
+        cursor.execute(self.translate(sql) if translate else sql, params)
+        return cursor
+
+    def executemany(self, sql, rows):
+        cursor = self.connection.cursor()
+        cursor.executemany(self.translate(sql), rows)
+        return cursor
+
+    def scalar(self, sql, params=()):
+        row = self.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def create_tables(self, catalog):
+        for table in catalog.tables.values():
+            self.execute(f'DROP TABLE IF EXISTS {table.name}', translate=False)
+            self.execute(self.table_ddl(table), translate=False)
+        self.commit()
+
+    def table_ddl(self, table, foreign_keys=()):
+        """CREATE TABLE no dialeto do motor a partir do catálogo (FKs só quando pedidas)"""
+        columns = []
+        for column in table.columns.values():
+            if self.engine == 'sqlite':
+                not_null = ' NOT NULL' if not column.nullable else ''
+                columns.append(f'"{column.name}" {_sqlite_type(column.type)}{not_null}')
+            else:
+                definition = re.sub(r'\bPRIMARY\s+KEY\b|\bUNIQUE(?:\s+KEY)?\b', '', _mysql_definition(column),
+                                    flags=re.I)
+                columns.append(f'`{column.name}` {definition}')
+        primary = next((index for index in table.indexes if index.primary), None)
+        if primary is not None:
+            columns.append('PRIMARY KEY (' + ', '.join(primary.columns) + ')')
+        for key in foreign_keys:
+            columns.append(f'FOREIGN KEY ({", ".join(key.columns)}) '
+                           f'REFERENCES {key.ref_table} ({", ".join(key.ref_columns)})')
+        return f'CREATE TABLE {table.name} (' + ', '.join(columns) + ')'
+
+    def index_ddl(self, table, index):
+        unique = 'UNIQUE ' if index.unique else ''
+        # No SQLite o nome do índice é global; no MySQL é por tabela
+        name = f'{table.name}__{index.name}' if self.engine == 'sqlite' else index.name
+        return f'CREATE {unique}INDEX {name} ON {table.name} ({", ".join(index.columns)})'
+
+    def create_indexes(self, catalog):
+        """Índices secundários, criados depois da carga para acelerar a geração"""
+        for table in catalog.tables.values():
+            for index in table.indexes:
+                if index.primary or not all(column in table.columns for column in index.columns):
+                    continue
+                self.execute(self.index_ddl(table, index), translate=False)
+        if self.engine == 'sqlite':
+            self.execute('ANALYZE', translate=False)
+        self.commit()
+
+    def create_views(self, catalog):
+        """Cria as views que o motor aceita; devolve {view: erro} das demais"""
+        failures = {}
+        for view in catalog.views.values():
+            try:
+                self.execute(f'DROP VIEW IF EXISTS {view.name}', translate=False)
+                self.execute(f'CREATE VIEW {view.name} AS {view.sql}')
+                # O SQLite só valida as colunas da view quando ela é usada
+                self.execute(f'SELECT * FROM {view.name} LIMIT 0', translate=False).fetchall()
+            except Exception as error:
+                failures[view.name] = str(error)
+                try:
+                    self.execute(f'DROP VIEW IF EXISTS {view.name}', translate=False)
+                except Exception:
+                    pass
+        self.commit()
+        return failures
+
+    def metadata(self):
+        try:
+            return dict(self.execute('SELECT chave, valor FROM bench_meta', translate=False).fetchall())
+        except Exception:
+            self.connection.rollback()
+            return {}
+
+    def set_metadata(self, values):
+        self.execute('CREATE TABLE IF NOT EXISTS bench_meta (chave VARCHAR(64) PRIMARY KEY, valor TEXT)',
+                     translate=False)
+        self.execute('DELETE FROM bench_meta', translate=False)
+        self.executemany('INSERT INTO bench_meta (chave, valor) VALUES (?, ?)',
+                         [(key, str(value)) for key, value in values.items()])
+        self.commit()
+
+    def insert_rows(self, table, columns, rows, batch_size=BATCH_SIZE):
+        """Insere um iterável de tuplas em lotes; devolve o total inserido"""
+        sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+        sql = self.translate(sql)
+        cursor = self.connection.cursor()
+        batch = []
+        total = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            total += len(batch)
+        self.commit()
+        return total
+
+
+def mysqld_available(url=DEFAULT_MYSQL_URL, timeout=0.2):
+    """Há um mysqld ouvindo e o PyMySQL está instalado?"""
+    try:
+        import pymysql  # noqa: F401
+    except ImportError:
+        return False
+    from urllib.parse import urlsplit
+    parts = urlsplit(url)
+    try:
+        with socket.create_connection((parts.hostname or '127.0.0.1', parts.port or 3306), timeout):
+            return True
+    except OSError:
+        return False
+
+
+def open_database(engine='auto', path=':memory:', mysql_url=DEFAULT_MYSQL_URL):
+    """Abre o banco local: mysqld se disponível (ou pedido), senão SQLite"""
+    if engine == 'mysql' or (engine == 'auto' and mysqld_available(mysql_url)):
+        return LocalDatabase.mysql(mysql_url)
+    return LocalDatabase.sqlite(path)
+
+
+def row_counts(scale, documents=None):
+    documents = scale if documents is None else documents
+    return {table: rule(scale, documents) for table, rule in TABLE_ROWS.items()}
+
+
+class SyntheticRows:
+    """Gera as linhas de cada tabela a partir do catálogo, sem manter chaves em memória"""
+
+    def __init__(self, catalog, counts, seed=42):
+        self.catalog = catalog
+        self.counts = counts
+        self.seed = seed
+
+    def _foreign_keys(self, table):
+        references = {}
+        for foreign_key in table.foreign_keys:
+            if len(foreign_key.columns) == 1:
+                references[foreign_key.columns[0]] = foreign_key.ref_table
+        return references
+
+    def _unique_columns(self, table):
+        return {index.columns[0] for index in table.indexes
+                if index.unique and not index.primary and len(index.columns) == 1}
+
+    def _value(self, rng, table, column, index, reference, unique):
+        name = column.name
+        base = column.type.split('(')[0].split()[0].upper()
+        if reference is not None:
+            count = self.counts.get(reference, 0)
+            if not count:
+                return None
+            if unique:
+                return synthetic_id(reference, index % count) if index < count else None
+            if column.nullable and rng.random() < 0.05:
+                return None
+            return synthetic_id(reference, rng.randrange(count))
+        if name == 'id' and base in ('CHAR', 'VARCHAR'):
+            return synthetic_id(table.name, index)
+        if name == 'status' and table.name in STATUS_VALUES:
+            return rng.choice(STATUS_VALUES[table.name])
+        if name in COLUMN_VALUES and base in ('VARCHAR', 'CHAR', 'TEXT', 'ENUM'):
+            return rng.choice(COLUMN_VALUES[name])
+        enum = re.match(r"ENUM\s*\((.*)\)", column.definition, re.I)
+        if enum:
+            return rng.choice(re.findall(r"'((?:[^']|'')*)'", enum.group(1)))
+        if 'email' in name:
+            return f'{table.name}{index}@exemplo.com.br' if unique else f'contato{rng.randrange(100000)}@exemplo.com.br'
+        if name == 'cnpj':
+            return f'{index:08d}0001{rng.randrange(100):02d}'
+        if 'telefone' in name or name == 'phone':
+            return f'(11) 9{rng.randrange(10000):04d}-{rng.randrange(10000):04d}'
+        if name.startswith('url') or name.endswith('_url'):
+            return f'https://res.cloudinary.com/crm/raw/upload/v1/{table.name}/{index}.pdf'
+        if name in ('arquivo_path', 'edital'):
+            return f'/uploads/{table.name}/{index}.pdf'
+        if name in ('ativo', 'is_active', 'principal', 'confirmado'):
+            return 1 if rng.random() < 0.9 else 0
+        if name == 'probabilidade':
+            return rng.randrange(0, 101, 5)
+        if name == 'tamanho':
+            return rng.randrange(10_000, 20_000_000)
+        if base in ('TIMESTAMP', 'DATETIME'):
+            moment = _EPOCH + timedelta(seconds=rng.randrange(_SPAN_SECONDS))
+            return moment.strftime('%Y-%m-%d %H:%M:%S')
+        if base == 'DATE':
+            return (_EPOCH + timedelta(days=rng.randrange(_SPAN_SECONDS // 86400))).isoformat()[:10]
+        if base == 'TIME':
+            return f'{rng.randrange(8, 19):02d}:{rng.choice((0, 15, 30, 45)):02d}:00'
+        if base in ('TINYINT', 'BOOLEAN', 'BOOL', 'BIT'):
+            return rng.randrange(2)
+        if base in ('INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'MEDIUMINT'):
+            return rng.randrange(1000)
+        if base in ('DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE'):
+            precision = re.match(r'\w+\s*\(\s*(\d+)', column.type)
+            limit = 10 ** min(int(precision.group(1)) - 2, 7) if precision else 10 ** 7
+            return round(rng.random() * limit, 2)
+        if base == 'JSON':
+            return '{}'
+        if base == 'CHAR':
+            return synthetic_id('valor', rng.getrandbits(40))
+        length = re.match(r'\w+\s*\(\s*(\d+)', column.type)
+        limit = int(length.group(1)) if length else 200
+        words = ' '.join(rng.choice(_WORDS) for _ in range(rng.randrange(2, 8 if base == 'TEXT' else 5)))
+        text = f'{words} {index}' if unique or name in ('nome', 'titulo', 'name') else words
+        return text[:limit]
+
+    def rows(self, table_name):
+        """(colunas, iterável de tuplas) de uma tabela"""
+        table = self.catalog.tables[table_name]
+        columns = list(table.columns.values())
+        references = self._foreign_keys(table)
+        unique = self._unique_columns(table)
+        rng = random.Random(f'{self.seed}:{table_name}')
+        if table_name in JUNCTION_TABLES:
+            return [column.name for column in columns], self._junction_rows(table, columns, references, rng)
+
+        def generate():
+            for index in range(self.counts.get(table_name, 0)):
+                yield tuple(self._value(rng, table, column, index, references.get(column.name),
+                                        column.name in unique) for column in columns)
+
+        return [column.name for column in columns], generate()
+
+    def _junction_rows(self, table, columns, references, rng):
+        first, second = columns[0].name, columns[1].name
+        parents = self.counts.get(references.get(first), 0)
+        choices = self.counts.get(references.get(second), 0)
+        for parent in range(parents):
+            for child in rng.sample(range(choices), min(choices, rng.randrange(1, 4))):
+                values = {first: synthetic_id(references[first], parent),
+                          second: synthetic_id(references[second], child)}
+                yield tuple(values.get(column.name) for column in columns)
+
+
+def populate(database, catalog, scale, documents=None, seed=42, progress=None):
+    """Recria o schema e carrega os dados sintéticos; devolve {tabela: (linhas, segundos)}"""
+    counts = row_counts(scale, documents)
+    generator = SyntheticRows(catalog, counts, seed)
+    database.create_tables(catalog)
+    loaded = {}
+    for table_name in list(TABLE_ROWS) + list(JUNCTION_TABLES):
+        if table_name not in catalog.tables:
+            continue
+        started = time.perf_counter()
+        columns, rows = generator.rows(table_name)
+        total = database.insert_rows(table_name, columns, rows)
+        loaded[table_name] = (total, time.perf_counter() - started)
+        if progress:
+            progress(table_name, total, loaded[table_name][1])
+    database.create_indexes(catalog)
+    return loaded
+
+
+def prepare(database, catalog, scale, documents=None, seed=42, progress=None):
+    """Carrega os dados só quando o banco não tem a mesma escala e semente; devolve o que foi carregado"""
+    wanted = {'scale': scale, 'documents': scale if documents is None else documents, 'seed': seed,
+              'schema': zlib.crc32(repr(sorted((name, list(table.columns))
+                                               for name, table in catalog.tables.items())).encode())}
+    current = database.metadata()
+    if current and all(current.get(key) == str(value) for key, value in wanted.items()):
+        failures = database.create_views(catalog)
+        return {}, failures
+    loaded = populate(database, catalog, scale, documents, seed, progress)
+    failures = database.create_views(catalog)
+    database.set_metadata(wanted)
+    return loaded, failures
+
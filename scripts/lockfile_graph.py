@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+
+"""
+Grafo de dependências resolvido a partir dos lockfiles (package-lock.json e pnpm-lock.yaml)
+Os dois arquivos são lidos em streaming: o package-lock por um tokenizador
+JSON incremental (um pacote por vez) e o pnpm-lock linha a linha, guardando só
+nome, versão e arestas de cada pacote. Com o grafo de cada lockfile o relatório
+mostra:
+  - versões duplicadas do mesmo pacote e quem puxa cada uma
+  - as subárvores transitivas mais pesadas por dependência direta (e quanto
+    sairia junto se a dependência fosse removida)
+  - divergências entre os dois lockfiles e entre eles e o package.json
+  - o fechamento das dependências do servidor (mysql2, cloudinary,
+    jsonwebtoken, jose), comparado com o orçamento de
+    scripts/dependency_budgets.json; cresce -> falha, com o caminho de cada
+    pacote novo
+Execute com: python3 scripts/lockfile_graph.py [--json] [--update-budgets]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+
+NPM_LOCKFILE = 'package-lock.json'
+PNPM_LOCKFILE = 'pnpm-lock.yaml'
+# O Dockerfile instala com pnpm quando há pnpm-lock.yaml
+INSTALL_LOCKFILE = PNPM_LOCKFILE
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dependency_budgets.json')
+DEFAULT_SERVER_ROOTS = ('mysql2', 'cloudinary', 'jsonwebtoken', 'jose')
+CHUNK_SIZE = 64 * 1024
+
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+_LITERAL = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+_LITERAL_END = re.compile(r'[,\]}\s]')
+_SEPARATORS = ' \t\r\n,:'
+
+
+class LockfileError(Exception):
+    """Lockfile ausente, malformado ou em formato não suportado"""
+
+
+def json_events(stream, chunk_size=CHUNK_SIZE):
+    """Eventos (tipo, valor) de um documento JSON lido em blocos, como o ijson"""
+    buffer = ''
+    position = 0
+    eof = False
+    stack = []  # [tipo do contêiner, próxima string é chave?]
+
+    def value_done():
+        if stack and stack[-1][0] == 'map':
+            stack[-1][1] = True
+
+    while True:
+        while True:
+            while position < len(buffer) and buffer[position] in _SEPARATORS:
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+        if position >= len(buffer):
+            return
+        char = buffer[position]
+        if char == '{':
+            stack.append(['map', True])
+            position += 1
+            yield 'start_map', None
+        elif char == '[':
+            stack.append(['array', False])
+            position += 1
+            yield 'start_array', None
+        elif char in '}]':
+            stack.pop()
+            position += 1
+            yield ('end_map' if char == '}' else 'end_array'), None
+            value_done()
+        else:
+            if char == '"':
+                match = _STRING_BODY.match(buffer, position + 1)
+                complete = match is not None
+            else:
+                match = _LITERAL.match(buffer, position)
+                complete = _LITERAL_END.search(buffer, position) is not None
+            if not complete and not eof:
+                # Token cortado no fim do bloco: lê mais e tenta de novo
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            if match is None:
+                raise LockfileError(f'JSON inválido perto de {buffer[position:position + 40]!r}')
+            position = match.end()
+            if char == '"':
+                raw = match.group()[:-1]
+                text = json.loads(f'"{raw}"') if '\\' in raw else raw
+                if stack and stack[-1][0] == 'map' and stack[-1][1]:
+                    stack[-1][1] = False
+                    yield 'map_key', text
+                    continue
+                yield 'string', text
+            else:
+                literal = match.group()
+                value = {'true': True, 'false': False, 'null': None}.get(literal, literal)
+                yield 'literal', value if value is not literal else float(literal) if '.' in literal else int(literal)
+            value_done()
+
+
+def _build(events, first):
+    """Monta o valor que começa no evento first (usado só para objetos pequenos)"""
+    kind, value = first
+    if kind == 'start_map':
+        result = {}
+        for kind, key in events:
+            if kind == 'end_map':
+                return result
+            result[key] = _build(events, next(events))
+    if kind == 'start_array':
+        result = []
+        for event in events:
+            if event[0] == 'end_array':
+                return result
+            result.append(_build(events, event))
+    return value
+
+
+def _skip(events, first):
+    if first[0] not in ('start_map', 'start_array'):
+        return
+    depth = 1
+    for kind, _ in events:
+        if kind in ('start_map', 'start_array'):
+            depth += 1
+        elif kind in ('end_map', 'end_array'):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def _unquote(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1].replace("''", "'")
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return json.loads(text)
+    return text
+
+
+def _split_key(content):
+    """(chave, resto) de uma linha 'chave: valor' do YAML, com chave entre aspas ou não"""
+    if content[0] in '\'"':
+        quote = content[0]
+        end = 1
+        while True:
+            end = content.index(quote, end)
+            if quote == "'" and content.startswith("''", end):
+                end += 2
+                continue
+            break
+        return _unquote(content[:end + 1]), content[end + 1:].lstrip(':').strip()
+    key, _, rest = content.partition(': ')
+    if not rest and key.endswith(':'):
+        key = key[:-1]
+    return key, rest.strip()
+
+
+def yaml_items(stream):
+    """(caminho de chaves, valor) de cada escalar de um YAML em blocos, como o do pnpm-lock"""
+    stack = []
+    for line in stream:
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip(' '))
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        keys = tuple(key for _, key in stack)
+        if stripped.startswith('- '):
+            yield keys + ('-',), _unquote(stripped[2:])
+            continue
+        key, rest = _split_key(stripped)
+        if rest:
+            yield keys + (key,), _unquote(rest)
+        else:
+            stack.append((indent, key))
+
+
+class Node:
+    __slots__ = ('name', 'version', 'deps', 'dev', 'optional', 'path')
+
+    def __init__(self, name, version, path=None):
+        self.name = name
+        self.version = version
+        self.deps = []
+        self.dev = False
+        self.optional = False
+        self.path = path
+
+
+class Graph:
+    """Pacotes instalados (nós) e arestas de dependência resolvidas de um lockfile"""
+
+    def __init__(self, source):
+        self.source = source
+        self.nodes = {}
+        self.roots = {}  # nome -> {'id', 'kind', 'specifier'}
+        self.unresolved = []
+
+    def key(self, node_id):
+        node = self.nodes[node_id]
+        return f'{node.name}@{node.version}'
+
+    def closure(self, ids):
+        seen = set()
+        pending = [node_id for node_id in ids if node_id in self.nodes]
+        while pending:
+            node_id = pending.pop()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            pending.extend(self.nodes[node_id].deps)
+        return seen
+
+    def shortest_paths(self, ids):
+        """Caminho mais curto (por nomes) de uma das raízes até cada nó alcançável"""
+        paths = {}
+        queue = deque()
+        for node_id in ids:
+            if node_id in self.nodes and node_id not in paths:
+                paths[node_id] = [self.nodes[node_id].name]
+                queue.append(node_id)
+        while queue:
+            node_id = queue.popleft()
+            for child in self.nodes[node_id].deps:
+                if child not in paths:
+                    paths[child] = paths[node_id] + [self.nodes[child].name]
+                    queue.append(child)
+        return paths
+
+    def root_ids(self, kinds=None):
+        return [root['id'] for root in self.roots.values()
+                if root['id'] and (kinds is None or root['kind'] in kinds)]
+
+
+def _npm_parent(path):
+    index = path.rfind('/node_modules/')
+    return path[:index] if index >= 0 else ''
+
+
+def read_npm_lock(path):
+    """Grafo do package-lock.json (lockfileVersion 2 ou 3), lido pacote a pacote"""
+    entries = {}
+    version = None
+    with open(path, 'r', encoding='utf-8') as f:
+        events = json_events(f)
+        if next(events, (None,))[0] != 'start_map':
+            raise LockfileError(f'{path}: não é um objeto JSON')
+        for kind, key in events:
+            if kind == 'end_map':
+                break
+            first = next(events)
+            if key == 'lockfileVersion':
+                version = first[1]
+            elif key == 'packages' and first[0] == 'start_map':
+                for kind, package_path in events:
+                    if kind == 'end_map':
+                        break
+                    entry = _build(events, next(events))
+                    # Só o que o grafo usa; o resto do objeto é descartado aqui
+                    entries[package_path] = {
+                        'name': entry.get('name'), 'version': entry.get('version'),
+                        'dev': bool(entry.get('dev')), 'optional': bool(entry.get('optional')),
+                        'link': entry.get('resolved') if entry.get('link') else None,
+                        'dependencies': entry.get('dependencies', {}),
+                        'optionalDependencies': entry.get('optionalDependencies', {}),
+                        'peerDependencies': entry.get('peerDependencies', {}),
+                        'peerOptional': set(entry.get('peerDependenciesMeta', {})),
+                        'devDependencies': entry.get('devDependencies', {}) if package_path == '' else {},
+                    }
+            else:
+                _skip(events, first)
+    if version is None or int(version) < 2 or '' not in entries:
+        raise LockfileError(f'{path}: lockfileVersion {version} não suportado (use npm 7+)')
+
+    graph = Graph(os.path.basename(path))
+    for package_path, entry in entries.items():
+        if package_path.startswith('node_modules/') or '/node_modules/' in package_path:
+            name = entry['name'] or package_path.rsplit('node_modules/', 1)[-1]
+            node = Node(name, entry['version'], package_path)
+            node.dev, node.optional = entry['dev'], entry['optional']
+            graph.nodes[package_path] = node
+
+    def resolve(origin, name):
+        current = origin
+        while True:
+            candidate = f'{current}/node_modules/{name}' if current else f'node_modules/{name}'
+            if candidate in entries:
+                link = entries[candidate]['link']
+                return link if link in graph.nodes else candidate
+            if not current or not current.startswith('node_modules/'):
+                return None if not current else resolve('', name)
+            current = _npm_parent(current)
+
+    for package_path, node in graph.nodes.items():
+        entry = entries[package_path]
+        for field in ('dependencies', 'optionalDependencies', 'peerDependencies'):
+            for name in entry[field]:
+                target = resolve(package_path, name)
+                if target in graph.nodes:
+                    node.deps.append(target)
+                elif field == 'dependencies':
+                    graph.unresolved.append((package_path, name))
+    root = entries['']
+    for kind, field in (('prod', 'dependencies'), ('optional', 'optionalDependencies'), ('dev', 'devDependencies')):
+        for name, specifier in root[field].items():
+            target = resolve('', name)
+            graph.roots[name] = {'id': target if target in graph.nodes else None, 'kind': kind,
+                                 'specifier': specifier}
+    return graph
+
+
+def _pnpm_split(node_id):
+    at = node_id.index('@', 1) if node_id.startswith('@') else node_id.index('@')
+    return node_id[:at], node_id[at + 1:].split('(')[0]
+
+
+def _pnpm_target(name, value):
+    """Id do snapshot apontado por 'nome: versão(peers)'; aliases trazem o nome na versão"""
+    if value.startswith(('link:', 'file:', 'workspace:')):
+        return None
+    if not value[:1].isdigit() and '@' in value[1:]:
+        return value.lstrip('/')
+    return f'{name}@{value}'
+
+
+def read_pnpm_lock(path):
+    """Grafo do pnpm-lock.yaml (v6 ou v9), lido linha a linha"""
+    graph = Graph(os.path.basename(path))
+    importers = {}
+    version = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for keys, value in yaml_items(f):
+            section = keys[0]
+            if section == 'lockfileVersion':
+                version = value
+            elif section == 'importers' and len(keys) == 5 and keys[4] in ('specifier', 'version'):
+                importers.setdefault((keys[1], keys[2], keys[3]), {})[keys[4]] = value
+            elif len(keys) >= 2 and (section == 'snapshots' or section == 'packages' and float(version) < 9):
+                # No v9 'packages' só traz metadados; as instâncias (com peers) e as arestas ficam em 'snapshots'
+                node_id = keys[1].lstrip('/')
+                node = graph.nodes.get(node_id)
+                if node is None:
+                    name, package_version = _pnpm_split(node_id)
+                    node = graph.nodes[node_id] = Node(name, package_version)
+                if len(keys) == 4 and keys[2] in ('dependencies', 'optionalDependencies'):
+                    target = _pnpm_target(keys[3], value)
+                    if target:
+                        node.deps.append(target)
+                elif len(keys) == 3 and keys[2] == 'optional':
+                    node.optional = value == 'true'
+    if version is None:
+        raise LockfileError(f'{path}: lockfileVersion ausente')
+    if float(version) < 6:
+        raise LockfileError(f'{path}: lockfileVersion {version} não suportado (use pnpm 8+)')
+    for node in graph.nodes.values():
+        missing = [target for target in node.deps if target not in graph.nodes]
+        graph.unresolved.extend((node.name, target) for target in missing)
+        node.deps = [target for target in node.deps if target in graph.nodes]
+    kinds = {'dependencies': 'prod', 'optionalDependencies': 'optional', 'devDependencies': 'dev'}
+    for (importer, field, name), spec in importers.items():
+        if importer != '.' or field not in kinds:
+            continue
+        target = _pnpm_target(name, spec.get('version', ''))
+        graph.roots[name] = {'id': target if target in graph.nodes else None, 'kind': kinds[field],
+                             'specifier': spec.get('specifier')}
+    production = graph.closure(graph.root_ids(('prod', 'optional')))
+    for node_id, node in graph.nodes.items():
+        node.dev = node_id not in production
+    return graph
+
+
+def duplicates(graph, limit=15):
+    """Pacotes com mais de uma versão instalada e quem depende de cada versão"""
+    versions = {}
+    for node_id, node in graph.nodes.items():
+        versions.setdefault(node.name, {}).setdefault(node.version, []).append(node_id)
+    parents = {}
+    duplicated = {name for name, by_version in versions.items() if len(by_version) > 1}
+    for node_id, node in graph.nodes.items():
+        for child in node.deps:
+            if graph.nodes[child].name in duplicated:
+                parents.setdefault(child, set()).add(node.name)
+    for root_name, root in graph.roots.items():
+        if root['id'] and graph.nodes[root['id']].name in duplicated:
+            parents.setdefault(root['id'], set()).add('(package.json)')
+    rows = []
+    for name in duplicated:
+        entries = []
+        for package_version, ids in sorted(versions[name].items()):
+            required = sorted(set().union(*(parents.get(node_id, set()) for node_id in ids)))
+            entries.append({'version': package_version, 'instances': len(ids), 'required_by': required[:4],
+                            'required_by_count': len(required)})
+        rows.append({'name': name, 'versions': entries,
+                     'extra_copies': sum(entry['instances'] for entry in entries) - 1})
+    rows.sort(key=lambda row: (-len(row['versions']), -row['extra_copies'], row['name']))
+    return {'packages': len(rows), 'extra_copies': sum(row['extra_copies'] for row in rows), 'top': rows[:limit]}
+
+
+def heavy_subtrees(graph, limit=15):
+    """Fechamento transitivo de cada dependência direta e a parte exclusiva dela"""
+    everything = {root_name: graph.closure([root['id']]) for root_name, root in graph.roots.items() if root['id']}
+    rows = []
+    for root_name, closure in everything.items():
+        others = set()
+        for other_name, other in everything.items():
+            if other_name != root_name:
+                others |= other
+        rows.append({'name': root_name, 'kind': graph.roots[root_name]['kind'],
+                     'packages': len({graph.key(node_id) for node_id in closure}),
+                     'exclusive': len({graph.key(node_id) for node_id in closure - others})})
+    rows.sort(key=lambda row: (-row['packages'], row['name']))
+    return rows[:limit]
+
+
+def _versions(graph):
+    versions = {}
+    for node in graph.nodes.values():
+        versions.setdefault(node.name, set()).add(node.version)
+    return versions
+
+
+def drift(first, second, manifest):
+    """Diferenças entre dois lockfiles e entre cada um e o package.json"""
+    left, right = _versions(first), _versions(second)
+    changed = sorted(name for name in set(left) & set(right) if left[name] != right[name])
+    direct = []
+    declared = {**manifest.get('devDependencies', {}), **manifest.get('dependencies', {})}
+    for name in sorted(set(declared) | set(first.roots) | set(second.roots)):
+        issues = []
+        wanted = declared.get(name)
+        resolved = {}
+        for graph in (first, second):
+            root = graph.roots.get(name)
+            if root is None:
+                issues.append(f'ausente em {graph.source}' if wanted else f'só em {graph.source}')
+                continue
+            if wanted is not None and root['specifier'] != wanted:
+                issues.append(f"{graph.source} resolve '{root['specifier']}', package.json pede '{wanted}'")
+            if root['id']:
+                resolved[graph.source] = graph.nodes[root['id']].version
+        if len(set(resolved.values())) > 1:
+            issues.append('versões diferentes: ' + ', '.join(f'{source} {version}'
+                                                             for source, version in resolved.items()))
+        if issues:
+            direct.append({'name': name, 'declared': wanted, 'resolved': resolved, 'issues': issues})
+    return {
+        'only_in': {first.source: sorted(set(left) - set(right)), second.source: sorted(set(right) - set(left))},
+        'version_mismatch': [{'name': name, first.source: sorted(left[name]), second.source: sorted(right[name])}
+                             for name in changed],
+        'direct': direct,
+    }
+
+
+def server_closure(graph, roots):
+    """Pacotes que o código do servidor puxa a partir das raízes indicadas"""
+    ids = {name: graph.roots[name]['id'] for name in roots if graph.roots.get(name, {}).get('id')}
+    closure = graph.closure(ids.values())
+    paths = graph.shortest_paths(ids.values())
+    members = sorted({graph.key(node_id) for node_id in closure})
+    return {
+        'roots': sorted(ids),
+        'missing_roots': sorted(set(roots) - set(ids)),
+        'packages': len(members),
+        'per_root': {name: len({graph.key(node_id) for node_id in graph.closure([node_id])})
+                     for name, node_id in sorted(ids.items())},
+        'members': members,
+        'paths': {graph.key(node_id): ' > '.join(paths[node_id]) for node_id in closure},
+    }
+
+
+def load_config(path):
+    """Orçamentos gravados; sem arquivo não há orçamento, mas um arquivo inválido é erro"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        raise LockfileError(f'{path}: JSON inválido ({e})') from e
+    if not isinstance(config, dict):
+        raise LockfileError(f'{path}: não é um objeto JSON')
+    return config
+
+
+def check_budget(closure, budget):
+    """Violações do fechamento do servidor contra o orçamento gravado"""
+    violations = []
+    if not budget:
+        return violations
+    if closure['packages'] > budget.get('packages', closure['packages']):
+        violations.append({'metric': 'packages', 'current': closure['packages'], 'budget': budget['packages']})
+    for name, count in closure['per_root'].items():
+        limit = budget.get('per_root', {}).get(name)
+        if limit is not None and count > limit:
+            violations.append({'metric': name, 'current': count, 'budget': limit})
+    if violations:
+        known = set(budget.get('members', ()))
+        for violation in violations:
+            violation['added'] = [{'package': member, 'path': closure['paths'][member]}
+                                  for member in closure['members'] if member not in known][:20]
+    return violations
+
+
+def lockfiles(root):
+    return [os.path.join(root, name) for name in (PNPM_LOCKFILE, NPM_LOCKFILE)
+            if os.path.isfile(os.path.join(root, name))]
+
+
+def analyze(root='.', config=None, limit=15):
+    """Lê os lockfiles da raiz e devolve o relatório completo com as violações de orçamento"""
+    config = load_config(DEFAULT_CONFIG) if config is None else config
+    server_roots = config.get('server_roots', list(DEFAULT_SERVER_ROOTS))
+    try:
+        with open(os.path.join(root, 'package.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    graphs = []
+    for path in lockfiles(root):
+        graphs.append((read_pnpm_lock if path.endswith('.yaml') else read_npm_lock)(path))
+    report = {'install_lockfile': INSTALL_LOCKFILE, 'lockfiles': {}, 'violations': []}
+    for graph in graphs:
+        closure = server_closure(graph, server_roots)
+        violations = check_budget(closure, config.get('lockfiles', {}).get(graph.source))
+        for violation in violations:
+            violation['lockfile'] = graph.source
+        report['violations'] += violations
+        report['lockfiles'][graph.source] = {
+            'nodes': len(graph.nodes),
+            'packages': len({graph.key(node_id) for node_id in graph.nodes}),
+            'names': len({node.name for node in graph.nodes.values()}),
+            'dev_nodes': sum(1 for node in graph.nodes.values() if node.dev),
+            'direct': len(graph.roots),
+            'unresolved': len(graph.unresolved),
+            'duplicates': duplicates(graph, limit),
+            'heavy_subtrees': heavy_subtrees(graph, limit),
+            'server_closure': closure,
+        }
+    if len(graphs) == 2:
+        report['drift'] = drift(graphs[0], graphs[1], manifest)
+    return report
+
+
+def updated_budgets(report, config):
+    """Orçamento exato com o fechamento atual: qualquer pacote novo no servidor falha a verificação"""
+    budgets = {}
+    for source, data in report['lockfiles'].items():
+        closure = data['server_closure']
+        budgets[source] = {'packages': closure['packages'], 'per_root': closure['per_root'],
+                           'members': closure['members']}
+    return {**config, 'server_roots': config.get('server_roots', list(DEFAULT_SERVER_ROOTS)), 'lockfiles': budgets}
+
+
+def format_report(report):
+    lines = []
+    for source, data in report['lockfiles'].items():
+        marker = ' (usado pelo Dockerfile)' if source == report['install_lockfile'] else ''
+        lines.append(f"📦 {source}{marker}: {data['packages']} pacotes ({data['nodes']} instalações, "
+                     f"{data['names']} nomes), {data['dev_nodes']} só de desenvolvimento, "
+                     f"{data['direct']} diretas")
+        if data['unresolved']:
+            lines.append(f"  ⚠️  {data['unresolved']} dependências sem resolução no lockfile")
+        dups = data['duplicates']
+        lines.append(f"  Duplicados: {dups['packages']} pacotes com mais de uma versão "
+                     f"({dups['extra_copies']} cópias a mais)")
+        for row in dups['top'][:8]:
+            versions = '; '.join(f"{entry['version']} x{entry['instances']} <- {', '.join(entry['required_by'])}"
+                                 + (f" +{entry['required_by_count'] - len(entry['required_by'])}"
+                                    if entry['required_by_count'] > len(entry['required_by']) else '')
+                                 for entry in row['versions'])
+            lines.append(f"    {row['name']:<28} {versions}")
+        lines.append(f"  {'Subárvores mais pesadas':<38}{'tipo':<10}{'pacotes':>8}{'exclusivos':>11}")
+        for row in data['heavy_subtrees'][:10]:
+            lines.append(f"    {row['name']:<36}{row['kind']:<10}{row['packages']:>8}{row['exclusive']:>11}")
+        closure = data['server_closure']
+        per_root = ', '.join(f'{name} {count}' for name, count in closure['per_root'].items())
+        lines.append(f"  Servidor: {closure['packages']} pacotes a partir de {per_root}")
+        if closure['missing_roots']:
+            lines.append(f"    ⚠️  fora do lockfile: {', '.join(closure['missing_roots'])}")
+        lines.append('')
+    if 'drift' in report:
+        drift_report = report['drift']
+        only = ', '.join(f'{len(names)} só em {source}' for source, names in drift_report['only_in'].items())
+        lines.append(f"🔀 Divergências: {only}, {len(drift_report['version_mismatch'])} com versões diferentes, "
+                     f"{len(drift_report['direct'])} dependências diretas fora do package.json ou entre si")
+        for row in drift_report['version_mismatch'][:8]:
+            versions = ' vs '.join(', '.join(row[source]) for source in report['lockfiles'])
+            lines.append(f"    {row['name']:<28} {versions}")
+        for row in drift_report['direct'][:10]:
+            lines.append(f"    ⚠️  {row['name']}: {'; '.join(row['issues'])}")
+        lines.append('')
+    if not report['violations']:
+        lines.append('✅ Fechamento do servidor dentro do orçamento')
+    for violation in report['violations']:
+        lines.append(f"❌ {violation['lockfile']}: {violation['metric']} {violation['current']} pacotes "
+                     f"> orçamento {violation['budget']}")
+        for added in violation['added'][:10]:
+            lines.append(f"    + {added['package']}  ({added['path']})")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Grafo dos lockfiles: duplicados, subárvores, divergências e orçamento')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help='arquivo JSON de orçamentos')
+    parser.add_argument('--top', type=int, default=15, help='linhas por seção')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    parser.add_argument('--update-budgets', action='store_true',
+                        help='grava o fechamento atual do servidor como orçamento')
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+        report = analyze(args.root, config, args.top)
+    except LockfileError as e:
+        print(f'❌ {e}', file=sys.stderr)
+        return 2
+    if not report['lockfiles']:
+        print(f'❌ nenhum lockfile em {args.root}', file=sys.stderr)
+        return 2
+
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(format_report(report))
+        if args.json_out:
+            with open(args.json_out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.update_budgets:
+        with open(args.config, 'w', encoding='utf-8') as f:
+            json.dump(updated_budgets(report, config), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'Orçamentos atualizados em {args.config}', file=sys.stderr)
+        return 0
+    return 1 if report['violations'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
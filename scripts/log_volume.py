@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+
+"""
+Análise do volume de logs por local de chamada (console.log/info/warn/error)
+Monta o catálogo de chamadas console.* com mensagem literal em app/, lib/,
+hooks/ e components/ (ex.: os logs de acquire/release do pool em
+lib/mysql/client.ts e a limpeza do lib/cache.ts) e classifica cada linha do
+stdout do contêiner pelo local que a emitiu. A leitura é em streaming (arquivo,
+.gz ou stdin) com memória constante: contadores por local e um top-k das
+linhas não reconhecidas. Aceita texto puro, linhas com carimbo RFC 3339
+(docker logs -t, kubectl logs --timestamps) e o formato json-file do Docker.
+Relata linhas/s e bytes/s por local e estima o custo em CPU e o ganho de vazão
+se cada local fosse removido ou amostrado (--sample).
+Execute com: python3 scripts/log_volume.py container.log[.gz] [--duration 3600] [--cpu-pct 80 --requests-per-sec 150]
+"""
+
+import argparse
+import functools
+import glob
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from ts_source import SourceFile
+
+SOURCE_GLOBS = ('app/**/*.ts', 'app/**/*.tsx', 'lib/**/*.ts', 'lib/**/*.tsx',
+                'hooks/**/*.ts', 'hooks/**/*.tsx', 'components/**/*.ts', 'components/**/*.tsx',
+                'middleware.ts')
+PREFIX_KEY = 12
+# Custo estimado de um console.log no Node (util.format + write síncrono no pipe)
+DEFAULT_LINE_COST_US = 8.0
+DEFAULT_BYTE_COST_NS = 1.5
+UNKNOWN_CAPACITY = 200
+
+_CONSOLE_CALL = re.compile(r'\bconsole\.(log|info|warn|error|debug|trace)\s*\(')
+_FORMAT_SPEC = re.compile(r'%[sdifjoOc%]')
+_TEMPLATE_EXPR = re.compile(r'\$\{[^}]*\}')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"', '`': '`', '$': '$'}
+_ESCAPE = re.compile(r'\\(.)')
+_TIMESTAMP = re.compile(rb'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d+)?(Z|[+-]\d{2}:?\d{2})? ')
+_DIGITS = re.compile(r'\d+')
+
+
+class CallSite:
+    """Uma mensagem de log; locais com o mesmo texto não se distinguem no stdout"""
+
+    __slots__ = ('level', 'prefix', 'static', 'regex', 'locations', 'lines', 'bytes')
+
+    def __init__(self, level, prefix, static, regex, location):
+        self.level = level
+        self.prefix = prefix
+        self.static = static
+        self.regex = regex
+        self.locations = [location]
+        self.lines = 0
+        self.bytes = 0
+
+    @property
+    def label(self):
+        extra = len(self.locations) - 1
+        return self.locations[0] + (f' (+{extra})' if extra else '')
+
+
+def _unescape(text):
+    return _ESCAPE.sub(lambda match: _ESCAPES.get(match.group(1), match.group(1)), text)
+
+
+def message_pattern(literal):
+    """Regex e texto fixo da mensagem produzida por console.*(literal, ...args)"""
+    if literal.quote == '`':
+        parts = _TEMPLATE_EXPR.split(literal.text)
+    else:
+        parts = _FORMAT_SPEC.split(literal.text)
+    parts = [_unescape(part) for part in parts]
+    # util.format: argumentos extras entram depois de um espaço; por isso só o início é ancorado
+    regex = re.compile('.*?'.join(re.escape(part) for part in parts), re.S)
+    return regex, parts[0], sum(len(part) for part in parts)
+
+
+def catalog(root='.'):
+    """Locais console.* com mensagem literal, agrupados pelo texto que produzem"""
+    sites = {}
+    for pattern in SOURCE_GLOBS:
+        for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+            source = SourceFile.read(path)
+            literals = {literal.start: literal for literal in source.literals}
+            relative = os.path.relpath(path, root)
+            for match in source.find_code(_CONSOLE_CALL.pattern):
+                index = match.end()
+                while index < len(source.text) and source.text[index].isspace():
+                    index += 1
+                literal = literals.get(index)
+                if literal is None:
+                    continue
+                level = match.group(1)
+                location = f'{relative}:{source.line_of(match.start())}'
+                key = (literal.quote == '`', literal.text)
+                if key in sites:
+                    sites[key].locations.append(location)
+                    continue
+                regex, prefix, static = message_pattern(literal)
+                sites[key] = CallSite(level, prefix, static, regex, location)
+    return list(sites.values())
+
+
+class Classifier:
+    """Encontra o local de uma mensagem: índice pelo início fixo, regex só nos candidatos"""
+
+    def __init__(self, sites):
+        self.by_length = {}
+        self.fallback = []
+        for site in sites:
+            prefix = site.prefix[:PREFIX_KEY]
+            if prefix:
+                self.by_length.setdefault(len(prefix), {}).setdefault(prefix, []).append(site)
+            else:
+                self.fallback.append(site)
+        self.lengths = sorted(self.by_length, reverse=True)
+
+    def classify(self, message):
+        best = None
+        for length in self.lengths:
+            for site in self.by_length[length].get(message[:length], ()):
+                if site.regex.match(message) and (best is None or site.static > best.static):
+                    best = site
+        if best is None:
+            for site in self.fallback:
+                if site.regex.match(message) and (best is None or site.static > best.static):
+                    best = site
+        return best
+
+
+class TopK:
+    """Space-Saving: as k formas mais frequentes em memória fixa (contagens são limites superiores)"""
+
+    def __init__(self, capacity=UNKNOWN_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+
+    def add(self, key, size):
+        entry = self.counts.get(key)
+        if entry is None:
+            if len(self.counts) >= self.capacity:
+                victim = min(self.counts, key=lambda item: self.counts[item][0])
+                lines, _ = self.counts.pop(victim)
+                entry = [lines, 0]
+            else:
+                entry = [0, 0]
+            self.counts[key] = entry
+        entry[0] += 1
+        entry[1] += size
+
+    def most_common(self, limit):
+        ranked = sorted(self.counts.items(), key=lambda item: item[1][1], reverse=True)
+        return [{'shape': key, 'lines': lines, 'bytes': size} for key, (lines, size) in ranked[:limit]]
+
+
+@functools.lru_cache(maxsize=64)
+def _base_seconds(stamp, zone):
+    """Segundos da parte inteira do carimbo; em cache porque muda no máximo uma vez por segundo"""
+    moment = datetime.fromisoformat(stamp.decode()).replace(tzinfo=timezone.utc)
+    offset = 0
+    if zone and zone != b'Z':
+        zone = zone.decode()
+        sign = 1 if zone[0] == '+' else -1
+        offset = sign * (int(zone[1:3]) * 3600 + int(zone[-2:]) * 60)
+    return moment.timestamp() - offset
+
+
+def _timestamp_seconds(stamp, fraction, zone):
+    return _base_seconds(stamp, zone) + (float(fraction) if fraction else 0.0)
+
+
+def split_line(raw):
+    """(segundos ou None, mensagem) de uma linha em texto, com carimbo ou json-file do Docker"""
+    if raw.startswith(b'{"log":'):
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            record = None
+        if record is not None:
+            seconds = None
+            stamp = record.get('time')
+            if stamp:
+                match = _TIMESTAMP.match(stamp.encode() + b' ')
+                if match:
+                    seconds = _timestamp_seconds(*match.groups())
+            return seconds, record.get('log', '').rstrip('\n')
+    match = _TIMESTAMP.match(raw)
+    if match:
+        return _timestamp_seconds(*match.groups()), raw[match.end():].decode('utf-8', 'replace').rstrip('\r\n')
+    return None, raw.decode('utf-8', 'replace').rstrip('\r\n')
+
+
+def _continues(message, previous):
+    """Linha que pertence à mensagem anterior: pilha de erro ou objeto impresso em várias linhas"""
+    if not message or not message[0].isspace() and message[0] not in '}])':
+        return False
+    stripped = message.lstrip()
+    return stripped.startswith('at ') or message[0] in '}])' or previous.endswith(('{', '[', '(', ','))
+
+
+def _open_binary(path):
+    if path == '-':
+        return sys.stdin.buffer
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def analyze(paths, sites):
+    """Lê os logs em streaming e acumula linhas e bytes por local"""
+    classifier = Classifier(sites)
+    unknown = TopK()
+    totals = {'lines': 0, 'bytes': 0, 'unknown_lines': 0, 'unknown_bytes': 0, 'continuation_lines': 0}
+    first = last = None
+    started = time.perf_counter()
+    for path in paths:
+        current = None
+        previous = ''
+        with _open_binary(path) as f:
+            for raw in f:
+                size = len(raw)
+                totals['lines'] += 1
+                totals['bytes'] += size
+                seconds, message = split_line(raw)
+                if seconds is not None:
+                    first = seconds if first is None else min(first, seconds)
+                    last = seconds if last is None else max(last, seconds)
+                if current is not None and _continues(message, previous):
+                    site = current
+                    totals['continuation_lines'] += 1
+                else:
+                    site = classifier.classify(message)
+                    current = site
+                previous = message
+                if site is None:
+                    totals['unknown_lines'] += 1
+                    totals['unknown_bytes'] += size
+                    unknown.add(_DIGITS.sub('#', message[:80]), size)
+                    continue
+                site.lines += 1
+                site.bytes += size
+    totals['seconds'] = time.perf_counter() - started
+    span = last - first if first is not None and last > first else None
+    return totals, span, unknown
+
+
+def estimate(sites, totals, window, args):
+    """Taxas, custo de CPU e ganho de vazão se o local for removido ou amostrado"""
+    busy = args.cpu_pct / 100.0 * args.cores if args.cpu_pct else None
+    rows = []
+    for site in sorted(sites, key=lambda item: item.bytes, reverse=True):
+        if not site.lines:
+            continue
+        row = {'site': site.label, 'locations': site.locations, 'level': site.level,
+               'lines': site.lines, 'bytes': site.bytes,
+               'bytes_pct': round(site.bytes / totals['bytes'] * 100, 2) if totals['bytes'] else 0.0}
+        if window:
+            lines_per_sec = site.lines / window
+            bytes_per_sec = site.bytes / window
+            cpu = lines_per_sec * args.line_cost_us / 1e6 + bytes_per_sec * args.byte_cost_ns / 1e9
+            row.update({'lines_per_sec': round(lines_per_sec, 2), 'bytes_per_sec': round(bytes_per_sec, 1),
+                        'core_pct': round(cpu * 100, 3)})
+            if args.requests_per_sec:
+                row['lines_per_request'] = round(lines_per_sec / args.requests_per_sec, 3)
+            if busy:
+                # Serviço limitado por CPU: a vazão cresce na proporção da CPU liberada
+                kept = 1.0 / args.sample if args.sample else 0.0
+                share = min(cpu / busy, 0.99)
+                row['gain_removed_pct'] = round(share / (1 - share) * 100, 2)
+                sampled = share * (1 - kept)
+                row['gain_sampled_pct'] = round(sampled / (1 - sampled) * 100, 2)
+        rows.append(row)
+    return rows
+
+
+def format_report(report):
+    summary = report['summary']
+    window = summary['window_seconds']
+    lines = [f"📊 {summary['lines']} linhas, {summary['bytes'] / 1e6:.1f} MB, "
+             f"{summary['classified_pct']:.1f}% atribuídas a {summary['active_sites']} de "
+             f"{summary['catalog_sites']} locais do catálogo; lido a {summary['read_mb_per_sec']:.1f} MB/s",
+             f"   janela: {f'{window:.0f}s' if window else 'desconhecida (use --duration ou logs com carimbo)'}"]
+    if window:
+        lines[-1] += (f", {summary['lines'] / window:.1f} linhas/s, {summary['bytes'] / window / 1024:.1f} KB/s; "
+                      f"custo estimado {summary['core_pct']:.2f}% de um núcleo")
+    gains = 'gain_removed_pct' in (report['sites'][0] if report['sites'] else {})
+    header = f"  {'local':<46}{'nível':<7}{'linhas':>10}{'% bytes':>9}"
+    if window:
+        header += f"{'linhas/s':>10}{'KB/s':>9}{'% núcleo':>10}"
+    if gains:
+        header += f"{'sem log':>9}{'amostr.':>9}"
+    lines.append(header)
+    for row in report['sites'][:report['settings']['top']]:
+        line = f"  {row['site'][:45]:<46}{row['level']:<7}{row['lines']:>10}{row['bytes_pct']:>8.1f}%"
+        if window:
+            line += f"{row['lines_per_sec']:>10.1f}{row['bytes_per_sec'] / 1024:>9.1f}{row['core_pct']:>9.2f}%"
+        if gains:
+            line += f"{row['gain_removed_pct']:>+8.1f}%{row['gain_sampled_pct']:>+8.1f}%"
+        lines.append(line)
+    if gains:
+        lines.append(f"  sem log / amostr.: vazão a mais se o local for removido ou amostrado 1/{report['settings']['sample']}")
+    elif window:
+        lines.append('  informe --cpu-pct (e --cores) para estimar o ganho de vazão')
+    if report['unknown']:
+        lines.append('')
+        lines.append(f"⚠️  {summary['unknown_lines']} linhas sem local conhecido ({summary['unknown_bytes_pct']:.1f}% dos bytes); mais frequentes:")
+        for entry in report['unknown'][:5]:
+            lines.append(f"  {entry['lines']:>10}  {entry['shape']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Volume de logs por local de chamada e custo estimado')
+    parser.add_argument('logs', nargs='+', help='stdout do contêiner (.gz aceito; - para stdin)')
+    parser.add_argument('--root', default='.', help='raiz do repositório (catálogo de console.*)')
+    parser.add_argument('--duration', type=float,
+                        help='segundos cobertos pelos logs (padrão: pelos carimbos de tempo)')
+    parser.add_argument('--line-cost-us', type=float, default=DEFAULT_LINE_COST_US,
+                        help='custo de CPU por chamada console.* em µs')
+    parser.add_argument('--byte-cost-ns', type=float, default=DEFAULT_BYTE_COST_NS,
+                        help='custo de CPU por byte escrito em ns')
+    parser.add_argument('--cpu-pct', type=float, help='uso de CPU observado do processo (%% de um núcleo)')
+    parser.add_argument('--cores', type=int, default=1, help='núcleos usados pelo processo')
+    parser.add_argument('--requests-per-sec', type=float, help='taxa de requisições no período (linhas por requisição)')
+    parser.add_argument('--sample', type=int, default=100, help='amostragem simulada: mantém 1 a cada N linhas')
+    parser.add_argument('--top', type=int, default=15, help='locais exibidos')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    sites = catalog(args.root)
+    if not sites:
+        parser.error(f'nenhuma chamada console.* encontrada em {args.root}')
+    try:
+        totals, span, unknown = analyze(args.logs, sites)
+    except OSError as e:
+        parser.error(str(e))
+    window = args.duration or span
+    rows = estimate(sites, totals, window, args)
+    classified = totals['lines'] - totals['unknown_lines']
+    report = {
+        'settings': {'line_cost_us': args.line_cost_us, 'byte_cost_ns': args.byte_cost_ns,
+                     'cpu_pct': args.cpu_pct, 'cores': args.cores, 'sample': args.sample, 'top': args.top},
+        'summary': {
+            'lines': totals['lines'],
+            'bytes': totals['bytes'],
+            'window_seconds': window,
+            'catalog_sites': len(sites),
+            'active_sites': len(rows),
+            'classified_pct': round(classified / totals['lines'] * 100, 2) if totals['lines'] else 0.0,
+            'continuation_lines': totals['continuation_lines'],
+            'unknown_lines': totals['unknown_lines'],
+            'unknown_bytes_pct': round(totals['unknown_bytes'] / totals['bytes'] * 100, 2) if totals['bytes'] else 0.0,
+            'core_pct': round(sum(row.get('core_pct', 0.0) for row in rows), 3),
+            'read_mb_per_sec': round(totals['bytes'] / 1e6 / totals['seconds'], 2) if totals['seconds'] else 0.0,
+        },
+        'sites': rows,
+        'unknown': unknown.most_common(20),
+    }
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Relatório salvo em: {args.json_out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+
+"""
+Análise de over-fetch nas rotas GET da API do sistema CRM
+Para cada handler GET cruza três listas de campos:
+  - colunas que a consulta principal devolve (SELECT * e alias.* expandidos
+    pelo catálogo de transicao-mysql-new.sql + sql_fixes.sql, atravessando views)
+  - colunas que o handler lê das linhas e os campos da resposta montada
+    (o objeto do .map() ou do formatador chamado nele; sem mapeamento a linha
+    vai inteira para o cliente)
+  - propriedades que os consumidores acessam: arquivos de hooks/, components/
+    e app/ que chamam a rota, quem importa os hooks desses arquivos e os
+    componentes importados por esses
+Os bytes desperdiçados por linha e por resposta vêm de dados de amostra: as
+linhas sintéticas do scripts/local_db.py e, quando o formato bate, os
+exemplos de data/*.json. Nomes comuns (id, status) contam como usados em
+qualquer acesso, então o desperdício é um limite inferior.
+Execute com: python3 scripts/overfetch_analyzer.py [--scale 1000] [--all] [--json arquivo|-]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+import local_db
+from index_advisor import Resolver
+from load_test import route_template
+from sql_catalog import split_top_level, table_aliases
+from ts_source import SourceFile
+
+CONSUMER_GLOBS = ('hooks/**/*.ts', 'hooks/**/*.tsx', 'components/**/*.tsx', 'components/**/*.ts',
+                  'app/**/*.tsx', 'lib/**/*.ts')
+SAMPLE_GLOB = 'data/*.json'
+DEFAULT_SCALE = 1000
+SAMPLE_ROWS = 200
+# Tamanho no protocolo binário do MySQL (connection.execute usa prepared statements)
+BINARY_SIZES = {'TINYINT': 1, 'BOOLEAN': 1, 'BOOL': 1, 'BIT': 1, 'SMALLINT': 2, 'MEDIUMINT': 4, 'INT': 4,
+                'INTEGER': 4, 'BIGINT': 8, 'FLOAT': 4, 'DOUBLE': 8, 'DATE': 5, 'DATETIME': 8, 'TIMESTAMP': 8,
+                'TIME': 9, 'YEAR': 2}
+# O mysql2 devolve datas como Date, serializadas como "2024-01-01T03:00:00.000Z"
+_DATE_JSON = 26
+_DATE_TYPES = ('DATE', 'DATETIME', 'TIMESTAMP')
+_NUMBER_TYPES = ('TINYINT', 'SMALLINT', 'MEDIUMINT', 'INT', 'INTEGER', 'BIGINT', 'FLOAT', 'DOUBLE', 'BOOLEAN',
+                 'BOOL', 'BIT', 'YEAR')
+_ROW_MAP = re.compile(r'\.\s*map\s*\(\s*(?:async\s*)?\(?\s*(\w+)\s*(?::[^)=]*)?\)?\s*=>')
+_ROW_MAP_REFERENCE = re.compile(r'\.\s*map\s*\(\s*(\w+)\s*\)')
+_SQL_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_OBJECT_PRECEDERS = ('(', '=', ',', ':', '[', '?', 'return')
+_PROPERTY = re.compile(r'\??\.\s*([A-Za-z_$][\w$]*)')
+_DESTRUCTURE = re.compile(r'\{([\w\s,:?=.]*)\}\s*(?:=[^=>]|:|\))')
+
+
+def _base_type(column_type):
+    return column_type.split('(')[0].split()[0].upper() if column_type else ''
+
+
+def _select_list(sql):
+    """Itens da lista do SELECT principal (até o FROM fora de parênteses)"""
+    match = re.match(r'\s*\(?\s*SELECT\s+(?:DISTINCT\s+)?', sql, re.I)
+    if not match:
+        return None
+    depth = 0
+    for position in range(match.end(), len(sql)):
+        char = sql[position]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and re.match(r'\bFROM\b', sql[position:position + 5], re.I) \
+                and not sql[position - 1:position].isalnum() and sql[position - 1:position] != '_':
+            return split_top_level(sql[match.end():position])
+    return None
+
+
+def selected_columns(sql, catalog, resolver):
+    """Colunas devolvidas pela consulta: nome -> (tabela, coluna) de origem ou None se calculada"""
+    items = _select_list(sql)
+    if items is None:
+        return None, False
+    aliases = table_aliases(sql)
+    columns = {}
+    star = False
+
+    def expand(name):
+        if name in catalog.tables:
+            return {column: (name, column) for column in catalog.tables[name].columns}
+        if name in catalog.views:
+            return {column: source for column, source in resolver._view(name).items()}
+        return {}
+
+    for item in items:
+        item = item.strip()
+        if item == '*':
+            star = True
+            for name in dict.fromkeys(aliases.values()):
+                for column, source in expand(name).items():
+                    columns.setdefault(column, source)
+            continue
+        qualified_star = re.match(r'^(\w+)\.\*$', item)
+        if qualified_star:
+            star = True
+            columns.update(expand(aliases.get(qualified_star.group(1).lower(), qualified_star.group(1).lower())))
+            continue
+        alias = re.search(r'(?:\bAS\s+|\s)`?(\w+)`?\s*$', item, re.I)
+        plain = re.match(r'^(?:(\w+)\.)?`?(\w+)`?$', item)
+        if plain:
+            name = plain.group(2).lower()
+            columns[name] = resolver.resolve(plain.group(1), plain.group(2), aliases)
+        elif alias:
+            expression = item[:alias.start()].strip()
+            direct = re.match(r'^(?:(\w+)\.)?(\w+)$', expression)
+            columns[alias.group(1).lower()] = resolver.resolve(direct.group(1), direct.group(2), aliases) \
+                if direct else None
+    return columns, star
+
+
+def _object_literals(source, start, end):
+    """Objetos literais { chave: valor } no trecho, com as entradas separadas"""
+    objects = []
+    for match in re.finditer(r'\{', source.masked[start:end]):
+        position = start + match.start()
+        before = source.masked[max(0, position - 8):position].rstrip()
+        if not before.endswith(_OBJECT_PRECEDERS):
+            continue
+        close = source.matching(position)
+        entries = []
+        for entry in split_top_level(source.masked[position + 1:close]):
+            spread = re.match(r'^\.\.\.\s*([\w.]+)', entry)
+            keyed = re.match(r'^(\w+)\s*:\s*(.*)$', entry, re.S)
+            shorthand = re.match(r'^(\w+)$', entry)
+            if spread:
+                entries.append(('...', spread.group(1)))
+            elif keyed:
+                entries.append((keyed.group(1), keyed.group(2).strip()))
+            elif shorthand:
+                entries.append((shorthand.group(1), shorthand.group(1)))
+        objects.append((position, entries))
+    return objects
+
+
+def _function_param(source, function):
+    match = re.search(r'\(\s*(\w+)', source.masked[function.start:function.end])
+    return match.group(1) if match else None
+
+
+def _called(source, block, functions):
+    """Funções do mesmo arquivo chamadas dentro do bloco"""
+    body = source.masked[block.start:block.end]
+    return [function for function in functions
+            if function is not block and re.search(rf'(?<![\w.]){re.escape(function.name)}\s*\(', body)]
+
+
+def response_shape(source, handler, functions, columns):
+    """Leituras das linhas e campos da resposta do handler
+
+    Devolve (lidas, campos, passa_tudo): lidas é o conjunto de colunas acessadas
+    nas linhas e campos mapeia cada chave da resposta para as colunas de origem.
+    """
+    scopes = [handler]
+    for function in _called(source, handler, functions):
+        scopes.append(function)
+        scopes.extend(f for f in _called(source, function, functions) if f not in scopes)
+    by_name = {function.name: function for function in functions}
+    # formatar(rows[0]): qualquer função chamada pode receber a linha no primeiro parâmetro
+    mappers = [[(function.start, function.end, _function_param(source, function))] for function in scopes[1:]]
+    for scope in scopes:
+        for match in _ROW_MAP.finditer(source.masked, scope.start, scope.end):
+            paren = source.masked.index('(', match.start())
+            regions = [(paren, source.matching(paren), match.group(1))]
+            body = source.masked[paren:regions[0][1]]
+            # .map(lic => formatar(lic, ...)): o formatador recebe a linha
+            for function in functions:
+                if re.search(rf'(?<![\w.]){re.escape(function.name)}\s*\(\s*{match.group(1)}\b', body):
+                    regions.append((function.start, function.end, _function_param(source, function)))
+            mappers.append(regions)
+        for match in _ROW_MAP_REFERENCE.finditer(source.masked, scope.start, scope.end):
+            function = by_name.get(match.group(1))
+            if function is not None:
+                mappers.append([(function.start, function.end, _function_param(source, function))])
+    best = None
+    for regions in mappers:
+        reads = set()
+        for start, end, row in regions:
+            if row:
+                reads |= {name.lower() for name in
+                          re.findall(rf'(?<![\w.]){row}\s*\??\.\s*(\w+)', source.masked[start:end])}
+        reads &= set(columns)
+        if best is None or len(reads) > len(best[1]):
+            best = (regions, reads)
+    if best is None or not best[1]:
+        return set(columns), {name: {name} for name in columns}, True
+
+    regions, reads = best
+    candidates = []
+    for start, end, row in regions:
+        if not row:
+            continue
+        for _, entries in _object_literals(source, start, end):
+            direct = sum(1 for _, value in entries if re.search(rf'(?<![\w.]){row}\s*\??\.', value))
+            candidates.append((direct, len(entries), row, entries))
+    if not candidates:
+        return reads, {name: {name} for name in reads}, False
+    _, _, row, entries = max(candidates, key=lambda candidate: candidate[:2])
+    fields = {}
+    passthrough = False
+    for key, value in entries:
+        if key == '...':
+            if value == row:
+                passthrough = True
+                for name in columns:
+                    fields.setdefault(name, {name})
+            continue
+        fields[key] = {name.lower() for name in re.findall(rf'(?<![\w.]){row}\s*\??\.\s*(\w+)', value)} \
+            & set(columns)
+    mapped = set().union(*fields.values()) if fields else set()
+    leftover = reads - mapped
+    for key, value in entries:
+        # Campo derivado de variável local (prazoFormatted): atribui as leituras não mapeadas
+        if key != '...' and not fields[key] and re.match(r'^[A-Za-z_]\w*$', value) and value != row:
+            fields[key] = set(leftover)
+    return (set(columns) if passthrough else reads), fields, passthrough
+
+
+def _route_matches(template, literal):
+    """Literal '/api/x/${id}?q' corresponde ao template /api/x/[id]?"""
+    path = re.sub(r'\$\{[^}]*\}', '*', literal).split('?')[0].rstrip('/')
+    expected = template.strip('/').split('/')
+    actual = path.strip('/').split('/')
+    if len(expected) != len(actual):
+        return False
+    return all(want == got or (want.startswith('[') and got) for want, got in zip(expected, actual))
+
+
+def resolve_import(root, importer, specifier):
+    if specifier.startswith('@/'):
+        base = os.path.join(root, specifier[2:])
+    elif specifier.startswith('.'):
+        base = os.path.normpath(os.path.join(os.path.dirname(importer), specifier))
+    else:
+        return None
+    for suffix in ('', '.tsx', '.ts', '/index.tsx', '/index.ts'):
+        if os.path.isfile(base + suffix):
+            return os.path.normpath(base + suffix)
+    return None
+
+
+class ConsumerIndex:
+    """Arquivos do front-end, quem chama cada rota e as propriedades que cada um acessa"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.files = {}
+        for pattern in CONSUMER_GLOBS:
+            for path in glob.glob(os.path.join(root, pattern), recursive=True):
+                normalized = os.path.normpath(path)
+                if '/api/' in f'/{self.relative(normalized)}' or normalized in self.files:
+                    continue
+                try:
+                    self.files[normalized] = SourceFile.read(normalized)
+                except (OSError, UnicodeDecodeError):
+                    continue
+        self._accessed = {}
+        self._imports = {}
+
+    def relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def callers(self, template):
+        return sorted(path for path, source in self.files.items()
+                      if any(literal.text.startswith('/api/') and _route_matches(template, literal.text)
+                             for literal in source.literals))
+
+    def imports(self, path):
+        if path not in self._imports:
+            source = self.files[path]
+            targets = set()
+            for match in re.finditer(r'\bfrom\s*([\'"])([^\'"]+)\1', source.text):
+                target = resolve_import(self.root, path, match.group(2))
+                if target in self.files:
+                    targets.add(target)
+            self._imports[path] = targets
+        return self._imports[path]
+
+    def closure(self, callers):
+        """Quem chama a rota, quem importa seus hooks e os componentes importados por esses"""
+        hooks = set()
+        for path in callers:
+            for function in self.files[path].functions():
+                if function.kind == 'exported' and function.name.startswith('use'):
+                    hooks.add(function.name)
+        importers = set()
+        for path, source in self.files.items():
+            if path not in callers and any(re.search(rf'\b{hook}\b', source.masked) for hook in hooks):
+                importers.add(path)
+        components = set()
+        for path in importers:
+            components |= {target for target in self.imports(path)
+                           if '/components/' in f'/{self.relative(target)}' and not target.endswith('.ts')}
+        return sorted(set(callers) | importers | components)
+
+    def accessed(self, path):
+        """Nomes lidos como propriedade, desestruturados ou citados como chave em string"""
+        if path not in self._accessed:
+            source = self.files[path]
+            names = set(_PROPERTY.findall(source.masked))
+            for match in _DESTRUCTURE.finditer(source.masked):
+                names.update(re.findall(r'(?:^|,)\s*(\w+)', match.group(1)))
+            for literal in source.literals:
+                if re.fullmatch(r'[A-Za-z_]\w*', literal.text):
+                    names.add(literal.text)
+                elif '${' in literal.text:
+                    names.update(_PROPERTY.findall(literal.text))
+            self._accessed[path] = names
+        return self._accessed[path]
+
+
+class Sampler:
+    """Tamanhos médios por coluna a partir das linhas sintéticas do banco local"""
+
+    def __init__(self, catalog, scale=DEFAULT_SCALE, root='.'):
+        self.catalog = catalog
+        self.database = local_db.LocalDatabase.sqlite()
+        local_db.prepare(self.database, catalog, scale)
+        self._values = {}
+        self.examples = self._examples(root)
+
+    @staticmethod
+    def _examples(root):
+        """Exemplos de resposta em data/*.json: lista de objetos por arquivo"""
+        examples = {}
+        for path in sorted(glob.glob(os.path.join(root, SAMPLE_GLOB))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(records, list) and records and all(isinstance(record, dict) for record in records):
+                examples[os.path.relpath(path, root).replace(os.sep, '/')] = records
+        return examples
+
+    def values(self, source):
+        if source not in self._values:
+            table, column = source
+            try:
+                rows = self.database.execute(f'SELECT "{column}" FROM {table} LIMIT {SAMPLE_ROWS}',
+                                             translate=False).fetchall()
+                self._values[source] = [row[0] for row in rows]
+            except Exception:
+                self._values[source] = []
+        return self._values[source]
+
+    def column_type(self, source):
+        table = self.catalog.tables.get(source[0]) if source else None
+        column = table.columns.get(source[1]) if table else None
+        return _base_type(column.type) if column else ''
+
+    def wire_bytes(self, source):
+        """Bytes médios da coluna por linha no protocolo binário do MySQL"""
+        if source is None:
+            return 9.0
+        base = self.column_type(source)
+        values = self.values(source)
+        if not values:
+            return float(BINARY_SIZES.get(base, 9))
+        total = 0
+        for value in values:
+            if value is None:
+                continue
+            if base in BINARY_SIZES:
+                total += BINARY_SIZES[base]
+            else:
+                size = len(str(value).encode('utf-8'))
+                total += size + (1 if size < 251 else 3)
+        return total / len(values)
+
+    def json_bytes(self, source):
+        """Bytes médios do valor da coluna serializado pelo NextResponse.json"""
+        if source is None:
+            return 6.0
+        base = self.column_type(source)
+        values = self.values(source)
+        if not values:
+            return float(_DATE_JSON if base in _DATE_TYPES else 6)
+        total = 0
+        for value in values:
+            if value is None:
+                total += 4
+            elif base in _DATE_TYPES:
+                total += _DATE_JSON
+            elif base in _NUMBER_TYPES:
+                total += len(str(value))
+            else:
+                # DECIMAL também vira string no mysql2
+                total += len(json.dumps(str(value), ensure_ascii=False).encode('utf-8'))
+        return total / len(values)
+
+    def example_for(self, fields):
+        """Exemplo de data/*.json cujas chaves cobrem ao menos metade dos campos"""
+        best, best_share = None, 0.5
+        for path, records in self.examples.items():
+            keys = set().union(*(record.keys() for record in records))
+            share = len(keys & set(fields)) / len(fields) if fields else 0
+            if share >= best_share:
+                best, best_share = path, share
+        return best
+
+    def field_bytes(self, key, sources, example=None):
+        """Bytes médios de "chave": valor, no JSON da resposta"""
+        overhead = len(json.dumps(key)) + 2
+        if example:
+            values = [record[key] for record in self.examples[example] if key in record]
+            if values:
+                return overhead + sum(len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+                                      for value in values) / len(values)
+        if not sources:
+            return overhead + 4
+        return overhead + sum(self.json_bytes(source) for source in sources)
+
+    def count(self, sql):
+        """Linhas devolvidas pela consulta sem filtros dinâmicos; None se ela tem parâmetros"""
+        if '?' in sql or not sql.strip():
+            return None
+        body = re.sub(r'\bORDER\s+BY\b.*$', '', sql, flags=re.I | re.S)
+        try:
+            return self.database.execute(f'SELECT COUNT(*) FROM ({body}) AS amostra').fetchone()[0]
+        except Exception:
+            return None
+
+    def close(self):
+        self.database.close()
+
+
+def _main_query(source, handler, catalog, resolver):
+    """Consulta principal do handler: a primeira com *, senão a que devolve mais colunas"""
+    best = None
+    for literal in source.literals_between(handler.start, handler.end):
+        sql = _SQL_COMMENT.sub(' ', re.sub(r'\$\{[^}]*\}', ' ? ', literal.text))
+        if not re.match(r'\s*\(?\s*SELECT\b', sql, re.I) or not re.search(r'\bFROM\b', sql, re.I):
+            continue
+        columns, star = selected_columns(sql, catalog, resolver)
+        if not columns:
+            continue
+        candidate = (star, len(columns), -literal.start, sql, columns, source.line_of(literal.start))
+        if best is None or candidate[:3] > best[:3]:
+            best = candidate
+    return best
+
+
+def analyze_route(path, root, catalog, resolver, consumers, sampler=None):
+    source = SourceFile.read(path)
+    functions = source.functions()
+    handler = next((function for function in functions if function.kind == 'exported' and function.name == 'GET'),
+                   None)
+    if handler is None:
+        return None
+    query = _main_query(source, handler, catalog, resolver)
+    if query is None:
+        return None
+    star, _, _, sql, columns, line = query
+    reads, fields, passthrough = response_shape(source, handler, functions, columns)
+    relative = os.path.relpath(path, root).replace(os.sep, '/')
+    template = route_template(relative)
+    callers = consumers.callers(template)
+    closure = consumers.closure(callers) if callers else []
+    consumed = set().union(*(consumers.accessed(file) for file in closure)) if closure else set()
+
+    route = {
+        'route': template,
+        'file': relative,
+        'line': line,
+        'select_star': star,
+        'sql': re.sub(r'\s+', ' ', sql).strip()[:120],
+        'columns': len(columns),
+        'unread_columns': sorted(set(columns) - reads),
+        'fields': len(fields),
+        'passthrough': passthrough,
+        'consumers': [consumers.relative(file) for file in callers],
+        'consumer_closure': len(closure),
+        'unused_fields': sorted(key for key in fields if key not in consumed) if callers else [],
+    }
+    if sampler is not None:
+        example = sampler.example_for(fields)
+        rows = sampler.count(sql)
+        if rows is None and template.endswith(']'):
+            rows = 1
+        db_row = sum(sampler.wire_bytes(columns[name]) for name in columns)
+        db_wasted = sum(sampler.wire_bytes(columns[name]) for name in route['unread_columns'])
+        field_sizes = {key: sampler.field_bytes(key, [columns[name] for name in sorted(sources)
+                                                      if columns.get(name)], example)
+                       for key, sources in fields.items()}
+        response_row = sum(field_sizes.values())
+        response_wasted = sum(field_sizes[key] for key in route['unused_fields'])
+        route.update({
+            'example': example,
+            'rows': rows,
+            'db_bytes_per_row': round(db_row, 1),
+            'db_wasted_per_row': round(db_wasted, 1),
+            'response_bytes_per_row': round(response_row, 1),
+            'response_wasted_per_row': round(response_wasted, 1),
+            'response_wasted_share': round(response_wasted / response_row, 3) if response_row else 0.0,
+            'db_wasted_per_response': round(db_wasted * rows) if rows is not None else None,
+            'response_wasted_per_response': round(response_wasted * rows) if rows is not None else None,
+        })
+    return route
+
+
+def analyze(root='.', scale=DEFAULT_SCALE, sample=True, pattern='app/api/**/route.ts'):
+    """Analisa todas as rotas GET e devolve o relatório, da maior perda para a menor"""
+    catalog = local_db.load_catalog(root)
+    resolver = Resolver(catalog)
+    consumers = ConsumerIndex(root)
+    sampler = Sampler(catalog, scale, root) if sample else None
+    routes = []
+    try:
+        for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+            route = analyze_route(path, root, catalog, resolver, consumers, sampler)
+            if route is not None:
+                routes.append(route)
+    finally:
+        if sampler is not None:
+            sampler.close()
+
+    def weight(route):
+        per_row = route.get('response_wasted_per_row', 0) + route.get('db_wasted_per_row', 0)
+        return (-((route.get('rows') or 1) * per_row), -len(route['unused_fields']), route['route'])
+
+    routes.sort(key=weight)
+    return {
+        'version': 1,
+        'scale': scale if sample else None,
+        'summary': {
+            'routes': len(routes),
+            'select_star': sum(1 for route in routes if route['select_star']),
+            'with_unread_columns': sum(1 for route in routes if route['unread_columns']),
+            'with_unused_fields': sum(1 for route in routes if route['unused_fields']),
+            'without_consumers': sum(1 for route in routes if not route['consumers']),
+        },
+        'routes': routes,
+    }
+
+
+def _kb(value):
+    return f'{value / 1024:.1f} KB' if value is not None else '-'
+
+
+def format_report(report, show_all=False):
+    lines = []
+    if report['scale']:
+        lines.append(f"📊 Amostra: dados sintéticos do local_db com escala {report['scale']}")
+    for route in report['routes']:
+        if not show_all and not route['unread_columns'] and not route['unused_fields']:
+            continue
+        star = ' (SELECT *)' if route['select_star'] else ''
+        lines.append(f"\n📦 {route['route']}  {route['file']}:{route['line']}{star}")
+        rows = route.get('rows')
+        rows_text = f"{rows} linhas" if rows is not None else 'linhas conforme o filtro'
+        if route['unread_columns']:
+            detail = (f" ({route['db_wasted_per_row']:.0f} B/linha, {_kb(route['db_wasted_per_response'])}"
+                      f" por resposta com {rows_text})") if 'db_wasted_per_row' in route else ''
+            lines.append(f"  banco -> handler: {len(route['unread_columns'])} de {route['columns']} colunas "
+                         f"nunca lidas{detail}")
+            lines.append(f"    {', '.join(route['unread_columns'])}")
+        if not route['consumers']:
+            lines.append('  handler -> cliente: nenhum consumidor encontrado no front-end')
+            continue
+        consumers = ', '.join(route['consumers'][:3]) + (f" +{len(route['consumers']) - 3}"
+                                                         if len(route['consumers']) > 3 else '')
+        if route['unused_fields']:
+            detail = (f" ({route['response_wasted_per_row']:.0f} de {route['response_bytes_per_row']:.0f} B/linha, "
+                      f"{route['response_wasted_share']:.0%} do payload, {_kb(route['response_wasted_per_response'])}"
+                      f" por resposta)") if 'response_wasted_per_row' in route else ''
+            lines.append(f"  handler -> cliente: {len(route['unused_fields'])} de {route['fields']} campos sem uso "
+                         f"em {route['consumer_closure']} arquivos{detail}")
+            lines.append(f"    {', '.join(route['unused_fields'])}")
+            lines.append(f"    consumidores: {consumers}")
+        else:
+            lines.append(f"  ✅ handler -> cliente: todos os {route['fields']} campos usados ({consumers})")
+    summary = report['summary']
+    lines.append(f"\nTotal: {summary['routes']} rotas GET, {summary['select_star']} com SELECT *, "
+                 f"{summary['with_unread_columns']} com colunas não lidas, "
+                 f"{summary['with_unused_fields']} com campos sem uso, "
+                 f"{summary['without_consumers']} sem consumidor encontrado")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Colunas e campos buscados pelas rotas GET e não usados')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE,
+                        help='escala dos dados sintéticos da amostra (número de oportunidades)')
+    parser.add_argument('--no-sample', action='store_true',
+                        help='só a análise estática, sem estimar bytes')
+    parser.add_argument('--all', action='store_true', help='lista também as rotas sem desperdício')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    report = analyze(args.root, args.scale, sample=not args.no_sample)
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    print(format_report(report, args.all))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'\n📄 Relatório salvo em: {args.json_out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
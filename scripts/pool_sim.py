@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+
+"""
+Simulador de eventos discretos do pool de conexões de lib/mysql/client.ts
+O pool é criado com connectionLimit: 20 e queueLimit: 0 (fila sem limite, sem
+timeout de espera). Cada requisição do simulador segue o handler da rota:
+obtém conexões (getDbConnection ou pool.query), executa as consultas segurando
+a conexão (com o tempo de aplicação entre elas) e a devolve. O MySQL é um
+servidor com --db-cores consultas simultâneas e --db-max-connections conexões.
+Calibração com o que já coletamos:
+  - handlers: consultas e aquisições por handler do scripts/query_analyzer.py
+    (consultas em laço multiplicadas por --loop-iterations)
+  - tráfego: --trace (scripts/traffic_trace.py) dá a taxa e o mix por rota e a
+    duração mediana de cada rota, de onde sai a latência por consulta
+  - latência de consulta: --query-bench (linha de base do scripts/query_bench.py)
+    usa as medianas medidas; sem ela, lognormal com --query-ms/--query-sigma
+Para cada taxa, número de réplicas e tamanho de pool o relatório traz espera
+pelo pool, saturação (tempo com todas as conexões em uso), uso do banco e
+latência p50/p95/p99, e indica o menor pool que atende --target-wait-ms.
+Execute com: python3 scripts/pool_sim.py [--trace trafego.crmtrace] [--pool-sizes 5,10,20,40] [--replicas 1,2,4]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import statistics
+import sys
+from collections import Counter, deque
+
+import query_analyzer
+from load_test import default_mix
+from traffic_trace import read_trace
+
+DEFAULT_POOL_SIZES = '5,10,20,40'
+DEFAULT_REPLICAS = '1,2,4'
+CURRENT_POOL_SIZE = 20
+
+
+class Simulation:
+    """Relógio virtual e fila de eventos; processos são geradores que produzem comandos"""
+
+    def __init__(self):
+        self.now = 0.0
+        self._events = []
+        self._sequence = 0
+
+    def schedule(self, delay, callback, *args):
+        self._sequence += 1
+        heapq.heappush(self._events, (self.now + delay, self._sequence, callback, args))
+
+    def start(self, process):
+        self.schedule(0.0, self.resume, process, None)
+
+    def resume(self, process, value):
+        try:
+            command = process.send(value)
+        except StopIteration:
+            return
+        command(self, process)
+
+    def run(self, until):
+        while self._events and self._events[0][0] <= until:
+            self.now, _, callback, args = heapq.heappop(self._events)
+            callback(*args)
+        self.now = until
+
+
+class Delay:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self, sim, process):
+        sim.schedule(self.seconds, sim.resume, process, None)
+
+
+class TimeWeighted:
+    """Média no tempo de um valor que muda em instantes discretos"""
+
+    def __init__(self):
+        self.value = 0
+        self.area = 0.0
+        self.full_time = 0.0
+        self.last = 0.0
+
+    def update(self, now, value, full=False):
+        elapsed = now - self.last
+        self.area += self.value * elapsed
+        if full:
+            self.full_time += elapsed
+        self.value = value
+        self.last = now
+
+
+class Database:
+    """MySQL com db_cores consultas em paralelo e fila FIFO; recusa conexões além do limite"""
+
+    def __init__(self, cores, max_connections):
+        self.cores = cores
+        self.max_connections = max_connections
+        self.open_connections = 0
+        self.busy = 0
+        self.queue = deque()
+        self.usage = TimeWeighted()
+        self.peak_queue = 0
+
+    def query(self, service):
+        def command(sim, process):
+            if self.busy < self.cores:
+                self._begin(sim, process, service)
+            else:
+                self.queue.append((process, service))
+                self.peak_queue = max(self.peak_queue, len(self.queue))
+        return command
+
+    def _begin(self, sim, process, service):
+        self.usage.update(sim.now, self.busy + 1)
+        self.busy += 1
+        sim.schedule(service, self._end, sim, process)
+
+    def _end(self, sim, process):
+        self.usage.update(sim.now, self.busy - 1)
+        self.busy -= 1
+        if self.queue:
+            waiting, service = self.queue.popleft()
+            self._begin(sim, waiting, service)
+        sim.resume(process, None)
+
+
+class Pool:
+    """Pool do mysql2: abre conexões sob demanda até o limite; fila sem limite (queueLimit: 0)"""
+
+    def __init__(self, size, database):
+        self.size = size
+        self.database = database
+        self.opened = 0
+        self.idle = 0
+        self.leaked = 0
+        self.exhausted_at = None
+        self.waiters = deque()
+        self.in_use = TimeWeighted()
+        self.peak_waiters = 0
+
+    def acquire(self):
+        def command(sim, process):
+            if self.idle:
+                self.idle -= 1
+                self._grant(sim, process)
+            elif self.opened < self.size:
+                if self.database.open_connections >= self.database.max_connections:
+                    sim.resume(process, 'ER_CON_COUNT_ERROR')
+                    return
+                self.opened += 1
+                self.database.open_connections += 1
+                self._grant(sim, process)
+            else:
+                self.waiters.append(process)
+                self.peak_waiters = max(self.peak_waiters, len(self.waiters))
+        return command
+
+    def _grant(self, sim, process):
+        busy = self.in_use.value + 1
+        self.in_use.update(sim.now, busy, full=self.in_use.value >= self.size)
+        sim.schedule(0.0, sim.resume, process, None)
+
+    def release(self, sim, leak=False):
+        if leak:
+            # Conexão nunca devolvida: continua ocupada e o pool perde a vaga para sempre
+            self.leaked += 1
+            if self.leaked == self.size:
+                self.exhausted_at = sim.now
+            return
+        if self.waiters:
+            sim.schedule(0.0, sim.resume, self.waiters.popleft(), None)
+            return
+        self.idle += 1
+        self.in_use.update(sim.now, self.in_use.value - 1, full=self.in_use.value >= self.size)
+
+
+def lognormal(rng, median, sigma):
+    return median * math.exp(rng.gauss(0.0, sigma))
+
+
+class Workload:
+    """Mix de rotas com o plano de banco de cada handler e a latência de consulta"""
+
+    def __init__(self, routes, rate, latency, args, rng):
+        self.routes = routes
+        self.rate = rate
+        self.latency = latency
+        self.args = args
+        self.rng = rng
+        self.cumulative = []
+        total = 0.0
+        for route in routes:
+            total += route['weight']
+            self.cumulative.append(total)
+
+    def pick(self):
+        return self.rng.choices(self.routes, cum_weights=self.cumulative)[0]
+
+    def query_time(self, route):
+        if route.get('query_ms') is not None:
+            return lognormal(self.rng, route['query_ms'], self.args.query_sigma) / 1000.0
+        return self.latency(self.rng) / 1000.0
+
+
+def request(sim, replica, workload, route, stats, measured):
+    """Uma requisição: aplicação, aquisições com suas consultas, aplicação"""
+    args = workload.args
+    arrival = sim.now
+    waited = 0.0
+    yield Delay(args.app_ms / 2000.0)
+    for index, queries in enumerate(route['plan']):
+        started = sim.now
+        error = yield replica.acquire()
+        if error:
+            if measured:
+                stats['errors'][error] += 1
+            return
+        waited += sim.now - started
+        for position in range(queries):
+            if position:
+                yield Delay(args.gap_ms / 1000.0)
+            yield replica.database.query(workload.query_time(route))
+        replica.release(sim, leak=route['leaks'] and args.leaks and index == len(route['plan']) - 1)
+    yield Delay(args.app_ms / 2000.0)
+    if measured:
+        stats['latency'].append(sim.now - arrival)
+        stats['wait'].append(waited)
+
+
+def arrivals(sim, replicas, workload, stats, warmup):
+    rng = workload.rng
+    while True:
+        yield Delay(rng.expovariate(workload.rate))
+        route = workload.pick()
+        replica = replicas[rng.randrange(len(replicas))]
+        stats['started'] += 1
+        sim.start(request(sim, replica, workload, route, stats, sim.now >= warmup))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def simulate(workload, pool_size, replica_count, args, seed):
+    workload.rng.seed(seed)
+    sim = Simulation()
+    database = Database(args.db_cores, args.db_max_connections)
+    replicas = [Pool(pool_size, database) for _ in range(replica_count)]
+    stats = {'latency': [], 'wait': [], 'errors': Counter(), 'started': 0}
+    warmup = args.duration * args.warmup
+    sim.start(arrivals(sim, replicas, workload, stats, warmup))
+    sim.run(args.duration)
+
+    for pool in replicas:
+        pool.in_use.update(sim.now, pool.in_use.value, full=pool.in_use.value >= pool.size)
+    database.usage.update(sim.now, database.busy)
+    window = args.duration
+    latency = sorted(stats['latency'])
+    wait = sorted(stats['wait'])
+    completed = len(latency)
+    return {
+        'rate': round(workload.rate, 2),
+        'pool_size': pool_size,
+        'replicas': replica_count,
+        'connections': pool_size * replica_count,
+        'completed': completed,
+        'errors': dict(stats['errors']),
+        'stuck': sum(len(pool.waiters) for pool in replicas),
+        'leaked': sum(pool.leaked for pool in replicas),
+        'exhausted_s': min((pool.exhausted_at for pool in replicas if pool.exhausted_at is not None),
+                           default=None),
+        'throughput_rps': round(completed / (args.duration - warmup), 1) if args.duration > warmup else 0.0,
+        'latency_ms': {name: round(percentile(latency, fraction) * 1000, 2)
+                       for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))},
+        'wait_ms': {'mean': round(statistics.fmean(wait) * 1000, 3) if wait else 0.0,
+                    'p95': round(percentile(wait, 0.95) * 1000, 3),
+                    'p99': round(percentile(wait, 0.99) * 1000, 3),
+                    'max': round(wait[-1] * 1000, 3) if wait else 0.0},
+        'waited_pct': round(sum(1 for value in wait if value > 0) / completed * 100, 2) if completed else 0.0,
+        'saturation_pct': round(statistics.fmean(pool.in_use.full_time for pool in replicas) / window * 100, 2),
+        'mean_in_use': round(sum(pool.in_use.area for pool in replicas) / window / replica_count, 2),
+        'peak_waiters': max(pool.peak_waiters for pool in replicas),
+        'db_utilization_pct': round(database.usage.area / window / args.db_cores * 100, 1),
+        'db_peak_queue': database.peak_queue,
+        'over_max_connections': pool_size * replica_count > args.db_max_connections,
+    }
+
+
+def handler_plans(root, loop_iterations):
+    """(método, arquivo) -> consultas por aquisição e se o handler vaza a conexão"""
+    report = query_analyzer.analyze(root)
+    loops = Counter()
+    leaks = set()
+    for finding in report['findings']:
+        key = (finding['handler'], finding['file'])
+        if finding['rule'] == 'execute-in-loop':
+            loops[key] += 1
+        elif finding['rule'] == 'connection-not-released':
+            leaks.add(key)
+    plans = {}
+    for handler in report['handlers']:
+        key = (handler['handler'], handler['file'])
+        queries = handler['queries'] + loops[key] * (loop_iterations - 1)
+        acquisitions = handler['acquisitions'] or (1 if queries else 0)
+        if not queries:
+            plan = []
+        else:
+            # Consultas repartidas entre as aquisições, as primeiras ficam com o resto
+            base, extra = divmod(queries, acquisitions)
+            plan = [base + (1 if index < extra else 0) for index in range(acquisitions) if base or index < extra]
+        plans[key] = {'plan': plan, 'leaks': key in leaks}
+    return plans
+
+
+def route_file(template):
+    return f'app{template}/route.ts'
+
+
+def load_trace(path):
+    """Taxa, peso e duração mediana por (método, rota) de um trace do traffic_trace.py"""
+    durations = {}
+    first = last = None
+    total = 0
+    for item in read_trace(path):
+        durations.setdefault((item.method, item.route), []).append(item.duration_ms)
+        first = item.time_ms if first is None else min(first, item.time_ms)
+        last = item.time_ms if last is None else max(last, item.time_ms)
+        total += 1
+    span = (last - first) / 1000.0 if total else 0.0
+    routes = [{'method': method, 'route': route, 'weight': len(values),
+               'median_ms': statistics.median(values) if values else None}
+              for (method, route), values in durations.items()]
+    return routes, (total / span if span else None)
+
+
+def query_bench_sampler(path):
+    """Sorteia a mediana de uma consulta medida pelo query_bench (maior escala registrada)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        runs = json.load(f).get('runs', {})
+    if not runs:
+        raise ValueError(f'{path}: nenhuma execução registrada')
+    run = max(runs.values(), key=lambda item: item.get('scale', 0))
+    medians = [result['median_ms'] for result in run.get('queries', {}).values() if 'median_ms' in result]
+    if not medians:
+        raise ValueError(f'{path}: nenhuma consulta com mediana')
+    return lambda rng, sigma: lognormal(rng, rng.choice(medians), sigma), len(medians)
+
+
+def build_routes(args, plans):
+    trace_rate = None
+    if args.trace:
+        entries, trace_rate = load_trace(args.trace)
+    else:
+        entries = [{'method': entry['method'], 'route': entry['route'], 'weight': entry['weight'],
+                    'median_ms': None} for entry in default_mix()]
+    routes = []
+    unknown = 0
+    for entry in entries:
+        plan = plans.get((entry['method'], route_file(entry['route'])))
+        if plan is None:
+            unknown += entry['weight']
+            plan = {'plan': [1], 'leaks': False}
+        route = dict(entry, plan=plan['plan'], leaks=plan['leaks'], query_ms=None)
+        queries = sum(route['plan'])
+        if args.calibrate and entry['median_ms'] and queries:
+            # O que sobra da duração mediana depois da aplicação vira tempo por consulta
+            spare = entry['median_ms'] - args.app_ms - args.gap_ms * max(0, queries - len(route['plan']))
+            route['query_ms'] = max(0.05, spare / queries)
+        routes.append(route)
+    return routes, trace_rate, unknown
+
+
+def recommend(results, target_ms):
+    """Menor pool por taxa e réplicas com p99 de espera dentro do alvo e sem erros"""
+    best = {}
+    for row in results:
+        key = (row['rate'], row['replicas'])
+        fits = row['wait_ms']['p99'] <= target_ms and not row['errors'] and not row['stuck'] \
+            and not row['over_max_connections']
+        if fits and (key not in best or row['pool_size'] < best[key]['pool_size']):
+            best[key] = row
+    return [{'rate': rate, 'replicas': replicas, 'pool_size': row['pool_size'] if row else None}
+            for (rate, replicas), row in sorted(best.items())]
+
+
+def format_report(report):
+    settings = report['settings']
+    workload = report['workload']
+    lines = [f"📊 Pool de conexões: {workload['routes']} rotas ({workload['source']}), "
+             f"{workload['queries_per_request']:.2f} consultas e {workload['acquisitions_per_request']:.2f} "
+             f"aquisições por requisição, latência de consulta: {workload['latency']}",
+             f"   banco: {settings['db_cores']} núcleos, max_connections {settings['db_max_connections']}; "
+             f"{settings['duration']}s simulados"]
+    if workload['leaking_share_pct']:
+        lines.append(f"⚠️  {workload['leaking_share_pct']:.1f}% das requisições vão a handlers que não liberam a "
+                     f"conexão; {'simulado com --leaks' if settings['leaks'] else 'use --leaks para simular o vazamento'}")
+    if workload['unknown_share_pct']:
+        lines.append(f"⚠️  {workload['unknown_share_pct']:.1f}% das requisições sem handler conhecido "
+                     f"(assumida 1 consulta)")
+    lines.append(f"  {'req/s':>7}{'réplicas':>9}{'pool':>6}{'vazão':>8}{'esperou':>9}{'espera p99':>11}"
+                 f"{'máx':>9}{'saturado':>9}{'em uso':>8}{'banco':>7}{'p50 ms':>8}{'p99 ms':>8}  obs.")
+    for row in report['results']:
+        notes = []
+        if row['pool_size'] == CURRENT_POOL_SIZE:
+            notes.append('atual')
+        if row['errors']:
+            notes.append('erros: ' + ', '.join(f'{name} {count}' for name, count in row['errors'].items()))
+        if row['stuck']:
+            notes.append(f"{row['stuck']} na fila ao final")
+        if row['leaked']:
+            notes.append(f"{row['leaked']} vazadas")
+        if row['exhausted_s'] is not None:
+            notes.append(f"pool esgotado em {row['exhausted_s']:.1f}s")
+        if row['over_max_connections']:
+            notes.append('excede max_connections')
+        lines.append(f"  {row['rate']:>7.0f}{row['replicas']:>9}{row['pool_size']:>6}{row['throughput_rps']:>8.1f}"
+                     f"{row['waited_pct']:>8.1f}%{row['wait_ms']['p99']:>11.2f}{row['wait_ms']['max']:>9.1f}"
+                     f"{row['saturation_pct']:>8.1f}%{row['mean_in_use']:>8.2f}{row['db_utilization_pct']:>6.0f}%"
+                     f"{row['latency_ms']['p50']:>8.2f}{row['latency_ms']['p99']:>8.2f}  {'; '.join(notes)}")
+    lines.append('  esperou: requisições que aguardaram conexão; saturado: tempo com o pool todo em uso')
+    lines.append('')
+    lines.append(f"✅ Menor pool com espera p99 <= {settings['target_wait_ms']} ms")
+    if not report['recommendation']:
+        lines.append('  nenhuma combinação simulada atende o alvo')
+    for entry in report['recommendation']:
+        lines.append(f"  {entry['rate']:.0f} req/s, {entry['replicas']} réplica(s): connectionLimit {entry['pool_size']}")
+    return '\n'.join(lines)
+
+
+def parse_list(value, kind):
+    return [kind(item) for item in value.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simula o pool de conexões MySQL para vários tamanhos e réplicas')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--trace', help='trace do traffic_trace.py para taxa, mix e calibração por rota')
+    parser.add_argument('--query-bench', help='linha de base do query_bench.py com as medianas das consultas')
+    parser.add_argument('--rates', help='taxas de chegada em req/s (padrão: a do trace ou 200)')
+    parser.add_argument('--pool-sizes', default=DEFAULT_POOL_SIZES, help='connectionLimit por réplica')
+    parser.add_argument('--replicas', default=DEFAULT_REPLICAS, help='instâncias da aplicação, cada uma com seu pool')
+    parser.add_argument('--duration', type=float, default=60.0, help='segundos simulados')
+    parser.add_argument('--warmup', type=float, default=0.1, help='fração inicial descartada das estatísticas')
+    parser.add_argument('--query-ms', type=float, default=2.0, help='mediana da latência de uma consulta')
+    parser.add_argument('--query-sigma', type=float, default=0.6, help='dispersão lognormal da latência')
+    parser.add_argument('--no-calibrate', dest='calibrate', action='store_false',
+                        help='ignora as durações do trace na latência por consulta')
+    parser.add_argument('--app-ms', type=float, default=3.0, help='tempo de aplicação por requisição fora do banco')
+    parser.add_argument('--gap-ms', type=float, default=0.3,
+                        help='tempo de aplicação entre consultas segurando a conexão')
+    parser.add_argument('--loop-iterations', type=int, default=5,
+                        help='iterações assumidas para consultas dentro de laços')
+    parser.add_argument('--leaks', action='store_true',
+                        help='simula handlers que nunca chamam release() (a conexão não volta ao pool)')
+    parser.add_argument('--db-cores', type=int, default=4, help='consultas executadas em paralelo pelo MySQL')
+    parser.add_argument('--db-max-connections', type=int, default=151, help='max_connections do MySQL')
+    parser.add_argument('--target-wait-ms', type=float, default=5.0, help='espera p99 aceitável pelo pool')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    plans = handler_plans(args.root, args.loop_iterations)
+    routes, trace_rate, unknown = build_routes(args, plans)
+    if not routes:
+        parser.error('nenhuma rota no mix')
+    if args.query_bench:
+        try:
+            sampler, count = query_bench_sampler(args.query_bench)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        latency = lambda generator: sampler(generator, args.query_sigma)
+        latency_label = f'medianas de {count} consultas do query_bench'
+    else:
+        latency = lambda generator: lognormal(generator, args.query_ms, args.query_sigma)
+        latency_label = f'lognormal mediana {args.query_ms} ms, sigma {args.query_sigma}'
+    if any(route['query_ms'] is not None for route in routes):
+        latency_label += ' (calibrada por rota pelo trace)'
+    rates = parse_list(args.rates, float) if args.rates else [trace_rate or 200.0]
+
+    total_weight = sum(route['weight'] for route in routes)
+    results = []
+    for rate in rates:
+        workload = Workload(routes, rate, latency, args, rng)
+        for replicas in parse_list(args.replicas, int):
+            for pool_size in parse_list(args.pool_sizes, int):
+                results.append(simulate(workload, pool_size, replicas, args, args.seed))
+
+    report = {
+        'settings': {'duration': args.duration, 'db_cores': args.db_cores,
+                     'db_max_connections': args.db_max_connections, 'leaks': args.leaks,
+                     'target_wait_ms': args.target_wait_ms, 'seed': args.seed},
+        'workload': {
+            'source': f'trace {os.path.basename(args.trace)}' if args.trace else 'mix padrão do load_test',
+            'routes': len(routes),
+            'latency': latency_label,
+            'queries_per_request': sum(sum(route['plan']) * route['weight'] for route in routes) / total_weight,
+            'acquisitions_per_request': sum(len(route['plan']) * route['weight'] for route in routes) / total_weight,
+            'leaking_share_pct': round(sum(route['weight'] for route in routes if route['leaks'])
+                                       / total_weight * 100, 2),
+            'unknown_share_pct': round(unknown / total_weight * 100, 2),
+        },
+        'results': results,
+        'recommendation': recommend(results, args.target_wait_ms),
+    }
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Relatório salvo em: {args.json_out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
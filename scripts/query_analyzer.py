@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""
+Análise estática de acesso ao banco nas rotas da API do sistema CRM
+Percorre app/api/**/route.ts e aponta:
+  - execute-in-loop: consultas dentro de laços ou callbacks de iteração (N+1)
+  - connection-in-loop: getDbConnection() dentro de laços
+  - repeated-connection: handler que obtém mais de uma conexão por requisição
+  - connection-not-released: handler que obtém conexão e nunca chama release()
+  - select-star-view: SELECT * (ou alias.*) sobre uma view
+A saída em JSON permite acompanhar a contagem e falhar o CI quando ela piora.
+Execute com: python3 scripts/query_analyzer.py [--json] [--baseline arquivo] [--update-baseline]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+from sql_catalog import schema_files
+from ts_source import SourceFile
+
+RULES = (
+    'execute-in-loop',
+    'connection-in-loop',
+    'repeated-connection',
+    'connection-not-released',
+    'select-star-view',
+)
+HTTP_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'query_analyzer_baseline.json')
+
+_QUERY_CALL = r'\.(?:execute|query)\s*\('
+_CONNECTION_CALL = r'\bgetDbConnection\s*\('
+_VIEW_DEFINITION = re.compile(
+    r'\bCREATE\s+(?:OR\s+REPLACE\s+)?(?:ALGORITHM\s*=\s*\w+\s+)?(?:DEFINER\s*=\s*\S+\s+)?'
+    r'(?:SQL\s+SECURITY\s+\w+\s+)?VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(?:\w+`?\.`?)?(\w+)`?',
+    re.IGNORECASE)
+_SELECT_STAR = re.compile(
+    r'\bSELECT\s+(?:DISTINCT\s+)?((?:\w+\.)?\*)(.*?)\bFROM\s+`?(\w+)`?', re.IGNORECASE | re.DOTALL)
+
+
+def known_views(root='.'):
+    """Nomes de views definidas nos arquivos SQL do projeto"""
+    views = set()
+    for path in schema_files(root):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                views.update(name.lower() for name in _VIEW_DEFINITION.findall(f.read()))
+        except OSError:
+            continue
+    return views
+
+
+def is_view(name, views):
+    name = name.lower()
+    return name in views or name.startswith('view_')
+
+
+def _innermost(blocks, index):
+    containing = [block for block in blocks if block.start <= index <= block.end]
+    return min(containing, key=lambda block: block.end - block.start) if containing else None
+
+
+def analyze_file(path, views, root='.'):
+    """Devolve (achados, métricas por handler) de um arquivo route.ts"""
+    source = SourceFile.read(path)
+    relative = os.path.relpath(path, root).replace(os.sep, '/')
+    functions = source.functions()
+    loops = source.loops()
+    findings = []
+
+    # query() de lib/mysql/client obtém e libera uma conexão a cada chamada
+    uses_pool_query = re.search(
+        r"import\s*\{[^}]*\bquery\b[^}]*\}\s*from\s*['\"]@/lib/mysql/client['\"]", source.text)
+    pool_query = r'(?<![.\w])query\s*\(' if uses_pool_query else None
+
+    def calls(pattern, start=0, end=None):
+        return [match.start() for match in source.find_code(pattern, start, end)]
+
+    # Funções locais que consultam o banco também contam quando chamadas em laços
+    helpers = {}
+    for function in functions:
+        if function.name in HTTP_METHODS:
+            continue
+        body_queries = calls(_QUERY_CALL, function.start, function.end)
+        body_connections = calls(_CONNECTION_CALL, function.start, function.end)
+        if pool_query:
+            body_connections += calls(pool_query, function.start, function.end)
+        if body_queries or body_connections:
+            helpers[function.name] = (len(body_queries), len(body_connections))
+    helper_call = (r'(?<![.\w])(' + '|'.join(map(re.escape, helpers)) + r')\s*\(') if helpers else None
+
+    def add(rule, index, handler, message):
+        findings.append({'rule': rule, 'file': relative, 'line': source.line_of(index),
+                         'handler': handler, 'message': message})
+
+    handlers = []
+    for function in functions:
+        if function.name not in HTTP_METHODS or function.kind != 'exported':
+            continue
+        start, end = function.start, function.end
+        scoped_loops = [loop for loop in loops if start <= loop.start <= end]
+        queries = calls(_QUERY_CALL, start, end)
+        connections = calls(_CONNECTION_CALL, start, end)
+        pool_queries = calls(pool_query, start, end) if pool_query else []
+        helper_calls = []
+        if helper_call:
+            helper_calls = [(match.start(), match.group(1))
+                            for match in source.find_code(helper_call, start, end)]
+
+        for index in queries + pool_queries:
+            loop = _innermost(scoped_loops, index)
+            if loop is not None:
+                add('execute-in-loop', index, function.name,
+                    f'consulta dentro de {loop.name} (linha {source.line_of(loop.start)})')
+        for index, name in helper_calls:
+            loop = _innermost(scoped_loops, index)
+            if loop is not None:
+                add('execute-in-loop', index, function.name,
+                    f'{name}() consulta o banco e é chamada dentro de {loop.name} '
+                    f'(linha {source.line_of(loop.start)})')
+        for index in connections:
+            if _innermost(scoped_loops, index) is not None:
+                add('connection-in-loop', index, function.name, 'getDbConnection() dentro de laço')
+
+        acquisitions = len(connections) + len(pool_queries) + sum(
+            helpers[name][1] for _, name in helper_calls)
+        if acquisitions > 1:
+            add('repeated-connection', start, function.name,
+                f'{acquisitions} aquisições de conexão na mesma requisição')
+        if connections and not source.find_code(r'\.(?:release|end|destroy)\s*\(', start, end):
+            add('connection-not-released', connections[0], function.name,
+                'conexão obtida com getDbConnection() sem release()')
+
+        handlers.append({'file': relative, 'handler': function.name,
+                         'line': source.line_of(start),
+                         'queries': len(queries) + len(pool_queries) + sum(
+                             helpers[name][0] for _, name in helper_calls),
+                         'acquisitions': acquisitions})
+
+    for literal in source.literals:
+        for match in _SELECT_STAR.finditer(literal.text):
+            if is_view(match.group(3), views):
+                handler = _innermost([f for f in functions if f.name in HTTP_METHODS], literal.start)
+                add('select-star-view', literal.start, handler.name if handler else None,
+                    f'SELECT {match.group(1)} sobre a view {match.group(3)}')
+
+    return findings, handlers
+
+
+def analyze(root='.', pattern='app/api/**/route.ts'):
+    """Analisa todas as rotas e devolve o relatório completo"""
+    views = known_views(root)
+    findings = []
+    handlers = []
+    for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+        file_findings, file_handlers = analyze_file(path, views, root)
+        findings.extend(file_findings)
+        handlers.extend(file_handlers)
+    counts = Counter(finding['rule'] for finding in findings)
+    return {
+        'version': 1,
+        'summary': {
+            'files': len({handler['file'] for handler in handlers}),
+            'handlers': len(handlers),
+            'total': len(findings),
+            'by_rule': {rule: counts.get(rule, 0) for rule in RULES},
+        },
+        'findings': findings,
+        'handlers': handlers,
+    }
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare_with_baseline(report, baseline):
+    """Regras cuja contagem aumentou em relação à linha de base"""
+    previous = baseline.get('by_rule', {})
+    regressions = {}
+    for rule, count in report['summary']['by_rule'].items():
+        if count > previous.get(rule, 0):
+            regressions[rule] = {'baseline': previous.get(rule, 0), 'current': count}
+    return regressions
+
+
+def write_baseline(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'by_rule': report['summary']['by_rule']}, f, indent=2)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detecta N+1 e uso de conexões nas rotas da API')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='linha de base com a contagem por regra')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='grava a contagem atual como nova linha de base')
+    args = parser.parse_args(argv)
+
+    report = analyze(args.root)
+    baseline = load_baseline(args.baseline)
+    regressions = compare_with_baseline(report, baseline) if baseline else {}
+    report['regressions'] = regressions
+
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        for finding in report['findings']:
+            print(f"{finding['file']}:{finding['line']}: [{finding['rule']}] "
+                  f"{finding['handler'] or '-'}: {finding['message']}")
+        print(f"\nTotal: {report['summary']['total']} achados em "
+              f"{report['summary']['handlers']} handlers")
+        for rule, count in report['summary']['by_rule'].items():
+            print(f"  {rule}: {count}")
+        if args.json_out:
+            with open(args.json_out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+    for rule, change in regressions.items():
+        print(f"Regressão em {rule}: {change['baseline']} -> {change['current']}", file=sys.stderr)
+
+    if args.update_baseline:
+        write_baseline(report, args.baseline)
+        print(f"Linha de base atualizada em {args.baseline}", file=sys.stderr)
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark de latência das views e consultas de relatório do sistema CRM
+Carrega o schema MySQL em um banco local (mysqld se houver, senão SQLite com
+tradução de dialeto), gera dados sintéticos na escala pedida e mede as views,
+as consultas de schema/comercial/03_queries.sql e as consultas das rotas.
+Os tempos ficam em uma linha de base JSON por motor e escala, para comparar
+execuções futuras e acompanhar como cada consulta cresce com o volume.
+Execute com: python3 scripts/query_bench.py [--scale 10000[,100000]] [--save-baseline]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from local_db import DEFAULT_MYSQL_URL, load_catalog, open_database, prepare, synthetic_id
+from sql_catalog import split_statements
+
+REPORT_QUERIES_FILE = 'schema/comercial/03_queries.sql'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_bench_baseline.json')
+DEFAULT_THRESHOLD = 2.0
+# Diferenças abaixo disso são ruído de medição, não regressão
+MIN_REGRESSION_MS = 2.0
+
+# Consultas das rotas da API, com os parâmetros posicionais trocados por nomeados
+ROUTE_QUERIES = {
+    'rota:oportunidades': 'SELECT * FROM view_oportunidades ORDER BY data_criacao DESC',
+    'rota:oportunidade_por_id': 'SELECT * FROM view_oportunidades WHERE id = :oportunidade_id',
+    'rota:comercial_estatisticas': (
+        'SELECT id, titulo, cliente_id, cliente_nome, valor, responsavel_id, responsavel_nome, '
+        'prazo, status, oportunidade_descricao AS descricao, data_criacao, data_atualizacao, '
+        'tipo, tipo_faturamento, data_reuniao, hora_reuniao, probabilidade '
+        'FROM view_oportunidades WHERE data_criacao >= :data_inicio_periodo'),
+    'rota:documentos': (
+        'SELECT d.id, d.nome, d.tipo, d.url_documento, d.arquivo_path, d.formato, d.tamanho, '
+        'd.status, d.criado_por, u_creator.name as criado_por_nome, d.data_criacao, '
+        'd.data_atualizacao, d.licitacao_id, l.titulo as licitacao_titulo, d.descricao, '
+        'd.numero_documento, d.data_validade, d.categoria, '
+        "(SELECT GROUP_CONCAT(t.nome SEPARATOR ', ') FROM tags t JOIN documentos_tags dt "
+        'ON t.id = dt.tag_id WHERE dt.documento_id = d.id) as tags_concatenadas '
+        'FROM documentos d LEFT JOIN licitacoes l ON d.licitacao_id = l.id '
+        'LEFT JOIN users u_creator ON d.criado_por = u_creator.id '
+        'GROUP BY d.id ORDER BY d.data_criacao DESC'),
+    'rota:documentos_vencendo': (
+        "SELECT COUNT(*) as count FROM documentos WHERE status = 'ativo' AND data_validade "
+        'BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 30 DAY)'),
+    'rota:documentos_por_tipo': (
+        "SELECT tipo, COUNT(*) as count FROM documentos WHERE status = 'ativo' "
+        'AND tipo IS NOT NULL GROUP BY tipo'),
+    'rota:documentos_por_licitacao': (
+        "SELECT licitacao_id, COUNT(*) as count FROM documentos WHERE status = 'ativo' "
+        'AND licitacao_id IS NOT NULL GROUP BY licitacao_id'),
+    'rota:licitacoes_por_status': (
+        'SELECT status, COUNT(*) as count FROM licitacoes WHERE data_criacao >= :data_inicio_periodo '
+        'GROUP BY status'),
+    'rota:licitacoes_pregoes_proximos': (
+        'SELECT COUNT(*) as count FROM licitacoes WHERE data_abertura BETWEEN CURDATE() '
+        'AND DATE_ADD(CURDATE(), INTERVAL 7 DAY) AND data_criacao >= :data_inicio_periodo'),
+}
+
+
+def _slug(text):
+    text = re.sub(r'^Consulta\s+(?:para\s+)?', '', text.strip(), flags=re.I)
+    text = text.lower()
+    for accented, plain in zip('áàâãéêíóôõúç', 'aaaaeeiooouc'):
+        text = text.replace(accented, plain)
+    slug = re.sub(r'[^a-z0-9]+', '_', text).strip('_')
+    return slug if len(slug) <= 40 else slug[:40].rsplit('_', 1)[0]
+
+
+def report_queries(root='.'):
+    """Consultas de 03_queries.sql nomeadas pelo comentário que as precede"""
+    path = os.path.join(root, REPORT_QUERIES_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    lines = text.splitlines()
+    queries = {}
+    for statement, line in split_statements(text):
+        comment = next((lines[number].lstrip('- ').strip() for number in range(line - 2, -1, -1)
+                        if lines[number].startswith('--')), f'linha {line}')
+        name = f'relatorio:{_slug(comment)}'
+        while name in queries:
+            name += '_'
+        queries[name] = statement
+    return queries
+
+
+def view_queries(catalog):
+    return {f'view:{name}': f'SELECT * FROM {name}' for name in catalog.views}
+
+
+def default_params(database):
+    """Valores dos parâmetros nomeados, apontando para linhas que existem nos dados sintéticos"""
+    sample = database.scalar('SELECT id FROM oportunidades WHERE cliente_id IS NOT NULL '
+                             'AND responsavel_id IS NOT NULL ORDER BY id LIMIT 1')
+    sample = sample or synthetic_id('oportunidades', 0)
+    return {
+        'id': sample,
+        'oportunidade_id': sample,
+        'termo': '%contrato%',
+        'status': 'todos',
+        'cliente_id': 'todos',
+        'responsavel_id': 'todos',
+        'data_inicio': None,
+        'data_fim': None,
+        'data_inicio_periodo': (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'),
+    }
+
+
+def time_query(database, sql, params, repeat):
+    """Executa a consulta repeat vezes lendo todas as linhas; devolve (tempos em ms, linhas)"""
+    names = set(re.findall(r'(?<![:\w]):(\w+)', sql))
+    bound = {name: params.get(name) for name in names}
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor = database.execute(sql, bound)
+        rows = 0
+        while True:
+            chunk = cursor.fetchmany(1000)
+            if not chunk:
+                break
+            rows += len(chunk)
+        timings.append((time.perf_counter() - started) * 1000)
+        cursor.close()
+    return timings, rows
+
+
+def run_benchmark(database, queries, params, repeat=3, only=None, skipped=None):
+    """Mede cada consulta; skipped traz {nome: motivo} das que não podem rodar neste banco"""
+    results = {}
+    for name, sql in queries.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        if skipped and name in skipped:
+            results[name] = {'error': skipped[name]}
+            continue
+        try:
+            timings, rows = time_query(database, sql, params, repeat)
+        except Exception as error:
+            database.connection.rollback()
+            results[name] = {'error': str(error).splitlines()[0]}
+            continue
+        results[name] = {
+            'median_ms': round(statistics.median(timings), 3),
+            'min_ms': round(min(timings), 3),
+            'rows': rows,
+        }
+    return results
+
+
+def run_key(engine, scale, documents):
+    return f'{engine}:{scale}' if documents == scale else f'{engine}:{scale}:{documents}'
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_baseline(runs, path, previous=None):
+    """Mescla as execuções atuais na linha de base (uma entrada por motor e escala)"""
+    merged = dict((previous or {}).get('runs', {}))
+    for key, run in runs.items():
+        merged[key] = {field: value for field, value in run.items() if field != 'load'}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'runs': merged}, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def compare_with_baseline(run, previous_run, threshold=DEFAULT_THRESHOLD):
+    """Consultas cuja mediana piorou mais que threshold vezes (e mais que o ruído mínimo)"""
+    regressions = {}
+    for name, result in run['queries'].items():
+        before = previous_run.get('queries', {}).get(name)
+        if not before or 'median_ms' not in before or 'median_ms' not in result:
+            continue
+        if result['median_ms'] > before['median_ms'] * threshold \
+                and result['median_ms'] - before['median_ms'] > MIN_REGRESSION_MS:
+            regressions[name] = {'baseline_ms': before['median_ms'], 'current_ms': result['median_ms'],
+                                 'ratio': round(result['median_ms'] / max(before['median_ms'], 1e-6), 2)}
+    return regressions
+
+
+def scaling_table(runs, engine):
+    """Mediana de cada consulta em cada escala medida para o motor"""
+    keyed = sorted(((run['scale'], run) for run in runs.values() if run['engine'] == engine),
+                   key=lambda item: item[0])
+    table = {}
+    for scale, run in keyed:
+        for name, result in run['queries'].items():
+            if 'median_ms' in result:
+                table.setdefault(name, {})[scale] = result['median_ms']
+    return table
+
+
+def format_run(run, previous_run=None, regressions=None):
+    lines = [f"📊 {run['version']} — escala {run['scale']:,} oportunidades / "
+             f"{run['documents']:,} documentos".replace(',', '.')]
+    for name, result in run['queries'].items():
+        if 'error' in result:
+            lines.append(f"  ⚠️  {name}: erro — {result['error']}")
+            continue
+        line = f"  {name:<52} {result['median_ms']:>10.2f} ms  {result['rows']:>9} linhas"
+        before = (previous_run or {}).get('queries', {}).get(name, {})
+        if 'median_ms' in before and before['median_ms'] > 0:
+            line += f"  ({result['median_ms'] / before['median_ms']:.2f}x da linha de base)"
+        if regressions and name in regressions:
+            line += '  ❌ regressão'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def format_scaling(table):
+    scales = sorted({scale for values in table.values() for scale in values})
+    if len(scales) < 2:
+        return ''
+    header = f"  {'consulta':<52}" + ''.join(f'{scale:>12,}'.replace(',', '.') for scale in scales)
+    lines = ['📈 Crescimento por escala (mediana em ms)', header]
+    for name, values in table.items():
+        lines.append(f'  {name:<52}' + ''.join(
+            f'{values[scale]:>12.2f}' if scale in values else f"{'-':>12}" for scale in scales))
+    return '\n'.join(lines)
+
+
+def parse_scales(text):
+    return [int(value.replace('_', '').replace('.', '')) for value in text.split(',') if value.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark das views e consultas de relatório do CRM')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--scale', default='10000',
+                        help='oportunidades geradas; várias escalas separadas por vírgula')
+    parser.add_argument('--documents', type=int, help='documentos gerados (padrão: igual à escala)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help='execuções por consulta')
+    parser.add_argument('--only', action='append', help='mede só as consultas cujo nome contém o texto')
+    parser.add_argument('--engine', choices=('auto', 'sqlite', 'mysql'), default='auto',
+                        help='auto usa o mysqld local quando disponível')
+    parser.add_argument('--mysql-url', default=os.environ.get('BENCH_MYSQL_URL', DEFAULT_MYSQL_URL))
+    parser.add_argument('--db', help='arquivo SQLite (reaproveitado entre execuções da mesma escala)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='arquivo JSON da linha de base')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='grava os tempos desta execução na linha de base')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fator de piora que conta como regressão (padrão: 2.0)')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o resultado JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.root)
+    queries = {**view_queries(catalog), **report_queries(args.root), **ROUTE_QUERIES}
+    baseline = load_baseline(args.baseline) or {}
+    quiet = args.json_out == '-'
+    runs = {}
+    all_regressions = {}
+
+    for scale in parse_scales(args.scale):
+        documents = scale if args.documents is None else args.documents
+        temporary = None
+        path = args.db
+        if path and len(parse_scales(args.scale)) > 1:
+            root, extension = os.path.splitext(path)
+            path = f'{root}-{scale}{extension or ".sqlite"}'
+        if not path:
+            temporary = tempfile.NamedTemporaryFile(prefix='crm-bench-', suffix='.sqlite', delete=False)
+            temporary.close()
+            path = temporary.name
+        database = open_database(args.engine, path, args.mysql_url)
+        try:
+            def progress(table, rows, seconds):
+                if not quiet:
+                    print(f'  carregado {table}: {rows} linhas em {seconds:.1f}s')
+
+            started = time.perf_counter()
+            loaded, view_failures = prepare(database, catalog, scale, documents, args.seed, progress)
+            load_seconds = time.perf_counter() - started
+            if not quiet:
+                state = f'carga em {load_seconds:.1f}s' if loaded else 'dados reaproveitados'
+                print(f'🗄️  {database.version} ({state})')
+                for view, error in view_failures.items():
+                    print(f'  ⚠️  view {view} não pôde ser criada: {error}')
+            skipped = {f'view:{view}': f'view não criada: {error}' for view, error in view_failures.items()}
+            results = run_benchmark(database, queries, default_params(database), args.repeat, args.only,
+                                    skipped)
+            key = run_key(database.engine, scale, documents)
+            run = {'engine': database.engine, 'version': database.version, 'scale': scale,
+                   'documents': documents, 'repeat': args.repeat,
+                   'measured_at': datetime.now().isoformat(timespec='seconds'),
+                   'load': {table: rows for table, (rows, _) in loaded.items()},
+                   'queries': results}
+        finally:
+            database.close()
+            if temporary is not None:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(temporary.name + suffix):
+                        os.remove(temporary.name + suffix)
+        runs[key] = run
+        previous_run = baseline.get('runs', {}).get(key)
+        regressions = compare_with_baseline(run, previous_run, args.threshold) if previous_run else {}
+        if regressions:
+            all_regressions[key] = regressions
+        if not quiet:
+            print(format_run(run, previous_run, regressions))
+            print()
+
+    combined = {**baseline.get('runs', {}), **runs}
+    engines = {run['engine'] for run in runs.values()}
+    if not quiet:
+        for engine in sorted(engines):
+            text = format_scaling(scaling_table(combined, engine))
+            if text:
+                print(text)
+    report = {'runs': runs, 'regressions': all_regressions}
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Resultado salvo em: {args.json_out}')
+    for key, regressions in all_regressions.items():
+        for name, change in regressions.items():
+            print(f"Regressão em {key} {name}: {change['baseline_ms']:.2f} ms -> "
+                  f"{change['current_ms']:.2f} ms ({change['ratio']}x)", file=sys.stderr)
+
+    if args.save_baseline:
+        write_baseline(runs, args.baseline, baseline)
+        print(f'Linha de base atualizada em {args.baseline}', file=sys.stderr)
+        return 0
+    return 1 if all_regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
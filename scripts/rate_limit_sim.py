@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+
+"""
+Simulação e benchmark do limitador de requisições de lib/rate-limit.ts
+Reproduz a janela fixa atual (que varre todo o tokenCache a cada check, O(N))
+e compara com alternativas: janela fixa com expiração por heap ou por roda de
+tempo (timing wheel), contador de janela deslizante e token bucket.
+Dois experimentos:
+  - escala: custo por check com N IPs vivos no cache (até milhões)
+  - tráfego: fila de requisições simulada (IPs quentes, frios e abusivos) em
+    tempo virtual, medindo latência, pico de entradas, memória e precisão
+Precisão é medida sobre uma amostra de IPs: requisições liberadas além do
+limite em qualquer janela deslizante e requisições negadas que uma janela
+deslizante exata teria liberado.
+Observação: no código TypeScript o tokenCache é um Map de módulo, compartilhado
+por todos os limitadores (auth, api, upload...); a simulação mede um limitador.
+Execute com: python3 scripts/rate_limit_sim.py [--populations 1000,100000,1000000] [--json]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+DEFAULT_POPULATIONS = '1000,10000,100000,1000000'
+ALGORITHMS = ('fixed-sweep', 'fixed-heap', 'fixed-wheel', 'sliding-window', 'token-bucket')
+
+
+class FixedWindowSweep:
+    """Algoritmo atual: janela fixa por IP e varredura completa do Map a cada check"""
+
+    def __init__(self, limit, interval):
+        self.limit = limit
+        self.interval = interval
+        self.entries = {}
+
+    def check(self, key, now):
+        entries = self.entries
+        for other in [other for other, entry in entries.items() if entry[1] < now]:
+            del entries[other]
+        entry = entries.get(key)
+        if entry is None or entry[1] < now:
+            entry = [0, now + self.interval]
+            entries[key] = entry
+        entry[0] += 1
+        return entry[0] <= self.limit
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class FixedWindowHeap(FixedWindowSweep):
+    """Mesma janela fixa; expiração preguiçosa por heap de (reset, chave)"""
+
+    def __init__(self, limit, interval):
+        super().__init__(limit, interval)
+        self.heap = []
+
+    def check(self, key, now):
+        entries, heap = self.entries, self.heap
+        while heap and heap[0][0] < now:
+            reset, other = heapq.heappop(heap)
+            entry = entries.get(other)
+            if entry is not None and entry[1] == reset:
+                del entries[other]
+        entry = entries.get(key)
+        if entry is None or entry[1] < now:
+            entry = [0, now + self.interval]
+            entries[key] = entry
+            heapq.heappush(heap, (entry[1], key))
+        entry[0] += 1
+        return entry[0] <= self.limit
+
+
+class ExpiryWheel:
+    """Roda de tempo: chaves agrupadas por fatia de tick ms do prazo de expiração"""
+
+    def __init__(self, tick):
+        self.tick = tick
+        self.slots = {}
+        self.cursor = None
+
+    def schedule(self, key, deadline):
+        self.slots.setdefault(int(deadline // self.tick), []).append(key)
+
+    def expire(self, now, deadline_of, remove):
+        """Processa as fatias vencidas; deadline_of(chave) devolve o prazo atual (ou None)"""
+        current = int(now // self.tick)
+        if self.cursor is None:
+            self.cursor = current
+        if current <= self.cursor:
+            return
+        if current - self.cursor > len(self.slots):
+            due = sorted(slot for slot in self.slots if slot < current)
+        else:
+            due = range(self.cursor, current)
+        self.cursor = current
+        for slot in due:
+            for key in self.slots.pop(slot, ()):
+                deadline = deadline_of(key)
+                if deadline is None:
+                    continue
+                if deadline < now:
+                    remove(key)
+                else:
+                    self.schedule(key, deadline)
+
+
+class FixedWindowWheel(FixedWindowSweep):
+    """Janela fixa com expiração em O(1) amortizado pela roda de tempo"""
+
+    def __init__(self, limit, interval, tick=1000):
+        super().__init__(limit, interval)
+        self.wheel = ExpiryWheel(tick)
+
+    def _deadline(self, key):
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def _remove(self, key):
+        del self.entries[key]
+
+    def check(self, key, now):
+        self.wheel.expire(now, self._deadline, self._remove)
+        entry = self.entries.get(key)
+        if entry is None or entry[1] < now:
+            if entry is None:
+                self.wheel.schedule(key, now + self.interval)
+            entry = [0, now + self.interval]
+            self.entries[key] = entry
+        entry[0] += 1
+        return entry[0] <= self.limit
+
+
+class SlidingWindowCounter(FixedWindowWheel):
+    """Janela deslizante aproximada: contagem da janela anterior ponderada pela sobreposição"""
+
+    def _deadline(self, key):
+        entry = self.entries.get(key)
+        # Depois de duas janelas sem uso a entrada não influencia mais nenhuma decisão
+        return entry[0] + 2 * self.interval if entry is not None else None
+
+    def check(self, key, now):
+        self.wheel.expire(now, self._deadline, self._remove)
+        interval = self.interval
+        window = now - now % interval
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = [window, 0, 0]
+            self.entries[key] = entry
+            self.wheel.schedule(key, window + 2 * interval)
+        elif entry[0] != window:
+            entry[1] = entry[2] if window - entry[0] == interval else 0
+            entry[2] = 0
+            entry[0] = window
+        estimate = entry[1] * (1 - (now - window) / interval) + entry[2]
+        if estimate < self.limit:
+            entry[2] += 1
+            return True
+        return False
+
+
+class TokenBucket(FixedWindowWheel):
+    """Balde de fichas: capacidade limit, reposição de limit fichas por intervalo"""
+
+    def _deadline(self, key):
+        entry = self.entries.get(key)
+        # Um balde cheio equivale a um balde novo e pode ser descartado
+        return entry[1] + self.interval if entry is not None else None
+
+    def check(self, key, now):
+        self.wheel.expire(now, self._deadline, self._remove)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = [float(self.limit), now]
+            self.entries[key] = entry
+            self.wheel.schedule(key, now + self.interval)
+        else:
+            entry[0] = min(self.limit, entry[0] + (now - entry[1]) * self.limit / self.interval)
+            entry[1] = now
+        if entry[0] >= 1:
+            entry[0] -= 1
+            return True
+        return False
+
+
+FACTORIES = {
+    'fixed-sweep': FixedWindowSweep,
+    'fixed-heap': FixedWindowHeap,
+    'fixed-wheel': FixedWindowWheel,
+    'sliding-window': SlidingWindowCounter,
+    'token-bucket': TokenBucket,
+}
+
+
+def ip_of(index):
+    return f'{10 + (index >> 24)}.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)] if ordered else 0.0
+
+
+def measure_scaling(name, population, checks, limit, interval, budget, seed=42):
+    """Custo por check com population IPs vivos; memória medida durante o preenchimento"""
+    limiter = FACTORIES[name](limit, interval)
+    keys = [ip_of(index) for index in range(population)]
+    now = 0.0
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fill_started = time.perf_counter()
+    # Preenche o Map direto: pela varredura o preenchimento custaria O(N²)
+    if name == 'fixed-sweep':
+        for key in keys:
+            limiter.entries[key] = [1, now + interval]
+    else:
+        for key in keys:
+            limiter.check(key, now)
+    fill_seconds = time.perf_counter() - fill_started
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    rng = random.Random(seed)
+    timings = []
+    started = time.perf_counter()
+    for _ in range(checks):
+        key = keys[rng.randrange(population)]
+        now += 0.001
+        check_started = time.perf_counter()
+        limiter.check(key, now)
+        timings.append((time.perf_counter() - check_started) * 1e6)
+        if time.perf_counter() - started > budget:
+            break
+    del keys
+    return {
+        'algorithm': name,
+        'population': population,
+        'checks': len(timings),
+        'mean_us': round(sum(timings) / len(timings), 3),
+        'p50_us': round(percentile(timings, 0.5), 3),
+        'p99_us': round(percentile(timings, 0.99), 3),
+        'bytes_per_entry': round(used / population, 1) if population else 0.0,
+        'fill_seconds': round(fill_seconds, 3),
+        'truncated': len(timings) < checks,
+    }
+
+
+def traffic(seed, ips, rate, duration, hot_share=0.8, hot_ips=1000, abusers=20, abuse_rate=20.0):
+    """Gera (t em ms, índice do IP) em ordem de tempo; memória constante"""
+    rng = random.Random(seed)
+    now = 0.0
+    end = duration * 1000.0
+    total_rate = rate + abusers * abuse_rate
+    abuse_share = abusers * abuse_rate / total_rate if total_rate else 0
+    while True:
+        now += rng.expovariate(total_rate) * 1000.0
+        if now >= end:
+            return
+        draw = rng.random()
+        if draw < abuse_share:
+            yield now, ips + rng.randrange(abusers)
+        elif rng.random() < hot_share:
+            yield now, rng.randrange(min(hot_ips, ips))
+        else:
+            yield now, rng.randrange(ips)
+
+
+class AccuracyTracker:
+    """Confere as decisões de uma amostra de IPs contra uma janela deslizante exata"""
+
+    def __init__(self, limit, interval, sample):
+        self.limit = limit
+        self.interval = interval
+        self.sample = sample
+        self.history = {}
+        self.checked = self.excess = self.wrongly_rejected = 0
+        self.max_burst = 0
+
+    def sampled(self, index):
+        return (index * 2654435761) % 10000 < self.sample * 10000
+
+    def record(self, index, now, allowed):
+        window = self.history.get(index)
+        if window is None:
+            window = self.history[index] = deque()
+        while window and window[0] <= now - self.interval:
+            window.popleft()
+        self.checked += 1
+        if allowed:
+            window.append(now)
+            if len(window) > self.limit:
+                self.excess += 1
+            self.max_burst = max(self.max_burst, len(window))
+        elif len(window) < self.limit:
+            self.wrongly_rejected += 1
+
+    def summary(self):
+        checked = self.checked or 1
+        return {
+            'sampled_requests': self.checked,
+            'excess_allowed_pct': round(100.0 * self.excess / checked, 3),
+            'wrongly_rejected_pct': round(100.0 * self.wrongly_rejected / checked, 3),
+            'max_burst_ratio': round(self.max_burst / self.limit, 2),
+        }
+
+
+def measure_traffic(name, args, bytes_per_entry):
+    limiter = FACTORIES[name](args.limit, args.interval_ms)
+    tracker = AccuracyTracker(args.limit, args.interval_ms, args.sample)
+    timings = []
+    requests = allowed_total = peak = 0
+    started = time.perf_counter()
+    truncated = False
+    for now, index in traffic(args.seed, args.ips, args.rate, args.duration, abusers=args.abusers,
+                              abuse_rate=args.abuse_rate):
+        key = ip_of(index)
+        check_started = time.perf_counter()
+        allowed = limiter.check(key, now)
+        timings.append((time.perf_counter() - check_started) * 1e6)
+        requests += 1
+        allowed_total += allowed
+        if requests % 256 == 0:
+            peak = max(peak, len(limiter))
+            if time.perf_counter() - started > args.budget:
+                truncated = True
+                break
+        if tracker.sampled(index):
+            tracker.record(index, now, allowed)
+    peak = max(peak, len(limiter))
+    return {
+        'algorithm': name,
+        'requests': requests,
+        'allowed_pct': round(100.0 * allowed_total / requests, 2) if requests else 0.0,
+        'mean_us': round(sum(timings) / len(timings), 3) if timings else 0.0,
+        'p50_us': round(percentile(timings, 0.5), 3),
+        'p99_us': round(percentile(timings, 0.99), 3),
+        'max_us': round(max(timings, default=0.0), 1),
+        'peak_entries': peak,
+        'peak_bytes': int(peak * bytes_per_entry),
+        'accuracy': tracker.summary(),
+        'truncated': truncated,
+    }
+
+
+def format_report(report):
+    lines = ['📊 Custo por check com N IPs vivos (µs)']
+    lines.append(f"  {'algoritmo':<16}{'N':>10}{'média':>12}{'p50':>10}{'p99':>10}{'bytes/IP':>10}")
+    for row in report['scaling']:
+        mark = ' (parcial)' if row['truncated'] else ''
+        lines.append(f"  {row['algorithm']:<16}{row['population']:>10}{row['mean_us']:>12.2f}"
+                     f"{row['p50_us']:>10.2f}{row['p99_us']:>10.2f}{row['bytes_per_entry']:>10.0f}{mark}")
+    if report['traffic']:
+        settings = report['settings']
+        lines.append('')
+        lines.append(f"📊 Tráfego simulado: {settings['ips']} IPs, {settings['rate']} req/s por "
+                     f"{settings['duration']}s, limite {settings['limit']}/{settings['interval_ms']:.0f} ms")
+        lines.append(f"  {'algoritmo':<16}{'reqs':>9}{'liberadas':>11}{'média µs':>10}{'p99 µs':>9}"
+                     f"{'pico IPs':>10}{'memória':>10}{'excesso':>9}{'negadas':>9}{'rajada':>8}")
+        for row in report['traffic']:
+            accuracy = row['accuracy']
+            mark = ' (parcial)' if row['truncated'] else ''
+            lines.append(f"  {row['algorithm']:<16}{row['requests']:>9}{row['allowed_pct']:>10.1f}%"
+                         f"{row['mean_us']:>10.2f}{row['p99_us']:>9.1f}{row['peak_entries']:>10}"
+                         f"{row['peak_bytes'] / 1e6:>8.1f}MB{accuracy['excess_allowed_pct']:>8.2f}%"
+                         f"{accuracy['wrongly_rejected_pct']:>8.2f}%{accuracy['max_burst_ratio']:>7.2f}x{mark}")
+        lines.append('  excesso: liberadas além do limite numa janela deslizante; negadas: recusadas com '
+                     'cota disponível; rajada: máximo na janela / limite')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simula e compara algoritmos para lib/rate-limit.ts')
+    parser.add_argument('--algorithms', default=','.join(ALGORITHMS),
+                        help=f'lista separada por vírgula entre: {", ".join(ALGORITHMS)}')
+    parser.add_argument('--populations', default=DEFAULT_POPULATIONS, help='IPs vivos no teste de escala')
+    parser.add_argument('--checks', type=int, default=2000, help='checks medidos por população')
+    parser.add_argument('--limit', type=int, default=100, help='requisições por janela (padrão da API)')
+    parser.add_argument('--interval-ms', type=float, default=60000.0)
+    parser.add_argument('--ips', type=int, default=100000, help='IPs distintos no tráfego simulado')
+    parser.add_argument('--rate', type=float, default=2000.0, help='requisições por segundo (tempo virtual)')
+    parser.add_argument('--duration', type=float, default=300.0, help='segundos de tráfego (tempo virtual)')
+    parser.add_argument('--abusers', type=int, default=20, help='IPs que excedem o limite')
+    parser.add_argument('--abuse-rate', type=float, default=20.0, help='req/s de cada IP abusivo')
+    parser.add_argument('--sample', type=float, default=0.05, help='fração de IPs conferida na precisão')
+    parser.add_argument('--budget', type=float, default=20.0,
+                        help='segundos máximos por medição (a varredura O(N) é interrompida)')
+    parser.add_argument('--no-traffic', action='store_true', help='só o teste de escala')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FACTORIES]
+    if unknown:
+        parser.error(f'algoritmos desconhecidos: {", ".join(unknown)}')
+    populations = [int(value) for value in args.populations.split(',') if value.strip()]
+
+    scaling = []
+    for name in names:
+        for population in populations:
+            scaling.append(measure_scaling(name, population, args.checks, args.limit, args.interval_ms,
+                                           args.budget, args.seed))
+    per_entry = {}
+    for row in scaling:
+        per_entry[row['algorithm']] = row['bytes_per_entry']
+    results = []
+    if not args.no_traffic:
+        for name in names:
+            results.append(measure_traffic(name, args, per_entry.get(name, 0.0)))
+
+    report = {
+        'settings': {'limit': args.limit, 'interval_ms': args.interval_ms, 'ips': args.ips, 'rate': args.rate,
+                     'duration': args.duration, 'abusers': args.abusers, 'sample': args.sample,
+                     'seed': args.seed},
+        'scaling': scaling,
+        'traffic': results,
+    }
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'📄 Relatório salvo em: {args.json_out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
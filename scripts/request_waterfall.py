@@ -0,0 +1,849 @@
+#!/usr/bin/env python3
+
+"""
+Cascata de requisições na montagem das páginas do sistema CRM
+Para cada app/(app)/*/page.tsx monta o grafo dos fetch disparados ao montar a
+página: os useEffect da própria página e os dos hooks que ela usa (cada
+chamada de hook é uma instância, como no React), seguindo as funções chamadas
+até o fetch — direto ou por um wrapper como makeAuthenticatedRequest(url) —
+e ignorando os blocos catch (novas tentativas após refresh do token).
+Em cada função:
+  - await seguido de outra chamada vira uma aresta sequencial; ela é de dados
+    quando a chamada seguinte usa algo declarado depois do await ou quando a
+    anterior é uma escrita (POST/PUT/PATCH/DELETE)
+  - Promise.all agrupa chamadas paralelas
+  - fetch dentro de for/while é um por item em série; em .map/.forEach, um
+    por item em paralelo
+  - um efeito cujas dependências incluem dados de um hook espera os fetch de
+    montagem daquele hook
+Aponta awaits sequenciais sem dependência de dados, o mesmo endpoint GET
+buscado mais de uma vez e fetch por item, e estima as idas e voltas (RTT) da
+montagem agora e com o plano otimizado (duplicatas removidas, arestas
+sequenciais paralelizadas e buscas por item em lote), respeitando o limite de
+conexões simultâneas por host do navegador.
+Com --replay a estimativa é conferida executando os dois planos contra o
+servidor de apoio (scripts/stub_server.py) com latência injetada.
+Providers do layout (AuthProvider) ficam fora: montam antes da página.
+Execute com: python3 scripts/request_waterfall.py [--items 10] [--replay [--latency-ms 40]] [--json arquivo|-]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+from load_test import ConnectionPool
+from overfetch_analyzer import resolve_import
+from stub_server import StubServer
+from ts_source import SourceFile
+
+PAGE_GLOB = 'app/(app)/*/page.tsx'
+LOOP_GLOBS = ('hooks/**/*.ts', 'hooks/**/*.tsx', 'components/**/*.tsx', 'app/(app)/**/*.tsx')
+DEFAULT_ITEMS = 10
+# Conexões HTTP/1.1 simultâneas por host nos navegadores
+BROWSER_SLOTS = 6
+DEFAULT_LATENCY_MS = 40.0
+MAX_DEPTH = 8
+REPLAY_PARAM = '00000000-0000-0000-0000-000000000001'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'function', 'return', 'await', 'async', 'typeof',
+            'new', 'import', 'super', 'do', 'else', 'try', 'with', 'void', 'delete', 'in', 'of', 'case',
+            'const', 'let', 'var', 'throw', 'true', 'false', 'null', 'undefined', 'this'}
+
+_CALL = re.compile(r'(?<![\w.$])([A-Za-z_$][\w$]*)\s*\(')
+# Chaves de objeto ({ method: 'GET' }) não são referências
+_IDENTIFIER = re.compile(r'(?<![\w.$])[A-Za-z_$][\w$]*(?![\w$]|\s*:(?!:))')
+_CALLBACK = re.compile(r'\b(?:const|let)\s+(\w+)\s*=\s*(?:useCallback|useMemo)\s*\(')
+_HOOK_CALL = re.compile(r'\b(?:const|let)\s+(?:\{([^{}]*)\}|(\w+))\s*=\s*(use[A-Z]\w*)\s*\(')
+_DECLARED = re.compile(r'\b(?:const|let|var)\s+(?:(\w+)|[{\[]([^}\]=]*)[}\]])|(?<![\w.$])(\w+)\s*=(?![=>])')
+
+
+@dataclass
+class Callable:
+    """Função nomeada do arquivo: declaração, const = () => {} ou useCallback"""
+    name: str
+    start: int
+    body: int
+    end: int
+    params: list
+
+
+@dataclass
+class Site:
+    """Chamada encontrada no corpo de uma função"""
+    name: str
+    start: int
+    end: int
+    awaited: bool
+    group: tuple = None
+    loop: str = None
+    names: set = field(default_factory=set)
+    url: str = None
+    method: str = 'GET'
+
+
+@dataclass
+class Fetch:
+    """Nó do grafo: uma requisição (ou N, quando por item) disparada na montagem"""
+    id: int
+    method: str
+    url: str
+    endpoint: str
+    kind: str
+    origin: str
+    via: tuple
+    deps: dict = field(default_factory=dict)
+
+
+def _split(masked, start, end):
+    """Trechos separados por vírgula no nível mais externo de masked[start:end]"""
+    spans, depth, begin = [], 0, start
+    for index in range(start, end):
+        char = masked[index]
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            spans.append((begin, index))
+            begin = index + 1
+    if masked[begin:end].strip():
+        spans.append((begin, end))
+    return spans
+
+
+def _trim(masked, span):
+    start, end = span
+    while start < end and masked[start].isspace():
+        start += 1
+    while end > start and masked[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def endpoint_key(url):
+    """'/api/x/${id}?a=1&b=${v}' -> '/api/x/[param]?a=1&b' (chave para achar duplicatas)"""
+    path, _, query = url.partition('?')
+    path = re.sub(r'\$\{[^}]*\}', '[param]', path).rstrip('/') or '/'
+    keys = []
+    for part in query.split('&'):
+        name, _, value = part.partition('=')
+        if name and not name.startswith('$'):
+            keys.append(part if value and '${' not in value else name)
+    return path + ('?' + '&'.join(sorted(keys)) if keys else '')
+
+
+def page_route(relative):
+    """app/(app)/comercial/page.tsx -> /comercial"""
+    parts = [part for part in relative.split('/')[1:-1] if not part.startswith('(')]
+    return '/' + '/'.join(parts)
+
+
+class Module:
+    """Arquivo TS/TSX com as funções, blocos catch, Promise.all e laços localizados"""
+
+    def __init__(self, root, path):
+        self.path = path
+        self.relative = os.path.relpath(path, root).replace(os.sep, '/')
+        self.source = source = SourceFile.read(path)
+        self.callables = self._callables()
+        self.catches = []
+        for match in source.find_code(r'(?<![\w.$])catch\s*(?:\([^()]*\)\s*)?\{'):
+            self.catches.append((match.start(), source.matching(match.end() - 1)))
+        self.groups = []
+        for match in source.find_code(r'(?<![\w.$])Promise\.all(?:Settled)?\s*\('):
+            awaited = bool(re.search(r'\b(?:await|return)\s*$', source.masked[max(0, match.start() - 12):match.start()]))
+            self.groups.append((match.end() - 1, source.matching(match.end() - 1), awaited))
+        self.loops = source.loops()
+        self.wrappers = self._wrappers()
+
+    def _callables(self):
+        source = self.source
+        found = []
+        for block in source.functions():
+            head = source.find_code(r'\(', block.start, block.end)
+            if not head:
+                continue
+            params_end = source.matching(head[0].start())
+            body = re.compile(r'=>|\{').search(source.masked, params_end + 1)
+            found.append(Callable(block.name, block.start, body.start() if body else params_end,
+                                  block.end, self._params(head[0].start(), params_end)))
+        for match in _CALLBACK.finditer(source.masked):
+            args_end = source.matching(match.end() - 1)
+            head = source.find_code(r'\(', match.end(), args_end)
+            params = []
+            body = match.end()
+            if head:
+                params_end = source.matching(head[0].start())
+                params = self._params(head[0].start(), params_end)
+                body = params_end + 1
+            found.append(Callable(match.group(1), match.start(), body, args_end, params))
+        found.sort(key=lambda item: item.start)
+        return found
+
+    def _params(self, start, end):
+        names = []
+        for span in _split(self.source.masked, start + 1, end):
+            match = re.match(r'\s*(?:\.\.\.)?(\w+)', self.source.masked[span[0]:span[1]])
+            names.append(match.group(1) if match else None)
+        return names
+
+    def _wrappers(self):
+        """Funções que repassam um parâmetro como URL do fetch: nome -> índice do parâmetro"""
+        wrappers = {}
+        for match in _CALL.finditer(self.source.masked):
+            if match.group(1) != 'fetch':
+                continue
+            args = _split(self.source.masked, match.end(), self.source.matching(match.end() - 1))
+            if not args:
+                continue
+            start, end = _trim(self.source.masked, args[0])
+            argument = self.source.masked[start:end]
+            if not re.fullmatch(r'\w+', argument):
+                continue
+            for function in sorted(self.enclosing(match.start()), key=lambda item: -item.start):
+                if argument in function.params:
+                    if not self._assigned(argument, function.body, match.start()):
+                        wrappers[function.name] = function.params.index(argument)
+                    break
+        return wrappers
+
+    def enclosing(self, position):
+        return [function for function in self.callables if function.start < position <= function.end]
+
+    def resolve(self, name, position):
+        """Definição visível de name em position (a declarada mais perto, no mesmo escopo)"""
+        best = None
+        for function in self.callables:
+            if function.name != name:
+                continue
+            scopes = [other for other in self.callables
+                      if other is not function and other.start < function.start <= other.end]
+            scope = max(scopes, key=lambda other: other.start, default=None)
+            visible = scope is None or scope.start < position <= scope.end
+            if visible and (best is None or function.start > best.start):
+                best = function
+        return best
+
+    def _assigned(self, name, start, end):
+        """Literal atribuído a name entre start e end (o último antes de end)"""
+        found = None
+        for match in re.finditer(rf'(?<![\w.$]){re.escape(name)}\s*(?::[^=;]+)?=(?![=>])\s*', self.source.masked[:end]):
+            if match.start() < start:
+                continue
+            literal = self.literal_at(match.end())
+            if literal is not None:
+                found = literal.text
+        return found
+
+    def literal_at(self, position):
+        for literal in self.source.literals:
+            if literal.start == position:
+                return literal
+        return None
+
+    def line(self, position):
+        return f'{self.relative}:{self.source.line_of(position)}'
+
+    def text_names(self, start, end):
+        """Identificadores usados no trecho, incluindo os ${...} dos templates"""
+        names = set(_IDENTIFIER.findall(self.source.masked[start:end]))
+        for literal in self.source.literals_between(start, end):
+            for expression in re.findall(r'\$\{([^}]*)\}', literal.text):
+                names |= set(_IDENTIFIER.findall(expression))
+        return names - KEYWORDS
+
+    def declared(self, start, end):
+        """Nomes declarados ou atribuídos no trecho, fora das funções aninhadas"""
+        nested = [function for function in self.callables if start <= function.start and function.end <= end]
+        names = set()
+        for match in _DECLARED.finditer(self.source.masked, start, end):
+            if any(function.body < match.start() <= function.end for function in nested):
+                continue
+            if match.group(2):
+                names |= set(_IDENTIFIER.findall(match.group(2)))
+            names.add(match.group(1) or match.group(3))
+        return names - {None}
+
+    def sites(self, start, end, known):
+        """Chamadas a fetch, a wrappers e a funções conhecidas no trecho, em ordem"""
+        masked = self.source.masked
+        nested = [function for function in self.callables if start < function.start and function.end <= end]
+        catches = [span for span in self.catches if start <= span[0] and span[1] <= end]
+        found = []
+        for match in _CALL.finditer(masked, start, end):
+            name, position = match.group(1), match.start(1)
+            if name != 'fetch' and name not in self.wrappers and name not in known:
+                continue
+            if re.search(r'\bfunction\s*$', masked[max(0, position - 10):position]):
+                continue
+            if any(function.start <= position <= function.end for function in nested):
+                continue
+            if any(low <= position <= high for low, high in catches):
+                continue
+            close = self.source.matching(match.end() - 1)
+            awaited = bool(re.search(r'\b(?:await|return)\s*$', masked[max(0, position - 12):position]))
+            site = Site(name, position, close, awaited)
+            groups = [group for group in self.groups if group[0] < position <= group[1] and start <= group[0]]
+            if groups:
+                site.group = max(groups, key=lambda group: group[0])
+            loops = [loop for loop in self.loops if start < loop.start < position <= loop.end]
+            if loops:
+                loop = max(loops, key=lambda loop: loop.start)
+                site.loop = 'parallel' if loop.kind == 'callback' or not site.awaited else 'seq'
+            site.names = self.text_names(match.end(), close)
+            if name == 'fetch' or name in self.wrappers:
+                if not self._fetch_target(site, match.end(), close, start):
+                    continue
+            else:
+                callee = self.resolve(name, position)
+                if callee is not None and start < callee.start and callee.end <= end:
+                    site.names |= (self.text_names(callee.body, callee.end)
+                                   - self.declared(callee.body, callee.end) - set(callee.params))
+                    # A assinatura também é resolvida na chamada: valores padrão e tipos
+                    # dos parâmetros (payload: typeof payloadCompleto) ligam o argumento
+                    # a nomes atribuídos depois do await anterior
+                    site.names |= (self.text_names(callee.start, callee.body)
+                                   - set(callee.params) - {callee.name})
+            found.append(site)
+        return found
+
+    def _fetch_target(self, site, args_start, args_end, scope_start):
+        masked = self.source.masked
+        args = _split(masked, args_start, args_end)
+        index = self.wrappers.get(site.name, 0) if site.name != 'fetch' else 0
+        if len(args) <= index:
+            return False
+        start, end = _trim(masked, args[index])
+        literal = self.literal_at(start)
+        if literal is not None and literal.end == end:
+            site.url = literal.text
+        elif re.fullmatch(r'\w+', masked[start:end]):
+            site.url = (self._assigned(masked[start:end], scope_start, site.start)
+                        or self._assigned(masked[start:end], 0, site.start))
+        if not site.url or not site.url.startswith('/api/'):
+            return False
+        options = self.source.text[args_start:args_end]
+        method = re.search(r'\bmethod\s*:\s*[\'"](\w+)[\'"]', options)
+        site.method = method.group(1).upper() if method else 'GET'
+        return True
+
+
+class Project:
+    """Cache dos módulos e resolução de hooks importados"""
+
+    def __init__(self, root):
+        self.root = root
+        self._modules = {}
+
+    def module(self, path):
+        path = os.path.normpath(path)
+        if path not in self._modules:
+            try:
+                self._modules[path] = Module(self.root, path)
+            except (OSError, UnicodeDecodeError):
+                self._modules[path] = None
+        return self._modules[path]
+
+    def find_hook(self, importer, name, seen=None):
+        """Módulo e função de um hook importado por importer (seguindo reexportações)"""
+        seen = seen or set()
+        if importer.path in seen:
+            return None
+        seen.add(importer.path)
+        for match in re.finditer(r'\b(?:import|export)\s*(?:type\s*)?\{([^}]*)\}\s*from\s*[\'"]([^\'"]+)[\'"]',
+                                 importer.source.text):
+            names = {}
+            for item in match.group(1).split(','):
+                parts = item.split(' as ')
+                if parts[0].strip():
+                    names[parts[-1].strip()] = parts[0].strip()
+            if name not in names:
+                continue
+            target = resolve_import(self.root, importer.path, match.group(2))
+            module = self.module(target) if target else None
+            if module is None:
+                return None
+            original = names[name]
+            for function in module.callables:
+                if function.name == original and not module.enclosing(function.start):
+                    return module, function
+            return self.find_hook(module, original, seen)
+        return None
+
+
+class Scope:
+    """Um arquivo e os nomes que vieram de hooks (desestruturados ou não)"""
+
+    def __init__(self, module, hook=None):
+        self.module = module
+        self.hook = hook
+        self.bindings = {}
+        self.instances = []
+        self.returned = {}
+        self.mount = set()
+
+    def known(self):
+        return {function.name for function in self.module.callables} | set(self.bindings)
+
+    def resolve(self, name, position):
+        """(escopo, função) chamada por name em position"""
+        if name in self.bindings:
+            instance, key = self.bindings[name]
+            local = instance.returned.get(key)
+            function = local and instance.module.resolve(local, instance.hook.end)
+            return (instance, function) if function else (None, None)
+        function = self.module.resolve(name, position)
+        return (self, function) if function else (None, None)
+
+    def returns_data(self, name):
+        if name not in self.bindings:
+            return None
+        instance, key = self.bindings[name]
+        local = instance.returned.get(key)
+        if local and instance.module.resolve(local, instance.hook.end):
+            return None
+        return instance
+
+
+class Walker:
+    """Percorre efeitos e funções criando os nós Fetch com suas dependências"""
+
+    def __init__(self, project):
+        self.project = project
+        self.fetches = []
+        self.instances = []
+        self._stack = []
+
+    def instantiate(self, module, start, end, scope):
+        """Chamadas de hooks em module[start:end]: liga os nomes e monta cada instância"""
+        masked = module.source.masked
+        nested = [function for function in module.callables if start < function.start and function.end <= end]
+        for match in _HOOK_CALL.finditer(masked, start, end):
+            if any(function.start <= match.start() <= function.end for function in nested):
+                continue
+            found = self.project.find_hook(module, match.group(3))
+            if found is None or len(self._stack) > 3:
+                continue
+            instance = Scope(*found)
+            instance.returned = self._returned(*found)
+            self._stack.append(found[1].name)
+            first = len(self.fetches)
+            self.instantiate(found[0], found[1].body, found[1].end, instance)
+            self.effects(instance, via=(match.group(3),))
+            self._stack.pop()
+            instance.mount = {fetch.id for fetch in self.fetches[first:]}
+            scope.instances.append(instance)
+            self.instances.append(instance)
+            if match.group(2):
+                continue
+            for item in _split(masked, match.start(1), match.end(1)):
+                text = masked[item[0]:item[1]].strip()
+                parts = re.match(r'(\w+)\s*(?::\s*(\w+))?', text)
+                if parts:
+                    scope.bindings[parts.group(2) or parts.group(1)] = (instance, parts.group(1))
+
+    def _returned(self, module, hook):
+        """Chaves do objeto devolvido pelo hook -> nome local"""
+        masked = module.source.masked
+        nested = [function for function in module.callables if hook.start < function.start and function.end <= hook.end]
+        returned = {}
+        for match in module.source.find_code(r'\breturn\s*\{', hook.body, hook.end):
+            if any(function.start <= match.start() <= function.end for function in nested):
+                continue
+            close = module.source.matching(match.end() - 1)
+            returned = {}
+            for item in _split(masked, match.end(), close):
+                parts = re.match(r'\s*(\w+)\s*(?::\s*(\w+))?\s*$', masked[item[0]:item[1]])
+                if parts:
+                    returned[parts.group(1)] = parts.group(2) or parts.group(1)
+        return returned
+
+    def effects(self, scope, via):
+        """useEffect do corpo do hook ou da página, disparados na montagem"""
+        module = scope.module
+        function = scope.hook
+        source = module.source
+        nested = [other for other in module.callables if function.start < other.start and other.end <= function.end]
+        for match in source.find_code(r'(?<![\w.$])useEffect\s*\(', function.body, function.end):
+            if any(other.start <= match.start() <= other.end for other in nested):
+                continue
+            close = source.matching(match.end() - 1)
+            after = set()
+            args = _split(source.masked, match.end(), close)
+            if len(args) > 1:
+                for name in module.text_names(*args[-1]):
+                    instance = scope.returns_data(name)
+                    if instance is not None:
+                        after |= instance.mount
+            self.run(scope, match.end(), close, after, 'dados', via + (f'useEffect@{source.line_of(match.start())}',))
+
+    def run(self, scope, start, end, after, after_kind, via, loop=None):
+        """Executa o trecho a partir de after; devolve os nós que terminam antes do próximo await"""
+        module = scope.module
+        frontier, last_await = set(after), None
+        group, group_frontier, group_await, group_done = None, None, None, set()
+
+        def close_group():
+            nonlocal frontier, last_await, group, group_done
+            if group is not None and group[2] and group_done:
+                frontier, last_await = set(group_done), group[1]
+            group, group_done = None, set()
+
+        for site in module.sites(start, end, scope.known()):
+            if group is not None and site.group != group:
+                close_group()
+            if site.group is not None:
+                if group is None:
+                    group, group_frontier, group_await = site.group, set(frontier), last_await
+                deps, anchor = group_frontier, group_await
+            else:
+                deps, anchor = frontier, last_await
+            kind = after_kind if anchor is None else self._edge_kind(module, site, deps, anchor)
+            done = self.launch(scope, site, deps, kind, via, site.loop or loop)
+            if site.group is not None:
+                group_done |= done
+            elif site.awaited and done and done != deps:
+                frontier, last_await = done, site.end
+        close_group()
+        return frontier
+
+    def _edge_kind(self, module, site, deps, anchor):
+        if any(self.fetches[fetch_id].method in WRITE_METHODS for fetch_id in deps):
+            return 'dados'
+        if site.names & module.declared(anchor, site.start):
+            return 'dados'
+        return 'sequencial'
+
+    def launch(self, scope, site, deps, kind, via, loop):
+        module = scope.module
+        if site.url is not None:
+            fetch = Fetch(len(self.fetches), site.method, site.url, endpoint_key(site.url),
+                          {'seq': 'por_item_serie', 'parallel': 'por_item_paralelo'}.get(loop, 'unico'),
+                          module.line(site.start), via, {fetch_id: kind for fetch_id in deps})
+            self.fetches.append(fetch)
+            return {fetch.id}
+        target, function = scope.resolve(site.name, site.start)
+        key = (target.module.path, function.start) if function else None
+        if function is None or key in self._stack or len(self._stack) >= MAX_DEPTH:
+            return set(deps)
+        self._stack.append(key)
+        try:
+            return self.run(target, function.body, function.end, deps, kind, via + (site.name,), loop)
+        finally:
+            self._stack.pop()
+
+
+def analyze_page(project, path):
+    module = project.module(path)
+    page = next((function for function in module.callables
+                 if re.search(r'\bexport\s+default\b', module.source.masked[function.start:function.body])), None)
+    walker = Walker(project)
+    if page is not None:
+        scope = Scope(module, page)
+        walker.instantiate(module, page.body, page.end, scope)
+        walker.effects(scope, via=('página',))
+    return walker
+
+
+def _tasks(fetches, items):
+    """Requisições unitárias (cada uma custa 1 RTT) com suas dependências"""
+    tasks, last = [], {}
+    for fetch in fetches:
+        before = [task for dep in fetch.deps for task in last.get(dep, ())]
+        count = items if fetch.kind != 'unico' else 1
+        if fetch.kind == 'por_item_serie':
+            chain = before
+            for _ in range(count):
+                tasks.append(chain)
+                chain = [len(tasks) - 1]
+            last[fetch.id] = chain
+        else:
+            last[fetch.id] = []
+            for _ in range(count):
+                tasks.append(before)
+                last[fetch.id].append(len(tasks) - 1)
+    return tasks
+
+
+def estimate(fetches, items=DEFAULT_ITEMS, slots=BROWSER_SLOTS):
+    """Requisições e RTTs até a última resposta, com no máximo slots em voo"""
+    tasks = _tasks(fetches, items)
+    finish, pending, now = {}, list(range(len(tasks))), 0
+    while pending:
+        ready = [task for task in pending if all(finish.get(dep, math.inf) <= now for dep in tasks[task])]
+        for task in ready[:slots]:
+            finish[task] = now + 1
+            pending.remove(task)
+        now += 1
+    return {'requests': len(tasks), 'round_trips': max(finish.values(), default=0)}
+
+
+def optimize(fetches):
+    """Plano otimizado: GET repetido servido pela primeira busca, só arestas de dados, por item em lote"""
+    kept, alias, plan, plan_by_id = {}, {}, [], {}
+    for fetch in fetches:
+        if fetch.method == 'GET' and fetch.endpoint in kept:
+            alias[fetch.id] = kept[fetch.endpoint]
+            continue
+        deps = {}
+        for dep, kind in fetch.deps.items():
+            dep = alias.get(dep, dep)
+            if kind == 'dados':
+                deps[dep] = kind
+            else:
+                deps.update(plan_by_id[dep].deps)
+        optimized = Fetch(fetch.id, fetch.method, fetch.url, fetch.endpoint, 'unico', fetch.origin, fetch.via, deps)
+        plan.append(optimized)
+        plan_by_id[fetch.id] = optimized
+        if fetch.method == 'GET':
+            kept[fetch.endpoint] = fetch.id
+    return plan
+
+
+def _findings(fetches):
+    by_id = {fetch.id: fetch for fetch in fetches}
+    sequential = [{'before': f'{by_id[dep].method} {by_id[dep].endpoint}',
+                   'after': f'{fetch.method} {fetch.endpoint}', 'origin': fetch.origin,
+                   'via': ' > '.join(fetch.via)}
+                  for fetch in fetches for dep, kind in fetch.deps.items() if kind == 'sequencial']
+    endpoints = {}
+    for fetch in fetches:
+        if fetch.method == 'GET':
+            endpoints.setdefault(fetch.endpoint, []).append(fetch)
+    duplicates = [{'endpoint': endpoint, 'count': len(hits), 'origins': [' > '.join(hit.via) for hit in hits]}
+                  for endpoint, hits in endpoints.items() if len(hits) > 1]
+    per_item = [{'endpoint': fetch.endpoint, 'method': fetch.method, 'kind': fetch.kind, 'origin': fetch.origin}
+                for fetch in fetches if fetch.kind != 'unico']
+    return sequential, duplicates, per_item
+
+
+def _fetch_dict(fetch):
+    return {'id': fetch.id, 'method': fetch.method, 'endpoint': fetch.endpoint, 'kind': fetch.kind,
+            'origin': fetch.origin, 'via': ' > '.join(fetch.via),
+            'deps': {str(dep): kind for dep, kind in fetch.deps.items()}}
+
+
+def hook_actions(project, instances):
+    """Funções devolvidas pelos hooks das páginas com awaits sequenciais sem dependência de dados"""
+    found = []
+    for instance in sorted(instances, key=lambda item: (item.module.relative, item.hook.name)):
+        for key, local in sorted(instance.returned.items()):
+            function = instance.module.resolve(local, instance.hook.end)
+            if function is None:
+                continue
+            walker = Walker(project)
+            walker.run(instance, function.body, function.end, set(), 'dados', (instance.hook.name, key))
+            sequential, _, _ = _findings(walker.fetches)
+            for item in sequential:
+                found.append(dict(item, hook=instance.hook.name, function=key))
+    return found
+
+
+def loop_fetches(project):
+    """fetch dentro de laços em qualquer arquivo do front-end (montagem ou ações)"""
+    found, seen, origins = [], set(), set()
+    for pattern in LOOP_GLOBS:
+        for path in sorted(glob.glob(os.path.join(project.root, pattern), recursive=True)):
+            if f'{os.sep}api{os.sep}' in path or os.path.normpath(path) in seen:
+                continue
+            seen.add(os.path.normpath(path))
+            module = project.module(path)
+            if module is None:
+                continue
+            for function in module.callables:
+                for site in module.sites(function.body, function.end, set()):
+                    if not site.loop or module.line(site.start) in origins:
+                        continue
+                    origins.add(module.line(site.start))
+                    found.append({'method': site.method, 'endpoint': endpoint_key(site.url),
+                                  'kind': 'por_item_serie' if site.loop == 'seq' else 'por_item_paralelo',
+                                  'origin': module.line(site.start)})
+    return found
+
+
+def _replay_path(fetch):
+    path = re.sub(r'\$\{[^}]*\}', REPLAY_PARAM, fetch.url.split('?')[0])
+    return path if path.startswith('/api/') else '/api/'
+
+
+async def _execute(base_url, fetches, items, slots):
+    pool = ConnectionPool(base_url, slots)
+    done = {fetch.id: asyncio.Event() for fetch in fetches}
+
+    async def one(fetch):
+        for dep in fetch.deps:
+            await done[dep].wait()
+        path = _replay_path(fetch)
+        if fetch.kind == 'por_item_serie':
+            for _ in range(items):
+                await pool.request(fetch.method, path)
+        elif fetch.kind == 'por_item_paralelo':
+            await asyncio.gather(*(pool.request(fetch.method, path) for _ in range(items)))
+        else:
+            await pool.request(fetch.method, path)
+        done[fetch.id].set()
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(fetch) for fetch in fetches))
+    finally:
+        pool.close()
+    return time.perf_counter() - started
+
+
+def replay(server, fetches, items=DEFAULT_ITEMS, slots=BROWSER_SLOTS):
+    """Executa o plano contra o servidor de apoio: requisições recebidas e RTTs medidos"""
+    before = len(server.requests)
+    elapsed = asyncio.run(_execute(server.base_url, fetches, items, slots))
+    return {'requests': len(server.requests) - before,
+            'round_trips': round(elapsed * 1000.0 / server.latency_ms, 2),
+            'elapsed_ms': round(elapsed * 1000.0, 1)}
+
+
+def _agrees(measured, estimated):
+    return (measured['requests'] == estimated['requests']
+            and abs(measured['round_trips'] - estimated['round_trips']) <= max(0.5, 0.15 * estimated['round_trips']))
+
+
+def analyze(root='.', items=DEFAULT_ITEMS, slots=BROWSER_SLOTS, run_replay=False, latency_ms=DEFAULT_LATENCY_MS):
+    project = Project(root)
+    server = StubServer(latency_ms=latency_ms, payload_items=1).start() if run_replay else None
+    pages, hooks = [], {}
+    try:
+        for path in sorted(glob.glob(os.path.join(root, PAGE_GLOB))):
+            module = project.module(path)
+            if module is None:
+                continue
+            walker = analyze_page(project, path)
+            fetches = walker.fetches
+            for instance in walker.instances:
+                hooks.setdefault((instance.module.path, instance.hook.name), instance)
+            plan = optimize(fetches)
+            sequential, duplicates, per_item = _findings(fetches)
+            page = {
+                'page': module.relative,
+                'route': page_route(module.relative),
+                'fetches': [_fetch_dict(fetch) for fetch in fetches],
+                'sequential': sequential,
+                'duplicates': duplicates,
+                'per_item': per_item,
+                'current': estimate(fetches, items, slots),
+                'optimized': estimate(plan, items, slots),
+            }
+            page['saved_round_trips'] = page['current']['round_trips'] - page['optimized']['round_trips']
+            page['saved_requests'] = page['current']['requests'] - page['optimized']['requests']
+            if server is not None and fetches:
+                page['replay'] = {'current': replay(server, fetches, items, slots),
+                                  'optimized': replay(server, plan, items, slots)}
+                page['replay']['agrees'] = (_agrees(page['replay']['current'], page['current'])
+                                            and _agrees(page['replay']['optimized'], page['optimized']))
+            pages.append(page)
+    finally:
+        if server is not None:
+            server.stop()
+    return {
+        'items': items,
+        'slots': slots,
+        'latency_ms': latency_ms if run_replay else None,
+        'pages': pages,
+        'actions': hook_actions(project, hooks.values()),
+        'loops': loop_fetches(project),
+        'summary': {
+            'pages': len(pages),
+            'requests': sum(page['current']['requests'] for page in pages),
+            'saved_requests': sum(page['saved_requests'] for page in pages),
+            'saved_round_trips': sum(page['saved_round_trips'] for page in pages),
+            'duplicates': sum(len(page['duplicates']) for page in pages),
+            'sequential': sum(len(page['sequential']) for page in pages),
+        },
+    }
+
+
+def format_report(report):
+    lines = [f"📊 Montagem das páginas: até {report['slots']} conexões por host, "
+             f"{report['items']} itens nas buscas por item"]
+    for page in report['pages']:
+        current, optimized = page['current'], page['optimized']
+        lines.append(f"\n📄 {page['route']}  {page['page']}")
+        if not page['fetches']:
+            lines.append('  nenhuma requisição na montagem')
+            continue
+        lines.append(f"  {current['requests']} requisições, {current['round_trips']} RTTs até a última resposta")
+        for fetch in page['fetches']:
+            deps = ', '.join(f"#{dep} ({kind})" for dep, kind in fetch['deps'].items())
+            after = f'  após {deps}' if deps else ''
+            lines.append(f"    #{fetch['id']} {fetch['method']} {fetch['endpoint']}  {fetch['via']}{after}")
+        for item in page['duplicates']:
+            lines.append(f"  ⚠️ {item['endpoint']} buscado {item['count']}x: {'; '.join(item['origins'])}")
+        for item in page['sequential']:
+            lines.append(f"  ⚠️ {item['after']} espera {item['before']} sem depender dos dados ({item['origin']})")
+        for item in page['per_item']:
+            lines.append(f"  ⚠️ {item['method']} {item['endpoint']} por item ({item['kind']}, {item['origin']})")
+        saved = [f'-{page[key]} {label}' for key, label in (('saved_requests', 'requisições'),
+                                                              ('saved_round_trips', 'RTTs')) if page[key]]
+        if saved:
+            lines.append(f"  🔀 otimizado: {optimized['requests']} requisições, {optimized['round_trips']} RTTs "
+                         f"({', '.join(saved)})")
+        else:
+            lines.append('  ✅ sem cascata evitável')
+        if 'replay' in page:
+            measured = page['replay']
+            mark = '✅' if measured['agrees'] else '❌'
+            lines.append(f"  {mark} replay a {report['latency_ms']:.0f} ms/RTT: atual "
+                         f"{measured['current']['round_trips']} RTTs ({measured['current']['requests']} req.), "
+                         f"otimizado {measured['optimized']['round_trips']} RTTs "
+                         f"({measured['optimized']['requests']} req.)")
+    if report['actions']:
+        lines.append('\n⚠️ Ações dos hooks com awaits sequenciais sem dependência de dados:')
+        for item in report['actions']:
+            lines.append(f"  {item['hook']}.{item['function']}: {item['after']} espera {item['before']} "
+                         f"({item['origin']})")
+    if report['loops']:
+        lines.append('\n📦 fetch dentro de laços (fora ou dentro da montagem):')
+        for item in report['loops']:
+            lines.append(f"  {item['method']} {item['endpoint']}  {item['kind']}  {item['origin']}")
+    summary = report['summary']
+    lines.append(f"\nTotal: {summary['pages']} páginas, {summary['requests']} requisições na montagem, "
+                 f"{summary['duplicates']} endpoints duplicados, {summary['sequential']} awaits sequenciais evitáveis; "
+                 f"otimizar economiza {summary['saved_requests']} requisições e {summary['saved_round_trips']} RTTs")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cascata de requisições disparadas na montagem das páginas')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--items', type=int, default=DEFAULT_ITEMS,
+                        help='itens por lista nas buscas por item (padrão: %(default)s)')
+    parser.add_argument('--slots', type=int, default=BROWSER_SLOTS,
+                        help='conexões simultâneas por host (padrão: %(default)s, como os navegadores)')
+    parser.add_argument('--replay', action='store_true',
+                        help='confere a estimativa executando os planos contra o servidor de apoio')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help='latência injetada no replay (padrão: %(default)s ms)')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    report = analyze(args.root, args.items, args.slots, args.replay, args.latency_ms)
+    failed = any(not page['replay']['agrees'] for page in report['pages'] if 'replay' in page)
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 1 if failed else 0
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'\n📄 Relatório salvo em: {args.json_out}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
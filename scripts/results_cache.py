@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+"""
+Cache persistente de resultados para o modo incremental das validações
+Cada verificação registra os arquivos que consultou; em execuções seguintes ela
+só é reavaliada se algum desses arquivos mudou, surgiu ou foi removido.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+
+try:
+    import fcntl
+except ImportError:  # Windows: a troca atômica do arquivo ainda evita corrupção
+    fcntl = None
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = '.validation-cache.json'
+# Folga para a granularidade do relógio do sistema de arquivos (FAT grava em 2s)
+RACY_WINDOW_NS = 2_000_000_000
+
+_local = threading.local()
+
+
+def track(path, content=False):
+    """Registra um arquivo consultado pela verificação em andamento"""
+    inputs = getattr(_local, 'inputs', None)
+    if inputs is not None:
+        path = os.path.abspath(path)
+        inputs[path] = inputs.get(path, False) or content
+
+
+@contextmanager
+def recording():
+    """Coleta os caminhos registrados com track() dentro do bloco"""
+    previous = getattr(_local, 'inputs', None)
+    inputs = {}
+    _local.inputs = inputs
+    try:
+        yield inputs
+    finally:
+        _local.inputs = previous
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path, content):
+    """Descreve o estado de um caminho: tipo e, para conteúdo, mtime/tamanho/hash"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {'kind': 'missing'}
+    if os.path.isdir(path):
+        return {'kind': 'dir'}
+    if not content:
+        return {'kind': 'file'}
+    return {'kind': 'file', 'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+            'sha256': file_digest(path)}
+
+
+def changed_since(path, since_ns):
+    """Se o caminho (ou, se ausente, o diretório que o conteria) mudou a partir de since_ns"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        parent = os.path.dirname(path)
+        return parent != path and changed_since(parent, since_ns)
+    # ctime também muda em renomeações e em arquivos recriados com mtime antigo
+    return max(stat.st_mtime_ns, stat.st_ctime_ns) >= since_ns
+
+
+def is_unchanged(path, recorded):
+    """Compara o estado atual com o registrado, calculando hash só se necessário"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return recorded['kind'] == 'missing'
+    kind = 'dir' if os.path.isdir(path) else 'file'
+    if kind != recorded['kind']:
+        return False
+    if 'sha256' not in recorded:
+        return True
+    if stat.st_mtime_ns == recorded['mtime'] and stat.st_size == recorded['size']:
+        return True
+    if stat.st_size != recorded['size'] or file_digest(path) != recorded['sha256']:
+        return False
+    # Arquivo apenas "tocado": atualiza o mtime para evitar novo hash
+    recorded['mtime'] = stat.st_mtime_ns
+    return True
+
+
+class _Tee(io.TextIOBase):
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+class ResultsCache:
+    """Resultados por verificação persistidos em JSON, invalidados pelas entradas"""
+
+    def __init__(self, cache_file, sources=()):
+        self.cache_file = cache_file
+        self.signature = self._signature(sources)
+        self.checks = {}
+        self.reused = 0
+        self.evaluated = 0
+        self._updated = {}
+        self._stale = set()
+        self._load()
+
+    @staticmethod
+    def _signature(sources):
+        # Mudanças nos próprios scripts invalidam todo o cache
+        digest = hashlib.sha256(str(CACHE_VERSION).encode())
+        for source in sorted(sources):
+            digest.update(file_digest(source).encode())
+        return digest.hexdigest()
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('signature') == self.signature:
+            self.checks = data.get('checks', {})
+
+    def lookup(self, name):
+        entry = self.checks.get(name)
+        if entry is None:
+            return None
+        for path, recorded in entry['inputs'].items():
+            if not is_unchanged(path, recorded):
+                return None
+        return entry
+
+    def run(self, name, fn, on_reuse=None):
+        """Devolve o resultado em cache se as entradas não mudaram; senão executa fn"""
+        entry = self.lookup(name)
+        if entry is not None:
+            sys.stdout.write(entry['output'])
+            if on_reuse is not None:
+                on_reuse(name)
+            self.reused += 1
+            self._updated[name] = entry
+            return entry['passed']
+
+        buffer = io.StringIO()
+        started = time.time_ns() - RACY_WINDOW_NS
+        with recording() as inputs, redirect_stdout(_Tee(sys.stdout, buffer)):
+            passed = fn()
+        self.evaluated += 1
+        fingerprints = {path: fingerprint(path, content)
+                        for path, content in sorted(inputs.items())}
+        # Uma entrada alterada durante a verificação pode ter sido lida na versão
+        # antiga e registrada na nova; o resultado não é guardado e ela é
+        # reavaliada na próxima execução
+        if any(changed_since(path, started) for path in fingerprints):
+            self._updated.pop(name, None)
+            self._stale.add(name)
+            return passed
+        self._updated[name] = {
+            'passed': bool(passed),
+            'output': buffer.getvalue(),
+            'inputs': fingerprints,
+        }
+        return passed
+
+    def save(self):
+        """Grava o cache sob trava exclusiva, mesclando com execuções concorrentes"""
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        with self._lock(directory):
+            current = {}
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('signature') == self.signature:
+                    current = data.get('checks', {})
+            except (OSError, ValueError):
+                pass
+            current.update(self._updated)
+            for name in self._stale:
+                current.pop(name, None)
+            payload = {'version': CACHE_VERSION, 'signature': self.signature,
+                       'checks': current}
+            fd, tmp_path = tempfile.mkstemp(prefix='.validation-cache-', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.cache_file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+    @contextmanager
+    def _lock(self, directory):
+        if fcntl is None:
+            yield
+            return
+        lock_path = os.path.join(directory, os.path.basename(self.cache_file) + '.lock')
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
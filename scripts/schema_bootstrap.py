@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+
+"""
+Bootstrap do schema do sistema CRM em um banco local a partir de um DAG mínimo
+Lê todos os arquivos SQL do projeto (sql_catalog.SCHEMA_GLOBS, na mesma ordem
+do catálogo), separa os do dialeto Postgres (os scripts antigos do Supabase em
+schema/) dos compatíveis com o MySQL e reduz os comandos destes a objetos:
+  - tabelas: os CREATE TABLE repetidos, ALTER TABLE e CREATE/DROP INDEX são
+    dobrados em uma definição final (via sql_catalog.Catalog). Os CREATE são
+    IF NOT EXISTS, então quem aplicava à mão ficava com as colunas da primeira
+    definição mais as das seguintes, e há views que dependem delas; só um
+    DROP TABLE descarta o que veio antes
+  - índices, views, triggers, procedures e funções: vale a última definição;
+    DROP remove as anteriores
+  - INSERT/UPDATE/DELETE e comandos avulsos (SET, DESCRIBE, SELECT) ficam fora
+As arestas do DAG são só as obrigatórias na criação: índice -> tabela,
+trigger -> tabela e view -> tabelas/views que ela lê. As FKs vão junto do
+CREATE TABLE com FOREIGN_KEY_CHECKS=0 no MySQL (como faz o mysqldump) e o
+SQLite não as valida na criação, então tabelas não esperam umas pelas outras;
+procedures e funções do MySQL só resolvem tabelas ao executar.
+A aplicação usa o banco do scripts/local_db.py: no mysqld local cada worker tem
+a sua conexão e os ramos independentes rodam em paralelo, priorizando o
+caminho crítico; no SQLite (um escritor por vez) roda com um worker e
+procedures/triggers do MySQL são ignorados.
+Execute com: python3 scripts/schema_bootstrap.py [--plan-only] [--engine auto|sqlite|mysql] [--workers 4]
+         ou: python3 scripts/schema_bootstrap.py --compare   (mede também a aplicação arquivo a arquivo)
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from local_db import DEFAULT_MYSQL_URL, LocalDatabase, open_database
+from sql_catalog import Catalog, parse_file, schema_files, table_aliases
+
+DEFAULT_WORKERS = 4
+POSTGRES_MARKERS = re.compile(
+    r'\bgen_random_uuid\s*\(|\buuid_generate_v4\s*\(|\bSERIAL\b|\bTIMESTAMPTZ\b|'
+    r'\bTIMESTAMP\s+WITH(?:OUT)?\s+TIME\s+ZONE\b|\bJSONB\b|::\s*[a-z]|\bLANGUAGE\s+plpgsql\b|'
+    r'\bCREATE\s+EXTENSION\b|\bRETURNS\s+TRIGGER\b|\bEXECUTE\s+(?:FUNCTION|PROCEDURE)\b|'
+    r'\bON\s+CONFLICT\b|\bILIKE\b|\bTEXT\s*\[\]|\bDO\s+\$\$|\bRAISE\s+NOTICE\b|\bCREATE\s+POLICY\b', re.I)
+MYSQL_MARKERS = re.compile(
+    r'\bENGINE\s*=|\bAUTO_INCREMENT\b|`|\bDEFAULT\s+CHARSET\b|\bUUID\(\)|\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b|'
+    r'\bTINYINT\b|\bDATETIME\b|\bENUM\s*\(|^\s*DELIMITER\b|\bFOR\s+EACH\s+ROW\s+(?:BEGIN|SET)\b', re.I | re.M)
+DATA_KINDS = ('insert', 'update', 'delete')
+ROUTINE_KINDS = {'create_trigger': 'trigger', 'create_procedure': 'procedure', 'create_function': 'function'}
+DROP_KINDS = {'drop_view': 'view', 'drop_trigger': 'trigger', 'drop_procedure': 'procedure',
+              'drop_function': 'function'}
+
+
+def dialect(text):
+    """'postgres', 'mysql' ou 'neutro' pelo que o arquivo usa de cada dialeto"""
+    postgres = len(POSTGRES_MARKERS.findall(text))
+    mysql = len(MYSQL_MARKERS.findall(text))
+    if postgres > mysql:
+        return 'postgres'
+    return 'mysql' if mysql else 'neutro'
+
+
+@dataclass
+class Node:
+    """Objeto do schema a criar, com as dependências obrigatórias"""
+    id: str
+    kind: str
+    name: str
+    source: str
+    deps: set = field(default_factory=set)
+    table: str = None
+    sql: str = None
+
+
+@dataclass
+class Plan:
+    files: dict = field(default_factory=dict)
+    nodes: dict = field(default_factory=dict)
+    superseded: list = field(default_factory=list)
+    merged: dict = field(default_factory=dict)
+    skipped: dict = field(default_factory=dict)
+    warnings: list = field(default_factory=list)
+    catalog: Catalog = None
+
+    def order(self):
+        """Ordem topológica (Kahn); nós em ciclo ficam de fora e viram aviso"""
+        pending = {node_id: set(node.deps) for node_id, node in self.nodes.items()}
+        ordered = []
+        ready = sorted(node_id for node_id, deps in pending.items() if not deps)
+        while ready:
+            node_id = ready.pop(0)
+            ordered.append(node_id)
+            del pending[node_id]
+            for other, deps in pending.items():
+                if node_id in deps:
+                    deps.discard(node_id)
+                    if not deps and other not in ready:
+                        ready.append(other)
+            ready.sort()
+        return ordered, sorted(pending)
+
+    def levels(self):
+        """Profundidade de cada nó: 0 sem dependências, 1 + a maior entre as dependências"""
+        ordered, _ = self.order()
+        depth = {}
+        for node_id in ordered:
+            depth[node_id] = 1 + max((depth[dep] for dep in self.nodes[node_id].deps), default=-1)
+        return depth
+
+    def heights(self):
+        """Nós no caminho mais longo até uma folha (prioridade na fila de execução)"""
+        ordered, _ = self.order()
+        dependents = {node_id: [] for node_id in self.nodes}
+        for node in self.nodes.values():
+            for dep in node.deps:
+                dependents[dep].append(node.id)
+        height = {}
+        for node_id in reversed(ordered):
+            height[node_id] = 1 + max((height[other] for other in dependents[node_id]), default=0)
+        return height
+
+
+def _source(statement):
+    return f'{statement.file}:{statement.line}'
+
+
+def _object_key(statement):
+    if statement.kind in ('create_table', 'drop_table'):
+        return ('table', statement.name)
+    if statement.kind in ('create_view', 'drop_view'):
+        return ('view', statement.name)
+    if statement.kind in ROUTINE_KINDS:
+        return (ROUTINE_KINDS[statement.kind], statement.name)
+    if statement.kind in DROP_KINDS:
+        return (DROP_KINDS[statement.kind], statement.name)
+    return None
+
+
+def _table_scoped(statement, table):
+    return statement.table == table and statement.kind in (
+        'create_table', 'alter_table', 'create_index', 'drop_index')
+
+
+def effective_statements(statements, plan):
+    """Remove as definições substituídas; devolve os comandos que descrevem o estado final"""
+    effective = []
+
+    def supersede(predicate, by, reason):
+        for kept in [item for item in effective if predicate(item)]:
+            effective.remove(kept)
+            plan.superseded.append({'statement': _source(kept), 'kind': kept.kind, 'name': kept.name,
+                                    'by': _source(by), 'reason': reason})
+
+    for statement in statements:
+        kind = statement.kind
+        key = _object_key(statement)
+        if kind in ('create_table', 'alter_table', 'drop_index'):
+            effective.append(statement)
+        elif kind == 'drop_table':
+            supersede(lambda item: _table_scoped(item, statement.name)
+                      or (item.kind == 'create_trigger' and item.table == statement.name),
+                      statement, 'DROP TABLE posterior')
+        elif kind == 'create_index':
+            supersede(lambda item: item.kind == 'create_index' and item.table == statement.table
+                      and item.name == statement.name, statement, 'CREATE INDEX posterior')
+            effective.append(statement)
+        elif kind == 'create_view' or kind in ROUTINE_KINDS:
+            supersede(lambda item: _object_key(item) == key, statement, 'definição posterior')
+            effective.append(statement)
+        elif kind in DROP_KINDS:
+            supersede(lambda item: _object_key(item) == key and item.kind.startswith('create_'),
+                      statement, 'DROP posterior')
+        elif kind in DATA_KINDS:
+            plan.skipped['dados'] = plan.skipped.get('dados', 0) + 1
+        else:
+            plan.skipped['outros'] = plan.skipped.get('outros', 0) + 1
+    return effective
+
+
+def _relax_legacy_columns(plan, effective):
+    """Tabela criada mais de uma vez: valem o último CREATE e o que vem depois dele;
+    colunas só das definições anteriores ficam, mas anuláveis (inserts atuais não as preenchem)"""
+    for table in plan.catalog.tables.values():
+        if len(table.sources) < 2:
+            continue
+        last = max(index for index, statement in enumerate(effective)
+                   if statement.kind == 'create_table' and statement.table == table.name)
+        current = Catalog()
+        for statement in effective[last:]:
+            if statement.table == table.name:
+                current.apply(statement)
+        legacy = [name for name in table.columns if name not in current.tables[table.name].columns]
+        for name in legacy:
+            column = table.columns[name]
+            column.nullable = True
+            column.definition = re.sub(r'\bNOT\s+NULL\b', 'NULL', column.definition, flags=re.I)
+        plan.merged[table.name] = {'sources': list(table.sources), 'legacy_columns': legacy}
+
+
+def build_plan(root='.'):
+    """Lê os arquivos SQL, descarta o que foi substituído e monta o DAG de criação"""
+    plan = Plan()
+    statements = []
+    for path in schema_files(root):
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            kind = dialect(f.read())
+        parsed = parse_file(path, root)
+        plan.files[relative] = {'dialect': kind, 'statements': len(parsed)}
+        if kind == 'postgres':
+            plan.skipped['postgres'] = plan.skipped.get('postgres', 0) + len(parsed)
+            continue
+        statements.extend(parsed)
+
+    effective = effective_statements(statements, plan)
+    catalog = Catalog()
+    for statement in effective:
+        catalog.apply(statement)
+    plan.catalog = catalog
+    _relax_legacy_columns(plan, effective)
+
+    for table in catalog.tables.values():
+        if not table.columns:
+            plan.warnings.append(f'{table.name}: ALTER/índice sem CREATE TABLE nos arquivos MySQL '
+                                 f'({", ".join(table.sources) or "sem origem"})')
+            continue
+        plan.nodes[f'table:{table.name}'] = Node(f'table:{table.name}', 'table', table.name,
+                                                 ', '.join(table.sources), table=table.name)
+    tables = {node.name for node in plan.nodes.values()}
+
+    for table in catalog.tables.values():
+        if table.name not in tables:
+            continue
+        for key in table.foreign_keys:
+            target = catalog.tables.get(key.ref_table)
+            if key.ref_table not in tables or not all(column in target.columns for column in key.ref_columns):
+                plan.warnings.append(f'{table.name}: FK ({", ".join(key.columns)}) para {key.ref_table} '
+                                     f'({", ".join(key.ref_columns)}) inexistente, omitida')
+        for index in table.indexes:
+            if index.primary:
+                continue
+            node_id = f'index:{table.name}.{index.name}'
+            if not all(column in table.columns for column in index.columns):
+                plan.warnings.append(f'{node_id}: coluna inexistente em ({", ".join(index.columns)}), omitido')
+                continue
+            plan.nodes[node_id] = Node(node_id, 'index', index.name, index.source or '',
+                                       {f'table:{table.name}'}, table=table.name)
+
+    for view in catalog.views.values():
+        node_id = f'view:{view.name}'
+        plan.nodes[node_id] = Node(node_id, 'view', view.name, view.source or '', sql=view.sql)
+    for view in catalog.views.values():
+        for name in set(table_aliases(view.sql).values()):
+            if name in tables:
+                plan.nodes[f'view:{view.name}'].deps.add(f'table:{name}')
+            elif name in catalog.views and name != view.name:
+                plan.nodes[f'view:{view.name}'].deps.add(f'view:{name}')
+
+    for statement in effective:
+        if statement.kind not in ROUTINE_KINDS:
+            continue
+        kind = ROUTINE_KINDS[statement.kind]
+        node_id = f'{kind}:{statement.name}'
+        node = Node(node_id, kind, statement.name, _source(statement), table=statement.table, sql=statement.text)
+        if kind == 'trigger':
+            if statement.table not in tables:
+                plan.warnings.append(f'{node_id}: tabela {statement.table} não existe, omitido')
+                continue
+            node.deps.add(f'table:{statement.table}')
+        plan.nodes[node_id] = node
+
+    _, cyclic = plan.order()
+    for node_id in cyclic:
+        plan.warnings.append(f'{node_id}: dependência circular, não será criado')
+    return plan
+
+
+def _foreign_keys(plan, table):
+    valid = []
+    for key in table.foreign_keys:
+        target = plan.catalog.tables.get(key.ref_table)
+        if f'table:{key.ref_table}' in plan.nodes and all(column in target.columns for column in key.ref_columns):
+            valid.append(key)
+    return valid
+
+
+def _raw(database, sql):
+    """Executa sem tradução nem interpolação de parâmetros (corpo de trigger/procedure)"""
+    cursor = database.connection.cursor()
+    cursor.execute(sql)
+    return cursor
+
+
+def apply_node(database, plan, node):
+    """Cria um objeto; devolve 'aplicado' ou 'ignorado' (sem suporte no motor)"""
+    catalog = plan.catalog
+    if node.kind == 'table':
+        table = catalog.tables[node.name]
+        database.execute(f'DROP TABLE IF EXISTS {table.name}', translate=False)
+        database.execute(database.table_ddl(table, _foreign_keys(plan, table)), translate=False)
+    elif node.kind == 'index':
+        table = catalog.tables[node.table]
+        index = table.index_named(node.name)
+        if database.engine == 'mysql' and index.implicit:
+            return 'ignorado'  # o InnoDB cria o índice junto da FK
+        database.execute(database.index_ddl(table, index), translate=False)
+    elif node.kind == 'view':
+        database.execute(f'DROP VIEW IF EXISTS {node.name}', translate=False)
+        database.execute(f'CREATE VIEW {node.name} AS {node.sql}')
+        # O SQLite só valida as colunas da view quando ela é usada
+        database.execute(f'SELECT * FROM {node.name} LIMIT 0', translate=False).fetchall()
+    else:
+        if database.engine != 'mysql':
+            return 'ignorado'
+        _raw(database, f'DROP {node.kind.upper()} IF EXISTS {node.name}')
+        _raw(database, node.sql)
+    database.commit()
+    return 'aplicado'
+
+
+class Connections:
+    """Uma conexão por worker (no SQLite, uma só para todos)"""
+
+    def __init__(self, engine, path, mysql_url):
+        self.engine = engine
+        self.path = path
+        self.mysql_url = mysql_url
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.opened = []
+
+    def first(self):
+        database = open_database(self.engine, self.path, self.mysql_url)
+        self._prepare(database)
+        return database
+
+    def get(self):
+        database = getattr(self._local, 'database', None)
+        if database is None:
+            database = LocalDatabase.mysql(self.mysql_url)
+            self._prepare(database)
+            self._local.database = database
+        return database
+
+    def _prepare(self, database):
+        if database.engine == 'mysql':
+            _raw(database, 'SET FOREIGN_KEY_CHECKS=0')
+        with self._lock:
+            self.opened.append(database)
+
+    def close(self):
+        for database in self.opened:
+            database.close()
+
+
+def apply_plan(plan, engine='auto', path=':memory:', mysql_url=DEFAULT_MYSQL_URL, workers=DEFAULT_WORKERS,
+               progress=None):
+    """Cria os objetos respeitando o DAG; ramos independentes em paralelo no MySQL"""
+    connections = Connections(engine, path, mysql_url)
+    first = connections.first()
+    if first.engine != 'mysql':
+        workers = 1
+    height = plan.heights()
+    ordered, _ = plan.order()
+    remaining = {node_id: set(plan.nodes[node_id].deps) for node_id in ordered}
+    results = {}
+    started = time.perf_counter()
+
+    def run(node_id, database=None):
+        node_started = time.perf_counter()
+        try:
+            status = apply_node(database or connections.get(), plan, plan.nodes[node_id])
+            error = None
+        except Exception as exc:
+            status, error = 'falhou', str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+            try:
+                (database or connections.get()).connection.rollback()
+            except Exception:
+                pass
+        return node_id, status, error, time.perf_counter() - node_started
+
+    def finish(node_id, status, error, seconds):
+        results[node_id] = {'status': status, 'error': error, 'seconds': round(seconds, 4)}
+        if progress:
+            progress(node_id, status, error)
+        for other, deps in list(remaining.items()):
+            if node_id in deps:
+                deps.discard(node_id)
+                if status in ('falhou', 'pulado') and other not in results:
+                    finish(other, 'pulado', f'depende de {node_id}', 0.0)
+
+    try:
+        if workers == 1:
+            # Um escritor só: mesma ordem da execução paralela, na conexão já aberta
+            while True:
+                ready = [node_id for node_id, deps in remaining.items() if not deps and node_id not in results]
+                if not ready:
+                    break
+                node_id = max(ready, key=lambda item: (height[item], -ordered.index(item)))
+                finish(*run(node_id, first))
+                remaining.pop(node_id)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                running = set()
+                while True:
+                    ready = sorted((node_id for node_id, deps in remaining.items()
+                                    if not deps and node_id not in results),
+                                   key=lambda item: (-height[item], ordered.index(item)))
+                    for node_id in ready[:max(0, workers - len(running))]:
+                        remaining.pop(node_id)
+                        running.add(executor.submit(run, node_id))
+                    if not running:
+                        break
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(*future.result())
+                    for node_id in [node_id for node_id in remaining if node_id in results]:
+                        remaining.pop(node_id)
+        version = first.version
+    finally:
+        connections.close()
+    elapsed = time.perf_counter() - started
+    return {
+        'engine': version,
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'nodes': results,
+        'counts': {status: sum(1 for result in results.values() if result['status'] == status)
+                   for status in ('aplicado', 'ignorado', 'falhou', 'pulado')},
+    }
+
+
+def apply_sequential(root='.', engine='auto', path=':memory:', mysql_url=DEFAULT_MYSQL_URL):
+    """Aplicação manual de referência: todos os comandos dos arquivos MySQL, em ordem"""
+    database = open_database(engine, path, mysql_url)
+    if database.engine == 'mysql':
+        _raw(database, 'SET FOREIGN_KEY_CHECKS=0')
+    executed = failed = 0
+    started = time.perf_counter()
+    try:
+        for file_path in schema_files(root):
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                if dialect(f.read()) == 'postgres':
+                    continue
+            for statement in parse_file(file_path, root):
+                executed += 1
+                try:
+                    database.execute(statement.text)
+                    database.commit()
+                except Exception:
+                    failed += 1
+                    try:
+                        database.connection.rollback()
+                    except Exception:
+                        pass
+    finally:
+        database.close()
+    return {'statements': executed, 'failed': failed, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def summarize(plan):
+    depth = plan.levels()
+    widths = {}
+    for level in depth.values():
+        widths[level] = widths.get(level, 0) + 1
+    kinds = {}
+    for node in plan.nodes.values():
+        kinds[node.kind] = kinds.get(node.kind, 0) + 1
+    dialects = {}
+    for info in plan.files.values():
+        dialects[info['dialect']] = dialects.get(info['dialect'], 0) + 1
+    return {
+        'files': len(plan.files),
+        'dialects': dialects,
+        'objects': kinds,
+        'nodes': len(plan.nodes),
+        'edges': sum(len(node.deps) for node in plan.nodes.values()),
+        'depth': max(depth.values(), default=-1) + 1,
+        'widest_level': max(widths.values(), default=0),
+        'superseded': len(plan.superseded),
+        'merged': len(plan.merged),
+        'skipped': dict(plan.skipped),
+    }
+
+
+def plan_report(plan):
+    depth = plan.levels()
+    return {
+        'summary': summarize(plan),
+        'files': plan.files,
+        'nodes': [{'id': node.id, 'source': node.source, 'level': depth.get(node.id),
+                   'deps': sorted(node.deps)} for node in plan.nodes.values()],
+        'superseded': plan.superseded,
+        'merged': plan.merged,
+        'warnings': plan.warnings,
+    }
+
+
+def format_report(report):
+    summary = report['summary']
+    dialects = summary['dialects']
+    lines = [f"📊 Arquivos SQL: {summary['files']} lidos, {dialects.get('mysql', 0)} MySQL, "
+             f"{dialects.get('neutro', 0)} neutros, {dialects.get('postgres', 0)} Postgres ignorados "
+             f"({summary['skipped'].get('postgres', 0)} comandos)"]
+    objects = ', '.join(f'{count} {kind}' for kind, count in sorted(summary['objects'].items()))
+    lines.append(f"📦 Objetos finais: {objects}")
+    lines.append(f"🔀 DAG: {summary['nodes']} nós, {summary['edges']} arestas, {summary['depth']} níveis, "
+                 f"até {summary['widest_level']} nós em paralelo")
+    legacy = sum(len(item['legacy_columns']) for item in report['merged'].values())
+    lines.append(f"  {summary['superseded']} definições substituídas removidas, "
+                 f"{summary['merged']} tabelas com CREATE repetido unidas ({legacy} colunas só das "
+                 f"definições antigas, mantidas anuláveis), "
+                 f"{summary['skipped'].get('dados', 0)} comandos de dados e "
+                 f"{summary['skipped'].get('outros', 0)} avulsos fora do plano")
+    by_reason = {}
+    for item in report['superseded']:
+        by_reason.setdefault(item['by'], []).append(f"{item['kind']} {item['name']} ({item['statement']})")
+    for by, items in list(by_reason.items())[:8]:
+        more = f' +{len(items) - 3}' if len(items) > 3 else ''
+        lines.append(f"    {by} substitui {', '.join(items[:3])}{more}")
+    if len(by_reason) > 8:
+        lines.append(f"    ... +{len(by_reason) - 8} origens")
+    for warning in report['warnings']:
+        lines.append(f"  ⚠️ {warning}")
+    applied = report.get('apply')
+    if applied:
+        counts = applied['counts']
+        mark = '✅' if not counts['falhou'] and not counts['pulado'] else '❌'
+        lines.append(f"\n{mark} {applied['engine']}: {counts['aplicado']} criados, {counts['ignorado']} ignorados, "
+                     f"{counts['falhou']} falhas, {counts['pulado']} pulados em {applied['seconds']:.2f}s "
+                     f"com {applied['workers']} worker(s)")
+        for node_id, result in applied['nodes'].items():
+            if result['status'] in ('falhou', 'pulado'):
+                lines.append(f"  ❌ {node_id}: {result['error']}")
+    sequential = report.get('sequential')
+    if sequential:
+        lines.append(f"📄 Arquivo a arquivo: {sequential['statements']} comandos, {sequential['failed']} com erro, "
+                     f"{sequential['seconds']:.2f}s")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cria o schema em um banco local a partir de um DAG mínimo')
+    parser.add_argument('--root', default='.', help='raiz do projeto (padrão: diretório atual)')
+    parser.add_argument('--engine', choices=('auto', 'sqlite', 'mysql'), default='auto',
+                        help='auto usa o mysqld local quando disponível')
+    parser.add_argument('--mysql-url', default=os.environ.get('BENCH_MYSQL_URL', DEFAULT_MYSQL_URL))
+    parser.add_argument('--db', default=':memory:', help='arquivo SQLite (padrão: em memória)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='conexões aplicando em paralelo no MySQL (padrão: %(default)s)')
+    parser.add_argument('--plan-only', action='store_true', help='só monta e mostra o plano')
+    parser.add_argument('--compare', action='store_true',
+                        help='aplica também arquivo a arquivo, em um banco novo, para comparar')
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    args = parser.parse_args(argv)
+
+    plan = build_plan(args.root)
+    report = plan_report(plan)
+    if not args.plan_only:
+        report['apply'] = apply_plan(plan, args.engine, args.db, args.mysql_url, max(1, args.workers))
+        if args.compare:
+            report['sequential'] = apply_sequential(args.root, args.engine, ':memory:', args.mysql_url)
+    failed = bool(report.get('apply') and (report['apply']['counts']['falhou'] or report['apply']['counts']['pulado']))
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 1 if failed else 0
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'\n📄 Relatório salvo em: {args.json_out}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
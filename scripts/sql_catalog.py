@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+
+"""
+Leitura dos arquivos SQL do sistema CRM em um catálogo em memória
+Divide os scripts em comandos (respeitando DELIMITER, strings, comentários e
+blocos $$ do Postgres) e monta tabelas, colunas, índices, chaves estrangeiras e
+views a partir de CREATE TABLE, CREATE INDEX, ALTER TABLE e CREATE VIEW.
+"""
+
+import glob
+import os
+import re
+from dataclasses import dataclass, field
+
+# Scripts MySQL que descrevem o banco de produção
+MYSQL_SCHEMA_FILES = ('transicao-mysql-new.sql', 'sql_fixes.sql')
+# Todos os arquivos SQL do projeto, na ordem de leitura; fonte única para os
+# analisadores e para os padrões observados pelo modo --watch
+SCHEMA_GLOBS = (
+    'schema/**/*.sql',
+    'sql-mysql/*.sql',
+    'migrations/*.sql',
+    *MYSQL_SCHEMA_FILES,
+)
+
+_IDENT = r'(?:`[^`]+`|"[^"]+"|\w+)'
+_QUALIFIED = rf'{_IDENT}(?:\s*\.\s*{_IDENT})?'
+_KEYWORDS = {
+    'where', 'on', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'full', 'group',
+    'order', 'limit', 'having', 'union', 'set', 'using', 'natural', 'straight_join',
+    'values', 'select', 'from', 'and', 'or', 'as', 'offset', 'for', 'into', 'when',
+}
+
+
+@dataclass
+class Statement:
+    """Comando SQL já sem comentários, com origem e classificação"""
+    text: str
+    file: str
+    line: int
+    kind: str = 'other'
+    name: str = None
+    table: str = None
+
+
+@dataclass
+class Column:
+    name: str
+    type: str
+    nullable: bool = True
+    default: str = None
+    definition: str = ''
+
+
+@dataclass
+class Index:
+    name: str
+    table: str
+    columns: list
+    unique: bool = False
+    primary: bool = False
+    implicit: bool = False
+    source: str = None
+
+
+@dataclass
+class ForeignKey:
+    table: str
+    columns: list
+    ref_table: str
+    ref_columns: list
+
+
+@dataclass
+class Table:
+    name: str
+    columns: dict = field(default_factory=dict)
+    indexes: list = field(default_factory=list)
+    foreign_keys: list = field(default_factory=list)
+    sources: list = field(default_factory=list)
+
+    def index_named(self, name):
+        for index in self.indexes:
+            if index.name and name and index.name.lower() == name.lower():
+                return index
+        return None
+
+    def add_index(self, index):
+        existing = self.index_named(index.name)
+        if existing is not None:
+            self.indexes.remove(existing)
+        if not index.implicit:
+            # O MySQL descarta o índice implícito da FK quando outro passa a atendê-la
+            self.indexes = [other for other in self.indexes
+                            if not (other.implicit and index.columns[:len(other.columns)] == other.columns)]
+        for other in self.indexes:
+            # Índice igual declarado em outro arquivo: mantém um só
+            if other.columns == index.columns and other.unique == index.unique \
+                    and other.primary == index.primary and other.implicit == index.implicit:
+                return
+        self.indexes.append(index)
+
+
+@dataclass
+class View:
+    name: str
+    sql: str
+    source: str = None
+
+
+def unquote(identifier):
+    """Remove crases/aspas e o prefixo de schema (crmonefactory.users -> users)"""
+    identifier = identifier.strip()
+    parts = re.split(r'\s*\.\s*', identifier)
+    return parts[-1].strip('`"').lower()
+
+
+def split_top_level(text, separator=','):
+    """Divide por separador fora de parênteses e strings"""
+    parts = []
+    depth = 0
+    current = []
+    quote = None
+    for char in text:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+            continue
+        if char in '\'"`':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    tail = ''.join(current).strip()
+    if tail:
+        parts.append(tail)
+    return parts
+
+
+def split_statements(text):
+    """Divide um script em comandos; devolve (texto sem comentários, linha inicial)"""
+    statements = []
+    delimiter = ';'
+    current = []
+    start_line = None
+    line = 1
+    index = 0
+    length = len(text)
+
+    def flush():
+        nonlocal current, start_line
+        statement = ''.join(current).strip()
+        if statement:
+            statements.append((statement, start_line or line))
+        current = []
+        start_line = None
+
+    while index < length:
+        at_line_start = index == 0 or text[index - 1] == '\n'
+        if at_line_start:
+            match = re.match(r'[ \t]*DELIMITER[ \t]+(\S+)[ \t]*(?:\n|$)', text[index:], re.IGNORECASE)
+            if match:
+                flush()
+                delimiter = match.group(1)
+                index += match.end()
+                line += 1
+                continue
+        char = text[index]
+        if text.startswith('--', index) or (char == '#' and (at_line_start or text[index - 1].isspace())):
+            end = text.find('\n', index)
+            index = length if end == -1 else end
+            continue
+        if text.startswith('/*', index):
+            end = text.find('*/', index + 2)
+            end = length if end == -1 else end + 2
+            line += text.count('\n', index, end)
+            current.append(' ')
+            index = end
+            continue
+        if text.startswith(delimiter, index):
+            flush()
+            index += len(delimiter)
+            continue
+        if start_line is None and not char.isspace():
+            start_line = line
+        if char in '\'"`':
+            end = index + 1
+            while end < length:
+                if text[end] == '\\' and char != '`':
+                    end += 2
+                    continue
+                if text[end] == char:
+                    if text.startswith(char * 2, end):
+                        end += 2
+                        continue
+                    break
+                end += 1
+            end = min(end + 1, length)
+        elif char == '$':
+            match = re.match(r'\$(\w*)\$', text[index:])
+            if match:
+                closing = text.find(match.group(0), index + match.end())
+                end = length if closing == -1 else closing + match.end()
+            else:
+                end = index + 1
+        else:
+            end = index + 1
+        segment = text[index:end]
+        line += segment.count('\n')
+        current.append(segment)
+        index = end
+    flush()
+    return statements
+
+
+_CLASSIFIERS = (
+    ('create_table', re.compile(
+        rf'^CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('create_index', re.compile(
+        rf'^CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?INDEX\s+(?:CONCURRENTLY\s+)?'
+        rf'(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED})\s+ON\s+(?:ONLY\s+)?({_QUALIFIED})', re.I)),
+    ('create_view', re.compile(
+        rf'^CREATE\s+(?:OR\s+REPLACE\s+)?(?:ALGORITHM\s*=\s*\w+\s+)?(?:DEFINER\s*=\s*\S+\s+)?'
+        rf'(?:SQL\s+SECURITY\s+\w+\s+)?(?:MATERIALIZED\s+)?VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('create_trigger', re.compile(
+        rf'^CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?TRIGGER\s+(?:IF\s+NOT\s+EXISTS\s+)?'
+        rf'({_QUALIFIED}).*?\bON\s+({_QUALIFIED})', re.I | re.S)),
+    ('create_procedure', re.compile(
+        rf'^CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?PROCEDURE\s+(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('create_function', re.compile(
+        rf'^CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?FUNCTION\s+(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('alter_table', re.compile(rf'^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?({_QUALIFIED})', re.I)),
+    ('drop_table', re.compile(rf'^DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('drop_view', re.compile(rf'^DROP\s+VIEW\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('drop_index', re.compile(
+        rf'^DROP\s+INDEX\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})(?:\s+ON\s+({_QUALIFIED}))?', re.I)),
+    ('drop_trigger', re.compile(rf'^DROP\s+TRIGGER\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('drop_procedure', re.compile(rf'^DROP\s+PROCEDURE\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('drop_function', re.compile(rf'^DROP\s+FUNCTION\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})', re.I)),
+    ('insert', re.compile(rf'^(?:INSERT|REPLACE)\s+(?:IGNORE\s+)?INTO\s+({_QUALIFIED})', re.I)),
+    ('update', re.compile(rf'^UPDATE\s+({_QUALIFIED})', re.I)),
+    ('delete', re.compile(rf'^DELETE\s+FROM\s+({_QUALIFIED})', re.I)),
+)
+
+
+def classify(statement):
+    """Preenche tipo, nome do objeto e tabela alvo de um comando"""
+    for kind, regex in _CLASSIFIERS:
+        match = regex.match(statement.text)
+        if match:
+            statement.kind = kind
+            statement.name = unquote(match.group(1))
+            if kind in ('create_index', 'create_trigger', 'drop_index') and match.lastindex > 1 \
+                    and match.group(2):
+                statement.table = unquote(match.group(2))
+            elif kind in ('create_table', 'alter_table', 'drop_table', 'insert', 'update', 'delete'):
+                statement.table = statement.name
+            return statement
+    return statement
+
+
+def parse_file(path, root='.'):
+    """Lê e classifica todos os comandos de um arquivo SQL"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    relative = os.path.relpath(path, root).replace(os.sep, '/')
+    return [classify(Statement(statement, relative, line))
+            for statement, line in split_statements(text)]
+
+
+def schema_files(root='.', patterns=SCHEMA_GLOBS):
+    """Arquivos SQL do projeto na ordem de leitura do catálogo"""
+    files = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def _index_columns(text):
+    columns = []
+    for part in split_top_level(text):
+        match = re.match(rf'\s*({_IDENT})', part)
+        if match:
+            columns.append(unquote(match.group(1)))
+    return columns
+
+
+def _parenthesized(text, start):
+    """Conteúdo entre o parêntese em start e seu fechamento"""
+    depth = 0
+    quote = None
+    for position in range(start, len(text)):
+        char = text[position]
+        if quote:
+            if char == quote:
+                quote = None
+            continue
+        if char in '\'"`':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:position], position
+    return text[start + 1:], len(text)
+
+
+class Catalog:
+    """Tabelas e views reunidas de todos os arquivos lidos"""
+
+    def __init__(self):
+        self.tables = {}
+        self.views = {}
+        self.statements = []
+
+    @classmethod
+    def from_files(cls, paths, root='.'):
+        catalog = cls()
+        for path in paths:
+            for statement in parse_file(path, root):
+                catalog.apply(statement)
+        return catalog
+
+    @classmethod
+    def load(cls, root='.'):
+        return cls.from_files(schema_files(root), root)
+
+    def table(self, name):
+        return self.tables.get(unquote(name)) if name else None
+
+    def apply(self, statement):
+        self.statements.append(statement)
+        handler = getattr(self, f'_apply_{statement.kind}', None)
+        if handler is not None:
+            handler(statement)
+
+    def _source(self, statement):
+        return f'{statement.file}:{statement.line}'
+
+    def _apply_create_table(self, statement):
+        body_start = statement.text.find('(')
+        if body_start == -1:
+            return  # CREATE TABLE ... AS SELECT / LIKE
+        table = self.tables.setdefault(statement.name, Table(statement.name))
+        table.sources.append(self._source(statement))
+        body, _ = _parenthesized(statement.text, body_start)
+        for item in split_top_level(body):
+            self._apply_definition(table, item, statement)
+
+    def _apply_definition(self, table, item, statement):
+        source = self._source(statement)
+        upper = item.upper()
+        constraint = re.match(rf'CONSTRAINT\s+({_IDENT})\s+', item, re.I)
+        constraint_name = unquote(constraint.group(1)) if constraint else None
+        if constraint:
+            item = item[constraint.end():]
+            upper = item.upper()
+        if upper.startswith('PRIMARY KEY'):
+            columns = _index_columns(_parenthesized(item, item.find('('))[0])
+            table.add_index(Index('PRIMARY', table.name, columns, unique=True, primary=True, source=source))
+        elif re.match(r'(UNIQUE|FULLTEXT|SPATIAL)?\s*(KEY|INDEX)\b|UNIQUE\b', upper):
+            match = re.match(rf'(UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX)?\s*({_IDENT})?\s*\(', item, re.I)
+            if not match:
+                return
+            name = unquote(match.group(2)) if match.group(2) else constraint_name
+            columns = _index_columns(_parenthesized(item, match.end() - 1)[0])
+            unique = upper.startswith('UNIQUE')
+            table.add_index(Index(name or f'{table.name}_{"_".join(columns)}', table.name, columns,
+                                  unique=unique, source=source))
+        elif upper.startswith('FOREIGN KEY'):
+            self._add_foreign_key(table, item, source, constraint_name)
+        elif upper.startswith('CHECK') or upper.startswith('EXCLUDE'):
+            return
+        else:
+            match = re.match(rf'({_IDENT})\s+(.*)$', item, re.S)
+            if not match:
+                return
+            name = unquote(match.group(1))
+            rest = match.group(2)
+            type_match = re.match(r'(\w+(?:\s+VARYING|\s+PRECISION)?(?:\s*\([^)]*\))?(?:\s+UNSIGNED)?)', rest, re.I)
+            column_type = type_match.group(1) if type_match else rest.split()[0]
+            default = re.search(r"\bDEFAULT\s+('(?:[^']|'')*'|\([^)]*\)|[\w.]+(?:\(\))?)", rest, re.I)
+            table.columns[name] = Column(
+                name, column_type.upper(), nullable=not re.search(r'\bNOT\s+NULL\b|\bPRIMARY\s+KEY\b', rest, re.I),
+                default=default.group(1) if default else None, definition=rest)
+            if re.search(r'\bPRIMARY\s+KEY\b', rest, re.I):
+                table.add_index(Index('PRIMARY', table.name, [name], unique=True, primary=True, source=source))
+            elif re.search(r'\bUNIQUE\b', rest, re.I):
+                table.add_index(Index(name, table.name, [name], unique=True, source=source))
+            reference = re.search(rf'\bREFERENCES\s+({_QUALIFIED})\s*\(([^)]*)\)', rest, re.I)
+            if reference:
+                self._register_foreign_key(table, [name], unquote(reference.group(1)),
+                                           _index_columns(reference.group(2)), source)
+
+    def _add_foreign_key(self, table, item, source, name=None):
+        match = re.match(rf'FOREIGN\s+KEY\s*(?:{_IDENT}\s*)?\(([^)]*)\)\s*REFERENCES\s+({_QUALIFIED})\s*\(([^)]*)\)',
+                         item, re.I)
+        if match:
+            self._register_foreign_key(table, _index_columns(match.group(1)), unquote(match.group(2)),
+                                       _index_columns(match.group(3)), source, name)
+
+    def _register_foreign_key(self, table, columns, ref_table, ref_columns, source, name=None):
+        table.foreign_keys.append(ForeignKey(table.name, columns, ref_table, ref_columns))
+        # O InnoDB cria um índice para a FK quando nenhum existente começa por ela
+        if not any(index.columns[:len(columns)] == columns for index in table.indexes):
+            table.add_index(Index(name or f'fk_{table.name}_{"_".join(columns)}', table.name, columns,
+                                  implicit=True, source=source))
+
+    def _apply_create_index(self, statement):
+        table = self.tables.setdefault(statement.table, Table(statement.table))
+        match = re.search(rf'\bON\s+(?:ONLY\s+)?{_QUALIFIED}\s*(?:USING\s+\w+\s*)?\(', statement.text, re.I)
+        if not match:
+            return
+        columns = _index_columns(_parenthesized(statement.text, match.end() - 1)[0])
+        unique = bool(re.match(r'CREATE\s+UNIQUE\b', statement.text, re.I))
+        table.add_index(Index(statement.name, table.name, columns, unique=unique, source=self._source(statement)))
+
+    def _apply_alter_table(self, statement):
+        table = self.tables.setdefault(statement.table, Table(statement.table))
+        match = re.match(rf'ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?{_QUALIFIED}\s*', statement.text, re.I)
+        for action in split_top_level(statement.text[match.end():]):
+            upper = action.upper()
+            if upper.startswith('ADD '):
+                definition = re.sub(r'^ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?', '', action, flags=re.I)
+                self._apply_definition(table, definition, statement)
+            elif upper.startswith('DROP '):
+                target = re.match(rf'DROP\s+(COLUMN\s+|INDEX\s+|KEY\s+|FOREIGN\s+KEY\s+|CONSTRAINT\s+|PRIMARY\s+KEY)?'
+                                  rf'(?:IF\s+EXISTS\s+)?({_IDENT})?', action, re.I)
+                kind = (target.group(1) or 'COLUMN').strip().upper()
+                name = unquote(target.group(2)) if target.group(2) else None
+                if kind == 'COLUMN' and name:
+                    table.columns.pop(name, None)
+                    table.indexes = [index for index in table.indexes if name not in index.columns]
+                elif kind in ('INDEX', 'KEY') and name:
+                    index = table.index_named(name)
+                    if index is not None:
+                        table.indexes.remove(index)
+                elif kind == 'PRIMARY KEY':
+                    table.indexes = [index for index in table.indexes if not index.primary]
+            elif upper.startswith(('MODIFY ', 'CHANGE ', 'ALTER COLUMN ')):
+                modify = re.match(rf'(?:MODIFY|ALTER)\s+(?:COLUMN\s+)?({_IDENT})\s+(?:TYPE\s+)?(.*)$', action, re.I | re.S)
+                change = re.match(rf'CHANGE\s+(?:COLUMN\s+)?({_IDENT})\s+({_IDENT})\s+(.*)$', action, re.I | re.S)
+                if change:
+                    old, new = unquote(change.group(1)), unquote(change.group(2))
+                    table.columns.pop(old, None)
+                    self._apply_definition(table, f'{new} {change.group(3)}', statement)
+                    for index in table.indexes:
+                        index.columns = [new if column == old else column for column in index.columns]
+                elif modify and not re.match(r'(SET|DROP)\b', modify.group(2), re.I):
+                    self._apply_definition(table, f'{unquote(modify.group(1))} {modify.group(2)}', statement)
+            elif upper.startswith('RENAME TO'):
+                new_name = unquote(action.split()[-1])
+                table = self.tables.pop(table.name)
+                table.name = new_name
+                self.tables[new_name] = table
+
+    def _apply_drop_table(self, statement):
+        self.tables.pop(statement.name, None)
+
+    def _apply_create_view(self, statement):
+        match = re.search(r'\bAS\b\s*(\(?\s*SELECT\b.*)$', statement.text, re.I | re.S)
+        sql = match.group(1) if match else statement.text
+        self.views[statement.name] = View(statement.name, sql, self._source(statement))
+
+    def _apply_drop_view(self, statement):
+        self.views.pop(statement.name, None)
+
+    def _apply_drop_index(self, statement):
+        tables = [self.tables[statement.table]] if statement.table in self.tables else self.tables.values()
+        for table in tables:
+            index = table.index_named(statement.name)
+            if index is not None:
+                table.indexes.remove(index)
+
+    def view_columns(self, name):
+        """Mapeia as colunas de uma view para (tabela, coluna) de origem"""
+        view = self.views.get(unquote(name))
+        if view is None:
+            return {}
+        aliases = table_aliases(view.sql)
+        select = re.match(r'\(?\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\bFROM\b', view.sql, re.I | re.S)
+        if not select:
+            return {}
+        mapping = {}
+        for item in split_top_level(select.group(1)):
+            star = re.match(r'^(\w+)\.\*$', item)
+            if star:
+                source = aliases.get(star.group(1).lower())
+                table = self.tables.get(source)
+                if table is not None:
+                    for column in table.columns:
+                        mapping.setdefault(column, (source, column))
+                continue
+            match = re.match(r'^(?:(\w+)\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?$', item.strip(), re.I)
+            if not match:
+                alias = re.search(r'\bAS\s+(\w+)\s*$', item, re.I)
+                if alias:
+                    mapping[alias.group(1).lower()] = None
+                continue
+            qualifier, column, alias = match.groups()
+            if qualifier:
+                source = aliases.get(qualifier.lower())
+            else:
+                source = next(iter(aliases.values()), None)
+            mapping[(alias or column).lower()] = (source, column.lower()) if source else None
+        return mapping
+
+
+def table_aliases(sql):
+    """Aliases de FROM/JOIN de uma consulta: alias -> tabela (a própria tabela também)"""
+    aliases = {}
+    pattern = re.compile(rf'\b(?:FROM|JOIN)\s+({_QUALIFIED})(?:\s+(?:AS\s+)?(\w+))?', re.I)
+    for match in pattern.finditer(sql):
+        table = unquote(match.group(1))
+        if table == 'select' or table.startswith('('):
+            continue
+        aliases.setdefault(table, table)
+        alias = match.group(2)
+        if alias and alias.lower() not in _KEYWORDS:
+            aliases[alias.lower()] = table
+    return aliases
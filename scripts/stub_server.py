@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+Servidor HTTP local que imita as rotas /api do sistema CRM
+Usado pelas ferramentas de carga e replay para rodar sem o Next.js nem o banco.
+Execute com: python3 scripts/stub_server.py [--port 3001] [--latency-ms 5]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Responde qualquer rota /api com JSON, aplicando a latência configurada"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body_in = self.rfile.read(length) if length else b''
+        path = urlsplit(self.path).path
+        server.record(self.command, path, len(body_in))
+
+        delay = server.latency_for(path)
+        if delay:
+            time.sleep(delay)
+
+        if not path.startswith('/api/'):
+            status, payload = 404, {'error': 'Rota não encontrada'}
+        else:
+            status, payload = 200, server.payload_for(path)
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _respond
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Servidor de apoio com latência por prefixo de rota e contagem de requisições"""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency_ms=0.0, route_latency_ms=None,
+                 payload_items=10, verbose=False):
+        super().__init__(address, StubHandler)
+        self.latency_ms = latency_ms
+        self.route_latency_ms = dict(route_latency_ms or {})
+        self.payload_items = payload_items
+        self.verbose = verbose
+        self.requests = deque(maxlen=100000)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def handle_error(self, request, client_address):
+        # Cliente que desistiu da resposta (ex.: tempo limite do load_test) não é erro do servidor
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def latency_for(self, path):
+        for prefix, latency in sorted(self.route_latency_ms.items(), key=lambda item: -len(item[0])):
+            if path.startswith(prefix):
+                return latency / 1000.0
+        return self.latency_ms / 1000.0
+
+    def payload_for(self, path):
+        return [{'id': f'{index:08d}', 'rota': path} for index in range(self.payload_items)]
+
+    def record(self, method, path, size):
+        with self._lock:
+            self.requests.append((time.monotonic(), method, path, size))
+
+    def start(self):
+        """Inicia o servidor em uma thread de fundo e devolve a própria instância"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Servidor local que imita as rotas /api do CRM')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3001)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='latência aplicada a todas as respostas')
+    parser.add_argument('--items', type=int, default=10, help='itens por resposta JSON')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = StubServer((args.host, args.port), latency_ms=args.latency_ms,
+                        payload_items=args.items, verbose=args.verbose)
+    print(f'Servidor de apoio ouvindo em {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,14 +3,24 @@
 """
 Script de Teste Abrangente - Sistema CRM
 Valida todas as melhorias implementadas no sistema
+As verificações vêm de scripts/checks.toml (suíte improvements)
+Execute com: python3 scripts/test_all_improvements.py [--root DIR] [--incremental] [--timings tempos.json] [--chrome-trace trace.json]
 """
 
+import argparse
 import os
 import sys
-import json
 import time
 from pathlib import Path
 
+import instrumentation
+import lockfile_graph
+from check_plan import DEFAULT_ROOT, CheckPlan, load_manifest
+from instrumentation import span
+from results_cache import DEFAULT_CACHE_FILE, ResultsCache, track
+
+_plan = None
+
 def print_header(title):
     """Imprime cabeçalho formatado"""
     print("\n" + "="*60)
@@ -30,334 +40,94 @@ def print_test(test_name, status="RUNNING"):
     color = status_colors.get(status, "")
     print(f"{color}[{status}]{reset_color} {test_name}")
 
-def test_file_exists(file_path, description):
-    """Testa se um arquivo existe"""
-    print_test(f"Verificando {description}", "RUNNING")
-    
-    if os.path.exists(file_path):
-        print_test(f"✓ {description} existe", "PASS")
-        return True
-    else:
-        print_test(f"✗ {description} não encontrado", "FAIL")
-        return False
+def use_root(root):
+    """Compila as verificações da suíte improvements para a raiz indicada"""
+    global _plan
+    _plan = CheckPlan(load_manifest(), ["improvements"], root)
+    return _plan
+
+def current_plan():
+    return _plan or use_root(DEFAULT_ROOT)
+
+def run_check(name):
+    """Executa uma verificação declarada em checks.toml e exibe seus itens"""
+    plan = current_plan()
+    print_header(plan.checks[("improvements", name)]["header"])
+    
+    result = plan.run("improvements", name)
+    for event in result["events"]:
+        if event["kind"] == "summary":
+            print(f"\n{event['message']}")
+            continue
+        if event["kind"] == "exists":
+            print_test(f"Verificando {event['label']}", "RUNNING")
+        print_test(event["message"], "PASS" if event["ok"] else "FAIL")
+    
+    return result["passed"]
 
 def test_directory_structure():
     """Testa a estrutura de diretórios do projeto"""
-    print_header("TESTE 1: ESTRUTURA DE DIRETÓRIOS")
-    
-    base_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    
-    required_dirs = [
-        ("app/api/auth", "Diretório de autenticação"),
-        ("app/api/comercial", "Diretório comercial"),
-        ("app/api/documentos", "Diretório de documentos"),
-        ("components", "Diretório de componentes"),
-        ("lib", "Diretório de bibliotecas"),
-        ("middleware", "Diretório de middleware"),
-        ("hooks", "Diretório de hooks")
-    ]
-    
-    passed = 0
-    total = len(required_dirs)
-    
-    for dir_path, description in required_dirs:
-        full_path = os.path.join(base_path, dir_path)
-        if test_file_exists(full_path, description):
-            passed += 1
-    
-    print(f"\nResultado: {passed}/{total} diretórios encontrados")
-    return passed == total
+    return run_check("Estrutura de Diretórios")
 
 def test_api_files():
     """Testa se os arquivos de API existem"""
-    print_header("TESTE 2: ARQUIVOS DE API")
-    
-    base_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    
-    api_files = [
-        ("app/api/auth/login/route.ts", "API de Login"),
-        ("app/api/auth/register/route.ts", "API de Registro"),
-        ("app/api/auth/refresh/route.ts", "API de Refresh Token"),
-        ("app/api/auth/avatar/route.ts", "API de Avatar"),
-        ("app/api/users/profile/route.ts", "API de Perfil"),
-        ("app/api/comercial/reunioes/route.ts", "API de Reuniões"),
-        ("app/api/comercial/oportunidades/route.ts", "API de Oportunidades"),
-        ("app/api/documentos/route.ts", "API de Documentos"),
-        ("app/api/documentos/por-tag/route.ts", "API de Documentos por Tag")
-    ]
-    
-    passed = 0
-    total = len(api_files)
-    
-    for file_path, description in api_files:
-        full_path = os.path.join(base_path, file_path)
-        if test_file_exists(full_path, description):
-            passed += 1
-    
-    print(f"\nResultado: {passed}/{total} APIs encontradas")
-    return passed == total
+    return run_check("Arquivos de API")
 
 def test_fixed_files():
     """Testa se os arquivos corrigidos existem"""
-    print_header("TESTE 3: ARQUIVOS CORRIGIDOS")
-    
-    base_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    
-    fixed_files = [
-        ("app/api/auth/login/route_fixed.ts", "Login API Corrigida"),
-        ("app/api/auth/avatar/route_fixed.ts", "Avatar API Corrigida"),
-        ("app/api/comercial/reunioes/route_fixed.ts", "Reuniões API Corrigida"),
-        ("app/api/comercial/reunioes/[id]/route_fixed.ts", "Reunião Específica API Corrigida"),
-        ("components/documentos/visualizador-documentos.tsx", "Visualizador de Documentos"),
-        ("components/perfil/gerenciar-perfil.tsx", "Gerenciador de Perfil"),
-        ("middleware/security.ts", "Middleware de Segurança"),
-        ("lib/rate-limit.ts", "Rate Limiting"),
-        ("lib/cache.ts", "Sistema de Cache")
-    ]
-    
-    passed = 0
-    total = len(fixed_files)
-    
-    for file_path, description in fixed_files:
-        full_path = os.path.join(base_path, file_path)
-        if test_file_exists(full_path, description):
-            passed += 1
-    
-    print(f"\nResultado: {passed}/{total} arquivos corrigidos encontrados")
-    return passed == total
+    return run_check("Arquivos Corrigidos")
 
 def test_documentation_files():
     """Testa se os arquivos de documentação existem"""
-    print_header("TESTE 4: DOCUMENTAÇÃO")
-    
-    base_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    
-    doc_files = [
-        ("sql_fixes.sql", "Comandos SQL de Correção"),
-        ("analise_agendamento.md", "Análise do Sistema de Agendamento"),
-        ("analise_autenticacao.md", "Análise do Sistema de Autenticação"),
-        ("melhorias_robustez.md", "Melhorias de Robustez"),
-        ("RESUMO_EXECUTIVO.md", "Resumo Executivo"),
-        ("todo.md", "Lista de Tarefas")
-    ]
-    
-    passed = 0
-    total = len(doc_files)
-    
-    for file_path, description in doc_files:
-        full_path = os.path.join(base_path, file_path)
-        if test_file_exists(full_path, description):
-            passed += 1
-    
-    print(f"\nResultado: {passed}/{total} arquivos de documentação encontrados")
-    return passed == total
+    return run_check("Documentação")
 
 def test_sql_file_content():
     """Testa o conteúdo do arquivo SQL"""
-    print_header("TESTE 5: CONTEÚDO DO ARQUIVO SQL")
-    
-    sql_file = "/home/ubuntu/crmoniefactory/crmoniefactory-main/sql_fixes.sql"
-    
-    if not os.path.exists(sql_file):
-        print_test("Arquivo SQL não encontrado", "FAIL")
-        return False
-    
-    try:
-        with open(sql_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        required_sections = [
-            ("ALTER TABLE documentos", "Correções na tabela documentos"),
-            ("CREATE INDEX", "Criação de índices"),
-            ("CREATE TRIGGER", "Criação de triggers"),
-            ("CREATE PROCEDURE", "Criação de procedimentos"),
-            ("CREATE TABLE.*login_attempts", "Tabela de tentativas de login"),
-            ("CREATE TABLE.*active_sessions", "Tabela de sessões ativas"),
-            ("CREATE TABLE.*user_activity_log", "Tabela de log de atividades"),
-            ("CLOUDINARY", "Configurações do Cloudinary"),
-            ("reunioes", "Melhorias no sistema de reuniões")
-        ]
-        
-        passed = 0
-        total = len(required_sections)
-        
-        for pattern, description in required_sections:
-            if pattern.upper() in content.upper():
-                print_test(f"✓ {description} encontrada", "PASS")
-                passed += 1
-            else:
-                print_test(f"✗ {description} não encontrada", "FAIL")
-        
-        print(f"\nResultado: {passed}/{total} seções SQL encontradas")
-        return passed == total
-        
-    except Exception as e:
-        print_test(f"Erro ao ler arquivo SQL: {e}", "FAIL")
-        return False
+    return run_check("Conteúdo SQL")
 
 def test_component_structure():
     """Testa a estrutura dos componentes React"""
-    print_header("TESTE 6: ESTRUTURA DOS COMPONENTES")
-    
-    base_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    
-    try:
-        # Testar componente de visualização de documentos
-        doc_viewer_path = os.path.join(base_path, "components/documentos/visualizador-documentos.tsx")
-        if os.path.exists(doc_viewer_path):
-            with open(doc_viewer_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            required_features = [
-                ("useState", "Gerenciamento de estado"),
-                ("useEffect", "Efeitos de ciclo de vida"),
-                ("filtros", "Sistema de filtros"),
-                ("preview", "Preview de documentos"),
-                ("download", "Funcionalidade de download")
-            ]
-            
-            passed = 0
-            total = len(required_features)
-            
-            for feature, description in required_features:
-                if feature in content:
-                    print_test(f"✓ {description} implementada", "PASS")
-                    passed += 1
-                else:
-                    print_test(f"✗ {description} não encontrada", "FAIL")
-            
-            print(f"\nComponente de Documentos: {passed}/{total} funcionalidades")
-        
-        # Testar componente de perfil
-        profile_path = os.path.join(base_path, "components/perfil/gerenciar-perfil.tsx")
-        if os.path.exists(profile_path):
-            with open(profile_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            profile_features = [
-                ("Avatar", "Gerenciamento de avatar"),
-                ("upload", "Upload de arquivos"),
-                ("Cloudinary", "Integração com Cloudinary"),
-                ("validação", "Validação de dados"),
-                ("preferências", "Gerenciamento de preferências")
-            ]
-            
-            passed_profile = 0
-            total_profile = len(profile_features)
-            
-            for feature, description in profile_features:
-                if feature in content:
-                    print_test(f"✓ {description} implementada", "PASS")
-                    passed_profile += 1
-                else:
-                    print_test(f"✗ {description} não encontrada", "FAIL")
-            
-            print(f"\nComponente de Perfil: {passed_profile}/{total_profile} funcionalidades")
-            
-            return (passed + passed_profile) == (total + total_profile)
-        
-        return False
-        
-    except Exception as e:
-        print_test(f"Erro ao analisar componentes: {e}", "FAIL")
-        return False
+    return run_check("Estrutura de Componentes")
 
 def test_security_improvements():
     """Testa as melhorias de segurança"""
-    print_header("TESTE 7: MELHORIAS DE SEGURANÇA")
-    
-    base_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    
-    security_files = [
-        ("middleware/security.ts", "Middleware de Segurança"),
-        ("lib/rate-limit.ts", "Rate Limiting"),
-        ("lib/cache.ts", "Sistema de Cache")
-    ]
-    
-    passed = 0
-    total = len(security_files)
-    
-    for file_path, description in security_files:
-        full_path = os.path.join(base_path, file_path)
-        if test_file_exists(full_path, description):
-            passed += 1
-    
-    # Verificar se as APIs corrigidas incluem melhorias de segurança
-    login_fixed = os.path.join(base_path, "app/api/auth/login/route_fixed.ts")
-    if os.path.exists(login_fixed):
-        try:
-            with open(login_fixed, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            security_features = [
-                ("rate", "Rate limiting"),
-                ("sanitize", "Sanitização de inputs"),
-                ("bcrypt", "Hash de senhas"),
-                ("validation", "Validação de dados"),
-                ("audit", "Log de auditoria")
-            ]
-            
-            for feature, description in security_features:
-                if feature.lower() in content.lower():
-                    print_test(f"✓ {description} implementada", "PASS")
-                    passed += 1
-                else:
-                    print_test(f"✗ {description} não encontrada", "FAIL")
-            
-            total += len(security_features)
-            
-        except Exception as e:
-            print_test(f"Erro ao analisar segurança: {e}", "FAIL")
-    
-    print(f"\nResultado: {passed}/{total} melhorias de segurança encontradas")
-    return passed >= (total * 0.8)  # 80% de aprovação
+    return run_check("Melhorias de Segurança")
 
 def test_package_dependencies():
-    """Testa as dependências do projeto"""
-    print_header("TESTE 8: DEPENDÊNCIAS DO PROJETO")
-    
-    package_json_path = "/home/ubuntu/crmoniefactory/crmoniefactory-main/package.json"
-    
-    if not os.path.exists(package_json_path):
-        print_test("package.json não encontrado", "FAIL")
-        return False
-    
+    """Testa as dependências do projeto e o fechamento do servidor nos lockfiles"""
+    passed = run_check("Dependências")
+    
+    root = current_plan().root
+    track(lockfile_graph.DEFAULT_CONFIG, content=True)
+    paths = lockfile_graph.lockfiles(root)
+    for path in paths + [os.path.join(root, "package.json")]:
+        track(path, content=True)
+    if not paths:
+        print_test("Nenhum lockfile para analisar", "SKIP")
+        return passed
+    
+    print_test("Analisando grafo dos lockfiles", "RUNNING")
     try:
-        with open(package_json_path, 'r', encoding='utf-8') as f:
-            package_data = json.load(f)
-        
-        dependencies = package_data.get('dependencies', {})
-        dev_dependencies = package_data.get('devDependencies', {})
-        all_deps = {**dependencies, **dev_dependencies}
-        
-        required_deps = [
-            ("next", "Next.js Framework"),
-            ("react", "React Library"),
-            ("mysql2", "MySQL Driver"),
-            ("bcryptjs", "Password Hashing"),
-            ("jsonwebtoken", "JWT Tokens"),
-            ("uuid", "UUID Generation"),
-            ("cloudinary", "Cloudinary SDK")
-        ]
-        
-        passed = 0
-        total = len(required_deps)
-        
-        for dep, description in required_deps:
-            if dep in all_deps:
-                print_test(f"✓ {description} ({dep}) instalada", "PASS")
-                passed += 1
-            else:
-                print_test(f"✗ {description} ({dep}) não encontrada", "FAIL")
-        
-        print(f"\nResultado: {passed}/{total} dependências encontradas")
-        return passed == total
-        
-    except Exception as e:
-        print_test(f"Erro ao analisar package.json: {e}", "FAIL")
+        report = lockfile_graph.analyze(root)
+    except (OSError, lockfile_graph.LockfileError) as e:
+        print_test(f"Erro ao ler lockfiles: {e}", "FAIL")
         return False
+    for source, data in report["lockfiles"].items():
+        closure = data["server_closure"]
+        print_test(f"{source}: {closure['packages']} pacotes no servidor, "
+                   f"{data['duplicates']['packages']} duplicados", "PASS")
+    drift = report.get("drift")
+    if drift and (drift["version_mismatch"] or drift["direct"]):
+        # Divergência entre lockfiles é aviso: só um deles é usado na instalação
+        print(f"⚠️  Lockfiles divergentes: {len(drift['version_mismatch'])} versões e "
+              f"{len(drift['direct'])} dependências diretas (python3 scripts/lockfile_graph.py)")
+    for violation in report["violations"]:
+        added = ", ".join(item["package"] for item in violation["added"][:5])
+        print_test(f"{violation['lockfile']}: {violation['metric']} com {violation['current']} pacotes "
+                   f"(orçamento {violation['budget']}) {added}", "FAIL")
+    return passed and not report["violations"]
 
-def generate_test_report():
+def generate_test_report(results_cache=None):
     """Gera relatório final dos testes"""
     print_header("RELATÓRIO FINAL DOS TESTES")
     
@@ -377,22 +147,34 @@ def generate_test_report():
     passed_tests = 0
     
     for test_name, test_func in tests:
+        reused = []
+        started = time.perf_counter()
         try:
-            result = test_func()
-            results.append((test_name, "PASS" if result else "FAIL"))
+            with span(test_name, "check"):
+                if results_cache is not None:
+                    result = results_cache.run(
+                        test_name, test_func,
+                        on_reuse=lambda name: (reused.append(name),
+                                               print_test(f"{name}: entradas inalteradas, resultado reaproveitado", "SKIP")))
+                else:
+                    result = test_func()
+            status = "PASS" if result else "FAIL"
             if result:
                 passed_tests += 1
         except Exception as e:
             print_test(f"Erro no teste {test_name}: {e}", "FAIL")
-            results.append((test_name, "ERROR"))
+            status = "ERROR"
+        results.append({"name": test_name, "status": status, "reused": bool(reused),
+                        "seconds": time.perf_counter() - started})
     
     print("\n" + "="*60)
     print(" RESUMO DOS TESTES")
     print("="*60)
     
-    for test_name, status in results:
+    for result in results:
+        status = result["status"]
         status_symbol = "✓" if status == "PASS" else "✗" if status == "FAIL" else "!"
-        print(f"{status_symbol} {test_name}: {status}")
+        print(f"{status_symbol} {result['name']}: {status} ({result['seconds'] * 1000:.1f} ms)")
     
     print(f"\nResultado Final: {passed_tests}/{total_tests} testes passaram")
     
@@ -408,42 +190,113 @@ def generate_test_report():
     else:
         print("\n❌ CRÍTICO! Sistema precisa de revisão completa.")
     
-    return success_rate >= 75
+    return success_rate >= 75, results
+
+def write_report(report_file, results, recorder, project_dir):
+    """Grava test_report.txt com o resultado e o tempo de cada verificação e das sondagens"""
+    checks = [event for event in recorder.events if event["cat"] == "check"]
+    probes = [event for event in recorder.events if event["cat"] == "probe"]
+    passed = sum(1 for result in results if result["status"] == "PASS")
+    total_ms = sum(result["seconds"] for result in results) * 1000
+    
+    lines = [
+        f"Relatório de Testes - {time.strftime('%d/%m/%Y %H:%M:%S')}",
+        "=" * 60,
+        "Sistema CRM - Validação de Melhorias",
+        f"Diretório: {project_dir}",
+        "=" * 60,
+        "",
+        f"{'Verificação':<32}{'Status':<8}{'Tempo (ms)':>12}{'Sondagens':>10}",
+    ]
+    for result in results:
+        event = next((event for event in checks if event["name"] == result["name"]), None)
+        count = 0
+        if event is not None:
+            end = event["start_ns"] + event["dur_ns"]
+            count = sum(1 for probe in probes if event["start_ns"] <= probe["start_ns"] <= end)
+        status = result["status"] + ("*" if result["reused"] else "")
+        lines.append(f"{result['name']:<32}{status:<8}{result['seconds'] * 1000:>12.2f}{count:>10}")
+    lines += [
+        "-" * 60,
+        f"Resultado: {passed}/{len(results)} verificações passaram em {total_ms:.2f} ms",
+    ]
+    if any(result["reused"] for result in results):
+        lines.append("* resultado reaproveitado do modo incremental")
+    
+    lines += ["", "Sondagens mais lentas", "-" * 60]
+    for probe in sorted(probes, key=lambda probe: -probe["dur_ns"])[:10]:
+        item = os.path.relpath(probe["args"].get("item", ""), project_dir)
+        lines.append(f"{probe['name']:<14}{item:<38.38}{probe['dur_ns'] / 1e6:>8.3f} ms")
+    lines += ["", "Tempo por tipo de trecho", "-" * 60, recorder.format_summary()]
+    
+    with open(report_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
 
-def main():
+def parse_args(argv=None):
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Teste abrangente do sistema CRM")
+    parser.add_argument("--root", default=DEFAULT_ROOT,
+                        help="raiz do projeto a validar (padrão: pai de scripts/)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reavalia apenas as verificações cujos arquivos mudaram")
+    parser.add_argument("--cache-file", default=None,
+                        help=f"arquivo de cache do modo incremental (padrão: {DEFAULT_CACHE_FILE} na raiz do projeto)")
+    instrumentation.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Função principal"""
+    args = parse_args(argv)
+
     print("="*60)
     print(" TESTE ABRANGENTE DO SISTEMA CRM")
     print(" Validação de Todas as Melhorias Implementadas")
     print("="*60)
     print(f" Data/Hora: {time.strftime('%d/%m/%Y %H:%M:%S')}")
-    print(f" Diretório: /home/ubuntu/crmoniefactory/crmoniefactory-main")
+    project_dir = os.path.abspath(args.root)
+    print(f" Diretório: {project_dir}")
     print("="*60)
     
     # Verificar se o diretório do projeto existe
-    project_dir = "/home/ubuntu/crmoniefactory/crmoniefactory-main"
-    if not os.path.exists(project_dir):
+    if not os.path.isdir(project_dir):
         print_test("Diretório do projeto não encontrado!", "FAIL")
         sys.exit(1)
+    use_root(project_dir)
     
     # Executar testes
-    success = generate_test_report()
+    results_cache = None
+    if args.incremental:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        sources = [os.path.join(script_dir, name) for name in
+                   ("test_all_improvements.py", "check_plan.py", "checks.toml",
+                    "content_cache.py", "results_cache.py", "lockfile_graph.py")]
+        results_cache = ResultsCache(args.cache_file or os.path.join(project_dir, DEFAULT_CACHE_FILE),
+                                     sources)
+    
+    with instrumentation.recorder_from_args(args) as recorder:
+        success, results = generate_test_report(results_cache)
+    
+    if results_cache is not None:
+        try:
+            results_cache.save()
+            print(f"\n♻️  Modo incremental: {results_cache.reused} reaproveitados, "
+                  f"{results_cache.evaluated} reavaliados")
+        except Exception as e:
+            print(f"\n⚠️  Erro ao salvar cache incremental: {e}")
     
     # Salvar relatório
     report_file = os.path.join(project_dir, "test_report.txt")
     try:
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(f"Relatório de Testes - {time.strftime('%d/%m/%Y %H:%M:%S')}\n")
-            f.write("="*60 + "\n")
-            f.write("Sistema CRM - Validação de Melhorias\n")
-            f.write("="*60 + "\n\n")
-            f.write("Este relatório foi gerado automaticamente.\n")
-            f.write("Para detalhes completos, execute o script novamente.\n")
-        
+        write_report(report_file, results, recorder, project_dir)
         print(f"\n📄 Relatório salvo em: {report_file}")
     except Exception as e:
         print(f"\n⚠️  Erro ao salvar relatório: {e}")
     
+    try:
+        instrumentation.export(recorder, args)
+    except OSError as e:
+        print(f"\n⚠️  Erro ao salvar tempos: {e}")
+    
     return 0 if success else 1
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""
+Testes da correção em lote das URLs de documentos (scripts/fix_document_urls.py)
+Execute com: python3 -m pytest scripts/test_fix_document_urls.py
+"""
+
+from fix_document_urls import STRATEGIES, fixed_url, repair
+from local_db import LocalDatabase
+
+BROKEN = 'https://res.cloudinary.com/crm/image/upload/v1/docs/image/upload/edital.pdf'
+FIXED = 'https://res.cloudinary.com/crm/raw/upload/v1/docs/image/upload/edital.pdf'
+
+
+def documents_database(url):
+    database = LocalDatabase.sqlite()
+    database.execute('CREATE TABLE documentos (id CHAR(36) PRIMARY KEY, nome TEXT, formato TEXT, '
+                     'url_documento TEXT)', translate=False)
+    database.execute('INSERT INTO documentos VALUES (?, ?, ?, ?)', ('1', 'edital.pdf', 'pdf', url))
+    database.commit()
+    return database
+
+
+def test_fixed_url_replaces_only_the_first_segment():
+    assert fixed_url(BROKEN) == FIXED
+
+
+def test_repair_keeps_repeated_segment_in_the_object_key():
+    for strategy in STRATEGIES:
+        database = documents_database(BROKEN)
+        result = repair(database, strategy=strategy, log=lambda message: None)
+        assert result['updated'] == 1
+        assert database.scalar('SELECT url_documento FROM documentos') == FIXED
+
+
+def test_repair_does_not_touch_already_fixed_urls():
+    database = documents_database(FIXED)
+    result = repair(database, log=lambda message: None)
+    assert result['scanned'] == 0
+    assert database.scalar('SELECT url_documento FROM documentos') == FIXED
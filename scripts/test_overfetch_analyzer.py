@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+"""
+Testes do analisador de campos buscados e não usados (scripts/overfetch_analyzer.py)
+Execute com: python3 -m pytest scripts/test_overfetch_analyzer.py
+"""
+
+import os
+
+import overfetch_analyzer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_relative_and_absolute_roots_give_the_same_report(monkeypatch):
+    monkeypatch.chdir(PROJECT_ROOT)
+    relative = overfetch_analyzer.analyze('.', sample=False)
+    absolute = overfetch_analyzer.analyze(PROJECT_ROOT, sample=False)
+
+    assert relative == absolute
+    # lista-clientes.tsx, importado por quem usa o hook da rota, lê cnpj
+    clientes = next(route for route in relative['routes'] if route['route'] == '/api/comercial/clientes')
+    assert 'cnpj' not in clientes['unused_fields']
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+"""
+Testes do analisador de requisições na montagem das páginas (scripts/request_waterfall.py)
+Execute com: python3 -m pytest scripts/test_request_waterfall.py
+"""
+
+import os
+
+import request_waterfall
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_patch_built_from_get_response_is_not_reported_as_sequential():
+    # hooks/useLicitacoesOtimizado.ts: o PATCH de atualizarStatusLicitacao sai de
+    # makeRequest, cujo payload é tipado pelo payloadCompleto montado com a resposta do GET
+    report = request_waterfall.analyze(PROJECT_ROOT)
+
+    assert not [action for action in report['actions']
+                if action['hook'] == 'useLicitacoesOtimizado' and action['function'] == 'atualizarStatusLicitacao']
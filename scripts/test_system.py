@@ -2,12 +2,25 @@
 
 """
 Script de teste para validar as principais funcionalidades do sistema CRM
-Execute com: python3 scripts/test_system.py
+As verificações de arquivos vêm de scripts/checks.toml (suíte system)
+Com --watch continua rodando e reexecuta só as verificações afetadas por cada mudança
+Com --schema também cria o schema em um SQLite local a partir do DAG de scripts/schema_bootstrap.py
+Execute com: python3 scripts/test_system.py [--root DIR] [--jobs N] [--watch] [--schema] [--timings tempos.json] [--chrome-trace trace.json]
 """
 
+import argparse
 import os
 import sys
-from pathlib import Path
+
+from check_runner import CheckRunner, emit
+from results_cache import recording
+import bundle_budget
+import check_plan
+import file_watcher
+import instrumentation
+import query_analyzer
+import schema_bootstrap
+import sql_catalog
 
 # Cores para output
 class Colors:
@@ -18,8 +31,15 @@ class Colors:
     BOLD = '\033[1m'
     RESET = '\033[0m'
 
+MANIFEST = check_plan.load_manifest()
+
+# Rotas principais da API
+API_ROUTES = check_plan.api_routes(MANIFEST)
+
+_plan = None
+
 def log(message, color=Colors.RESET):
-    print(f"{color}{message}{Colors.RESET}")
+    emit(f"{color}{message}{Colors.RESET}")
 
 def log_success(message):
     log(f"✅ {message}", Colors.GREEN)
@@ -33,254 +53,169 @@ def log_warning(message):
 def log_info(message):
     log(f"ℹ️  {message}", Colors.BLUE)
 
-def file_exists(file_path):
-    return Path(file_path).exists()
+def use_root(root):
+    """Compila as verificações da suíte system para a raiz indicada"""
+    global _plan
+    _plan = check_plan.CheckPlan(MANIFEST, ['system'], root)
+    return _plan
 
-def dir_exists(dir_path):
-    return Path(dir_path).is_dir()
+def current_plan():
+    return _plan or use_root(check_plan.DEFAULT_ROOT)
 
-def check_file_content(file_path, search_string):
-    if not file_exists(file_path):
-        return False
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            return search_string in content
-    except:
-        return False
-
-def test_project_structure():
-    log(f"\n📁 Testando estrutura do projeto...", Colors.BOLD)
-    
-    required_dirs = [
-        'app/api',
-        'components',
-        'lib',
-        'hooks',
-        'types',
-        'middleware',
-        'scripts'
-    ]
-    
-    passed = 0
-    
-    for dir_path in required_dirs:
-        if dir_exists(dir_path):
-            log_success(f"Diretório {dir_path} existe")
-            passed += 1
+def run_check(name):
+    """Executa uma verificação declarada em checks.toml e exibe seus itens"""
+    plan = current_plan()
+    check = plan.checks[('system', name)]
+    log(f"\n{check['header']}", Colors.BOLD)
+    
+    result = plan.run('system', name)
+    for event in result['events']:
+        if event['severity'] == 'ok':
+            log_success(event['message'])
+        elif event['severity'] == 'warning':
+            log_warning(event['message'])
+        elif event['severity'] == 'info':
+            log_info(event['message'])
         else:
-            log_error(f"Diretório {dir_path} não encontrado")
+            log_error(event['message'])
     
-    return passed == len(required_dirs)
+    return result['passed']
+
+def test_project_structure():
+    return run_check('Estrutura do Projeto')
 
 def test_api_routes():
-    log(f"\n🔌 Testando rotas da API...", Colors.BOLD)
-    
-    api_routes = [
-        'app/api/comercial/oportunidades/route.ts',
-        'app/api/comercial/oportunidades/[id]/route.ts',
-        'app/api/comercial/oportunidades/[id]/documentos/route.ts',
-        'app/api/licitacoes/route.ts',
-        'app/api/licitacoes/[id]/route.ts',
-        'app/api/documentos/route.ts',
-        'app/api/documentos/por-oportunidade/route.ts',
-        'app/api/documentos/por-tag/route.ts',
-        'app/api/contatos/route.ts',
-        'app/api/contatos/[id]/route.ts'
-    ]
+    return run_check('Rotas da API')
+
+def test_route_queries():
+    log(f"\n🔎 Analisando acesso ao banco nas rotas da API...", Colors.BOLD)
     
-    passed = 0
+    report = query_analyzer.analyze(current_plan().root)
+    baseline = query_analyzer.load_baseline(query_analyzer.DEFAULT_BASELINE)
     
-    for route in api_routes:
-        if file_exists(route):
-            log_success(f"Rota {route} existe")
-            passed += 1
+    for rule, count in report['summary']['by_rule'].items():
+        if count:
+            log_warning(f"{rule}: {count} ocorrência(s)")
         else:
-            log_error(f"Rota {route} não encontrada")
+            log_success(f"{rule}: nenhuma ocorrência")
+    
+    if baseline is None:
+        log_info('Linha de base não encontrada; gere com scripts/query_analyzer.py --update-baseline')
+        return True
     
-    return passed == len(api_routes)
+    regressions = query_analyzer.compare_with_baseline(report, baseline)
+    for rule, change in regressions.items():
+        log_error(f"Regressão em {rule}: {change['baseline']} -> {change['current']}")
+    
+    return not regressions
 
 def test_components():
-    log(f"\n🧩 Testando componentes...", Colors.BOLD)
+    return run_check('Componentes')
+
+def test_bundle_budget():
+    log(f"\n📦 Testando peso das páginas...", Colors.BOLD)
     
-    components = [
-        'components/detalhes-oportunidade.tsx',
-        'components/licitacoes/detalhes-licitacao.tsx',
-        'components/detalhes-cliente.tsx',
-        'components/licitacoes/detalhes-orgao.tsx',
-        'components/documentos/visualizador-documentos.tsx'
-    ]
+    report = bundle_budget.analyze(current_plan().root)
     
-    passed = 0
+    for page in report['pages']:
+        for heavy in page['heavy_imports'][:3]:
+            log_warning(f"{page['route']}: import pesado no cliente {heavy['import']} ({heavy['client_kb']:.0f} KB)")
     
-    for component in components:
-        if file_exists(component):
-            log_success(f"Componente {component} existe")
-            passed += 1
-        else:
-            log_error(f"Componente {component} não encontrado")
+    if not report['violations']:
+        log_success(f"{report['summary']['pages']} páginas dentro do orçamento")
+    for violation in report['violations']:
+        log_error(f"{violation['route']}: {violation['metric']} {violation['current']} KB "
+                  f"acima do orçamento de {violation['budget']} KB")
     
-    return passed == len(components)
+    return not report['violations']
 
 def test_security():
-    log(f"\n🔒 Testando implementações de segurança...", Colors.BOLD)
-    
-    security_files = [
-        'middleware/security.ts',
-        'lib/rate-limit.ts',
-        'lib/cache.ts'
-    ]
-    
-    passed = 0
-    
-    for file_path in security_files:
-        if file_exists(file_path):
-            log_success(f"Arquivo de segurança {file_path} existe")
-            passed += 1
-        else:
-            log_error(f"Arquivo de segurança {file_path} não encontrado")
-    
-    # Verificar se middleware de segurança tem funções essenciais
-    if file_exists('middleware/security.ts'):
-        security_functions = [
-            'sanitizeInput',
-            'isValidUUID',
-            'isValidEmail',
-            'isValidCNPJ',
-            'securityMiddleware'
-        ]
-        
-        for func in security_functions:
-            if check_file_content('middleware/security.ts', func):
-                log_success(f"Função de segurança {func} implementada")
-                passed += 1
-            else:
-                log_error(f"Função de segurança {func} não encontrada")
-    
-    return passed >= len(security_files)
+    return run_check('Segurança')
 
 def test_sql_fixes():
-    log(f"\n🗄️  Testando correções SQL...", Colors.BOLD)
-    
-    sql_file = 'sql_fixes.sql'
-    
-    if not file_exists(sql_file):
-        log_error(f"Arquivo {sql_file} não encontrado")
-        return False
-    
-    sql_checks = [
-        'ALTER TABLE documentos',
-        'FOREIGN KEY',
-        'CREATE INDEX',
-        'CREATE TRIGGER',
-        'CREATE FUNCTION fn_validar_cnpj',
-        'CREATE OR REPLACE VIEW view_estatisticas_sistema',
-        'CREATE PROCEDURE sp_limpeza_dados_orfaos'
-    ]
-    
-    passed = 0
-    
-    for check in sql_checks:
-        if check_file_content(sql_file, check):
-            log_success(f"Correção SQL encontrada: {check}")
-            passed += 1
-        else:
-            log_warning(f"Correção SQL não encontrada: {check}")
-    
-    return passed >= len(sql_checks) * 0.8  # 80% das correções devem estar presentes
+    return run_check('Correções SQL')
+
+def test_schema_bootstrap():
+    log(f"\n🗄️  Criando o schema em um banco local a partir do DAG...", Colors.BOLD)
+    
+    plan = schema_bootstrap.build_plan(current_plan().root)
+    for warning in plan.warnings:
+        log_warning(warning)
+    result = schema_bootstrap.apply_plan(plan, engine='sqlite')
+    counts = result['counts']
+    for node_id, node in result['nodes'].items():
+        if node['status'] in ('falhou', 'pulado'):
+            log_error(f"{node_id}: {node['error']}")
+    if not counts['falhou'] and not counts['pulado']:
+        log_success(f"{counts['aplicado']} objetos criados em {result['seconds']:.2f}s "
+                    f"({counts['ignorado']} sem suporte no {result['engine']})")
+    
+    return not counts['falhou'] and not counts['pulado']
 
 def test_documentation():
-    log(f"\n📚 Testando documentação...", Colors.BOLD)
-    
-    doc_files = [
-        'todo.md',
-        'melhorias_robustez.md',
-        'sql_fixes.sql'
-    ]
-    
-    passed = 0
-    
-    for file_path in doc_files:
-        if file_exists(file_path):
-            log_success(f"Arquivo de documentação {file_path} existe")
-            passed += 1
-        else:
-            log_error(f"Arquivo de documentação {file_path} não encontrado")
-    
-    return passed == len(doc_files)
+    return run_check('Documentação')
 
 def test_tag_system():
-    log(f"\n🏷️  Testando sistema de tags...", Colors.BOLD)
-    
-    passed = 0
-    
-    # Verificar se a nova rota de documentos por oportunidade existe
-    if file_exists('app/api/comercial/oportunidades/[id]/documentos/route.ts'):
-        log_success('Nova rota de documentos por oportunidade implementada')
-        passed += 1
-    else:
-        log_error('Nova rota de documentos por oportunidade não encontrada')
-    
-    # Verificar se a correção na API de oportunidades foi feita
-    if check_file_content('app/api/comercial/oportunidades/route.ts', 'documentos_vinculados'):
-        log_success('Correção do sistema de tags na API de oportunidades implementada')
-        passed += 1
-    else:
-        log_warning('Correção do sistema de tags pode não estar completa')
-    
-    return passed >= 1
+    return run_check('Sistema de Tags')
 
 def test_document_viewer():
-    log(f"\n📄 Testando visualizador de documentos...", Colors.BOLD)
-    
-    passed = 0
-    
-    if file_exists('components/documentos/visualizador-documentos.tsx'):
-        log_success('Componente VisualizadorDocumentos existe')
-        passed += 1
-        
-        features = [
-            'entityType',
-            'showFilters',
-            'handlePreview',
-            'handleDownload',
-            'formatarTamanho'
-        ]
-        
-        for feature in features:
-            if check_file_content('components/documentos/visualizador-documentos.tsx', feature):
-                log_success(f"Funcionalidade {feature} implementada")
-                passed += 1
-            else:
-                log_warning(f"Funcionalidade {feature} pode estar ausente")
-    else:
-        log_error('Componente VisualizadorDocumentos não encontrado')
-    
-    return passed >= 3
+    return run_check('Visualizador de Documentos')
+
+TESTS = [
+    ('Estrutura do Projeto', test_project_structure),
+    ('Rotas da API', test_api_routes),
+    ('Consultas das Rotas', test_route_queries),
+    ('Componentes', test_components),
+    ('Peso das Páginas', test_bundle_budget),
+    ('Segurança', test_security),
+    ('Correções SQL', test_sql_fixes),
+    ('Documentação', test_documentation),
+    ('Sistema de Tags', test_tag_system),
+    ('Visualizador de Documentos', test_document_viewer)
+]
+
+# Etapas fora da execução padrão, ativadas por opção de linha de comando
+SCHEMA_TESTS = [
+    ('Bootstrap do Schema', test_schema_bootstrap),
+]
+
+def selected_tests(schema=False):
+    return TESTS + SCHEMA_TESTS if schema else TESTS
+
+# Entradas das verificações em código; as declaradas em checks.toml registram
+# os caminhos que consultam via track()
+WATCH_PATTERNS = {
+    'Consultas das Rotas': ['app/api/**/route.ts', *sql_catalog.SCHEMA_GLOBS],
+    'Peso das Páginas': [f'{directory}/**' for directory in bundle_budget.SOURCE_DIRS],
+    'Bootstrap do Schema': list(sql_catalog.SCHEMA_GLOBS),
+}
 
-def run_tests():
+def recorded(name, fn, inputs):
+    """Envolve a verificação para guardar em inputs os caminhos que ela consultou"""
+    def run():
+        with recording() as paths:
+            try:
+                return fn()
+            finally:
+                inputs[name] = dict(paths)
+    return run
+
+def run_checks(tests, jobs=1, inputs=None):
+    if inputs is not None:
+        tests = [(name, recorded(name, fn, inputs)) for name, fn in tests]
+    with CheckRunner(jobs) as runner:
+        return runner.run(tests)
+
+def run_tests(jobs=1, root=check_plan.DEFAULT_ROOT, inputs=None, tests=None):
+    use_root(root)
     log('🚀 Iniciando testes do sistema CRM...', Colors.BOLD)
     log('=' * 50)
     
-    tests = [
-        {'name': 'Estrutura do Projeto', 'fn': test_project_structure},
-        {'name': 'Rotas da API', 'fn': test_api_routes},
-        {'name': 'Componentes', 'fn': test_components},
-        {'name': 'Segurança', 'fn': test_security},
-        {'name': 'Correções SQL', 'fn': test_sql_fixes},
-        {'name': 'Documentação', 'fn': test_documentation},
-        {'name': 'Sistema de Tags', 'fn': test_tag_system},
-        {'name': 'Visualizador de Documentos', 'fn': test_document_viewer}
-    ]
+    tests = TESTS if tests is None else tests
     
-    total_passed = 0
-    results = []
+    results = run_checks(tests, jobs, inputs)
     
-    for test in tests:
-        passed = test['fn']()
-        results.append({'name': test['name'], 'passed': passed})
-        if passed:
-            total_passed += 1
+    total_passed = sum(1 for result in results if result['passed'])
     
     # Resumo dos resultados
     log(f"\n📊 Resumo dos Testes:", Colors.BOLD)
@@ -288,9 +223,9 @@ def run_tests():
     
     for result in results:
         if result['passed']:
-            log_success(f"{result['name']}: PASSOU")
+            log_success(f"{result['name']}: PASSOU ({result['seconds'] * 1000:.1f} ms)")
         else:
-            log_error(f"{result['name']}: FALHOU")
+            log_error(f"{result['name']}: FALHOU ({result['seconds'] * 1000:.1f} ms)")
     
     log(f"\n📈 Resultado Final: {total_passed}/{len(tests)} testes passaram", Colors.BOLD)
     
@@ -303,7 +238,85 @@ def run_tests():
     
     return total_passed / len(tests)
 
+def affected_checks(changed, inputs, plan, tests=None):
+    """Verificações cujos caminhos consultados ou padrões observados incluem algum alterado"""
+    relative = [os.path.relpath(path, plan.root).replace(os.sep, '/') for path in changed]
+    names = []
+    for name, _ in TESTS if tests is None else tests:
+        # Caminhos só sondados quanto à existência importam se surgiram ou sumiram
+        paths = inputs.get(name, {})
+        if any(paths[path] or plan.existence_changed(path) for path in changed if path in paths):
+            names.append(name)
+        elif any(file_watcher.matches(path, pattern) for pattern in WATCH_PATTERNS.get(name, ())
+                 for path in relative):
+            names.append(name)
+    return names
+
+def watch(jobs=1, root=check_plan.DEFAULT_ROOT, debounce=file_watcher.DEFAULT_DEBOUNCE,
+          interval=file_watcher.DEFAULT_INTERVAL, backend='auto', tests=None):
+    """Executa a suíte e depois reexecuta só as verificações afetadas a cada mudança"""
+    tests = TESTS if tests is None else tests
+    inputs = {}
+    run_tests(jobs, root, inputs, tests)
+    plan = current_plan()
+    watcher = file_watcher.create_watcher(plan.root, backend)
+    log_info(f"Observando {plan.root} ({watcher.name}); Ctrl+C para sair")
+    
+    try:
+        for changed in file_watcher.batches(watcher, debounce, interval):
+            names = affected_checks(changed, inputs, plan, tests)
+            if not names:
+                continue
+            # O plano esquece as sondagens alteradas; o cache de conteúdo continua
+            # quente e só relê os arquivos cujo mtime mudou
+            plan.invalidate(changed)
+            files = sorted(os.path.relpath(path, plan.root) for path in changed)
+            more = f" e mais {len(files) - 3}" if len(files) > 3 else ''
+            log(f"\n🔁 Alterado: {', '.join(files[:3])}{more} -> reexecutando {len(names)} verificação(ões)",
+                Colors.BOLD)
+            
+            for result in run_checks([(name, fn) for name, fn in tests if name in names], jobs, inputs):
+                if result['passed']:
+                    log_success(f"{result['name']}: PASSOU ({result['seconds'] * 1000:.1f} ms)")
+                else:
+                    log_error(f"{result['name']}: FALHOU ({result['seconds'] * 1000:.1f} ms)")
+    except KeyboardInterrupt:
+        log_info('Modo watch encerrado')
+    finally:
+        watcher.stop()
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Valida as principais funcionalidades do sistema CRM')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='número de verificações executadas em paralelo (padrão: 1)')
+    parser.add_argument('--root', default=check_plan.DEFAULT_ROOT,
+                        help='raiz do projeto a validar (padrão: pai de scripts/)')
+    parser.add_argument('--watch', action='store_true',
+                        help='continua rodando e reexecuta as verificações afetadas a cada mudança')
+    parser.add_argument('--debounce', type=float, default=file_watcher.DEFAULT_DEBOUNCE,
+                        help='segundos sem eventos antes de reexecutar (padrão: %(default)s)')
+    parser.add_argument('--schema', action='store_true',
+                        help='inclui a criação do schema em um SQLite local (scripts/schema_bootstrap.py)')
+    parser.add_argument('--watch-backend', choices=('auto', 'watchdog', 'polling'), default='auto',
+                        help='watchdog quando instalado, senão varredura periódica (padrão: auto)')
+    instrumentation.add_arguments(parser)
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
-    score = run_tests()
+    args = parse_args()
+    if args.memory and args.jobs > 1:
+        # tracemalloc soma as alocações de todas as threads: em paralelo a diferença
+        # medida em uma verificação inclui as das outras em andamento
+        log_warning('--memory mede cada verificação só em execução serial; usando --jobs 1')
+        args.jobs = 1
+    if args.watch:
+        sys.exit(watch(args.jobs, args.root, args.debounce, backend=args.watch_backend,
+                       tests=selected_tests(args.schema)))
+    with instrumentation.recorder_from_args(args) as recorder:
+        score = run_tests(args.jobs, args.root, tests=selected_tests(args.schema))
+    log(f"\n⏱️  Tempo total: {recorder.wall_ms():.1f} ms; trechos mais caros:", Colors.BOLD)
+    log(recorder.format_summary())
+    instrumentation.export(recorder, args, log_info)
     sys.exit(0 if score == 1 else 1)
 
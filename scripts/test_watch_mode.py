@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+"""
+Testes da seleção de verificações do modo --watch (scripts/test_system.py)
+Execute com: python3 -m pytest scripts/test_watch_mode.py
+"""
+
+import os
+
+import check_plan
+import test_system
+from file_watcher import matches
+
+
+def test_double_star_matches_zero_or_more_directories():
+    assert matches('hooks/useLicitacoesOtimizado.ts', 'hooks/**/*.ts')
+    assert matches('hooks/comercial/useOportunidades.ts', 'hooks/**/*.ts')
+    assert matches('app/api/route.ts', 'app/api/**/route.ts')
+    assert matches('app/(app)/licitacoes/page.tsx', 'app/(app)/*/page.tsx')
+    assert not matches('hooks/useLicitacoesOtimizado.tsx', 'hooks/**/*.ts')
+    assert not matches('sql-mysql/antigos/schema.sql', 'sql-mysql/*.sql')
+
+
+def test_touching_top_level_hook_reruns_watching_checks(tmp_path, monkeypatch):
+    hook = tmp_path / 'hooks' / 'useLicitacoesOtimizado.ts'
+    hook.parent.mkdir()
+    hook.write_text('export function useLicitacoesOtimizado() {}\n', encoding='utf-8')
+    monkeypatch.setattr(test_system, 'TESTS', [('Hooks', None), ('Componentes', None)])
+    monkeypatch.setattr(test_system, 'WATCH_PATTERNS', {'Hooks': ['hooks/**/*.ts'],
+                                                        'Componentes': ['components/**/*.tsx']})
+    plan = check_plan.CheckPlan(test_system.MANIFEST, ['system'], str(tmp_path))
+
+    assert test_system.affected_checks([os.path.join(plan.root, 'hooks', hook.name)], {}, plan) == ['Hooks']
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+
+"""
+Captura e replay de tráfego real da API
+  capture: lê access logs (Common/Combined Log Format ou JSON por linha) ou HAR
+           em streaming, normaliza cada caminho para o template da rota em
+           app/api (ex.: /api/licitacoes/[id]) e grava um trace colunar compacto
+  replay:  reproduz o trace contra um alvo (ou o servidor de apoio), mantendo os
+           intervalos entre chegadas ou comprimindo o tempo com --speed
+  info:    resumo do trace por rota
+  to-mix:  mix ponderado para scripts/load_test.py --mix
+  to-cache: eventos NDJSON para scripts/cache_sim.py --trace
+O trace é gravado em blocos; cada coluna do bloco é um array de inteiros
+comprimido com zlib e os caminhos usam um dicionário local ao bloco, então
+captura, leitura e replay usam memória constante.
+Execute com: python3 scripts/traffic_trace.py capture access.log -o trafego.crmtrace
+         ou: python3 scripts/traffic_trace.py replay trafego.crmtrace --stub --speed 10
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+from load_test import ConnectionPool, RouteStats, format_report, percentile, route_template
+
+MAGIC = b'CRMTRACE1\n'
+BLOCK_SIZE = 4096
+COLUMNS = ('t', 'method', 'route', 'path', 'status', 'bytes', 'duration')
+READ_CHUNK = 1 << 20
+
+Request = namedtuple('Request', 'time_ms method route path status bytes duration_ms')
+
+_CLF = re.compile(
+    r'^(?P<host>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)(?: [^"]*)?" '
+    r'(?P<status>\d{3}) (?P<bytes>\d+|-)(?: "[^"]*" "[^"]*")?(?: (?P<duration>[\d.]+))?')
+_HAR_ENTRIES = re.compile(r'"entries"\s*:\s*\[')
+_ID_SEGMENT = re.compile(r'^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+|[0-9a-f]{16,})$',
+                         re.IGNORECASE)
+
+
+class RouteMatcher:
+    """Árvore dos templates de app/api; segmentos estáticos vencem os dinâmicos"""
+
+    def __init__(self, templates):
+        self.root = {}
+        for template in templates:
+            node = self.root
+            for segment in template.strip('/').split('/'):
+                key = '*' if segment.startswith('[') else segment
+                node = node.setdefault(key, {})
+            node['$'] = template
+
+    @classmethod
+    def from_root(cls, root):
+        files = glob.glob(os.path.join(root, 'app', 'api', '**', 'route.[tj]s'), recursive=True)
+        return cls(route_template(os.path.relpath(path, root).replace(os.sep, '/')) for path in files)
+
+    def match(self, path):
+        segments = path.strip('/').split('/')
+
+        def walk(node, index):
+            if index == len(segments):
+                return node.get('$')
+            segment = segments[index]
+            if segment in node:
+                found = walk(node[segment], index + 1)
+                if found:
+                    return found
+            if '*' in node:
+                return walk(node['*'], index + 1)
+            return None
+
+        found = walk(self.root, 0)
+        if found:
+            return found
+        # Fora das rotas conhecidas: troca segmentos com cara de id por [id]
+        return '/' + '/'.join('[id]' if _ID_SEGMENT.match(segment) else segment for segment in segments)
+
+
+def _open_text(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def _epoch_ms(moment):
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() * 1000.0
+
+
+def _parse_time(value):
+    if isinstance(value, (int, float)):
+        # Segundos ou milissegundos desde a época
+        return float(value) * (1000.0 if value < 1e11 else 1.0)
+    try:
+        return _epoch_ms(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        return _epoch_ms(datetime.strptime(value, '%d/%b/%Y:%H:%M:%S %z'))
+
+
+def parse_clf(line):
+    """Linha no Common/Combined Log Format, com o tempo de resposta (s) opcional no fim"""
+    match = _CLF.match(line)
+    if not match:
+        return None
+    duration = match.group('duration')
+    size = match.group('bytes')
+    return (_parse_time(match.group('time')), match.group('method'), match.group('target'),
+            int(match.group('status')), 0 if size == '-' else int(size),
+            float(duration) * 1000.0 if duration else 0.0)
+
+
+def parse_json_line(line):
+    """Log estruturado: {"time"|"timestamp", "method", "url"|"path", "status", "bytes"|"size", "duration"}"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    moment = record.get('time', record.get('timestamp'))
+    target = record.get('url', record.get('path'))
+    if moment is None or not target:
+        return None
+    return (_parse_time(moment), record.get('method', 'GET').upper(), target, int(record.get('status', 0)),
+            int(record.get('bytes', record.get('size', 0)) or 0),
+            float(record.get('duration_ms', record.get('duration', 0)) or 0))
+
+
+def read_log(path):
+    """Linhas de access log (texto ou JSON), detectando o formato em cada linha"""
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parsed = parse_json_line(line) if line.startswith('{') else parse_clf(line)
+            if parsed is not None:
+                yield parsed
+
+
+def read_har(path):
+    """Entradas de um HAR decodificadas uma a uma, sem carregar o arquivo inteiro"""
+    decoder = json.JSONDecoder()
+    with _open_text(path) as f:
+        buffer = ''
+        position = None
+        eof = False
+        while position is None:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return
+            buffer += chunk
+            match = _HAR_ENTRIES.search(buffer)
+            if match:
+                position = match.end()
+            else:
+                buffer = buffer[-64:]
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                if eof:
+                    return
+                chunk = f.read(READ_CHUNK)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                entry, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(READ_CHUNK)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            position = end
+            request, response = entry.get('request', {}), entry.get('response', {})
+            content = response.get('content', {})
+            size = response.get('bodySize', -1)
+            if size is None or size < 0:
+                size = content.get('size', 0) or 0
+            yield (_parse_time(entry['startedDateTime']), request.get('method', 'GET').upper(),
+                   request.get('url', ''), int(response.get('status', 0)), int(size),
+                   float(entry.get('time', 0) or 0))
+
+
+def detect_format(path):
+    if path.endswith(('.har', '.har.gz')):
+        return 'har'
+    return 'log'
+
+
+class TraceWriter:
+    """Grava Requests em blocos colunares"""
+
+    def __init__(self, stream, block_size=BLOCK_SIZE):
+        self.stream = stream
+        self.block_size = block_size
+        self.methods = {}
+        self.routes = {}
+        self.pending = []
+        self.count = 0
+        self.last_time = None
+        stream.write(MAGIC)
+
+    def add(self, request):
+        self.pending.append(request)
+        if len(self.pending) >= self.block_size:
+            self.flush()
+
+    def _code(self, table, value, new):
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+            new.append(value)
+        return code
+
+    def flush(self):
+        if not self.pending:
+            return
+        new_methods, new_routes, paths, path_codes = [], [], [], {}
+        columns = {name: array('q') for name in COLUMNS}
+        last = self.last_time if self.last_time is not None else 0
+        for request in self.pending:
+            moment = int(round(request.time_ms))
+            columns['t'].append(moment - last)
+            last = moment
+            columns['method'].append(self._code(self.methods, request.method, new_methods))
+            columns['route'].append(self._code(self.routes, request.route, new_routes))
+            columns['path'].append(self._code(path_codes, request.path, paths))
+            columns['status'].append(request.status)
+            columns['bytes'].append(request.bytes)
+            columns['duration'].append(int(round(request.duration_ms * 1000)))
+        payloads = []
+        for name in COLUMNS:
+            column = columns[name]
+            if sys.byteorder != 'little':
+                column.byteswap()
+            payloads.append(zlib.compress(column.tobytes(), 6))
+        header = json.dumps({
+            'count': len(self.pending),
+            'base': self.last_time,
+            'methods': new_methods,
+            'routes': new_routes,
+            'paths': paths,
+            'sizes': [len(payload) for payload in payloads],
+        }, separators=(',', ':')).encode('utf-8')
+        self.stream.write(struct.pack('<I', len(header)) + header)
+        for payload in payloads:
+            self.stream.write(payload)
+        self.count += len(self.pending)
+        self.last_time = last
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+
+def read_trace(path):
+    """Requests de um trace, bloco a bloco"""
+    methods, routes = [], []
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} não é um trace gravado por traffic_trace.py')
+        while True:
+            prefix = f.read(4)
+            if not prefix:
+                return
+            header = json.loads(f.read(struct.unpack('<I', prefix)[0]))
+            methods.extend(header['methods'])
+            routes.extend(header['routes'])
+            paths = header['paths']
+            columns = {}
+            for name, size in zip(COLUMNS, header['sizes']):
+                column = array('q')
+                column.frombytes(zlib.decompress(f.read(size)))
+                if sys.byteorder != 'little':
+                    column.byteswap()
+                columns[name] = column
+            moment = header['base'] or 0
+            for index in range(header['count']):
+                moment += columns['t'][index]
+                yield Request(moment, methods[columns['method'][index]], routes[columns['route'][index]],
+                              paths[columns['path'][index]], columns['status'][index], columns['bytes'][index],
+                              columns['duration'][index] / 1000.0)
+
+
+def capture(inputs, output, matcher, input_format='auto', prefix='/api/', block_size=BLOCK_SIZE):
+    """Converte logs/HAR em trace; devolve (gravadas, ignoradas)"""
+    written = skipped = 0
+    with open(output, 'wb') as stream:
+        writer = TraceWriter(stream, block_size)
+        for path in inputs:
+            kind = detect_format(path) if input_format == 'auto' else input_format
+            records = read_har(path) if kind == 'har' else read_log(path)
+            for moment, method, target, status, size, duration in records:
+                parts = urlsplit(target)
+                if prefix and not parts.path.startswith(prefix):
+                    skipped += 1
+                    continue
+                path_with_query = parts.path + ('?' + parts.query if parts.query else '')
+                writer.add(Request(moment, method, matcher.match(parts.path), path_with_query, status, size,
+                                   duration))
+                written += 1
+        writer.close()
+    return written, skipped
+
+
+def summarize(path):
+    routes = Counter()
+    methods = Counter()
+    first = last = None
+    total = size = 0
+    for request in read_trace(path):
+        routes[(request.method, request.route)] += 1
+        methods[request.method] += 1
+        first = request.time_ms if first is None else min(first, request.time_ms)
+        last = request.time_ms if last is None else max(last, request.time_ms)
+        total += 1
+        size += request.bytes
+    span = ((last - first) / 1000.0) if total else 0.0
+    return {
+        'requests': total,
+        'span_s': round(span, 3),
+        'rate_rps': round(total / span, 2) if span else 0.0,
+        'response_bytes': size,
+        'file_bytes': os.path.getsize(path),
+        'bytes_per_request': round(os.path.getsize(path) / total, 2) if total else 0.0,
+        'methods': dict(methods),
+        'routes': [{'method': method, 'route': route, 'requests': count}
+                   for (method, route), count in routes.most_common()],
+    }
+
+
+def to_mix(path):
+    """Mix de load_test: peso por (método, rota) com o caminho e a consulta mais frequentes"""
+    counts = Counter()
+    paths = {}
+    queries = {}
+    for request in read_trace(path):
+        key = (request.method, request.route)
+        counts[key] += 1
+        parts = urlsplit(request.path)
+        if '[' in request.route:
+            # load_test só conhece o parâmetro id; rotas dinâmicas usam um caminho real
+            paths.setdefault(key, Counter())[parts.path] += 1
+        if parts.query:
+            queries.setdefault(key, Counter())[parts.query] += 1
+    mix = []
+    for key, count in counts.most_common():
+        method, route = key
+        if key in paths:
+            route = paths[key].most_common(1)[0][0]
+        entry = {'route': route, 'method': method, 'weight': count}
+        if key in queries:
+            entry['query'] = queries[key].most_common(1)[0][0]
+        mix.append(entry)
+    return mix
+
+
+def cache_events(path, ttl_ms=5 * 60 * 1000):
+    """Eventos de cache_sim: GET vira leitura-através com chave apiKey; escritas invalidam a coleção"""
+    for request in read_trace(path):
+        parts = urlsplit(request.path)
+        static = [segment for segment in request.route.strip('/').split('/')[1:] if not segment.startswith('[')]
+        collection = static[-1] if static else request.route
+        if request.method == 'GET':
+            params = ','.join(f'{name}:{value}' for name, value in sorted(parse_qsl(parts.query)))
+            yield {'t': request.time_ms, 'op': 'get', 'key': f"api:{parts.path}{'-' + params if params else ''}",
+                   'size': request.bytes, 'ttl': ttl_ms, 'tags': [collection]}
+        elif request.method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            yield {'t': request.time_ms, 'op': 'invalidate', 'tag': collection}
+
+
+async def replay(path, base_url, speed=1.0, concurrency=50, methods=('GET',), limit=None):
+    """Reproduz o trace; speed 0 envia o mais rápido possível"""
+    pool = ConnectionPool(base_url, concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    stats = {}
+    lags = []
+    matched = compared = 0
+    tasks = set()
+    started = time.monotonic()
+    first = None
+
+    async def send(request, route_stats):
+        nonlocal matched, compared
+        begin = time.perf_counter()
+        try:
+            status, size = await pool.request(request.method, request.path)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            route_stats.errors[type(e).__name__] += 1
+            return
+        finally:
+            slots.release()
+        route_stats.latencies.append(time.perf_counter() - begin)
+        route_stats.statuses[status] += 1
+        route_stats.bytes += size
+        if request.status:
+            compared += 1
+            matched += status == request.status
+
+    sent = 0
+    try:
+        for request in read_trace(path):
+            if request.method not in methods:
+                continue
+            if limit is not None and sent >= limit:
+                break
+            if first is None:
+                first = request.time_ms
+            if speed:
+                delay = started + (request.time_ms - first) / 1000.0 / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await slots.acquire()
+            if speed:
+                scheduled = started + (request.time_ms - first) / 1000.0 / speed
+                lags.append(max(0.0, time.monotonic() - scheduled))
+            route_stats = stats.get(request.route)
+            if route_stats is None:
+                route_stats = stats[request.route] = RouteStats()
+            task = asyncio.ensure_future(send(request, route_stats))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sent += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        pool.close()
+    elapsed = time.monotonic() - started
+
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.latencies.extend(route_stats.latencies)
+        total.statuses.update(route_stats.statuses)
+        total.errors.update(route_stats.errors)
+        total.bytes += route_stats.bytes
+    lags.sort()
+    return {
+        'target': base_url,
+        'elapsed_s': round(elapsed, 3),
+        'concurrency': concurrency,
+        'rate': None,
+        'speed': speed,
+        'connections_opened': pool.opened,
+        'total': total.summary(elapsed),
+        'routes': {route: route_stats.summary(elapsed) for route, route_stats in stats.items()},
+        'schedule_lag_ms': {'p50': round(percentile(lags, 0.5) * 1000, 3),
+                            'p99': round(percentile(lags, 0.99) * 1000, 3),
+                            'max': round(lags[-1] * 1000, 3) if lags else 0.0},
+        'status_match': round(matched / compared, 4) if compared else None,
+    }
+
+
+def _write_json(data, output):
+    if output in (None, '-'):
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f'📄 Salvo em: {output}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Captura e replay de tráfego da API do CRM')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    capture_parser = commands.add_parser('capture', help='converte access logs ou HAR em trace')
+    capture_parser.add_argument('inputs', nargs='+', help='arquivos de log/HAR (.gz aceito; - para stdin)')
+    capture_parser.add_argument('-o', '--output', required=True)
+    capture_parser.add_argument('--format', choices=('auto', 'log', 'har'), default='auto')
+    capture_parser.add_argument('--prefix', default='/api/', help='só caminhos com este prefixo ("" para todos)')
+    capture_parser.add_argument('--root', default='.', help='raiz do repositório (templates de app/api)')
+    capture_parser.add_argument('--block-size', type=int, default=BLOCK_SIZE)
+
+    replay_parser = commands.add_parser('replay', help='reproduz um trace contra um alvo')
+    replay_parser.add_argument('trace')
+    target = replay_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', help='URL base, ex.: http://localhost:3000')
+    target.add_argument('--stub', action='store_true', help='sobe o servidor local de apoio')
+    replay_parser.add_argument('--speed', type=float, default=1.0,
+                               help='compressão do tempo (2 = dobro da taxa; 0 = sem espera)')
+    replay_parser.add_argument('-c', '--concurrency', type=int, default=50, help='requisições em voo')
+    replay_parser.add_argument('--all-methods', action='store_true',
+                               help='reproduz também POST/PUT/PATCH/DELETE (sem corpo)')
+    replay_parser.add_argument('-n', '--limit', type=int)
+    replay_parser.add_argument('--stub-latency-ms', type=float, default=2.0)
+    replay_parser.add_argument('--json', dest='json_out', help='grava o relatório em JSON neste arquivo')
+
+    info_parser = commands.add_parser('info', help='resumo do trace')
+    info_parser.add_argument('trace')
+    info_parser.add_argument('--json', dest='json_out', nargs='?', const='-')
+
+    mix_parser = commands.add_parser('to-mix', help='gera um mix para load_test.py --mix')
+    mix_parser.add_argument('trace')
+    mix_parser.add_argument('-o', '--output', default='-')
+
+    cache_parser = commands.add_parser('to-cache', help='gera eventos para cache_sim.py --trace')
+    cache_parser.add_argument('trace')
+    cache_parser.add_argument('-o', '--output', required=True)
+    cache_parser.add_argument('--ttl-ms', type=int, default=5 * 60 * 1000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'capture':
+        matcher = RouteMatcher.from_root(args.root)
+        started = time.perf_counter()
+        written, skipped = capture(args.inputs, args.output, matcher, args.format, args.prefix, args.block_size)
+        size = os.path.getsize(args.output)
+        print(f'📊 {written} requisições gravadas em {args.output} ({size} bytes, '
+              f'{size / written if written else 0:.1f} bytes/req) em {time.perf_counter() - started:.2f}s')
+        if skipped:
+            print(f'   {skipped} fora do prefixo {args.prefix!r} ignoradas')
+        return 0
+
+    if args.command == 'replay':
+        stub = None
+        base_url = args.target
+        if args.stub:
+            from stub_server import StubServer
+            stub = StubServer(latency_ms=args.stub_latency_ms).start()
+            base_url = stub.base_url
+        methods = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE') if args.all_methods else ('GET', 'HEAD')
+        try:
+            report = asyncio.run(replay(args.trace, base_url, args.speed, args.concurrency, methods, args.limit))
+        finally:
+            if stub is not None:
+                stub.stop()
+        print(format_report(report))
+        lag = report['schedule_lag_ms']
+        print(f"⏱️  atraso em relação ao agendamento: p50 {lag['p50']} ms, p99 {lag['p99']} ms, máx {lag['max']} ms")
+        if report['status_match'] is not None:
+            print(f"   status iguais ao capturado: {report['status_match'] * 100:.1f}%")
+        if args.json_out:
+            _write_json(report, args.json_out)
+        return 0 if sum(report['total']['errors'].values()) == 0 else 1
+
+    if args.command == 'info':
+        summary = summarize(args.trace)
+        if args.json_out:
+            _write_json(summary, args.json_out)
+            return 0
+        print(f"📊 {summary['requests']} requisições em {summary['span_s']}s ({summary['rate_rps']} req/s), "
+              f"{summary['file_bytes']} bytes no disco ({summary['bytes_per_request']} bytes/req)")
+        for row in summary['routes'][:30]:
+            print(f"  {row['method']:<7}{row['route']:<60}{row['requests']:>9}")
+        return 0
+
+    if args.command == 'to-mix':
+        _write_json(to_mix(args.trace), args.output)
+        return 0
+
+    count = 0
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for event in cache_events(args.trace, args.ttl_ms):
+            f.write(json.dumps(event, separators=(',', ':')) + '\n')
+            count += 1
+    print(f'📄 {count} eventos de cache gravados em {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
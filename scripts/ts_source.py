@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+"""
+Utilitários de leitura de código TypeScript/TSX para as análises estáticas
+Não é um parser completo: mascara comentários, strings, templates e regex para
+que chaves e parênteses possam ser casados com segurança, e localiza funções,
+laços e literais de string.
+"""
+
+import re
+from dataclasses import dataclass
+
+_REGEX_PRECEDERS = set('(,=:[!&|?{;+-*%~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield', 'await')
+
+
+@dataclass
+class Literal:
+    """Literal de string (aspas simples, duplas ou template) e sua posição"""
+    start: int
+    end: int
+    quote: str
+    text: str
+
+
+@dataclass
+class Block:
+    """Trecho de código delimitado: função exportada, laço ou callback"""
+    kind: str
+    name: str
+    start: int
+    end: int
+
+
+class SourceFile:
+    """Código-fonte original e sua versão mascarada, com as mesmas posições"""
+
+    def __init__(self, text, path=None):
+        self.path = path
+        self.text = text
+        self.masked, self.literals = _mask(text)
+        self._line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), path)
+
+    def line_of(self, index):
+        """Número da linha (a partir de 1) de uma posição"""
+        low, high = 0, len(self._line_starts)
+        while low < high:
+            middle = (low + high) // 2
+            if self._line_starts[middle] <= index:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def matching(self, index):
+        """Posição do fechamento correspondente ao (, [ ou { em index"""
+        pairs = {'(': ')', '[': ']', '{': '}'}
+        opener = self.masked[index]
+        closer = pairs[opener]
+        depth = 0
+        for position in range(index, len(self.masked)):
+            char = self.masked[position]
+            if char == opener:
+                depth += 1
+            elif char == closer:
+                depth -= 1
+                if depth == 0:
+                    return position
+        return len(self.masked) - 1
+
+    def find_code(self, pattern, start=0, end=None):
+        """Procura uma regex apenas no código (fora de strings e comentários)"""
+        regex = re.compile(pattern)
+        end = len(self.masked) if end is None else end
+        return list(regex.finditer(self.masked, start, end))
+
+    def functions(self):
+        """Funções declaradas no arquivo (nomeadas ou atribuídas a const)"""
+        blocks = []
+        declaration = re.compile(
+            r'\b(export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)\s*(?:<[^>{}]*>)?\s*\(')
+        arrow = re.compile(
+            r'\b(export\s+)?(?:const|let|var)\s+(\w+)\s*(?::[^=]+)?=\s*(?:async\s+)?'
+            r'(?:function\b[^(]*)?\(')
+        for regex in (declaration, arrow):
+            for match in regex.finditer(self.masked):
+                params_end = self.matching(match.end() - 1)
+                body_start = self._body_start(params_end + 1)
+                if body_start is None:
+                    continue
+                kind = 'exported' if match.group(1) else 'function'
+                blocks.append(Block(kind, match.group(2), match.start(),
+                                    self.matching(body_start)))
+        blocks.sort(key=lambda block: block.start)
+        return blocks
+
+    def loops(self):
+        """Laços e callbacks de iteração, com o trecho do corpo"""
+        blocks = []
+        for match in re.finditer(r'\b(for|while)\s*(?:await\s*)?\(', self.masked):
+            head_end = self.matching(match.end() - 1)
+            body_start = _skip_space(self.masked, head_end + 1)
+            if body_start < len(self.masked) and self.masked[body_start] == '{':
+                body_end = self.matching(body_start)
+            else:
+                body_end = _statement_end(self.masked, body_start)
+            blocks.append(Block(match.group(1), match.group(1), body_start, body_end))
+        for match in re.finditer(r'\bdo\s*\{', self.masked):
+            body_start = match.end() - 1
+            blocks.append(Block('do', 'do', body_start, self.matching(body_start)))
+        for match in re.finditer(
+                r'\.(forEach|map|flatMap|filter|reduce|some|every|find)\s*\(', self.masked):
+            args_start = match.end() - 1
+            blocks.append(Block('callback', match.group(1), args_start, self.matching(args_start)))
+        blocks.sort(key=lambda block: block.start)
+        return blocks
+
+    def literals_between(self, start, end):
+        return [literal for literal in self.literals if start <= literal.start < end]
+
+    def _body_start(self, index):
+        index = _skip_space(self.masked, index)
+        # Anotação de tipo de retorno: ): Promise<Foo> {
+        if index < len(self.masked) and self.masked[index] == ':':
+            depth = 0
+            while index < len(self.masked):
+                char = self.masked[index]
+                if char in '<([':
+                    depth += 1
+                elif char in '>)]':
+                    depth -= 1
+                elif depth <= 0 and (char == '{' or self.masked.startswith('=>', index)):
+                    break
+                index += 1
+        index = _skip_space(self.masked, index)
+        if self.masked.startswith('=>', index):
+            index = _skip_space(self.masked, index + 2)
+            if index < len(self.masked) and self.masked[index] != '{':
+                return None
+        if index < len(self.masked) and self.masked[index] == '{':
+            return index
+        return None
+
+
+def _skip_space(text, index):
+    while index < len(text) and text[index].isspace():
+        index += 1
+    return index
+
+
+def _statement_end(text, index):
+    depth = 0
+    while index < len(text):
+        char = text[index]
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            if depth == 0:
+                return index
+            depth -= 1
+        elif char == ';' and depth == 0:
+            return index
+        index += 1
+    return index
+
+
+def _regex_allowed(out):
+    tail = ''.join(out[-16:]).rstrip()
+    if not tail or tail[-1] in _REGEX_PRECEDERS:
+        return True
+    return any(tail.endswith(keyword) and not tail[:-len(keyword)][-1:].isalnum()
+               for keyword in _REGEX_KEYWORDS)
+
+
+def _mask(text):
+    """Troca o conteúdo de comentários, strings, templates e regex por espaços"""
+    out = []
+    literals = []
+    index = 0
+    length = len(text)
+
+    def blank(segment):
+        return ''.join(char if char == '\n' else ' ' for char in segment)
+
+    while index < length:
+        char = text[index]
+        if text.startswith('//', index):
+            end = text.find('\n', index)
+            end = length if end == -1 else end
+            out.append(blank(text[index:end]))
+            index = end
+        elif text.startswith('/*', index):
+            end = text.find('*/', index + 2)
+            end = length if end == -1 else end + 2
+            out.append(blank(text[index:end]))
+            index = end
+        elif char in '\'"`':
+            end = index + 1
+            while end < length and text[end] != char:
+                if text[end] == '\\':
+                    end += 1
+                elif char != '`' and text[end] == '\n':
+                    break
+                end += 1
+            end = min(end, length - 1)
+            literals.append(Literal(index, end + 1, char, text[index + 1:end]))
+            out.append(char + blank(text[index + 1:end]) + text[end])
+            index = end + 1
+        elif char == '/' and _regex_allowed(out):
+            end = index + 1
+            in_class = False
+            while end < length and text[end] != '\n':
+                if text[end] == '\\':
+                    end += 2
+                    continue
+                if text[end] == '[':
+                    in_class = True
+                elif text[end] == ']':
+                    in_class = False
+                elif text[end] == '/' and not in_class:
+                    break
+                end += 1
+            if end >= length or text[end] != '/':
+                out.append(char)
+                index += 1
+                continue
+            out.append('/' + blank(text[index + 1:end]) + '/')
+            index = end + 1
+        else:
+            out.append(char)
+            index += 1
+    return ''.join(out), literals
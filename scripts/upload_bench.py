@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark do upload de documentos (app/api/documentos/doc/upload/route.ts)
+A rota lê o multipart inteiro (request.formData()), copia o arquivo com
+Buffer.from(await file.arrayBuffer()) e só então o entrega ao upload_stream
+do Cloudinary: o pico de memória por requisição é de pelo menos 2x o arquivo.
+O benchmark sobe um substituto local do endpoint de upload do Cloudinary e, em
+um processo separado (para medir seu RSS), a rota em dois modos:
+  - buffered: reproduz a rota atual (corpo inteiro + cópia do arquivo)
+  - streaming: lê o multipart em blocos e repassa cada bloco ao Cloudinary com
+    Transfer-Encoding: chunked (upload_stream alimentado pelo próprio request)
+Clientes concorrentes enviam arquivos multipart dos tamanhos pedidos; o
+relatório traz latência, vazão, RSS ocioso e de pico da rota e confere o etag
+(MD5) devolvido pelo Cloudinary substituto contra o arquivo enviado.
+Execute com: python3 scripts/upload_bench.py [--sizes-mb 1,10,25] [--concurrency 1,4] [--json]
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows: só a amostragem de /proc (indisponível) ficaria
+    resource = None
+
+CHUNK_SIZE = 64 * 1024
+UPLOAD_PATH = '/api/documentos/doc/upload'
+CLOUD_NAME = 'crm-bench'
+MODES = ('buffered', 'streaming')
+MB = 1024 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+def boundary_of(content_type):
+    for part in (content_type or '').split(';'):
+        key, _, value = part.strip().partition('=')
+        if key.lower() == 'boundary' and value:
+            return value.strip('"').encode('latin-1')
+    raise UploadError('multipart sem boundary')
+
+
+def parse_part_headers(raw):
+    headers = {}
+    for line in raw.decode('utf-8', 'replace').split('\r\n'):
+        name, _, value = line.partition(':')
+        if value:
+            headers[name.strip().lower()] = value.strip()
+    disposition = {}
+    for item in headers.get('content-disposition', '').split(';')[1:]:
+        key, _, value = item.strip().partition('=')
+        disposition[key.lower()] = value.strip('"')
+    return headers, disposition
+
+
+class FileFieldReader:
+    """Lê um corpo multipart em blocos e entrega o campo com filename sem guardá-lo inteiro"""
+
+    def __init__(self, read, boundary, length=None, chunk_size=CHUNK_SIZE):
+        self._read = read
+        self._remaining = length
+        self._chunk_size = chunk_size
+        self._delimiter = b'\r\n--' + boundary
+        # O corpo começa com --boundary; o \r\n inicial deixa todas as buscas iguais
+        self._buffer = bytearray(b'\r\n')
+        self.fields = {}
+        self.filename = None
+        self.content_type = None
+
+    def _fill(self):
+        size = self._chunk_size if self._remaining is None else min(self._chunk_size, self._remaining)
+        data = self._read(size) if size else b''
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        self._buffer += data
+        return bool(data)
+
+    def _find(self, token, start=0):
+        while True:
+            index = self._buffer.find(token, start)
+            if index >= 0:
+                return index
+            start = max(0, len(self._buffer) - len(token) + 1)
+            if not self._fill():
+                raise UploadError('multipart truncado')
+
+    def open(self):
+        """Avança até o campo do arquivo, guardando os campos de texto anteriores"""
+        while True:
+            index = self._find(self._delimiter)
+            del self._buffer[:index + len(self._delimiter)]
+            while len(self._buffer) < 2 and self._fill():
+                pass
+            if self._buffer[:2] == b'--':
+                raise UploadError('multipart sem arquivo')
+            end = self._find(b'\r\n\r\n')
+            headers, disposition = parse_part_headers(bytes(self._buffer[2:end]))
+            del self._buffer[:end + 4]
+            if 'filename' in disposition:
+                self.filename = disposition['filename']
+                self.content_type = headers.get('content-type', 'application/octet-stream')
+                return self
+            value_end = self._find(self._delimiter)
+            self.fields[disposition.get('name', '')] = bytes(self._buffer[:value_end]).decode('utf-8', 'replace')
+            del self._buffer[:value_end]
+
+    def chunks(self):
+        """Gera o conteúdo do arquivo; termina no delimitador seguinte"""
+        keep = len(self._delimiter) - 1
+        while True:
+            index = self._buffer.find(self._delimiter)
+            if index >= 0:
+                if index:
+                    yield bytes(self._buffer[:index])
+                del self._buffer[:index]
+                return
+            if len(self._buffer) > keep:
+                yield bytes(self._buffer[:-keep])
+                del self._buffer[:-keep]
+            if not self._fill():
+                raise UploadError('multipart truncado')
+
+
+class ChunkedReader:
+    """read(n) sobre um corpo com Transfer-Encoding: chunked"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._left = 0
+        self._done = False
+
+    def read(self, size):
+        if self._done:
+            return b''
+        if self._left == 0:
+            line = self.stream.readline()
+            self._left = int(line.split(b';')[0].strip() or b'0', 16)
+            if self._left == 0:
+                while self.stream.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+                self._done = True
+                return b''
+        data = self.stream.read(min(size, self._left))
+        self._left -= len(data)
+        if self._left == 0:
+            self.stream.readline()
+        return data
+
+
+def multipart_body(boundary, filename, content_type, chunks, fields=None):
+    """Gera um corpo multipart a partir de blocos do arquivo"""
+    for name, value in (fields or {}).items():
+        yield (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n').encode()
+    yield (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+           f'Content-Type: {content_type}\r\n\r\n').encode()
+    yield from chunks
+    yield f'\r\n--{boundary}--\r\n'.encode()
+
+
+def upload_stream(base_url, chunks, filename, content_type, options, timeout=120):
+    """Cliente de referência: envia o arquivo ao Cloudinary bloco a bloco (chunked)"""
+    parts = urlsplit(base_url)
+    boundary = uuid.uuid4().hex
+    resource_type = options.get('resource_type', 'auto')
+    fields = {key: value for key, value in options.items() if key != 'resource_type'}
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    try:
+        connection.request('POST', f'/v1_1/{CLOUD_NAME}/{resource_type}/upload',
+                           body=multipart_body(boundary, filename, content_type, chunks, fields),
+                           headers={'Content-Type': f'multipart/form-data; boundary={boundary}'},
+                           encode_chunked=True)
+        response = connection.getresponse()
+        payload = json.loads(response.read() or b'{}')
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise UploadError(f"Cloudinary respondeu {response.status}: {payload.get('error')}")
+    return payload
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CloudinaryHandler(_JsonHandler):
+    def do_POST(self):
+        server = self.server
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            read, length = ChunkedReader(self.rfile).read, None
+        else:
+            read, length = self.rfile.read, int(self.headers.get('Content-Length') or 0)
+        try:
+            reader = FileFieldReader(read, boundary_of(self.headers.get('Content-Type')), length).open()
+            digest = hashlib.md5()
+            size = 0
+            started = time.perf_counter()
+            for chunk in reader.chunks():
+                digest.update(chunk)
+                size += len(chunk)
+                if server.bandwidth:
+                    # Banda limitada: espera o tempo que os bytes levariam no link
+                    lag = size / server.bandwidth - (time.perf_counter() - started)
+                    if lag > 0:
+                        time.sleep(lag)
+            while read(CHUNK_SIZE):
+                pass
+        except (UploadError, ValueError) as e:
+            self.close_connection = True
+            self.send_json(400, {'error': {'message': str(e)}})
+            return
+        resource_type = self.path.strip('/').split('/')[2]
+        public_id = f"{reader.fields.get('folder', '')}/{reader.fields.get('public_id') or uuid.uuid4()}".lstrip('/')
+        with server.lock:
+            server.uploads += 1
+            server.bytes += size
+        self.send_json(200, {
+            'public_id': public_id,
+            'version': int(time.time()),
+            'resource_type': resource_type,
+            'bytes': size,
+            'etag': digest.hexdigest(),
+            'secure_url': f'https://res.cloudinary.com/{CLOUD_NAME}/{resource_type}/upload/{public_id}',
+        })
+
+
+class CloudinaryStub(ThreadingHTTPServer):
+    """Substituto local do endpoint de upload do Cloudinary (latência e banda configuráveis)"""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency_ms=0.0, bandwidth_mbps=0.0):
+        super().__init__(address, CloudinaryHandler)
+        self.latency_ms = latency_ms
+        self.bandwidth = bandwidth_mbps * 1e6 / 8
+        self.lock = threading.Lock()
+        self.uploads = 0
+        self.bytes = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+def current_rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class RouteHandler(_JsonHandler):
+    def do_GET(self):
+        if self.path == '/__stats':
+            self.send_json(200, self.server.stats())
+        else:
+            self.send_json(404, {'error': 'Rota não encontrada'})
+
+    def do_POST(self):
+        if self.path != UPLOAD_PATH:
+            self.send_json(404, {'error': 'Rota não encontrada'})
+            return
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak_active = max(server.peak_active, server.active)
+        try:
+            boundary = boundary_of(self.headers.get('Content-Type'))
+            length = int(self.headers.get('Content-Length') or 0)
+            handler = self.buffered if server.mode == 'buffered' else self.streaming
+            result = handler(boundary, length)
+        except (UploadError, ValueError, OSError) as e:
+            self.close_connection = True
+            self.send_json(500, {'error': str(e)})
+            return
+        finally:
+            with server.lock:
+                server.active -= 1
+        self.send_json(201, {'id': result['public_id'], 'url_documento': result['secure_url'],
+                             'tamanho': result['bytes'], 'etag': result['etag']})
+
+    def options_for(self, filename, content_type):
+        is_pdf = filename.lower().endswith('.pdf') or content_type == 'application/pdf'
+        return {'folder': 'crm_documents', 'public_id': str(uuid.uuid4()),
+                'resource_type': 'raw' if is_pdf else 'auto'}
+
+    def buffered(self, boundary, length):
+        """Como a rota atual: formData() guarda o corpo, Buffer.from() copia o arquivo"""
+        body = self.rfile.read(length)
+        delimiter = b'--' + boundary
+        start = body.find(delimiter)
+        while start >= 0:
+            header_end = body.find(b'\r\n\r\n', start)
+            if header_end < 0:
+                raise UploadError('multipart truncado')
+            headers, disposition = parse_part_headers(body[start + len(delimiter) + 2:header_end])
+            end = body.find(b'\r\n' + delimiter, header_end + 4)
+            if end < 0:
+                raise UploadError('multipart truncado')
+            if 'filename' in disposition:
+                file_buffer = bytes(body[header_end + 4:end])
+                view = memoryview(file_buffer)
+                chunks = (view[offset:offset + CHUNK_SIZE] for offset in range(0, len(view), CHUNK_SIZE))
+                content_type = headers.get('content-type', 'application/octet-stream')
+                return upload_stream(self.server.upstream, chunks, disposition['filename'], content_type,
+                                     self.options_for(disposition['filename'], content_type))
+            start = end + 2
+        raise UploadError('Nenhum arquivo enviado')
+
+    def streaming(self, boundary, length):
+        """Alternativa: cada bloco lido do request segue direto para o Cloudinary"""
+        reader = FileFieldReader(self.rfile.read, boundary, length).open()
+        result = upload_stream(self.server.upstream, reader.chunks(), reader.filename, reader.content_type,
+                               self.options_for(reader.filename, reader.content_type))
+        # Consome o epílogo para manter a conexão reaproveitável
+        for _ in reader.chunks():
+            pass
+        return result
+
+
+class RouteServer(ThreadingHTTPServer):
+    """Rota de upload em um dos modos, medindo o próprio RSS"""
+
+    daemon_threads = True
+
+    def __init__(self, address, mode, upstream, sample_interval=0.02):
+        super().__init__(address, RouteHandler)
+        self.mode = mode
+        self.upstream = upstream
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak_active = 0
+        self.idle_rss_kb = current_rss_kb()
+        self.sampled_peak_kb = self.idle_rss_kb or 0
+        self._sampler = threading.Thread(target=self._sample, args=(sample_interval,), daemon=True)
+        self._sampler.start()
+
+    def _sample(self, interval):
+        while True:
+            rss = current_rss_kb()
+            if rss is None:
+                return
+            self.sampled_peak_kb = max(self.sampled_peak_kb, rss)
+            time.sleep(interval)
+
+    def stats(self):
+        # ru_maxrss pega picos entre amostras; a amostragem cobre sistemas sem resource
+        peak = max(filter(None, (peak_rss_kb(), self.sampled_peak_kb)), default=None)
+        return {'mode': self.mode, 'idle_rss_kb': self.idle_rss_kb, 'peak_rss_kb': peak,
+                'peak_active': self.peak_active}
+
+
+def serve_route(mode, upstream, port):
+    server = RouteServer(('127.0.0.1', port), mode, upstream)
+    print(f'PORT {server.server_address[1]}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+class RouteProcess:
+    """Sobe a rota em um processo próprio para que o RSS medido seja só dela"""
+
+    def __init__(self, mode, upstream):
+        self.mode = mode
+        self.upstream = upstream
+        self.process = None
+        self.port = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve-route', self.mode, '--upstream', self.upstream],
+            stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line.startswith('PORT '):
+            self.process.kill()
+            raise RuntimeError(f'rota {self.mode} não iniciou')
+        self.port = int(line.split()[1])
+        return self
+
+    def stats(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        try:
+            connection.request('GET', '/__stats')
+            return json.loads(connection.getresponse().read())
+        finally:
+            connection.close()
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+        return False
+
+
+class SyntheticFile:
+    """Conteúdo determinístico de um tamanho dado, gerado em blocos com MD5 conhecido"""
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.block = random.Random(seed).randbytes(CHUNK_SIZE)
+        digest = hashlib.md5()
+        for chunk in self.chunks():
+            digest.update(chunk)
+        self.md5 = digest.hexdigest()
+
+    def chunks(self):
+        remaining = self.size
+        while remaining > 0:
+            chunk = self.block if remaining >= CHUNK_SIZE else self.block[:remaining]
+            remaining -= len(chunk)
+            yield chunk
+
+
+def send_upload(port, synthetic, filename='documento.pdf', content_type='application/pdf'):
+    """Envia um multipart com Content-Length, sem montar o corpo em memória"""
+    boundary = uuid.uuid4().hex
+    overhead = sum(len(part) for part in multipart_body(boundary, filename, content_type, ()))
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    try:
+        connection.request('POST', UPLOAD_PATH,
+                           body=multipart_body(boundary, filename, content_type, synthetic.chunks()),
+                           headers={'Content-Type': f'multipart/form-data; boundary={boundary}',
+                                    'Content-Length': str(overhead + synthetic.size)})
+        response = connection.getresponse()
+        payload = json.loads(response.read() or b'{}')
+    finally:
+        connection.close()
+    return response.status, payload
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_case(mode, size, concurrency, uploads, upstream, seed):
+    """Uma rodada: processo novo da rota, `uploads` envios por cliente concorrente"""
+    synthetic = SyntheticFile(size, seed)
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    with RouteProcess(mode, upstream) as route:
+        def client():
+            for _ in range(uploads):
+                started = time.perf_counter()
+                try:
+                    status, payload = send_upload(route.port, synthetic)
+                    error = None if status == 201 else f'{status}: {payload.get("error")}'
+                    if error is None and payload.get('etag') != synthetic.md5:
+                        error = 'etag diferente do arquivo enviado'
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    error = str(e)
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+                    if error:
+                        failures.append(error)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        stats = route.stats()
+
+    latencies.sort()
+    total = len(latencies)
+    idle = stats['idle_rss_kb'] or 0
+    peak = stats['peak_rss_kb'] or 0
+    growth_mb = (peak - idle) / 1024
+    return {
+        'mode': mode,
+        'size_mb': round(size / MB, 2),
+        'concurrency': concurrency,
+        'uploads': total,
+        'errors': len(failures),
+        'first_error': failures[0] if failures else None,
+        'mean_ms': round(sum(latencies) / total * 1000, 1) if total else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'throughput_mb_s': round((total - len(failures)) * size / MB / wall, 1) if wall else 0.0,
+        'idle_rss_mb': round(idle / 1024, 1),
+        'peak_rss_mb': round(peak / 1024, 1),
+        'growth_mb': round(growth_mb, 1),
+        # Crescimento do RSS por upload simultâneo, em múltiplos do arquivo
+        'growth_per_file': round(growth_mb / max(1, stats['peak_active']) / (size / MB), 2) if size else 0.0,
+        'peak_active': stats['peak_active'],
+    }
+
+
+def savings(results):
+    rows = []
+    by_key = {(row['mode'], row['size_mb'], row['concurrency']): row for row in results}
+    for (mode, size_mb, concurrency), row in by_key.items():
+        streaming = by_key.get(('streaming', size_mb, concurrency))
+        if mode != 'buffered' or streaming is None:
+            continue
+        rows.append({'size_mb': size_mb, 'concurrency': concurrency,
+                     'saved_mb': round(row['growth_mb'] - streaming['growth_mb'], 1),
+                     'latency_change_pct': round((streaming['mean_ms'] / row['mean_ms'] - 1) * 100, 1)
+                     if row['mean_ms'] else 0.0})
+    return rows
+
+
+def format_report(report):
+    settings = report['settings']
+    limits = []
+    if settings['cloud_latency_ms']:
+        limits.append(f"latência {settings['cloud_latency_ms']:.0f} ms")
+    if settings['cloud_mbps']:
+        limits.append(f"banda {settings['cloud_mbps']:.0f} Mbit/s")
+    lines = [f"📊 Upload de documentos: {settings['uploads']} envio(s) por cliente, "
+             f"Cloudinary local ({', '.join(limits) or 'sem limites'})",
+             f"  {'modo':<10}{'MB':>7}{'conc.':>6}{'envios':>7}{'erros':>6}{'média ms':>10}{'p95 ms':>9}"
+             f"{'MB/s':>8}{'RSS ocioso':>11}{'pico':>8}{'+MB':>8}{'x arquivo':>10}"]
+    for row in report['results']:
+        lines.append(f"  {row['mode']:<10}{row['size_mb']:>7.1f}{row['concurrency']:>6}{row['uploads']:>7}"
+                     f"{row['errors']:>6}{row['mean_ms']:>10.1f}{row['p95_ms']:>9.1f}{row['throughput_mb_s']:>8.1f}"
+                     f"{row['idle_rss_mb']:>11.1f}{row['peak_rss_mb']:>8.1f}{row['growth_mb']:>8.1f}"
+                     f"{row['growth_per_file']:>10.2f}")
+        if row['first_error']:
+            lines.append(f"    ⚠️  {row['first_error']}")
+    lines.append('  +MB: pico menos ocioso; x arquivo: crescimento por upload simultâneo / tamanho do arquivo')
+    if report['savings']:
+        lines.append('')
+        lines.append('✅ Streaming em relação à rota atual')
+        for row in report['savings']:
+            lines.append(f"  {row['size_mb']:.1f} MB x {row['concurrency']}: {row['saved_mb']:.1f} MB a menos "
+                         f"no pico, latência {row['latency_change_pct']:+.1f}%")
+    return '\n'.join(lines)
+
+
+def parse_list(value, kind):
+    return [kind(item) for item in value.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mede memória, latência e vazão do upload de documentos')
+    parser.add_argument('--sizes-mb', default='1,10,25', help='tamanhos de arquivo em MB')
+    parser.add_argument('--concurrency', default='1,4', help='clientes simultâneos')
+    parser.add_argument('--uploads', type=int, default=3, help='envios por cliente em cada rodada')
+    parser.add_argument('--modes', default=','.join(MODES), help=f'entre {", ".join(MODES)}')
+    parser.add_argument('--cloud-latency-ms', type=float, default=0.0, help='latência do Cloudinary substituto')
+    parser.add_argument('--cloud-mbps', type=float, default=0.0, help='banda até o Cloudinary (0 = ilimitada)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_out', nargs='?', const='-',
+                        help='grava o relatório JSON no arquivo indicado (ou stdout)')
+    parser.add_argument('--serve-route', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--upstream', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve_route:
+        return serve_route(args.serve_route, args.upstream, args.port)
+
+    modes = parse_list(args.modes, str)
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f'modos desconhecidos: {", ".join(unknown)}')
+
+    results = []
+    with CloudinaryStub(latency_ms=args.cloud_latency_ms, bandwidth_mbps=args.cloud_mbps) as cloud:
+        for size_mb in parse_list(args.sizes_mb, float):
+            for concurrency in parse_list(args.concurrency, int):
+                for mode in modes:
+                    results.append(run_case(mode, int(size_mb * MB), concurrency, args.uploads,
+                                            cloud.base_url, args.seed))
+
+    report = {
+        'settings': {'uploads': args.uploads, 'cloud_latency_ms': args.cloud_latency_ms,
+                     'cloud_mbps': args.cloud_mbps, 'chunk_kb': CHUNK_SIZE // 1024},
+        'results': results,
+        'savings': savings(results),
+    }
+    if args.json_out == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(format_report(report))
+        if args.json_out:
+            with open(args.json_out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f'📄 Relatório salvo em: {args.json_out}')
+    return 1 if any(row['errors'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())